@@ -0,0 +1,175 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/utils/math/SafeMath.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+import "./strategies/camelot/CoreStrategyAaveGrail.sol";
+
+// Everything a keeper or dashboard reads from a strategy, see getPositionSnapshot()
+struct PositionSnapshot {
+    /*****************************/
+    /*      Prices & reserves    */
+    /*****************************/
+    uint256 wantInLp;
+    uint256 shortInLp;
+    uint256 lpTotalSupply;
+    uint256 lpPrice;
+    uint256 oraclePrice;
+    /*****************************/
+    /*          Balances         */
+    /*****************************/
+    uint256 balanceOfWant;
+    uint256 balanceShort;
+    uint256 balanceShortWantEq;
+    uint256 balanceLend;
+    uint256 balanceLpInShort;
+    uint256 balanceLp;
+    uint256 balanceDebtInShort;
+    uint256 balanceDebt;
+    uint256 balanceDebtOracle;
+    uint256 balancePendingHarvest;
+    uint256 balanceDeployed;
+    uint256 estimatedTotalAssets;
+    /*****************************/
+    /*           Ratios          */
+    /*****************************/
+    // 0 while nothing is deployed, calcDebtRatio() and calcCollateral() revert instead
+    uint256 debtRatio;
+    uint256 collateral;
+    /*****************************/
+    /*         Thresholds        */
+    /*****************************/
+    uint256 debtLower;
+    uint256 debtUpper;
+    uint256 rebalancePercent;
+    uint256 collatLower;
+    uint256 collatTarget;
+    uint256 collatUpper;
+    uint256 collatLimit;
+    uint256 priceSourceDiffKeeper;
+    uint256 priceSourceDiffUser;
+    bool doPriceCheck;
+    bool isPaused;
+}
+
+// First precondition of rebalanceDebt() or rebalanceCollateral() that fails, Ready
+// if it would go through
+enum RebalanceTrigger {
+    Ready,
+    Paused,
+    // no LP (debt) or nothing lent (collateral), the ratio views revert
+    NotDeployed,
+    // the ratio is within its thresholds
+    InRange,
+    // oracle and LP prices differ by priceSourceDiffKeeper or more
+    PriceSourceDiff
+}
+
+/**
+ * @notice
+ *  Read-only views over CoreStrategyAaveGrail strategies, kept out of the
+ *  strategy so it stays under the EIP-170 contract size limit. Every value is
+ *  derived from the strategy's public views the same way the strategy does.
+ */
+contract StrategyLens {
+    using SafeMath for uint256;
+
+    uint256 constant BASIS_PRECISION = 10000;
+
+    /**
+     * @notice
+     *  Reads the whole position of `_strategy` in one call. Reserves and oracle
+     *  prices are read once and every value is derived from them the same way
+     *  as the strategy's individual views.
+     */
+    function getPositionSnapshot(CoreStrategyAaveGrail _strategy)
+        external
+        view
+        returns (PositionSnapshot memory _snapshot)
+    {
+        (_snapshot.wantInLp, _snapshot.shortInLp) = _strategy.getLpReserves();
+        _snapshot.lpTotalSupply = _strategy.wantShortLP().totalSupply();
+        _snapshot.lpPrice = _snapshot.wantInLp.mul(1e18).div(_snapshot.shortInLp);
+        _snapshot.oraclePrice = _strategy.getOraclePrice();
+
+        _snapshot.balanceOfWant = _strategy.balanceOfWant();
+        _snapshot.balanceShort = _strategy.balanceShort();
+        _snapshot.balanceShortWantEq = _snapshot.balanceShort.mul(_snapshot.wantInLp).div(_snapshot.shortInLp);
+        _snapshot.balanceLend = _strategy.balanceLend();
+        _snapshot.balanceLpInShort = _strategy.balanceLpInShort();
+        _snapshot.balanceLp = _snapshot.balanceLpInShort.mul(_snapshot.wantInLp).mul(2).div(_snapshot.lpTotalSupply);
+        _snapshot.balanceDebtInShort = _strategy.balanceDebtInShort();
+        _snapshot.balanceDebt = _snapshot.balanceDebtInShort.mul(_snapshot.wantInLp).div(_snapshot.shortInLp);
+        _snapshot.balanceDebtOracle = _snapshot.balanceDebtInShort.mul(_snapshot.oraclePrice).div(1e18);
+        _snapshot.balancePendingHarvest = _strategy.balancePendingHarvest();
+        _snapshot.balanceDeployed = _snapshot.balanceLend.add(_snapshot.balanceLp).add(_snapshot.balanceShortWantEq).sub(
+            _snapshot.balanceDebt
+        );
+        _snapshot.estimatedTotalAssets = _snapshot.balanceOfWant.add(_snapshot.balanceDeployed);
+
+        if (_snapshot.balanceLp > 0) {
+            _snapshot.debtRatio = _snapshot.balanceDebt.mul(BASIS_PRECISION).mul(2).div(_snapshot.balanceLp);
+        }
+        if (_snapshot.balanceLend > 0) {
+            _snapshot.collateral = _snapshot.balanceDebtOracle.mul(BASIS_PRECISION).div(_snapshot.balanceLend);
+        }
+
+        _snapshot.debtLower = _strategy.debtLower();
+        _snapshot.debtUpper = _strategy.debtUpper();
+        _snapshot.rebalancePercent = _strategy.rebalancePercent();
+        _snapshot.collatLower = _strategy.collatLower();
+        _snapshot.collatTarget = _strategy.collatTarget();
+        _snapshot.collatUpper = _strategy.collatUpper();
+        _snapshot.collatLimit = _strategy.collatLimit();
+        _snapshot.priceSourceDiffKeeper = _strategy.priceSourceDiffKeeper();
+        _snapshot.priceSourceDiffUser = _strategy.priceSourceDiffUser();
+        _snapshot.doPriceCheck = _strategy.doPriceCheck();
+        _snapshot.isPaused = _strategy.isPaused();
+    }
+
+    /// The packed configuration of `_strategy`, in the layout setConfig() takes
+    function getConfig(CoreStrategyAaveGrail _strategy) external view returns (StrategyConfig memory _config) {
+        _config.collatUpper = SafeCast.toUint16(_strategy.collatUpper());
+        _config.collatTarget = SafeCast.toUint16(_strategy.collatTarget());
+        _config.collatLower = SafeCast.toUint16(_strategy.collatLower());
+        _config.collatLimit = SafeCast.toUint16(_strategy.collatLimit());
+        _config.debtUpper = SafeCast.toUint16(_strategy.debtUpper());
+        _config.debtLower = SafeCast.toUint16(_strategy.debtLower());
+        _config.rebalancePercent = SafeCast.toUint16(_strategy.rebalancePercent());
+        _config.slippageAdj = SafeCast.toUint16(_strategy.slippageAdj());
+        _config.priceSourceDiffKeeper = SafeCast.toUint16(_strategy.priceSourceDiffKeeper());
+        _config.priceSourceDiffUser = SafeCast.toUint16(_strategy.priceSourceDiffUser());
+        _config.doPriceCheck = _strategy.doPriceCheck();
+        _config.isPaused = _strategy.isPaused();
+        _config.incrementalDebtRebalance = _strategy.incrementalDebtRebalance();
+        _config.flashLoanCollateralRebalance = _strategy.flashLoanCollateralRebalance();
+    }
+
+    /**
+     * @notice
+     *  Checks every precondition of rebalanceCollateral() without calling it, so
+     *  keepers can check many strategies in one multicall and skip the ones
+     *  that would revert. The checks are the strategy's own views.
+     */
+    function rebalanceCollateralTrigger(CoreStrategyAaveGrail _strategy) external view returns (RebalanceTrigger) {
+        if (_strategy.isPaused()) return RebalanceTrigger.Paused;
+        if (_strategy.balanceLend() == 0) return RebalanceTrigger.NotDeployed;
+        if (_strategy.collateralInRange()) return RebalanceTrigger.InRange;
+        return _priceSourceTrigger(_strategy);
+    }
+
+    /// Same as rebalanceCollateralTrigger() for rebalanceDebt()
+    function rebalanceDebtTrigger(CoreStrategyAaveGrail _strategy) external view returns (RebalanceTrigger) {
+        if (_strategy.isPaused()) return RebalanceTrigger.Paused;
+        if (_strategy.balanceLpInShort() == 0) return RebalanceTrigger.NotDeployed;
+        if (_strategy.debtInRange()) return RebalanceTrigger.InRange;
+        return _priceSourceTrigger(_strategy);
+    }
+
+    function _priceSourceTrigger(CoreStrategyAaveGrail _strategy) internal view returns (RebalanceTrigger) {
+        if (_strategy.priceSourceOk(_strategy.priceSourceDiffKeeper())) {
+            return RebalanceTrigger.Ready;
+        }
+        return RebalanceTrigger.PriceSourceDiff;
+    }
+}
@@ -0,0 +1,7 @@
+// SPDX-License-Identifier: AGPL-3.0
+
+pragma solidity 0.8.15;
+
+interface ICamelotFactory {
+    function getPair(address tokenA, address tokenB) external view returns (address pair);
+}
@@ -0,0 +1,75 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "../interfaces/IUniswapV2Pair.sol";
+
+/**
+ * @notice
+ *  Swaps against a Camelot volatile pair directly instead of through the
+ *  router. The input is sent to the pair and the output is worked out from
+ *  the pair's reserves and the fee of the input token, the same way the
+ *  pair's K check does, so an exact output swap pays exactly what the output
+ *  costs. Pair tokens are sorted, token0 is the lower address.
+ */
+library CamelotPairSwap {
+    using SafeERC20 for IERC20;
+
+    uint256 internal constant FEE_DENOMINATOR = 100000;
+
+    /// Reserves of `_pair` ordered input first and the fee paid on the input
+    function getReserves(IUniswapV2Pair _pair, bool _inIsToken0)
+        internal
+        view
+        returns (
+            uint256 _reserveIn,
+            uint256 _reserveOut,
+            uint256 _feeIn
+        )
+    {
+        (uint112 reserve0, uint112 reserve1, uint16 fee0, uint16 fee1) = _pair.getReserves();
+        if (_inIsToken0) {
+            return (reserve0, reserve1, fee0);
+        }
+        return (reserve1, reserve0, fee1);
+    }
+
+    function getAmountOut(
+        uint256 _amountIn,
+        uint256 _reserveIn,
+        uint256 _reserveOut,
+        uint256 _feeIn
+    ) internal pure returns (uint256) {
+        uint256 amountInWithFee = _amountIn * (FEE_DENOMINATOR - _feeIn);
+        return amountInWithFee * _reserveOut / (_reserveIn * FEE_DENOMINATOR + amountInWithFee);
+    }
+
+    function getAmountIn(
+        uint256 _amountOut,
+        uint256 _reserveIn,
+        uint256 _reserveOut,
+        uint256 _feeIn
+    ) internal pure returns (uint256) {
+        require(_amountOut > 0, "insufficient output amount");
+        require(_reserveIn > 0 && _reserveOut > _amountOut, "insufficient liquidity");
+        return _reserveIn * _amountOut * FEE_DENOMINATOR / ((_reserveOut - _amountOut) * (FEE_DENOMINATOR - _feeIn)) + 1;
+    }
+
+    /// Sends `_amountIn` of `_tokenIn` to `_pair` and takes `_amountOut` of the other token to `_to`
+    function swap(
+        IUniswapV2Pair _pair,
+        IERC20 _tokenIn,
+        bool _inIsToken0,
+        uint256 _amountIn,
+        uint256 _amountOut,
+        address _to
+    ) internal {
+        _tokenIn.safeTransfer(address(_pair), _amountIn);
+        if (_inIsToken0) {
+            _pair.swap(0, _amountOut, _to, new bytes(0));
+        } else {
+            _pair.swap(_amountOut, 0, _to, new bytes(0));
+        }
+    }
+}
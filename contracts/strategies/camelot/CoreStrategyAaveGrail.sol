@@ -12,12 +12,15 @@ import {
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/utils/math/SafeMath.sol";
 import "@openzeppelin/contracts/utils/math/Math.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "../../interfaces/camelot/ICamelotRouter.sol";
 import "../../interfaces/aave/IAToken.sol";
 import "../../interfaces/aave/IVariableDebtToken.sol";
 import "../../interfaces/aave/IPool.sol";
+import "../../interfaces/aave/IFlashLoanSimpleReceiver.sol";
 import "../../interfaces/aave/IAaveOracle.sol";
 import "../../interfaces/IUniswapV2Pair.sol";
+import "../../libraries/CamelotPairSwap.sol";
 import "../../interfaces/IStrategyInsurance.sol";
 
 struct CoreStrategyAaveConfig {
@@ -51,11 +54,56 @@ struct CoreStrategyAaveConfig {
     uint256 minDeploy;
 }
 
+// Pair state and oracle price shared by the steps of one keeper or vault call,
+// see _loadMarket()
+struct MarketSnapshot {
+    uint256 wantInLp;
+    uint256 shortInLp;
+    uint256 lpTotalSupply;
+    // 0 until first used, see _oraclePrice()
+    uint256 oraclePrice;
+}
+
+// Thresholds and switches read on the keeper and vault paths, packed in one
+// storage slot. Ratios and percentages are multiplied by BASIS_PRECISION
+struct StrategyConfig {
+    /*****************************/
+    /*   Collateral thresholds   */
+    /*****************************/
+    uint16 collatUpper;
+    uint16 collatTarget;
+    uint16 collatLower;
+    // protocal limit for the ratio of debt to collateral
+    uint16 collatLimit;
+    /*****************************/
+    /*      Debt thresholds      */
+    /*****************************/
+    uint16 debtUpper;
+    uint16 debtLower;
+    // how far does rebalance of debt move towards 100% from threshold
+    uint16 rebalancePercent;
+    /*****************************/
+    /*   Slippage & price checks  */
+    /*****************************/
+    uint16 slippageAdj;
+    uint16 priceSourceDiffKeeper;
+    uint16 priceSourceDiffUser;
+    bool doPriceCheck;
+    /*****************************/
+    /*          Switches         */
+    /*****************************/
+    bool isPaused;
+    // rebalanceDebt only unwinds the drift instead of the whole position, see _rebalanceDebtIncremental()
+    bool incrementalDebtRebalance;
+    // rebalanceCollateral repays the debt with an Aave flash loan first, see _flashRebalanceCollateral()
+    bool flashLoanCollateralRebalance;
+}
+
 interface IERC20Extended is IERC20 {
     function decimals() external view returns (uint8);
 }
 
-abstract contract CoreStrategyAaveGrail is BaseStrategy {
+abstract contract CoreStrategyAaveGrail is BaseStrategy, IFlashLoanSimpleReceiver {
     using SafeERC20 for IERC20;
     using Address for address;
     using SafeMath for uint256;
@@ -70,24 +118,32 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         uint256 indexed collatRatio,
         uint256 indexed adjAmount
     );
-
-    uint256 public collatUpper = 7500;
-    uint256 public collatTarget = 7000;
-    uint256 public collatLower = 6500;
-    uint256 public debtUpper = 10390;
-    uint256 public debtLower = 9610;
-    uint256 public rebalancePercent = 10000; // 100% (how far does rebalance of debt move towards 100% from threshold)
-
-    // protocal limits & upper, target and lower thresholds for ratio of debt to collateral
-    uint256 public collatLimit = 8100;
-
-    bool public doPriceCheck = true;
+    event UnwindStep(uint256 lpRemoved, uint256 lpRemaining, uint256 slippage);
+
+    StrategyConfig internal config =
+        StrategyConfig({
+            collatUpper: 7500,
+            collatTarget: 7000,
+            collatLower: 6500,
+            collatLimit: 8100,
+            debtUpper: 10390,
+            debtLower: 9610,
+            rebalancePercent: 10000, // 100%
+            slippageAdj: 9900, // 99%
+            priceSourceDiffKeeper: 500, // 5% Default
+            priceSourceDiffUser: 200, // 2% Default
+            doPriceCheck: true,
+            isPaused: false,
+            incrementalDebtRebalance: false,
+            flashLoanCollateralRebalance: false
+        });
 
     // ERC20 Tokens;
     IERC20 public short;
     uint8 wantDecimals;
     uint8 shortDecimals;
-    IUniswapV2Pair wantShortLP; // This is public because it helps with unit testing
+    IUniswapV2Pair public wantShortLP; // This is public because it helps with unit testing
+    bool immutable wantIsToken0;
     // Contract Interfaces
     address grailManager; //Since it is usually custom, will leave it as an address
     ICamelotRouter router;
@@ -97,19 +153,14 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
     IVariableDebtToken debtToken;
     IAaveOracle public oracle;
 
-    uint256 public slippageAdj = 9900; // 99%
-
-    uint256 constant BASIS_PRECISION = 10000;
-    uint256 public priceSourceDiffKeeper = 500; // 5% Default
-    uint256 public priceSourceDiffUser = 200; // 2% Default
+    uint256 public minDeploy;
 
-    uint256 constant FEE_DENOMINATOR = 100000;
+    // LP removed per unwindStep(), non zero while a chunked unwind is in progress
+    uint256 public unwindLpPerStep;
 
-    bool public isPaused = false;
+    uint256 constant BASIS_PRECISION = 10000;
 
     uint256 constant STD_PRECISION = 1e18;
-    address weth;
-    uint256 public minDeploy;
 
     constructor(address _vault, CoreStrategyAaveConfig memory _config)
         BaseStrategy(_vault)
@@ -117,6 +168,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         // initialise token interfaces
         short = IERC20(_config.short);
         wantShortLP = IUniswapV2Pair(_config.wantShortLP);
+        wantIsToken0 = wantShortLP.token0() == address(want);
         wantDecimals = IERC20Extended(_config.want).decimals();
         shortDecimals = IERC20Extended(_config.short).decimals();
 
@@ -145,6 +197,63 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         return "StrategyHedgedFarmingAaveCamelotV1.0";
     }
 
+    // StrategyConfig fields, see StrategyLens.getConfig()
+    function collatUpper() public view returns (uint256) {
+        return config.collatUpper;
+    }
+
+    function collatTarget() public view returns (uint256) {
+        return config.collatTarget;
+    }
+
+    function collatLower() public view returns (uint256) {
+        return config.collatLower;
+    }
+
+    function collatLimit() public view returns (uint256) {
+        return config.collatLimit;
+    }
+
+    function debtUpper() public view returns (uint256) {
+        return config.debtUpper;
+    }
+
+    function debtLower() public view returns (uint256) {
+        return config.debtLower;
+    }
+
+    function rebalancePercent() public view returns (uint256) {
+        return config.rebalancePercent;
+    }
+
+    function slippageAdj() public view returns (uint256) {
+        return config.slippageAdj;
+    }
+
+    function priceSourceDiffKeeper() public view returns (uint256) {
+        return config.priceSourceDiffKeeper;
+    }
+
+    function priceSourceDiffUser() public view returns (uint256) {
+        return config.priceSourceDiffUser;
+    }
+
+    function doPriceCheck() public view returns (bool) {
+        return config.doPriceCheck;
+    }
+
+    function isPaused() public view returns (bool) {
+        return config.isPaused;
+    }
+
+    function incrementalDebtRebalance() public view returns (bool) {
+        return config.incrementalDebtRebalance;
+    }
+
+    function flashLoanCollateralRebalance() public view returns (bool) {
+        return config.flashLoanCollateralRebalance;
+    }
+
     function prepareReturn(uint256 _debtOutstanding)
         internal
         override
@@ -154,11 +263,12 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             uint256 _debtPayment
         )
     {
-        uint256 totalAssets = estimatedTotalAssets();
+        MarketSnapshot memory market = _loadMarket();
+        uint256 totalAssets = _estimatedTotalAssets(market);
         uint256 totalDebt = _getTotalDebt();
         if (totalAssets > totalDebt) {
             _profit = totalAssets.sub(totalDebt);
-            (uint256 amountFreed, ) = _withdraw(_debtOutstanding.add(_profit));
+            (uint256 amountFreed, ) = _withdraw(_debtOutstanding.add(_profit), market);
             if (_debtOutstanding > amountFreed) {
                 _debtPayment = amountFreed;
                 _profit = 0;
@@ -167,7 +277,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
                 _profit = amountFreed.sub(_debtOutstanding);
             }
         } else {
-            _withdraw(_debtOutstanding);
+            _withdraw(_debtOutstanding, market);
             _debtPayment = balanceOfWant();
             _loss = totalDebt.sub(totalAssets);
         }
@@ -213,6 +323,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         liquidateAllPositionsInternal();
     }
 
+    // priced with the Aave oracle, the router's WETH is the chain's native token
     function ethToWant(uint256 _amtInWei)
         public
         view
@@ -220,26 +331,37 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         override
         returns (uint256)
     {
-        // This is not currently used by the strategies and is
-        // being removed to reduce the size of the contract
-        return 0;
+        if (_amtInWei == 0) return 0;
+        uint256 ethOPrice = oracle.getAssetPrice(router.WETH());
+        uint256 wantOPrice = oracle.getAssetPrice(address(want));
+        return _amtInWei.mul(ethOPrice).mul(10**wantDecimals).div(wantOPrice).div(1e18);
     }
 
-    function getTokenOutPath(address _token_in, address _token_out)
-        internal
-        view
-        returns (address[] memory _path)
-    {
-        bool is_weth =
-            _token_in == address(weth) || _token_out == address(weth);
-        _path = new address[](is_weth ? 2 : 3);
-        _path[0] = _token_in;
-        if (is_weth) {
-            _path[1] = _token_out;
-        } else {
-            _path[1] = address(weth);
-            _path[2] = _token_out;
-        }
+    /**
+     * @notice
+     *  BaseStrategy.harvestTrigger() counting the pending farm rewards as profit,
+     *  so a harvest is only worth it once `profitFactor` times the call cost is
+     *  below what it reports. The report delays, debt outstanding and loss
+     *  checks are unchanged.
+     */
+    function harvestTrigger(uint256 callCostInWei) public view override returns (bool) {
+        StrategyParams memory params = vault.strategies(address(this));
+
+        if (params.activation == 0) return false;
+        if ((block.timestamp - params.lastReport) < minReportDelay) return false;
+        if ((block.timestamp - params.lastReport) >= maxReportDelay) return true;
+
+        if (vault.debtOutstanding() > debtThreshold) return true;
+
+        uint256 total = estimatedTotalAssets();
+        if ((total + debtThreshold) < params.totalDebt) return true;
+
+        // prepareReturn nets the claimed rewards against any loss of the position
+        uint256 reported = total.add(balancePendingHarvest());
+        uint256 profit = reported > params.totalDebt ? reported - params.totalDebt : 0;
+
+        uint256 credit = vault.creditAvailable();
+        return profitFactor.mul(ethToWant(callCostInWei)) < credit.add(profit);
     }
 
     function approveContracts() internal {
@@ -250,16 +372,43 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         IERC20(address(wantShortLP)).safeApprove(address(router), type(uint256).max);
     }
 
+    /**
+     * Replaces the whole configuration in one write. StrategyLens.getConfig()
+     * reads it back. `isPaused` is kept,
+     * it's only changed by pauseStrat() and unpauseStrat().
+     */
+    function setConfig(StrategyConfig memory _newConfig) external onlyAuthorized {
+        _newConfig.isPaused = config.isPaused;
+        _setConfig(_newConfig);
+    }
+
+    // every write of `config` goes through here
+    function _setConfig(StrategyConfig memory _newConfig) internal {
+        require(_newConfig.debtLower <= BASIS_PRECISION);
+        require(_newConfig.rebalancePercent <= BASIS_PRECISION);
+        require(_newConfig.debtUpper >= BASIS_PRECISION);
+        require(_newConfig.collatLimit <= BASIS_PRECISION);
+        require(_newConfig.collatLimit > _newConfig.collatUpper);
+        require(_newConfig.collatUpper >= _newConfig.collatTarget);
+        require(_newConfig.collatTarget >= _newConfig.collatLower);
+        require(_newConfig.slippageAdj <= BASIS_PRECISION);
+        require(_newConfig.priceSourceDiffKeeper <= BASIS_PRECISION);
+        require(_newConfig.priceSourceDiffUser <= BASIS_PRECISION);
+        config = _newConfig;
+    }
+
     function setSlippageConfig(
         uint256 _slippageAdj,
         uint256 _priceSourceDiffUser,
         uint256 _priceSourceDiffKeeper,
         bool _doPriceCheck
     ) external onlyAuthorized {
-        slippageAdj = _slippageAdj;
-        priceSourceDiffKeeper = _priceSourceDiffKeeper;
-        priceSourceDiffUser = _priceSourceDiffUser;
-        doPriceCheck = _doPriceCheck;
+        StrategyConfig memory newConfig = config;
+        newConfig.slippageAdj = SafeCast.toUint16(_slippageAdj);
+        newConfig.priceSourceDiffKeeper = SafeCast.toUint16(_priceSourceDiffKeeper);
+        newConfig.priceSourceDiffUser = SafeCast.toUint16(_priceSourceDiffUser);
+        newConfig.doPriceCheck = _doPriceCheck;
+        _setConfig(newConfig);
     }
 
     function setInsurance(address _insurance) external onlyAuthorized {
@@ -278,12 +427,23 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         uint256 _upper,
         uint256 _rebalancePercent
     ) external onlyAuthorized {
-        require(_lower <= BASIS_PRECISION);
-        require(_rebalancePercent <= BASIS_PRECISION);
-        require(_upper >= BASIS_PRECISION);
-        rebalancePercent = _rebalancePercent;
-        debtUpper = _upper;
-        debtLower = _lower;
+        StrategyConfig memory newConfig = config;
+        newConfig.rebalancePercent = SafeCast.toUint16(_rebalancePercent);
+        newConfig.debtUpper = SafeCast.toUint16(_upper);
+        newConfig.debtLower = SafeCast.toUint16(_lower);
+        _setConfig(newConfig);
+    }
+
+    function setIncrementalDebtRebalance(bool _incremental) external onlyAuthorized {
+        StrategyConfig memory newConfig = config;
+        newConfig.incrementalDebtRebalance = _incremental;
+        _setConfig(newConfig);
+    }
+
+    function setFlashLoanCollateralRebalance(bool _flashLoan) external onlyAuthorized {
+        StrategyConfig memory newConfig = config;
+        newConfig.flashLoanCollateralRebalance = _flashLoan;
+        _setConfig(newConfig);
     }
 
     function setCollateralThresholds(
@@ -292,30 +452,105 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         uint256 _upper,
         uint256 _limit
     ) external onlyAuthorized {
-        require(_limit <= BASIS_PRECISION);
-        collatLimit = _limit;
-        require(collatLimit > _upper);
-        require(_upper >= _target);
-        require(_target >= _lower);
-        collatUpper = _upper;
-        collatTarget = _target;
-        collatLower = _lower;
+        StrategyConfig memory newConfig = config;
+        newConfig.collatLimit = SafeCast.toUint16(_limit);
+        newConfig.collatUpper = SafeCast.toUint16(_upper);
+        newConfig.collatTarget = SafeCast.toUint16(_target);
+        newConfig.collatLower = SafeCast.toUint16(_lower);
+        _setConfig(newConfig);
+    }
+
+    function _setPaused(bool _paused) internal {
+        StrategyConfig memory newConfig = config;
+        newConfig.isPaused = _paused;
+        _setConfig(newConfig);
     }
 
     function pauseStrat() external onlyKeepers {
-        require(!isPaused);
+        require(!isPaused());
         liquidateAllPositionsInternal();
         _lendWant(balanceOfWant());
-        isPaused = true;
+        _setPaused(true);
     }
 
     function unpauseStrat() external onlyKeepers {
-        require(isPaused);
-        isPaused = false;
-        _redeemWant(balanceLend());
+        require(isPaused());
+        require(unwindLpPerStep == 0);
+        _setPaused(false);
+        // empty after an emergency exit or a migration
+        if (balanceLend() > 0) {
+            _redeemWant(balanceLend());
+        }
         _deploy(balanceOfWant());
     }
 
+    /**
+     * @notice
+     *  pauseStrat() spread over several transactions for positions too large to
+     *  unwind in one. The strategy is paused straight away and every
+     *  unwindStep() then removes the same amount of LP, `_chunk` (in
+     *  BASIS_PRECISION) of the LP held when the unwind starts, repays the same
+     *  share of the debt and lends the want freed, until the last step unwinds
+     *  what is left with liquidateAllPositionsInternal(), which ends the unwind
+     *  whoever calls it (emergency exit, migration). Withdrawals keep
+     *  unwinding proportionally in the meantime. The rebalances are blocked
+     *  while paused, cancelUnwind() gives them back.
+     */
+    function startUnwind(uint256 _chunk) external onlyKeepers {
+        require(!isPaused());
+        require(_chunk > 0 && _chunk <= BASIS_PRECISION);
+        uint256 lpCount = countLpPooled().add(wantShortLP.balanceOf(address(this)));
+        // rounded up, BASIS_PRECISION / _chunk steps unwind everything
+        unwindLpPerStep = Math.max(lpCount.mul(_chunk).add(BASIS_PRECISION - 1).div(BASIS_PRECISION), 1);
+        _setPaused(true);
+    }
+
+    /**
+     * Stops a chunked unwind and resumes the strategy with what is still
+     * deployed. The freed want stays lent, the keeper rebalances the collateral
+     * back to its target.
+     */
+    function cancelUnwind() external onlyAuthorized {
+        require(unwindLpPerStep > 0);
+        unwindLpPerStep = 0;
+        _setPaused(false);
+    }
+
+    function unwindStep() external onlyKeepers {
+        uint256 lpPerStep = unwindLpPerStep;
+        require(lpPerStep > 0);
+        MarketSnapshot memory market = _loadMarket();
+        require(_testPriceSource(priceSourceDiffKeeper(), market));
+
+        uint256 lpCount = countLpPooled().add(wantShortLP.balanceOf(address(this)));
+        uint256 lpRemoved = Math.min(lpPerStep, lpCount);
+        uint256 slippage = 0;
+        if (lpRemoved == lpCount) {
+            (, slippage) = liquidateAllPositionsInternal();
+        } else {
+            // same as a withdrawal of the LP share, see _withdraw(). Rounded up
+            // so the LP left goes down by at least lpPerStep
+            uint256 share = lpRemoved.mul(STD_PRECISION).sub(1).div(lpCount).add(1);
+            uint256 debtShare = balanceDebtInShortCurrent().mul(share).div(STD_PRECISION);
+            _removeLpShare(share);
+            _loadReserves(market);
+            uint256 shortInShort = balanceShort();
+            if (debtShare > shortInShort) {
+                // at most the want out of the LP, the lend is still collateral
+                slippage = _swapExactWantShort(
+                    Math.min(_convertShortToWantLP(debtShare.sub(shortInShort), market), balanceOfWant())
+                );
+            } else {
+                (, slippage) = _swapExactShortWant(shortInShort.sub(debtShare));
+            }
+            _repayDebt();
+        }
+        if (balanceOfWant() > 0) {
+            _lendWant(balanceOfWant());
+        }
+        emit UnwindStep(lpRemoved, lpCount.sub(lpRemoved), slippage);
+    }
+
     function liquidatePositionAuth(uint256 _amount) external onlyAuthorized {
         liquidatePosition(_amount);
     }
@@ -338,6 +573,8 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         internal
         returns (uint256 _amountFreed, uint256 _loss)
     {
+        // ends a chunked unwind in progress, nothing is left to unwind
+        unwindLpPerStep = 0;
         _withdrawAllPooled();
         _removeAllLp();
 
@@ -350,35 +587,86 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             }
         } else {
             uint256 debtDifference = debtInShort.sub(balShort);
-            if (convertShortToWantLP(debtDifference) > 0) {
-                (_loss) = _swapWantShortExact(debtDifference);
+            uint256 debtDifferenceWant = convertShortToWantLP(debtDifference);
+            uint256 amountIn = getAmountIn(debtDifference);
+            if (amountIn > balanceOfWant() && debtDifferenceWant >= minDeploy) {
+                // The want out of the LP can't buy back the debt and the lend
+                // can't be redeemed while it's owed, flash borrow the difference
+                // to repay the debt, then redeem the lend to buy it back
+                uint256 wantBefore = balanceOfWant().add(balanceLend());
+                _flashRepay(debtDifference, 0, type(uint256).max);
+                uint256 wantSpent = wantBefore.sub(balanceOfWant());
+                if (wantSpent > debtDifferenceWant) {
+                    _loss = wantSpent.sub(debtDifferenceWant);
+                }
             } else {
-                _swapExactWantShort(uint256(1));
+                if (amountIn > balanceOfWant()) {
+                    // Dust left by rounding, the lend still covers it many
+                    // times over so a sliver of it buys the short back
+                    _redeemWant(amountIn.sub(balanceOfWant()));
+                }
+                if (debtDifferenceWant > 0) {
+                    (_loss) = _swapWantShortExact(debtDifference);
+                } else {
+                    _swapExactWantShort(uint256(1));
+                }
             }
             _repayDebt();
         }
 
-        _redeemWant(balanceLend());
+        if (balanceLend() > 0) {
+            _redeemWant(balanceLend());
+        }
         _amountFreed = balanceOfWant();
     }
 
     // rebalances RoboVault strat position to within target collateral range
     function rebalanceCollateral() external onlyKeepers {
         // ratio of amount borrowed to collateral
-        require(!isPaused);
-        uint256 collatRatio = calcCollateral();
-        require(collatRatio <= collatLower || collatRatio >= collatUpper);
-        require(_testPriceSource(priceSourceDiffKeeper));
-        _rebalanceCollateralInternal();
+        require(!isPaused());
+        MarketSnapshot memory market = _loadMarket();
+        uint256 collatRatio = _calcCollateral(market);
+        require(!_collateralInRange(collatRatio));
+        require(_testPriceSource(priceSourceDiffKeeper(), market));
+        _rebalanceCollateralInternal(collatRatio, market);
     }
 
     /// rebalances RoboVault holding of short token vs LP to within target collateral range
     function rebalanceDebt() external onlyKeepers {
-        require(!isPaused);
-        uint256 debtRatio = calcDebtRatio();
-        require(debtRatio < debtLower || debtRatio > debtUpper);
-        require(_testPriceSource(priceSourceDiffKeeper));
-        _rebalanceDebtInternal();
+        require(!isPaused());
+        MarketSnapshot memory market = _loadMarket();
+        uint256 debtRatio = _calcDebtRatio(market);
+        require(!_debtInRange(debtRatio));
+        require(_testPriceSource(priceSourceDiffKeeper(), market));
+        if (incrementalDebtRebalance()) {
+            _rebalanceDebtIncremental(debtRatio, market);
+        } else {
+            _rebalanceDebtInternal(debtRatio, market);
+        }
+    }
+
+    // rebalanceCollateral() reverts while true, reverts with nothing lent
+    function collateralInRange() external view returns (bool) {
+        return _collateralInRange(calcCollateral());
+    }
+
+    // rebalanceDebt() reverts while true, reverts without LP
+    function debtInRange() external view returns (bool) {
+        return _debtInRange(calcDebtRatio());
+    }
+
+    // Whether the oracle and LP prices are within `_priceDiff`, the rebalances
+    // check priceSourceDiffKeeper() and withdrawals priceSourceDiffUser()
+    function priceSourceOk(uint256 _priceDiff) external view returns (bool) {
+        return _testPriceSource(_priceDiff, _loadMarket());
+    }
+
+    function _collateralInRange(uint256 _collatRatio) internal view returns (bool) {
+        return _collatRatio > collatLower() && _collatRatio < collatUpper();
+    }
+
+    function _debtInRange(uint256 _debtRatio) internal view returns (bool) {
+        return _debtRatio >= debtLower() && _debtRatio <= debtUpper();
     }
 
     function claimHarvest() internal virtual;
@@ -406,27 +694,34 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         return false;
     }
 
-    function _rebalanceCollateralInternal() internal {
-        uint256 collatRatio = calcCollateral();
-        uint256 shortPos = balanceDebt();
+    function _rebalanceCollateralInternal(
+        uint256 collatRatio,
+        MarketSnapshot memory _market
+    ) internal {
+        uint256 shortPos = _convertShortToWantLP(balanceDebtInShort(), _market);
         uint256 lendPos = balanceLend();
 
-        if (collatRatio > collatTarget) {
+        if (collatRatio > collatTarget()) {
             uint256 adjAmount =
-                (shortPos.sub(lendPos.mul(collatTarget).div(BASIS_PRECISION)))
+                (shortPos.sub(lendPos.mul(collatTarget()).div(BASIS_PRECISION)))
                     .mul(BASIS_PRECISION)
-                    .div(BASIS_PRECISION.add(collatTarget));
-            /// remove some LP use 50% of withdrawn LP to repay debt and half to add to collateral
-            _withdrawLpRebalanceCollateral(adjAmount.mul(2));
+                    .div(BASIS_PRECISION.add(collatTarget()));
+            /// remove some LP use 50% of withdrawn LP to repay debt and half to add to collateral.
+            /// The flash loan is only worth its premium once the LP can't repay that much
+            if (flashLoanCollateralRebalance() && adjAmount.mul(2) > _balanceLp(_market)) {
+                _flashRebalanceCollateral(adjAmount, _market);
+            } else {
+                _withdrawLpRebalanceCollateral(adjAmount.mul(2), _market);
+            }
             emit CollatRebalance(collatRatio, adjAmount);
-        } else if (collatRatio < collatTarget) {
+        } else if (collatRatio < collatTarget()) {
             uint256 adjAmount =
-                ((lendPos.mul(collatTarget).div(BASIS_PRECISION)).sub(shortPos))
+                ((lendPos.mul(collatTarget()).div(BASIS_PRECISION)).sub(shortPos))
                     .mul(BASIS_PRECISION)
-                    .div(BASIS_PRECISION.add(collatTarget));
-            uint256 borrowAmt = _borrowWantEq(adjAmount);
+                    .div(BASIS_PRECISION.add(collatTarget()));
+            uint256 borrowAmt = _borrowWantEq(adjAmount, _market);
             _redeemWant(adjAmount);
-            _addToLP(borrowAmt);
+            _addToLP(borrowAmt, _market);
             _depositLp();
             emit CollatRebalance(collatRatio, adjAmount);
         }
@@ -434,7 +729,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
 
     // deploy assets according to vault strategy
     function _deploy(uint256 _amount) internal {
-        if (isPaused) {
+        if (isPaused()) {
             _lendWant(balanceOfWant());
             return;
         }
@@ -442,12 +737,13 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         if (_amount < minDeploy || collateralCapReached(_amount)) {
             return;
         }
-        uint256 oPrice = getOraclePrice();
-        uint256 lpPrice = getLpPrice();
+        MarketSnapshot memory market = _loadMarket();
+        uint256 oPrice = _oraclePrice(market);
+        uint256 lpPrice = _lpPrice(market);
         uint256 borrow =
-            collatTarget.mul(_amount).mul(1e18).div(
+            collatTarget().mul(_amount).mul(1e18).div(
                 BASIS_PRECISION.mul(
-                    (collatTarget.mul(lpPrice).div(BASIS_PRECISION).add(oPrice))
+                    (collatTarget().mul(lpPrice).div(BASIS_PRECISION).add(oPrice))
                 )
             );
 
@@ -455,7 +751,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         uint256 lendNeeded = _amount.sub(debtAllocation);
         _lendWant(lendNeeded);
         _borrow(borrow);
-        _addToLP(borrow);
+        _addToLP(borrow, market);
         _depositLp();
     }
 
@@ -464,6 +760,35 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         return wantInLp.mul(1e18).div(shortInLp);
     }
 
+    /**
+     * @notice
+     *  Reads the pair reserves and LP supply once for a step, the oracle price
+     *  is read on first use. The snapshot is passed down to every helper of the
+     *  step instead of each one calling the pair and oracle again. After
+     *  anything that trades on, adds to or removes from the pair, reload the
+     *  reserves with _loadReserves() before using it again.
+     */
+    function _loadMarket() internal view returns (MarketSnapshot memory _market) {
+        _loadReserves(_market);
+    }
+
+    function _loadReserves(MarketSnapshot memory _market) internal view {
+        (_market.wantInLp, _market.shortInLp) = getLpReserves();
+        _market.lpTotalSupply = wantShortLP.totalSupply();
+    }
+
+    // Oracle prices don't move within a transaction, the first read is kept
+    function _oraclePrice(MarketSnapshot memory _market) internal view returns (uint256) {
+        if (_market.oraclePrice == 0) {
+            _market.oraclePrice = getOraclePrice();
+        }
+        return _market.oraclePrice;
+    }
+
+    function _lpPrice(MarketSnapshot memory _market) internal pure returns (uint256) {
+        return _market.wantInLp.mul(1e18).div(_market.shortInLp);
+    }
+
     function getOraclePrice() public view returns (uint256) {
         uint256 shortOPrice = oracle.getAssetPrice(address(short));
         uint256 wantOPrice = oracle.getAssetPrice(address(want));
@@ -477,10 +802,10 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
      * @notice
      *  Reverts if the difference in the price sources are >  priceDiff
      */
-    function _testPriceSource(uint256 priceDiff) internal returns (bool) {
-        if (doPriceCheck) {
-            uint256 oPrice = getOraclePrice();
-            uint256 lpPrice = getLpPrice();
+    function _testPriceSource(uint256 priceDiff, MarketSnapshot memory _market) internal view returns (bool) {
+        if (doPriceCheck()) {
+            uint256 oPrice = _oraclePrice(_market);
+            uint256 lpPrice = _lpPrice(_market);
             uint256 priceSourceRatio = oPrice.mul(BASIS_PRECISION).div(lpPrice);
             return (priceSourceRatio > BASIS_PRECISION.sub(priceDiff) &&
                 priceSourceRatio < BASIS_PRECISION.add(priceDiff));
@@ -510,26 +835,27 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
      *  Solving this for L finds:
      *  B = (TCr - Cr*Plp(2Si-Di)) / (Po + Cr*Plp)
      */
-    function _calcDeployment(uint256 _amount)
+    function _calcDeployment(uint256 _amount, MarketSnapshot memory _market)
         internal
+        view
         returns (uint256 _lendNeeded, uint256 _borrow)
     {
-        uint256 oPrice = getOraclePrice();
-        uint256 lpPrice = getLpPrice();
+        uint256 oPrice = _oraclePrice(_market);
+        uint256 lpPrice = _lpPrice(_market);
         uint256 Si2 = balanceShort().mul(2);
         uint256 Di = balanceDebtInShort();
-        uint256 CrPlp = collatTarget.mul(lpPrice);
+        uint256 CrPlp = collatTarget().mul(lpPrice);
         uint256 numerator;
 
         // NOTE: may throw if _amount * CrPlp > 1e70
         if (Di > Si2) {
             numerator = (
-                collatTarget.mul(_amount).mul(1e18).add(CrPlp.mul(Di.sub(Si2)))
+                collatTarget().mul(_amount).mul(1e18).add(CrPlp.mul(Di.sub(Si2)))
             )
                 .sub(oPrice.mul(BASIS_PRECISION).mul(Di));
         } else {
             numerator = (
-                collatTarget.mul(_amount).mul(1e18).sub(CrPlp.mul(Si2.sub(Di)))
+                collatTarget().mul(_amount).mul(1e18).sub(CrPlp.mul(Si2.sub(Di)))
             )
                 .sub(oPrice.mul(BASIS_PRECISION).mul(Di));
         }
@@ -542,33 +868,34 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         );
     }
 
-    function _deployFromLend(uint256 _amount) internal {
-        if (isPaused) {
+    // `_market` has to hold the current reserves
+    function _deployFromLend(uint256 _amount, MarketSnapshot memory _market) internal {
+        if (isPaused()) {
             return;
         }
 
-        (uint256 _lendNeeded, uint256 _borrowAmt) = _calcDeployment(_amount);
+        (uint256 _lendNeeded, uint256 _borrowAmt) = _calcDeployment(_amount, _market);
         _redeemWant(balanceLend().sub(_lendNeeded));
         _borrow(_borrowAmt);
-        _addToLP(balanceShort());
+        _addToLP(balanceShort(), _market);
         _depositLp();
     }
 
-    function _rebalanceDebtInternal() internal {
+    function _rebalanceDebtInternal(uint256 debtRatio, MarketSnapshot memory _market) internal {
         uint256 swapAmountWant;
         uint256 slippage;
-        uint256 debtRatio = calcDebtRatio();
 
         // Liquidate all the lend, leaving some in debt or as short
         liquidateAllToLend();
+        _loadReserves(_market);
 
         uint256 debtInShort = balanceDebtInShort();
         uint256 balShort = balanceShort();
 
         if (debtInShort > balShort) {
-            uint256 debt = convertShortToWantLP(debtInShort.sub(balShort));
+            uint256 debt = _convertShortToWantLP(debtInShort.sub(balShort), _market);
             // If there's excess debt, we swap some want to repay a portion of the debt
-            swapAmountWant = debt.mul(rebalancePercent).div(BASIS_PRECISION);
+            swapAmountWant = debt.mul(rebalancePercent()).div(BASIS_PRECISION);
             _redeemWant(swapAmountWant);
             slippage = _swapExactWantShort(swapAmountWant);
         } else {
@@ -576,33 +903,69 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             // If there's excess short, we swap some to want which will be used
             // to create lp in _deployFromLend()
             (swapAmountWant, slippage) = _swapExactShortWant(
-                excessShort.mul(rebalancePercent).div(BASIS_PRECISION)
+                excessShort.mul(rebalancePercent()).div(BASIS_PRECISION)
             );
         }
         _repayDebt();
-        _deployFromLend(estimatedTotalAssets());
+        _loadReserves(_market);
+        _deployFromLend(_estimatedTotalAssets(_market), _market);
+        emit DebtRebalance(debtRatio, swapAmountWant, slippage);
+    }
+
+    /**
+     * @notice
+     *  Moves the debt ratio back towards 100% by changing the debt by the drift
+     *  only, leaving the LP in place. Excess debt is repaid with short bought
+     *  with want redeemed from the lend, missing debt is borrowed and sold for
+     *  want that goes to the lend. Gas and slippage scale with the drift
+     *  instead of the position, and the collateral ratio stays close to where
+     *  it was.
+     *
+     * @dev
+     *  The debt ratio is D / S, D the debt and S the short held in the LP.
+     *  Repaying or borrowing x = |D - S| short, scaled by rebalancePercent like
+     *  the full rebalance, makes D equal S.
+     */
+    function _rebalanceDebtIncremental(uint256 debtRatio, MarketSnapshot memory _market) internal {
+        uint256 swapAmountWant;
+        uint256 slippage;
+
+        _repayDebt();
+        uint256 debtInShort = balanceDebtInShort();
+        uint256 shortInLp = balanceLpInShort().mul(_market.shortInLp).div(_market.lpTotalSupply);
+
+        if (debtInShort > shortInLp) {
+            uint256 debt = _convertShortToWantLP(debtInShort.sub(shortInLp), _market);
+            swapAmountWant = debt.mul(rebalancePercent()).div(BASIS_PRECISION);
+            _redeemWant(swapAmountWant);
+            slippage = _swapExactWantShort(swapAmountWant);
+            _repayDebt();
+        } else {
+            uint256 borrowAmt = shortInLp.sub(debtInShort).mul(rebalancePercent()).div(BASIS_PRECISION);
+            uint256 wantBefore = balanceOfWant();
+            _borrow(borrowAmt);
+            (swapAmountWant, slippage) = _swapExactShortWant(borrowAmt);
+            _lendWant(balanceOfWant().sub(wantBefore));
+            // the extra debt must not take the collateral ratio past the limit
+            require(_calcCollateral(_market) <= collatLimit());
+        }
         emit DebtRebalance(debtRatio, swapAmountWant, slippage);
     }
 
     /**
-     * Withdraws and removes `_deployedPercent` percentage if LP from farming and pool respectively
+     * Withdraws and removes `_share` of the LP from farming and pool respectively
      *
-     * @param _deployedPercent percentage multiplied by BASIS_PRECISION of LP to remove.
+     * @param _share share multiplied by STD_PRECISION of LP to remove.
      */
-    function _removeLpPercent(uint256 _deployedPercent) internal {
+    function _removeLpShare(uint256 _share) internal {
         uint256 lpPooled = countLpPooled();
         uint256 lpUnpooled = wantShortLP.balanceOf(address(this));
         uint256 lpCount = lpUnpooled.add(lpPooled);
-        uint256 lpReq = lpCount.mul(_deployedPercent).div(BASIS_PRECISION);
-        uint256 lpWithdraw;
-        if (lpReq - lpUnpooled < lpPooled) {
-            lpWithdraw = lpReq.sub(lpUnpooled);
-        } else {
-            lpWithdraw = lpPooled;
+        uint256 lpReq = lpCount.mul(_share).div(STD_PRECISION);
+        if (lpReq > lpUnpooled) {
+            _withdrawSomeLp(Math.min(lpReq.sub(lpUnpooled), lpPooled));
         }
-
-        // Finnally withdraw the LP from farms and remove from pool
-        _withdrawSomeLp(lpWithdraw);
+        // Finnally remove the LP from the pool, including what was unpooled
         _removeAllLp();
     }
 
@@ -615,8 +978,8 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         override
         returns (uint256 _liquidatedAmount, uint256 _loss)
     {
-        uint256 balanceWant = balanceOfWant();
-        uint256 totalAssets = estimatedTotalAssets();
+        MarketSnapshot memory market = _loadMarket();
+        uint256 totalAssets = _estimatedTotalAssets(market);
 
         // if estimatedTotalAssets is less than params.debtRatio it means there's
         // been a loss (ignores pending harvests). This type of loss is calculated
@@ -631,7 +994,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         }
 
         // Liquidate the amount needed
-        (, uint256 _slippage) = _withdraw(newAmount);
+        (, uint256 _slippage) = _withdraw(newAmount, market);
         _loss = _loss.add(_slippage);
 
         // NOTE: Maintain invariant `want.balanceOf(this) >= _liquidatedAmount`
@@ -652,26 +1015,28 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
      * 2. Uses the short removed to repay debt (Swaps short or base for large withdrawals)
      * 3. Redeems the
      * @param _amountNeeded `want` amount to liquidate
+     * @param _market Snapshot loaded by the caller, reused until the pair changes
      */
-    function _withdraw(uint256 _amountNeeded)
+    function _withdraw(uint256 _amountNeeded, MarketSnapshot memory _market)
         internal
         returns (uint256 _liquidatedAmount, uint256 _loss)
     {
         uint256 balanceWant = balanceOfWant();
 
-        if (isPaused) {
+        // a chunked unwind still has debt against the lend, see startUnwind()
+        if (isPaused() && unwindLpPerStep == 0) {
             if (_amountNeeded > balanceWant) {
                 _redeemWant(_amountNeeded.sub(balanceWant));
             }
             return (_amountNeeded, 0);
         }
 
-        require(_testPriceSource(priceSourceDiffUser));
+        require(_testPriceSource(priceSourceDiffUser(), _market));
         if (_amountNeeded <= balanceWant) {
             return (_amountNeeded, 0);
         }
 
-        uint256 balanceDeployed = balanceDeployed();
+        uint256 balanceDeployed = _balanceDeployed(_market);
 
         // stratPercent: Percentage of the deployed capital we want to liquidate.
         uint256 stratPercent =
@@ -685,34 +1050,44 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             (, _loss) = liquidateAllPositionsInternal();
             _liquidatedAmount = balanceOfWant().sub(balanceWant);
         } else {
-            // liquidate all to lend
-            liquidateAllToLend();
+            // Unwind the same share of the LP, debt and lend so the debt and
+            // collateral ratios are kept, rounding up to free at least what is needed
+            uint256 share =
+                _amountNeeded.sub(balanceWant).mul(STD_PRECISION).sub(1).div(
+                    balanceDeployed
+                ).add(1);
+            uint256 debtShare = balanceDebtInShort().mul(share).div(STD_PRECISION);
+            uint256 lendShare = balanceLend().mul(share).div(STD_PRECISION);
+            _removeLpShare(share);
+            _loadReserves(_market);
             // Only rebalance if more than 5% is being liquidated
             // to save on gas
             uint256 slippage = 0;
             if (stratPercent > 500) {
                 // swap to ensure the debt ratio isn't negatively affected
                 uint256 shortInShort = balanceShort();
-                uint256 debtInShort = balanceDebtInShort();
-                if (debtInShort > shortInShort) {
-                    uint256 debt =
-                        convertShortToWantLP(debtInShort.sub(shortInShort));
-                    uint256 swapAmountWant =
-                        debt.mul(stratPercent).div(BASIS_PRECISION);
-                    _redeemWant(swapAmountWant);
-                    slippage = _swapExactWantShort(swapAmountWant);
+                if (debtShare > shortInShort) {
+                    slippage = _swapExactWantShort(
+                        _convertShortToWantLP(debtShare.sub(shortInShort), _market)
+                    );
                 } else {
                     (, slippage) = _swapExactShortWant(
-                        (shortInShort.sub(debtInShort)).mul(stratPercent).div(
-                            BASIS_PRECISION
-                        )
+                        shortInShort.sub(debtShare)
                     );
                 }
+                _loadReserves(_market);
             }
             _repayDebt();
-
-            // Redeploy the strat
-            _deployFromLend(balanceDeployed.sub(_amountNeeded).add(slippage));
+            if (stratPercent > 500) {
+                _redeemWant(lendShare);
+            } else {
+                // All the short freed repaid debt, which is more than debtShare
+                // below a 100% debt ratio, so redeem whatever is still missing
+                uint256 wantNow = balanceOfWant();
+                if (_amountNeeded > wantNow) {
+                    _redeemWant(_amountNeeded.sub(wantNow));
+                }
+            }
             _liquidatedAmount = balanceOfWant().sub(balanceWant);
             _loss = slippage;
         }
@@ -720,20 +1095,36 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
 
     // calculate total value of vault assets
     function estimatedTotalAssets() public view override returns (uint256) {
-        return balanceOfWant().add(balanceDeployed());
+        return _estimatedTotalAssets(_loadMarket());
+    }
+
+    function _estimatedTotalAssets(MarketSnapshot memory _market) internal view returns (uint256) {
+        return balanceOfWant().add(_balanceDeployed(_market));
     }
 
     // calculate total value of vault assets
     function balanceDeployed() public view returns (uint256) {
+        return _balanceDeployed(_loadMarket());
+    }
+
+    function _balanceDeployed(MarketSnapshot memory _market) internal view returns (uint256) {
         return
-            balanceLend().add(balanceLp()).add(balanceShortWantEq()).sub(
-                balanceDebt()
-            );
+            balanceLend()
+                .add(_balanceLp(_market))
+                .add(_convertShortToWantLP(balanceShort(), _market))
+                .sub(_convertShortToWantLP(balanceDebtInShort(), _market));
     }
 
     // debt ratio - used to trigger rebalancing of debt
     function calcDebtRatio() public view returns (uint256) {
-        return (balanceDebt().mul(BASIS_PRECISION).mul(2).div(balanceLp()));
+        return _calcDebtRatio(_loadMarket());
+    }
+
+    function _calcDebtRatio(MarketSnapshot memory _market) internal view returns (uint256) {
+        return
+            _convertShortToWantLP(balanceDebtInShort(), _market).mul(BASIS_PRECISION).mul(2).div(
+                _balanceLp(_market)
+            );
     }
 
     // calculate debt / collateral - used to trigger rebalancing of debt & collateral
@@ -741,13 +1132,20 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         return balanceDebtOracle().mul(BASIS_PRECISION).div(balanceLend());
     }
 
+    function _calcCollateral(MarketSnapshot memory _market) internal view returns (uint256) {
+        return
+            balanceDebtInShort().mul(_oraclePrice(_market)).div(1e18).mul(BASIS_PRECISION).div(
+                balanceLend()
+            );
+    }
+
     function getLpReserves()
         public
         view
         returns (uint256 _wantInLp, uint256 _shortInLp)
     {
         (uint112 reserves0, uint112 reserves1,,) = wantShortLP.getReserves();
-        if (wantShortLP.token0() == address(want)) {
+        if (wantIsToken0) {
             _wantInLp = uint256(reserves0);
             _shortInLp = uint256(reserves1);
         } else {
@@ -759,7 +1157,7 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
     function getLpReservesAndFee() public view returns (uint256 _wantInLp, uint256 _shortInLp, uint256 _wantFeePercent, uint256 _shortFeePercent) {
         (uint112 reserves0, uint112 reserves1, uint16 fee0, uint16 fee1) = wantShortLP.getReserves();
         
-        if (wantShortLP.token0() == address(want)){
+        if (wantIsToken0) {
             _wantInLp = uint256(reserves0);
             _shortInLp = uint256(reserves1);
             _wantFeePercent = uint256(fee0);
@@ -781,6 +1179,14 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         return (_amountShort.mul(wantInLp).div(shortInLp));
     }
 
+    function _convertShortToWantLP(uint256 _amountShort, MarketSnapshot memory _market)
+        internal
+        pure
+        returns (uint256)
+    {
+        return _amountShort.mul(_market.wantInLp).div(_market.shortInLp);
+    }
+
     function convertShortToWantOracle(uint256 _amountShort)
         internal
         view
@@ -804,10 +1210,13 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
 
     /// get value of all LP in want currency
     function balanceLp() public view returns (uint256) {
-        (uint256 wantInLp, ) = getLpReserves();
+        return _balanceLp(_loadMarket());
+    }
+
+    function _balanceLp(MarketSnapshot memory _market) internal view returns (uint256) {
         return
-            balanceLpInShort().mul(wantInLp).mul(2).div(
-                wantShortLP.totalSupply()
+            balanceLpInShort().mul(_market.wantInLp).mul(2).div(
+                _market.lpTotalSupply
             );
     }
 
@@ -866,11 +1275,11 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
     }
 
     // borrow tokens woth _amount of want tokens
-    function _borrowWantEq(uint256 _amount)
+    function _borrowWantEq(uint256 _amount, MarketSnapshot memory _market)
         internal
         returns (uint256 _borrowamount)
     {
-        _borrowamount = convertWantToShortLP(_amount);
+        _borrowamount = _amount.mul(_market.shortInLp).div(_market.wantInLp);
         _borrow(_borrowamount);
     }
 
@@ -896,11 +1305,12 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
     }
 
     //  withdraws some LP worth _amount, uses withdrawn LP to add to collateral & repay debt
-    function _withdrawLpRebalanceCollateral(uint256 _amount) internal {
+    function _withdrawLpRebalanceCollateral(uint256 _amount, MarketSnapshot memory _market) internal {
         uint256 lpUnpooled = wantShortLP.balanceOf(address(this));
         uint256 lpPooled = countLpPooled();
         uint256 lpCount = lpUnpooled.add(lpPooled);
-        uint256 lpReq = _amount.mul(lpCount).div(balanceLp());
+        // lpCount is balanceLpInShort(), the value of the LP in want follows from the reserves
+        uint256 lpReq = _amount.mul(lpCount).div(lpCount.mul(_market.wantInLp).mul(2).div(_market.lpTotalSupply));
         uint256 lpWithdraw;
         if (lpReq - lpUnpooled < lpPooled) {
             lpWithdraw = lpReq - lpUnpooled;
@@ -918,8 +1328,104 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         _repayDebt();
     }
 
-    function _addToLP(uint256 _amountShort) internal {
-        uint256 _amountWant = convertShortToWantLP(_amountShort);
+    /**
+     * Repays `_adjAmount` of debt and lends as much want in one go: the debt
+     * is repaid with flash borrowed short before the LP is removed, and the
+     * short out of the LP pays back the loan. Whatever the LP lacks, the
+     * premium included, is bought with want from the LP or the lend, which
+     * can be redeemed since the debt is already repaid.
+     *
+     * @param _adjAmount debt to repay, in want at the LP price.
+     */
+    function _flashRebalanceCollateral(uint256 _adjAmount, MarketSnapshot memory _market) internal {
+        uint256 wantBefore = balanceOfWant();
+        uint256 repayAmount = _adjAmount.mul(_market.shortInLp).div(_market.wantInLp);
+        uint256 balanceLp = _balanceLp(_market);
+        uint256 lpShare = balanceLp == 0
+            ? 0
+            : Math.min(_adjAmount.mul(2).mul(STD_PRECISION).div(balanceLp), STD_PRECISION);
+        _flashRepay(Math.min(repayAmount, balanceDebtInShort()), lpShare, 0);
+
+        // Short left over from the LP goes to the debt, the want to the lend
+        _repayDebt();
+        uint256 wantBal = balanceOfWant();
+        if (wantBal > wantBefore) {
+            _lendWant(wantBal.sub(wantBefore));
+        }
+    }
+
+    /**
+     * Flash borrows `_amount` of short from the Aave pool, see executeOperation().
+     *
+     * @param _amount short to repay the debt with.
+     * @param _lpShare share multiplied by STD_PRECISION of LP to remove once the debt is repaid.
+     * @param _redeemAmount want to redeem once the debt is repaid, type(uint256).max for all of it.
+     */
+    function _flashRepay(
+        uint256 _amount,
+        uint256 _lpShare,
+        uint256 _redeemAmount
+    ) internal {
+        pool.flashLoanSimple(
+            address(this),
+            address(short),
+            _amount,
+            abi.encode(_lpShare, _redeemAmount),
+            0
+        );
+    }
+
+    /**
+     * Aave flash loan callback: repays the debt with the borrowed short,
+     * removes LP and redeems want as encoded in `_params` by _flashRepay(),
+     * and buys the short owed to the pool that isn't held.
+     */
+    function executeOperation(
+        address _asset,
+        uint256 _amount,
+        uint256 _premium,
+        address _initiator,
+        bytes calldata _params
+    ) external override returns (bool) {
+        require(msg.sender == address(pool) && _initiator == address(this));
+        require(_asset == address(short));
+        (uint256 lpShare, uint256 redeemAmount) =
+            abi.decode(_params, (uint256, uint256));
+
+        _repayDebt();
+        if (lpShare > 0) {
+            _removeLpShare(lpShare);
+        }
+        redeemAmount = Math.min(redeemAmount, balanceLend());
+        if (redeemAmount > 0) {
+            _redeemWant(redeemAmount);
+        }
+
+        // The pool pulls the loan and premium back after this returns
+        uint256 owed = _amount.add(_premium);
+        uint256 balShort = balanceShort();
+        if (balShort < owed) {
+            uint256 wantNeeded = getAmountIn(owed.sub(balShort));
+            uint256 wantBal = balanceOfWant();
+            if (wantBal < wantNeeded) {
+                _redeemWant(Math.min(wantNeeded.sub(wantBal), balanceLend()));
+            }
+            _swapWantShortExact(owed.sub(balShort));
+        }
+        return true;
+    }
+
+    function POOL() external view override returns (IPool) {
+        return pool;
+    }
+
+    function ADDRESSES_PROVIDER() external view override returns (IPoolAddressesProvider) {
+        return pool.ADDRESSES_PROVIDER();
+    }
+
+    // `_market` has to hold the current reserves
+    function _addToLP(uint256 _amountShort, MarketSnapshot memory _market) internal {
+        uint256 _amountWant = _convertShortToWantLP(_amountShort, _market);
 
         uint256 balWant = want.balanceOf(address(this));
         if (balWant < _amountWant) {
@@ -931,8 +1437,8 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             address(want),
             _amountShort,
             _amountWant,
-            _amountShort.mul(slippageAdj).div(BASIS_PRECISION),
-            _amountWant.mul(slippageAdj).div(BASIS_PRECISION),
+            _amountShort.mul(slippageAdj()).div(BASIS_PRECISION),
+            _amountWant.mul(slippageAdj()).div(BASIS_PRECISION),
             address(this),
             block.timestamp
         );
@@ -962,11 +1468,11 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
             uint256 lpIssued = wantShortLP.totalSupply();
 
             uint256 amountAMin =
-                _amount.mul(shortLP).mul(slippageAdj).div(BASIS_PRECISION).div(
+                _amount.mul(shortLP).mul(slippageAdj()).div(BASIS_PRECISION).div(
                     lpIssued
                 );
             uint256 amountBMin =
-                _amount.mul(wantLP).mul(slippageAdj).div(BASIS_PRECISION).div(
+                _amount.mul(wantLP).mul(slippageAdj()).div(BASIS_PRECISION).div(
                     lpIssued
                 );
             router.removeLiquidity(
@@ -993,22 +1499,17 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         internal
         returns (uint256 slippageWant)
     {
-        uint256 amountOutMin = convertWantToShortLP(_amount);
-        
-        uint256 shortBalanceBefore = short.balanceOf(address(this));
-
-        router.swapExactTokensForTokensSupportingFeeOnTransferTokens(
-            _amount,
-            amountOutMin.mul(slippageAdj).div(BASIS_PRECISION),
-            getTokenOutPath(address(want), address(short)), // _pathWantToShort(),
-            address(this),
-            address(this),
-            block.timestamp
-        );
+        if (_amount == 0) return 0;
+        (uint256 wantInLp, uint256 shortInLp, uint256 wantFee) =
+            CamelotPairSwap.getReserves(wantShortLP, wantIsToken0);
+        uint256 amountOutSpot = _amount.mul(shortInLp).div(wantInLp);
+        uint256 amountOut =
+            CamelotPairSwap.getAmountOut(_amount, wantInLp, shortInLp, wantFee);
+        require(amountOut >= amountOutSpot.mul(slippageAdj()).div(BASIS_PRECISION));
 
-        uint256 amountOut = short.balanceOf(address(this)) - shortBalanceBefore;
+        CamelotPairSwap.swap(wantShortLP, want, wantIsToken0, _amount, amountOut, address(this));
 
-        slippageWant = convertShortToWantLP(amountOutMin - amountOut);
+        slippageWant = amountOutSpot.sub(amountOut).mul(wantInLp).div(shortInLp);
     }
 
     /**
@@ -1024,52 +1525,47 @@ abstract contract CoreStrategyAaveGrail is BaseStrategy {
         internal
         returns (uint256 _amountWant, uint256 _slippageWant)
     {
-        _amountWant = convertShortToWantLP(_amountShort);
-
-        uint256 wantBalanceBefore = want.balanceOf(address(this));
-
-        router.swapExactTokensForTokensSupportingFeeOnTransferTokens(
-            _amountShort,
-            _amountWant.mul(slippageAdj).div(BASIS_PRECISION),
-            getTokenOutPath(address(short), address(want)),
-            address(this),
-            address(this),
-            block.timestamp
-        );
+        if (_amountShort == 0) return (0, 0);
+        (uint256 shortInLp, uint256 wantInLp, uint256 shortFee) =
+            CamelotPairSwap.getReserves(wantShortLP, !wantIsToken0);
+        _amountWant = _amountShort.mul(wantInLp).div(shortInLp);
+        uint256 amountWantOut =
+            CamelotPairSwap.getAmountOut(_amountShort, shortInLp, wantInLp, shortFee);
+        require(amountWantOut >= _amountWant.mul(slippageAdj()).div(BASIS_PRECISION));
 
-        uint256 _amountWantOut = want.balanceOf(address(this)) - wantBalanceBefore;
+        CamelotPairSwap.swap(wantShortLP, short, !wantIsToken0, _amountShort, amountWantOut, address(this));
 
-        _slippageWant = _amountWant - _amountWantOut;
+        _slippageWant = _amountWant - amountWantOut;
     }
 
+    /**
+     * @notice
+     *  Swaps want for exactly _amountOut of short
+     *
+     * @param _amountOut The amount of short to buy
+     *
+     * @return _slippageWant Returns the cost of fees + slippage in want
+     */
     function _swapWantShortExact(uint256 _amountOut)
         internal
         returns (uint256 _slippageWant)
     {
-        uint256 amountInWant = convertShortToWantLP(_amountOut);
-        uint256 amountInExactWant = getAmountIn(_amountOut);
-
-        // Sub Optimal implementation given camelot does not have SwapTokensForExactTokens
-        router.swapExactTokensForTokensSupportingFeeOnTransferTokens(
-            amountInExactWant,
-            _amountOut,
-            getTokenOutPath(address(want), address(short)), // _pathWantToShort(),
-            address(this),
-            address(this),
-            block.timestamp
-        );
-        
-        _slippageWant = amountInExactWant - amountInWant;
-    }
+        if (_amountOut == 0) return 0;
+        (uint256 wantInLp, uint256 shortInLp, uint256 wantFee) =
+            CamelotPairSwap.getReserves(wantShortLP, wantIsToken0);
+        uint256 amountInWant =
+            CamelotPairSwap.getAmountIn(_amountOut, wantInLp, shortInLp, wantFee);
+
+        CamelotPairSwap.swap(wantShortLP, want, wantIsToken0, amountInWant, _amountOut, address(this));
 
-    function getAmountIn(uint256 amountOut) internal returns (uint256 amountIn) {
-        require(amountOut > 0, "insufficient output amount");
-        (uint256 reserveIn, uint256 reserveOut, uint256 reserveInFee,) = getLpReservesAndFee();
-        require(reserveIn > 0 && reserveOut > 0, "insufficient liquidity");
+        _slippageWant = amountInWant.sub(_amountOut.mul(wantInLp).div(shortInLp));
+    }
 
-        uint256 numerator = reserveIn.mul(amountOut).mul(FEE_DENOMINATOR);
-        uint256 denominator = reserveOut.sub(amountOut).mul(FEE_DENOMINATOR - reserveInFee);
-        amountIn = (numerator / denominator).add(1);
+    // want needed to buy `amountOut` of short, see _swapWantShortExact()
+    function getAmountIn(uint256 amountOut) internal view returns (uint256 amountIn) {
+        (uint256 wantInLp, uint256 shortInLp, uint256 wantFee) =
+            CamelotPairSwap.getReserves(wantShortLP, wantIsToken0);
+        amountIn = CamelotPairSwap.getAmountIn(amountOut, wantInLp, shortInLp, wantFee);
     }
 
     /**
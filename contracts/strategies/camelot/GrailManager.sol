@@ -11,6 +11,9 @@ import "@openzeppelin/contracts/utils/math/SafeMath.sol";
 import "../../libraries/proxy/utils/Initializable.sol";
 import "../../libraries/proxy/utils/UUPSUpgradeable.sol";
 import "../../interfaces/camelot/ICamelotRouter.sol";
+import "../../interfaces/camelot/ICamelotFactory.sol";
+import "../../interfaces/IUniswapV2Pair.sol";
+import "../../libraries/CamelotPairSwap.sol";
 
 struct GrailManagerConfig {
     address want;
@@ -142,10 +145,15 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
     address public manager;
     uint256 public tokenId;
     IERC20 public want;
+    // looked up from the router's factory on the first swap, see _swapGrailToWant()
+    IUniswapV2Pair public grailWantPair;
+    // withdraw() keeps the GRAIL until it's worth this much want, harvest() always sells it
+    uint256 public grailSwapThreshold;
 
     event SetStrategy(address strategy);
     event SetManager(address manager);
     event SetYieldBooster(address yieldBooster);
+    event SetGrailSwapThreshold(uint256 grailSwapThreshold);
 
     modifier onlyManager() {
         _onlyManager();
@@ -195,7 +203,6 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
         yieldBooster = _config.yieldBooster;
 
         lp.approve(address(pool), type(uint256).max);
-        grail.approve(address(router), type(uint256).max);
         xGrail.approveUsage(yieldBooster, type(uint256).max);
     }
 
@@ -235,7 +242,8 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
 
         pool.withdrawFromPosition(tokenId, _amount);
 
-        _swapGrailToWant(balanceOfGrail());
+        // nothing more to harvest once the position is closed, sell what was kept
+        _swapGrailToWant(balanceOfGrail(), tokenId == uint256(0) ? 0 : grailSwapThreshold);
 
         if (tokenId != uint256(0)) {
             _stakeXGrail(balanceOfXGrail());
@@ -247,9 +255,10 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
     function harvest() external onlyStrategyAndAbove {
         if (tokenId != uint256(0)) {
             pool.harvestPosition(tokenId);
-            _swapGrailToWant(balanceOfGrail());
             _stakeXGrail(balanceOfXGrail());
         }
+        // along with the GRAIL withdraw() kept below grailSwapThreshold
+        _swapGrailToWant(balanceOfGrail(), 0);
     }
 
     function stakeXGrail(uint256 _amount) external onlyStrategist {
@@ -272,24 +281,29 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
         }
     }
 
-    function _swapGrailToWant(uint256 _amountGrail) internal {
-        address[] memory _path = new address[](2);
+    /// Sells `_amountGrail` for want to the strategy if it buys at least `_minAmountOut`
+    function _swapGrailToWant(uint256 _amountGrail, uint256 _minAmountOut) internal {
+        if (_amountGrail == 0) return;
+        IUniswapV2Pair pair = grailWantPair;
+        if (address(pair) == address(0)) {
+            pair = _getGrailWantPair();
+            grailWantPair = pair;
+        }
+        bool grailIsToken0 = address(grail) < address(want);
 
-        _path[0] = address(grail);
-        _path[1] = address(want);
+        (uint256 reserveIn, uint256 reserveOut, uint256 feeIn) = CamelotPairSwap.getReserves(pair, grailIsToken0);
+        uint256 amountOut = CamelotPairSwap.getAmountOut(_amountGrail, reserveIn, reserveOut, feeIn);
 
-        uint256[] memory amounts = router.getAmountsOut(_amountGrail, _path);
+        if (amountOut > 0 && amountOut >= _minAmountOut) {
+            CamelotPairSwap.swap(pair, grail, grailIsToken0, _amountGrail, amountOut, address(strategy));
+        }
+    }
 
-        if (amounts[1] > 0){
-            router.swapExactTokensForTokensSupportingFeeOnTransferTokens(
-                _amountGrail,
-                0,
-                _path,
-                address(strategy),
-                address(strategy),
-                block.timestamp
-            );
+    function _getGrailWantPair() internal view returns (IUniswapV2Pair) {
+        if (address(grailWantPair) != address(0)) {
+            return grailWantPair;
         }
+        return IUniswapV2Pair(ICamelotFactory(router.factory()).getPair(address(grail), address(want)));
     }
 
     function getPendingRewards() public view returns (uint256, uint256) {
@@ -302,6 +316,27 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
         return (xGrailRewards, grailRewards);
     }
 
+    /**
+     * @notice
+     *  Want the strategy would receive if harvest() was called now: the pending
+     *  GRAIL rewards and any GRAIL held, sold at the current GRAIL/want reserves.
+     *  The xGRAIL share of the rewards is staked, not sold, and isn't counted.
+     *  GRAIL kept below grailSwapThreshold is counted without a position too.
+     */
+    function getPendingRewardsInWant() external view returns (uint256) {
+        uint256 amountGrail = balanceOfGrail();
+        if (tokenId != uint256(0)) {
+            (, uint256 grailRewards) = getPendingRewards();
+            amountGrail = amountGrail.add(grailRewards);
+        }
+        if (amountGrail == 0) return 0;
+
+        bool grailIsToken0 = address(grail) < address(want);
+        (uint256 reserveIn, uint256 reserveOut, uint256 feeIn) =
+            CamelotPairSwap.getReserves(_getGrailWantPair(), grailIsToken0);
+        return CamelotPairSwap.getAmountOut(amountGrail, reserveIn, reserveOut, feeIn);
+    }
+
     function balanceOfWant() public view returns (uint256) {
         return (want.balanceOf(address(this)));
     }
@@ -335,6 +370,11 @@ contract GrailManager is INFTHandler, Initializable, UUPSUpgradeable {
         emit SetYieldBooster(_yieldBooster);
     }
 
+    function setGrailSwapThreshold(uint256 _grailSwapThreshold) external onlyStrategist {
+        grailSwapThreshold = _grailSwapThreshold;
+        emit SetGrailSwapThreshold(_grailSwapThreshold);
+    }
+
     function setManager(address _manager) external onlyManager {
         setManagerInternal(_manager);
     }
@@ -0,0 +1,76 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import {
+    SafeERC20,
+    Address
+} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/utils/math/SafeMath.sol";
+import "./CoreStrategyAaveGrail.sol";
+import "../../interfaces/aave/IAaveOracle.sol";
+
+interface IGrailManager {
+    function deposit(uint256 _amount) external;
+    function withdraw(uint256 _amount) external;
+    function harvest() external;
+    function balance() external view returns (uint256 _amount);
+    function getPendingRewards() external view returns (uint256, uint256);
+    function getPendingRewardsInWant() external view returns (uint256);
+}
+
+/**
+ * @notice
+ *  Farms the want/short LP in a Camelot NFTPool through a GrailManager. Concrete
+ *  strategies only provide the token and protocol addresses.
+ */
+abstract contract GrailStrategy is CoreStrategyAaveGrail {
+    using SafeERC20 for IERC20;
+
+    event SetGrailManager(address grailManager);
+    event SetAave(address oracle, address pool);
+
+    constructor(address _vault, CoreStrategyAaveConfig memory _config)
+        CoreStrategyAaveGrail(_vault, _config)
+    {}
+
+    // in want, see GrailManager.getPendingRewardsInWant(). 0 until the manager is set
+    function balancePendingHarvest() public view override returns (uint256) {
+        if (grailManager == address(0)) return 0;
+        return IGrailManager(grailManager).getPendingRewardsInWant();
+    }
+
+    function _depositLp() internal override {
+        uint256 lpBalance = wantShortLP.balanceOf(address(this));
+        IGrailManager(grailManager).deposit(lpBalance);
+    }
+
+    function _withdrawFarm(uint256 _amount) internal override {
+        if (_amount > 0)
+            IGrailManager(grailManager).withdraw(_amount);
+    }
+
+    function claimHarvest() internal override {
+        IGrailManager(grailManager).harvest();
+    }
+
+    function countLpPooled() internal view override returns (uint256) {
+        if (grailManager == address(0)) return 0;
+        return IGrailManager(grailManager).balance();
+    }
+
+    function setGrailManager(address _grailManager) external onlyAuthorized {
+        grailManager = _grailManager;
+        IERC20(address(wantShortLP)).safeApprove(_grailManager, type(uint256).max);
+        emit SetGrailManager(_grailManager);
+    }
+
+    function setAave(address _oracle, address _pool) external onlyAuthorized {
+        require(_oracle != address(0) && _pool != address(0), "invalid address");
+        oracle = IAaveOracle(_oracle);
+        pool = IPool(_pool);
+        want.safeApprove(address(pool), type(uint256).max);
+        short.safeApprove(address(pool), type(uint256).max);
+        emit SetAave(_oracle, _pool);
+    }
+}
@@ -0,0 +1,223 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "../interfaces/aave/IAaveOracle.sol";
+import "../interfaces/aave/IFlashLoanSimpleReceiver.sol";
+import "./MockAaveToken.sol";
+import "./MockPoolAddressesProvider.sol";
+
+/**
+ * @notice
+ *  Aave v3 pool without interest accrual. Supply, withdraw, variable rate
+ *  borrow and repay move the underlying and mint or burn the reserve tokens.
+ *  Like Aave, borrows are checked against each reserve's LTV and withdrawals
+ *  against the health factor, i.e. the liquidation threshold, using the price
+ *  oracle registered in the addresses provider. Simple flash loans
+ *  charge FLASHLOAN_PREMIUM_TOTAL, which stays with the reserve.
+ */
+contract MockAavePool {
+    using SafeERC20 for IERC20;
+
+    uint256 internal constant PERCENTAGE_FACTOR = 1e4;
+    uint256 internal constant HEALTH_FACTOR_ONE = 1e18;
+
+    struct Reserve {
+        MockAaveToken aToken;
+        MockAaveToken debtToken;
+        uint256 ltv;
+        uint256 liquidationThreshold;
+    }
+
+    MockPoolAddressesProvider public immutable ADDRESSES_PROVIDER;
+    uint128 public FLASHLOAN_PREMIUM_TOTAL = 5;
+    mapping(address => Reserve) public reserves;
+    address[] internal reservesList;
+
+    event Supply(address indexed reserve, address user, address indexed onBehalfOf, uint256 amount, uint16 indexed referralCode);
+    event Withdraw(address indexed reserve, address indexed user, address indexed to, uint256 amount);
+    event Borrow(address indexed reserve, address user, address indexed onBehalfOf, uint256 amount, uint256 interestRateMode, uint16 indexed referralCode);
+    event Repay(address indexed reserve, address indexed user, address indexed repayer, uint256 amount);
+    event FlashLoan(address indexed target, address initiator, address indexed asset, uint256 amount, uint256 interestRateMode, uint256 premium, uint16 indexed referralCode);
+
+    constructor(address _provider) {
+        ADDRESSES_PROVIDER = MockPoolAddressesProvider(_provider);
+    }
+
+    function initReserve(
+        address _asset,
+        address _aToken,
+        address _debtToken,
+        uint256 _ltv,
+        uint256 _liquidationThreshold
+    ) external {
+        require(msg.sender == ADDRESSES_PROVIDER.owner(), "caller not pool admin");
+        require(address(reserves[_asset].aToken) == address(0), "reserve already added");
+        reserves[_asset] = Reserve(MockAaveToken(_aToken), MockAaveToken(_debtToken), _ltv, _liquidationThreshold);
+        reservesList.push(_asset);
+    }
+
+    function updateFlashloanPremiums(uint128 _flashLoanPremiumTotal, uint128) external {
+        require(msg.sender == ADDRESSES_PROVIDER.owner(), "caller not pool admin");
+        FLASHLOAN_PREMIUM_TOTAL = _flashLoanPremiumTotal;
+    }
+
+    function getReservesList() external view returns (address[] memory) {
+        return reservesList;
+    }
+
+    function supply(
+        address _asset,
+        uint256 _amount,
+        address _onBehalfOf,
+        uint16 _referralCode
+    ) public {
+        require(_amount != 0, "invalid amount");
+        Reserve storage reserve = _getReserve(_asset);
+        IERC20(_asset).safeTransferFrom(msg.sender, address(reserve.aToken), _amount);
+        reserve.aToken.mint(_onBehalfOf, _amount);
+        emit Supply(_asset, msg.sender, _onBehalfOf, _amount, _referralCode);
+    }
+
+    function deposit(
+        address _asset,
+        uint256 _amount,
+        address _onBehalfOf,
+        uint16 _referralCode
+    ) external {
+        supply(_asset, _amount, _onBehalfOf, _referralCode);
+    }
+
+    function withdraw(
+        address _asset,
+        uint256 _amount,
+        address _to
+    ) external returns (uint256) {
+        Reserve storage reserve = _getReserve(_asset);
+        uint256 userBalance = reserve.aToken.balanceOf(msg.sender);
+        uint256 amountToWithdraw = _amount == type(uint256).max ? userBalance : _amount;
+        require(amountToWithdraw != 0, "invalid amount");
+        require(amountToWithdraw <= userBalance, "not enough available user balance");
+
+        reserve.aToken.burn(msg.sender, amountToWithdraw);
+        reserve.aToken.transferUnderlyingTo(_to, amountToWithdraw);
+        _requireHealthFactor(msg.sender);
+
+        emit Withdraw(_asset, msg.sender, _to, amountToWithdraw);
+        return amountToWithdraw;
+    }
+
+    function borrow(
+        address _asset,
+        uint256 _amount,
+        uint256 _interestRateMode,
+        uint16 _referralCode,
+        address _onBehalfOf
+    ) external {
+        require(_interestRateMode == 2, "invalid interest rate mode selected");
+        require(_onBehalfOf == msg.sender, "credit delegation not supported");
+        require(_amount != 0, "invalid amount");
+        Reserve storage reserve = _getReserve(_asset);
+        require(IERC20(_asset).balanceOf(address(reserve.aToken)) >= _amount, "not enough liquidity");
+
+        reserve.debtToken.mint(_onBehalfOf, _amount);
+        reserve.aToken.transferUnderlyingTo(msg.sender, _amount);
+        _requireBorrowCovered(_onBehalfOf);
+
+        emit Borrow(_asset, msg.sender, _onBehalfOf, _amount, _interestRateMode, _referralCode);
+    }
+
+    function repay(
+        address _asset,
+        uint256 _amount,
+        uint256 _interestRateMode,
+        address _onBehalfOf
+    ) external returns (uint256) {
+        require(_interestRateMode == 2, "invalid interest rate mode selected");
+        Reserve storage reserve = _getReserve(_asset);
+        uint256 debt = reserve.debtToken.balanceOf(_onBehalfOf);
+        require(debt != 0, "no debt of selected type");
+        uint256 paybackAmount = _amount < debt ? _amount : debt;
+
+        reserve.debtToken.burn(_onBehalfOf, paybackAmount);
+        IERC20(_asset).safeTransferFrom(msg.sender, address(reserve.aToken), paybackAmount);
+
+        emit Repay(_asset, _onBehalfOf, msg.sender, paybackAmount);
+        return paybackAmount;
+    }
+
+    function flashLoanSimple(
+        address _receiverAddress,
+        address _asset,
+        uint256 _amount,
+        bytes calldata _params,
+        uint16 _referralCode
+    ) external {
+        Reserve storage reserve = _getReserve(_asset);
+        uint256 premium = _amount * FLASHLOAN_PREMIUM_TOTAL / PERCENTAGE_FACTOR;
+
+        reserve.aToken.transferUnderlyingTo(_receiverAddress, _amount);
+        require(
+            IFlashLoanSimpleReceiver(_receiverAddress).executeOperation(_asset, _amount, premium, msg.sender, _params),
+            "invalid flashloan executor return"
+        );
+        IERC20(_asset).safeTransferFrom(_receiverAddress, address(reserve.aToken), _amount + premium);
+
+        emit FlashLoan(_receiverAddress, msg.sender, _asset, _amount, 0, premium, _referralCode);
+    }
+
+    function getUserAccountData(address _user)
+        public
+        view
+        returns (
+            uint256 totalCollateralBase,
+            uint256 totalDebtBase,
+            uint256 availableBorrowsBase,
+            uint256 currentLiquidationThreshold,
+            uint256 ltv,
+            uint256 healthFactor
+        )
+    {
+        IAaveOracle oracle = IAaveOracle(ADDRESSES_PROVIDER.getPriceOracle());
+        uint256 borrowCapacity;
+        uint256 liquidationCapacity;
+        for (uint256 i; i < reservesList.length; i++) {
+            address asset = reservesList[i];
+            Reserve storage reserve = reserves[asset];
+            uint256 unit = 10**reserve.aToken.decimals();
+            uint256 price = oracle.getAssetPrice(asset);
+
+            uint256 collateral = reserve.aToken.balanceOf(_user) * price / unit;
+            totalCollateralBase += collateral;
+            borrowCapacity += collateral * reserve.ltv;
+            liquidationCapacity += collateral * reserve.liquidationThreshold;
+            totalDebtBase += reserve.debtToken.balanceOf(_user) * price / unit;
+        }
+
+        if (totalCollateralBase != 0) {
+            ltv = borrowCapacity / totalCollateralBase;
+            currentLiquidationThreshold = liquidationCapacity / totalCollateralBase;
+        }
+        uint256 maxBorrowBase = borrowCapacity / PERCENTAGE_FACTOR;
+        availableBorrowsBase = maxBorrowBase > totalDebtBase ? maxBorrowBase - totalDebtBase : 0;
+        healthFactor = totalDebtBase == 0
+            ? type(uint256).max
+            : liquidationCapacity * HEALTH_FACTOR_ONE / PERCENTAGE_FACTOR / totalDebtBase;
+    }
+
+    function _getReserve(address _asset) internal view returns (Reserve storage reserve) {
+        reserve = reserves[_asset];
+        require(address(reserve.aToken) != address(0), "reserve not active");
+    }
+
+    function _requireBorrowCovered(address _user) internal view {
+        (uint256 collateral, uint256 debt, , , uint256 ltv, ) = getUserAccountData(_user);
+        require(debt * PERCENTAGE_FACTOR <= collateral * ltv, "collateral cannot cover new borrow");
+    }
+
+    function _requireHealthFactor(address _user) internal view {
+        (, , , , , uint256 healthFactor) = getUserAccountData(_user);
+        require(healthFactor >= HEALTH_FACTOR_ONE, "health factor lower than liquidation threshold");
+    }
+}
@@ -0,0 +1,62 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+
+/**
+ * @notice
+ *  Pool-controlled balance token used for both the aToken and the variable
+ *  debt token of a MockAavePool reserve. Debt tokens are not transferable.
+ */
+contract MockAaveToken is ERC20 {
+    using SafeERC20 for IERC20;
+
+    address public immutable POOL;
+    address public immutable UNDERLYING_ASSET_ADDRESS;
+    bool public immutable transferable;
+    uint8 private immutable _decimals;
+
+    modifier onlyPool() {
+        require(msg.sender == POOL, "caller must be pool");
+        _;
+    }
+
+    constructor(
+        address _pool,
+        address _underlying,
+        uint8 _tokenDecimals,
+        bool _transferable,
+        string memory _name,
+        string memory _symbol
+    ) ERC20(_name, _symbol) {
+        POOL = _pool;
+        UNDERLYING_ASSET_ADDRESS = _underlying;
+        _decimals = _tokenDecimals;
+        transferable = _transferable;
+    }
+
+    function decimals() public view override returns (uint8) {
+        return _decimals;
+    }
+
+    function mint(address _to, uint256 _amount) external onlyPool {
+        _mint(_to, _amount);
+    }
+
+    function burn(address _from, uint256 _amount) external onlyPool {
+        _burn(_from, _amount);
+    }
+
+    function transferUnderlyingTo(address _target, uint256 _amount) external onlyPool {
+        IERC20(UNDERLYING_ASSET_ADDRESS).safeTransfer(_target, _amount);
+    }
+
+    function _beforeTokenTransfer(
+        address _from,
+        address _to,
+        uint256
+    ) internal view override {
+        require(transferable || _from == address(0) || _to == address(0), "operation not supported");
+    }
+}
@@ -0,0 +1,164 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/utils/math/Math.sol";
+
+/**
+ * @notice
+ *  Camelot volatile pair with directional fees. Implements the subset of the
+ *  pair used by the strategy and the router: reserves with fees, mint/burn of
+ *  liquidity and fee-adjusted constant product swaps.
+ */
+contract MockCamelotPair is ERC20 {
+    using SafeERC20 for IERC20;
+
+    uint256 public constant MINIMUM_LIQUIDITY = 1000;
+    uint256 public constant FEE_DENOMINATOR = 100000;
+    uint256 public constant MAX_FEE_PERCENT = 2000;
+    address private constant DEAD = 0x000000000000000000000000000000000000dEaD;
+
+    address public immutable factory;
+    address public token0;
+    address public token1;
+
+    uint112 private reserve0;
+    uint112 private reserve1;
+    uint16 public token0FeePercent = 300;
+    uint16 public token1FeePercent = 300;
+
+    event Mint(address indexed sender, uint256 amount0, uint256 amount1);
+    event Burn(address indexed sender, uint256 amount0, uint256 amount1, address indexed to);
+    event Swap(
+        address indexed sender,
+        uint256 amount0In,
+        uint256 amount1In,
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address indexed to
+    );
+    event Sync(uint112 reserve0, uint112 reserve1);
+    event FeePercentUpdated(uint16 token0FeePercent, uint16 token1FeePercent);
+
+    constructor(address _tokenA, address _tokenB) ERC20("Camelot LP", "CMLT-LP") {
+        (token0, token1) = _tokenA < _tokenB ? (_tokenA, _tokenB) : (_tokenB, _tokenA);
+        factory = msg.sender;
+    }
+
+    function getReserves()
+        external
+        view
+        returns (
+            uint112 _reserve0,
+            uint112 _reserve1,
+            uint16 _token0FeePercent,
+            uint16 _token1FeePercent
+        )
+    {
+        return (reserve0, reserve1, token0FeePercent, token1FeePercent);
+    }
+
+    /// @dev Camelot fees are dynamic, tests move them to exercise the strategy's fee handling
+    function setFeePercent(uint16 _token0FeePercent, uint16 _token1FeePercent) external {
+        require(_token0FeePercent <= MAX_FEE_PERCENT && _token1FeePercent <= MAX_FEE_PERCENT, "invalid fee");
+        token0FeePercent = _token0FeePercent;
+        token1FeePercent = _token1FeePercent;
+        emit FeePercentUpdated(_token0FeePercent, _token1FeePercent);
+    }
+
+    function getAmountOut(uint256 _amountIn, address _tokenIn) public view returns (uint256) {
+        (uint256 reserveIn, uint256 reserveOut, uint256 feePercent) = _tokenIn == token0
+            ? (uint256(reserve0), uint256(reserve1), uint256(token0FeePercent))
+            : (uint256(reserve1), uint256(reserve0), uint256(token1FeePercent));
+        uint256 amountInWithFee = _amountIn * (FEE_DENOMINATOR - feePercent);
+        return amountInWithFee * reserveOut / (reserveIn * FEE_DENOMINATOR + amountInWithFee);
+    }
+
+    function mint(address _to) external returns (uint256 liquidity) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 amount0 = balance0 - reserve0;
+        uint256 amount1 = balance1 - reserve1;
+
+        uint256 _totalSupply = totalSupply();
+        if (_totalSupply == 0) {
+            liquidity = Math.sqrt(amount0 * amount1) - MINIMUM_LIQUIDITY;
+            _mint(DEAD, MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = Math.min(
+                amount0 * _totalSupply / reserve0,
+                amount1 * _totalSupply / reserve1
+            );
+        }
+        require(liquidity > 0, "INSUFFICIENT_LIQUIDITY_MINTED");
+        _mint(_to, liquidity);
+
+        _update(balance0, balance1);
+        emit Mint(msg.sender, amount0, amount1);
+    }
+
+    function burn(address _to) external returns (uint256 amount0, uint256 amount1) {
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+        uint256 liquidity = balanceOf(address(this));
+
+        uint256 _totalSupply = totalSupply();
+        amount0 = liquidity * balance0 / _totalSupply;
+        amount1 = liquidity * balance1 / _totalSupply;
+        require(amount0 > 0 && amount1 > 0, "INSUFFICIENT_LIQUIDITY_BURNED");
+        _burn(address(this), liquidity);
+        IERC20(token0).safeTransfer(_to, amount0);
+        IERC20(token1).safeTransfer(_to, amount1);
+
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+        emit Burn(msg.sender, amount0, amount1, _to);
+    }
+
+    function swap(
+        uint256 _amount0Out,
+        uint256 _amount1Out,
+        address _to,
+        bytes calldata
+    ) external {
+        require(_amount0Out > 0 || _amount1Out > 0, "INSUFFICIENT_OUTPUT_AMOUNT");
+        (uint112 _reserve0, uint112 _reserve1) = (reserve0, reserve1);
+        require(_amount0Out < _reserve0 && _amount1Out < _reserve1, "INSUFFICIENT_LIQUIDITY");
+
+        if (_amount0Out > 0) IERC20(token0).safeTransfer(_to, _amount0Out);
+        if (_amount1Out > 0) IERC20(token1).safeTransfer(_to, _amount1Out);
+        uint256 balance0 = IERC20(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20(token1).balanceOf(address(this));
+
+        uint256 amount0In = balance0 > _reserve0 - _amount0Out ? balance0 - (_reserve0 - _amount0Out) : 0;
+        uint256 amount1In = balance1 > _reserve1 - _amount1Out ? balance1 - (_reserve1 - _amount1Out) : 0;
+        require(amount0In > 0 || amount1In > 0, "INSUFFICIENT_INPUT_AMOUNT");
+
+        uint256 balance0Adjusted = balance0 * FEE_DENOMINATOR - amount0In * token0FeePercent;
+        uint256 balance1Adjusted = balance1 * FEE_DENOMINATOR - amount1In * token1FeePercent;
+        require(
+            balance0Adjusted * balance1Adjusted >= uint256(_reserve0) * _reserve1 * FEE_DENOMINATOR ** 2,
+            "K"
+        );
+
+        _update(balance0, balance1);
+        emit Swap(msg.sender, amount0In, amount1In, _amount0Out, _amount1Out, _to);
+    }
+
+    function skim(address _to) external {
+        IERC20(token0).safeTransfer(_to, IERC20(token0).balanceOf(address(this)) - reserve0);
+        IERC20(token1).safeTransfer(_to, IERC20(token1).balanceOf(address(this)) - reserve1);
+    }
+
+    function sync() external {
+        _update(IERC20(token0).balanceOf(address(this)), IERC20(token1).balanceOf(address(this)));
+    }
+
+    function _update(uint256 _balance0, uint256 _balance1) internal {
+        require(_balance0 <= type(uint112).max && _balance1 <= type(uint112).max, "OVERFLOW");
+        reserve0 = uint112(_balance0);
+        reserve1 = uint112(_balance1);
+        emit Sync(reserve0, reserve1);
+    }
+}
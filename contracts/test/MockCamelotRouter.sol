@@ -0,0 +1,182 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "./MockCamelotPair.sol";
+
+/**
+ * @notice
+ *  Camelot router and factory in one contract. Pairs are created through
+ *  createPair and routed with the same maths as the Camelot periphery.
+ */
+contract MockCamelotRouter {
+    using SafeERC20 for IERC20;
+
+    address public immutable WETH;
+    mapping(address => mapping(address => address)) public getPair;
+    address[] public allPairs;
+
+    event PairCreated(address indexed token0, address indexed token1, address pair, uint256 length);
+
+    modifier ensure(uint256 _deadline) {
+        require(_deadline >= block.timestamp, "EXPIRED");
+        _;
+    }
+
+    constructor(address _weth) {
+        WETH = _weth;
+    }
+
+    function factory() external view returns (address) {
+        return address(this);
+    }
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function createPair(address _tokenA, address _tokenB) external returns (address pair) {
+        require(_tokenA != _tokenB, "IDENTICAL_ADDRESSES");
+        require(getPair[_tokenA][_tokenB] == address(0), "PAIR_EXISTS");
+        pair = address(new MockCamelotPair(_tokenA, _tokenB));
+        getPair[_tokenA][_tokenB] = pair;
+        getPair[_tokenB][_tokenA] = pair;
+        allPairs.push(pair);
+        emit PairCreated(MockCamelotPair(pair).token0(), MockCamelotPair(pair).token1(), pair, allPairs.length);
+    }
+
+    function quote(
+        uint256 _amountA,
+        uint256 _reserveA,
+        uint256 _reserveB
+    ) public pure returns (uint256) {
+        require(_amountA > 0, "INSUFFICIENT_AMOUNT");
+        require(_reserveA > 0 && _reserveB > 0, "INSUFFICIENT_LIQUIDITY");
+        return _amountA * _reserveB / _reserveA;
+    }
+
+    function getAmountsOut(uint256 _amountIn, address[] calldata _path)
+        external
+        view
+        returns (uint256[] memory amounts)
+    {
+        require(_path.length >= 2, "INVALID_PATH");
+        amounts = new uint256[](_path.length);
+        amounts[0] = _amountIn;
+        for (uint256 i; i < _path.length - 1; i++) {
+            amounts[i + 1] = _pairFor(_path[i], _path[i + 1]).getAmountOut(amounts[i], _path[i]);
+        }
+    }
+
+    function addLiquidity(
+        address _tokenA,
+        address _tokenB,
+        uint256 _amountADesired,
+        uint256 _amountBDesired,
+        uint256 _amountAMin,
+        uint256 _amountBMin,
+        address _to,
+        uint256 _deadline
+    )
+        external
+        ensure(_deadline)
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        MockCamelotPair pair = _pairFor(_tokenA, _tokenB);
+        (amountA, amountB) = _addLiquidity(pair, _tokenA, _amountADesired, _amountBDesired, _amountAMin, _amountBMin);
+        IERC20(_tokenA).safeTransferFrom(msg.sender, address(pair), amountA);
+        IERC20(_tokenB).safeTransferFrom(msg.sender, address(pair), amountB);
+        liquidity = pair.mint(_to);
+    }
+
+    function removeLiquidity(
+        address _tokenA,
+        address _tokenB,
+        uint256 _liquidity,
+        uint256 _amountAMin,
+        uint256 _amountBMin,
+        address _to,
+        uint256 _deadline
+    ) external ensure(_deadline) returns (uint256 amountA, uint256 amountB) {
+        MockCamelotPair pair = _pairFor(_tokenA, _tokenB);
+        IERC20(address(pair)).safeTransferFrom(msg.sender, address(pair), _liquidity);
+        (uint256 amount0, uint256 amount1) = pair.burn(_to);
+        (amountA, amountB) = _tokenA == pair.token0() ? (amount0, amount1) : (amount1, amount0);
+        require(amountA >= _amountAMin, "INSUFFICIENT_A_AMOUNT");
+        require(amountB >= _amountBMin, "INSUFFICIENT_B_AMOUNT");
+    }
+
+    function swapExactTokensForTokensSupportingFeeOnTransferTokens(
+        uint256 _amountIn,
+        uint256 _amountOutMin,
+        address[] calldata _path,
+        address _to,
+        address, /*referrer*/
+        uint256 _deadline
+    ) external ensure(_deadline) {
+        IERC20(_path[0]).safeTransferFrom(msg.sender, address(_pairFor(_path[0], _path[1])), _amountIn);
+        uint256 balanceBefore = IERC20(_path[_path.length - 1]).balanceOf(_to);
+        _swapSupportingFeeOnTransferTokens(_path, _to);
+        require(
+            IERC20(_path[_path.length - 1]).balanceOf(_to) - balanceBefore >= _amountOutMin,
+            "INSUFFICIENT_OUTPUT_AMOUNT"
+        );
+    }
+
+    function _addLiquidity(
+        MockCamelotPair _pair,
+        address _tokenA,
+        uint256 _amountADesired,
+        uint256 _amountBDesired,
+        uint256 _amountAMin,
+        uint256 _amountBMin
+    ) internal view returns (uint256 amountA, uint256 amountB) {
+        (uint256 reserveA, uint256 reserveB) = _getReserves(_pair, _tokenA);
+        if (reserveA == 0 && reserveB == 0) {
+            return (_amountADesired, _amountBDesired);
+        }
+        uint256 amountBOptimal = quote(_amountADesired, reserveA, reserveB);
+        if (amountBOptimal <= _amountBDesired) {
+            require(amountBOptimal >= _amountBMin, "INSUFFICIENT_B_AMOUNT");
+            return (_amountADesired, amountBOptimal);
+        }
+        uint256 amountAOptimal = quote(_amountBDesired, reserveB, reserveA);
+        require(amountAOptimal <= _amountADesired && amountAOptimal >= _amountAMin, "INSUFFICIENT_A_AMOUNT");
+        return (amountAOptimal, _amountBDesired);
+    }
+
+    function _swapSupportingFeeOnTransferTokens(address[] calldata _path, address _to) internal {
+        for (uint256 i; i < _path.length - 1; i++) {
+            (address input, address output) = (_path[i], _path[i + 1]);
+            MockCamelotPair pair = _pairFor(input, output);
+            (uint256 reserveInput, ) = _getReserves(pair, input);
+            uint256 amountOutput = pair.getAmountOut(IERC20(input).balanceOf(address(pair)) - reserveInput, input);
+            (uint256 amount0Out, uint256 amount1Out) = input == pair.token0()
+                ? (uint256(0), amountOutput)
+                : (amountOutput, uint256(0));
+            address recipient = i < _path.length - 2 ? address(_pairFor(output, _path[i + 2])) : _to;
+            pair.swap(amount0Out, amount1Out, recipient, new bytes(0));
+        }
+    }
+
+    function _pairFor(address _tokenA, address _tokenB) internal view returns (MockCamelotPair pair) {
+        pair = MockCamelotPair(getPair[_tokenA][_tokenB]);
+        require(address(pair) != address(0), "PAIR_NOT_FOUND");
+    }
+
+    function _getReserves(MockCamelotPair _pair, address _tokenA)
+        internal
+        view
+        returns (uint256 reserveA, uint256 reserveB)
+    {
+        (uint112 reserve0, uint112 reserve1, , ) = _pair.getReserves();
+        (reserveA, reserveB) = _tokenA == _pair.token0()
+            ? (uint256(reserve0), uint256(reserve1))
+            : (uint256(reserve1), uint256(reserve0));
+    }
+}
@@ -0,0 +1,15 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "../strategies/camelot/GrailStrategy.sol";
+
+/**
+ * @notice
+ *  USDCWETHGRAIL with the protocol addresses passed in, so it can be deployed
+ *  against the local mock stack.
+ */
+contract MockGrailStrategy is GrailStrategy {
+    constructor(address _vault, CoreStrategyAaveConfig memory _config)
+        GrailStrategy(_vault, _config)
+    {}
+}
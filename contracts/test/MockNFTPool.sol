@@ -0,0 +1,220 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/utils/Address.sol";
+import "./MockERC20.sol";
+import "./MockXGrail.sol";
+
+interface INFTHandlerCallbacks {
+    function onNFTHarvest(address operator, address to, uint256 tokenId, uint256 grailAmount, uint256 xGrailAmount) external returns (bool);
+    function onNFTAddToPosition(address operator, uint256 tokenId, uint256 lpAmount) external returns (bool);
+    function onNFTWithdraw(address operator, uint256 tokenId, uint256 lpAmount) external returns (bool);
+}
+
+/**
+ * @notice
+ *  Camelot NFTPool staking positions without lock or boost multipliers.
+ *  Rewards are emitted at a fixed rate per second, shared pro rata between
+ *  positions and paid out partly in xGRAIL according to xGrailRewardsShare.
+ */
+contract MockNFTPool is ERC721 {
+    using SafeERC20 for IERC20;
+    using Address for address;
+
+    uint256 private constant _TOTAL_REWARDS_SHARES = 10000;
+    uint256 private constant _ACC_PRECISION = 1e18;
+
+    struct StakingPosition {
+        uint256 amount;
+        uint256 startLockTime;
+        uint256 lockDuration;
+        uint256 rewardDebt;
+    }
+
+    IERC20 public immutable lpToken;
+    MockERC20 public immutable grailToken;
+    MockXGrail public immutable xGrailToken;
+
+    uint256 public lastTokenId;
+    uint256 public xGrailRewardsShare = 8000;
+    uint256 public rewardsPerSecond;
+    uint256 public accRewardsPerShare;
+    uint256 public lastRewardTime;
+    uint256 public totalStaked;
+    mapping(uint256 => StakingPosition) internal _stakingPositions;
+
+    event CreatePosition(uint256 indexed tokenId, uint256 amount, uint256 lockDuration);
+    event AddToPosition(uint256 indexed tokenId, address user, uint256 amount);
+    event WithdrawFromPosition(uint256 indexed tokenId, uint256 amount);
+    event HarvestPosition(uint256 indexed tokenId, address to, uint256 pending);
+
+    constructor(
+        address _lpToken,
+        address _grailToken,
+        address _xGrailToken
+    ) ERC721("Camelot staking position NFT", "spNFT") {
+        lpToken = IERC20(_lpToken);
+        grailToken = MockERC20(_grailToken);
+        xGrailToken = MockXGrail(_xGrailToken);
+        lastRewardTime = block.timestamp;
+    }
+
+    function setRewardsPerSecond(uint256 _rewardsPerSecond) external {
+        _updatePool();
+        rewardsPerSecond = _rewardsPerSecond;
+    }
+
+    function setXGrailRewardsShare(uint256 _xGrailRewardsShare) external {
+        require(_xGrailRewardsShare <= _TOTAL_REWARDS_SHARES, "too high");
+        xGrailRewardsShare = _xGrailRewardsShare;
+    }
+
+    function exists(uint256 _tokenId) external view returns (bool) {
+        return _exists(_tokenId);
+    }
+
+    function getStakingPosition(uint256 _tokenId)
+        external
+        view
+        returns (
+            uint256 amount,
+            uint256 amountWithMultiplier,
+            uint256 startLockTime,
+            uint256 lockDuration,
+            uint256 lockMultiplier,
+            uint256 rewardDebt,
+            uint256 boostPoints,
+            uint256 totalMultiplier
+        )
+    {
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        return (
+            position.amount,
+            position.amount,
+            position.startLockTime,
+            position.lockDuration,
+            0,
+            position.rewardDebt,
+            0,
+            0
+        );
+    }
+
+    function pendingRewards(uint256 _tokenId) external view returns (uint256) {
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        uint256 acc = accRewardsPerShare;
+        if (block.timestamp > lastRewardTime && totalStaked != 0) {
+            acc += (block.timestamp - lastRewardTime) * rewardsPerSecond * _ACC_PRECISION / totalStaked;
+        }
+        return position.amount * acc / _ACC_PRECISION - position.rewardDebt;
+    }
+
+    function createPosition(uint256 _amount, uint256 _lockDuration) external {
+        require(_amount > 0, "null amount");
+        _updatePool();
+        lpToken.safeTransferFrom(msg.sender, address(this), _amount);
+
+        uint256 tokenId = ++lastTokenId;
+        _stakingPositions[tokenId] = StakingPosition(
+            _amount,
+            block.timestamp,
+            _lockDuration,
+            _amount * accRewardsPerShare / _ACC_PRECISION
+        );
+        totalStaked += _amount;
+        _safeMint(msg.sender, tokenId);
+        emit CreatePosition(tokenId, _amount, _lockDuration);
+    }
+
+    function addToPosition(uint256 _tokenId, uint256 _amountToAdd) external {
+        require(_isApprovedOrOwner(msg.sender, _tokenId), "not allowed");
+        require(_amountToAdd > 0, "0 amount");
+        _updatePool();
+        address nftOwner = ownerOf(_tokenId);
+        _harvestPosition(_tokenId, nftOwner);
+
+        lpToken.safeTransferFrom(msg.sender, address(this), _amountToAdd);
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        position.amount += _amountToAdd;
+        position.rewardDebt = position.amount * accRewardsPerShare / _ACC_PRECISION;
+        totalStaked += _amountToAdd;
+
+        if (nftOwner.isContract()) {
+            require(
+                INFTHandlerCallbacks(nftOwner).onNFTAddToPosition(msg.sender, _tokenId, _amountToAdd),
+                "handler error"
+            );
+        }
+        emit AddToPosition(_tokenId, msg.sender, _amountToAdd);
+    }
+
+    function harvestPosition(uint256 _tokenId) external {
+        require(_isApprovedOrOwner(msg.sender, _tokenId), "not allowed");
+        _updatePool();
+        _harvestPosition(_tokenId, ownerOf(_tokenId));
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        position.rewardDebt = position.amount * accRewardsPerShare / _ACC_PRECISION;
+    }
+
+    function withdrawFromPosition(uint256 _tokenId, uint256 _amountToWithdraw) external {
+        require(_isApprovedOrOwner(msg.sender, _tokenId), "not allowed");
+        _updatePool();
+        address nftOwner = ownerOf(_tokenId);
+        _harvestPosition(_tokenId, nftOwner);
+
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        require(position.amount >= _amountToWithdraw, "invalid withdraw amount");
+        position.amount -= _amountToWithdraw;
+        position.rewardDebt = position.amount * accRewardsPerShare / _ACC_PRECISION;
+        totalStaked -= _amountToWithdraw;
+
+        if (position.amount == 0) {
+            delete _stakingPositions[_tokenId];
+            _burn(_tokenId);
+        }
+        lpToken.safeTransfer(nftOwner, _amountToWithdraw);
+
+        if (nftOwner.isContract()) {
+            require(
+                INFTHandlerCallbacks(nftOwner).onNFTWithdraw(msg.sender, _tokenId, _amountToWithdraw),
+                "handler error"
+            );
+        }
+        emit WithdrawFromPosition(_tokenId, _amountToWithdraw);
+    }
+
+    function _updatePool() internal {
+        if (block.timestamp <= lastRewardTime) {
+            return;
+        }
+        if (totalStaked != 0) {
+            accRewardsPerShare +=
+                (block.timestamp - lastRewardTime) * rewardsPerSecond * _ACC_PRECISION / totalStaked;
+        }
+        lastRewardTime = block.timestamp;
+    }
+
+    function _harvestPosition(uint256 _tokenId, address _to) internal {
+        StakingPosition storage position = _stakingPositions[_tokenId];
+        uint256 pending = position.amount * accRewardsPerShare / _ACC_PRECISION - position.rewardDebt;
+        if (pending == 0) {
+            return;
+        }
+
+        uint256 xGrailRewards = pending * xGrailRewardsShare / _TOTAL_REWARDS_SHARES;
+        uint256 grailRewards = pending - xGrailRewards;
+        grailToken.mint(_to, grailRewards);
+        xGrailToken.mint(_to, xGrailRewards);
+
+        if (_to.isContract()) {
+            require(
+                INFTHandlerCallbacks(_to).onNFTHarvest(msg.sender, _to, _tokenId, grailRewards, xGrailRewards),
+                "handler error"
+            );
+        }
+        emit HarvestPosition(_tokenId, _to, pending);
+    }
+}
@@ -0,0 +1,38 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+contract MockPoolAddressesProvider {
+    address public owner;
+    address private pool;
+    address private priceOracle;
+
+    event PoolUpdated(address indexed oldAddress, address indexed newAddress);
+    event PriceOracleUpdated(address indexed oldAddress, address indexed newAddress);
+
+    modifier onlyOwner() {
+        require(msg.sender == owner, "Ownable: caller is not the owner");
+        _;
+    }
+
+    constructor(address _owner) {
+        owner = _owner;
+    }
+
+    function getPool() external view returns (address) {
+        return pool;
+    }
+
+    function getPriceOracle() external view returns (address) {
+        return priceOracle;
+    }
+
+    function setPoolImpl(address _pool) external onlyOwner {
+        emit PoolUpdated(pool, _pool);
+        pool = _pool;
+    }
+
+    function setPriceOracle(address _priceOracle) external onlyOwner {
+        emit PriceOracleUpdated(priceOracle, _priceOracle);
+        priceOracle = _priceOracle;
+    }
+}
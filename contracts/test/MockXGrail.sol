@@ -0,0 +1,88 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+interface IXGrailTokenUsage {
+    function allocate(address userAddress, uint256 amount, bytes calldata data) external;
+    function deallocate(address userAddress, uint256 amount, bytes calldata data) external;
+}
+
+/**
+ * @notice
+ *  xGRAIL escrow token. Allocated and redeeming balances are held by the
+ *  contract itself so they no longer count towards the user's balanceOf.
+ */
+contract MockXGrail is ERC20 {
+    struct RedeemInfo {
+        uint256 xGrailAmount;
+        uint256 endTime;
+    }
+
+    mapping(address => mapping(address => uint256)) public usageApprovals;
+    mapping(address => mapping(address => uint256)) public usageAllocations;
+    mapping(address => uint256) public allocatedBalance;
+    mapping(address => RedeemInfo[]) public userRedeems;
+
+    event Allocate(address indexed userAddress, address indexed usageAddress, uint256 amount);
+    event Deallocate(address indexed userAddress, address indexed usageAddress, uint256 amount);
+    event Redeem(address indexed userAddress, uint256 xGrailAmount, uint256 duration);
+    event CancelRedeem(address indexed userAddress, uint256 xGrailAmount);
+
+    constructor() ERC20("Camelot escrowed token", "xGRAIL") {}
+
+    function mint(address _to, uint256 _amount) external {
+        _mint(_to, _amount);
+    }
+
+    function approveUsage(address _usage, uint256 _amount) external {
+        usageApprovals[msg.sender][_usage] = _amount;
+    }
+
+    function allocate(
+        address _usageAddress,
+        uint256 _amount,
+        bytes calldata _usageData
+    ) external {
+        require(usageApprovals[msg.sender][_usageAddress] >= _amount, "allocate: non authorized amount");
+        _transfer(msg.sender, address(this), _amount);
+        usageAllocations[msg.sender][_usageAddress] += _amount;
+        allocatedBalance[msg.sender] += _amount;
+        IXGrailTokenUsage(_usageAddress).allocate(msg.sender, _amount, _usageData);
+        emit Allocate(msg.sender, _usageAddress, _amount);
+    }
+
+    function deallocate(
+        address _usageAddress,
+        uint256 _amount,
+        bytes calldata _usageData
+    ) external {
+        require(usageAllocations[msg.sender][_usageAddress] >= _amount, "deallocate: non authorized amount");
+        usageAllocations[msg.sender][_usageAddress] -= _amount;
+        allocatedBalance[msg.sender] -= _amount;
+        IXGrailTokenUsage(_usageAddress).deallocate(msg.sender, _amount, _usageData);
+        _transfer(address(this), msg.sender, _amount);
+        emit Deallocate(msg.sender, _usageAddress, _amount);
+    }
+
+    function redeem(uint256 _xGrailAmount, uint256 _duration) external {
+        require(_xGrailAmount > 0, "redeem: xGrailAmount cannot be null");
+        _transfer(msg.sender, address(this), _xGrailAmount);
+        userRedeems[msg.sender].push(RedeemInfo(_xGrailAmount, block.timestamp + _duration));
+        emit Redeem(msg.sender, _xGrailAmount, _duration);
+    }
+
+    function cancelRedeem(uint256 _redeemIndex) external {
+        RedeemInfo[] storage redeems = userRedeems[msg.sender];
+        require(_redeemIndex < redeems.length, "validateRedeem: redeem entry does not exist");
+        uint256 amount = redeems[_redeemIndex].xGrailAmount;
+        redeems[_redeemIndex] = redeems[redeems.length - 1];
+        redeems.pop();
+        _transfer(address(this), msg.sender, amount);
+        emit CancelRedeem(msg.sender, amount);
+    }
+
+    function getUserRedeemsLength(address _userAddress) external view returns (uint256) {
+        return userRedeems[_userAddress].length;
+    }
+}
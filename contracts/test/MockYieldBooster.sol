@@ -0,0 +1,52 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.15;
+
+/**
+ * @notice
+ *  Records xGRAIL allocated to NFTPool positions. Boosting itself is not
+ *  modelled, positions earn the base emission rate.
+ */
+contract MockYieldBooster {
+    address public immutable xGrailToken;
+
+    // nftPool => tokenId => allocated xGRAIL
+    mapping(address => mapping(uint256 => uint256)) public positionsAllocation;
+    mapping(address => uint256) public usersAllocation;
+
+    modifier onlyXGrailToken() {
+        require(msg.sender == xGrailToken, "onlyXGrailToken: caller has no access");
+        _;
+    }
+
+    constructor(address _xGrailToken) {
+        xGrailToken = _xGrailToken;
+    }
+
+    function getUserPositionAllocation(
+        address, /*userAddress*/
+        address _poolAddress,
+        uint256 _tokenId
+    ) external view returns (uint256) {
+        return positionsAllocation[_poolAddress][_tokenId];
+    }
+
+    function allocate(
+        address _userAddress,
+        uint256 _amount,
+        bytes calldata _data
+    ) external onlyXGrailToken {
+        (address poolAddress, uint256 tokenId) = abi.decode(_data, (address, uint256));
+        positionsAllocation[poolAddress][tokenId] += _amount;
+        usersAllocation[_userAddress] += _amount;
+    }
+
+    function deallocate(
+        address _userAddress,
+        uint256 _amount,
+        bytes calldata _data
+    ) external onlyXGrailToken {
+        (address poolAddress, uint256 tokenId) = abi.decode(_data, (address, uint256));
+        positionsAllocation[poolAddress][tokenId] -= _amount;
+        usersAllocation[_userAddress] -= _amount;
+    }
+}
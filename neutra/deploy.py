@@ -0,0 +1,347 @@
+"""
+Resumable, pipelined deployment of a vault, strategy and its periphery.
+
+A deployment is an ordered list of `Step`s, each a contract deployment or a
+call on a contract. Steps are grouped into waves: a step goes one wave after
+the latest step it depends on. All transactions of a wave are sent back to
+back with explicitly assigned nonces and only the wave as a whole is waited
+on, so independent transactions are mined together instead of one
+confirmation at a time. A step still waits for its dependencies to be mined,
+not only sent, because its gas is estimated against the latest state.
+
+Every send and every confirmation is written to a JSON manifest. Running
+again with the same manifest skips mined steps, waits on the ones still
+pending and resends dropped ones under their original nonce, which keeps the
+precomputed contract addresses that later steps were given valid.
+
+The chain is reached through a backend with this interface:
+
+    sender                          address every transaction is sent from
+    nonce(pending=True)             transaction count of `sender`
+    send(step, target, args, nonce) sends without waiting, returns the tx hash
+    status(tx_hash)                 one of PENDING, DROPPED, MINED, REVERTED
+"""
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from eth_utils import keccak, to_checksum_address
+
+try:
+    from eth_abi import encode as _abi_encode
+except ImportError:  # eth-abi < 4, as pinned by brownie
+    from eth_abi import encode_abi as _abi_encode
+
+PENDING = "pending"
+DROPPED = "dropped"
+MINED = "mined"
+REVERTED = "reverted"
+
+
+class DeployError(Exception):
+    """The deployment cannot continue without manual intervention."""
+
+
+@dataclass(frozen=True)
+class Ref:
+    """Address of the contract deployed by step `step`."""
+
+    step: str
+
+
+@dataclass(frozen=True)
+class Calldata:
+    """ABI encoded call of `signature`, e.g. for a proxy's initializer."""
+
+    signature: str
+    args: tuple
+
+
+@dataclass(frozen=True)
+class Step:
+    """Deploys `contract`, or calls `method` on the `contract` at `target`.
+
+    `target` is a `Ref` or an address. `after` names steps that must be mined
+    first although no argument refers to them.
+    """
+
+    name: str
+    contract: str
+    method: str = None
+    target: object = None
+    args: tuple = ()
+    after: tuple = ()
+
+    @property
+    def deploys(self):
+        return self.method is None
+
+    def dependencies(self):
+        refs = set(self.after)
+        for value in (self.target, *self.args):
+            refs.update(_refs(value))
+        return refs
+
+
+def _refs(value):
+    if isinstance(value, Ref):
+        yield value.step
+    elif isinstance(value, Calldata):
+        yield from _refs(value.args)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _refs(item)
+
+
+def _arg_types(signature):
+    # top level argument types of `name(type,(tuple,type),...)`
+    types, depth, start = [], 0, signature.index("(") + 1
+    for i, char in enumerate(signature[start:-1], start):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            types.append(signature[start:i])
+            start = i + 1
+    if start < len(signature) - 1:
+        types.append(signature[start:-1])
+    return types
+
+
+def encode_calldata(signature, args):
+    return keccak(text=signature)[:4] + _abi_encode(_arg_types(signature), list(args))
+
+
+def _rlp_bytes(data):
+    if len(data) == 1 and data[0] < 0x80:
+        return data
+    return bytes([0x80 + len(data)]) + data
+
+
+def create_address(sender, nonce):
+    """Address of the contract `sender` deploys with transaction `nonce`."""
+    payload = _rlp_bytes(bytes.fromhex(sender[2:])) + _rlp_bytes(nonce.to_bytes((nonce.bit_length() + 7) // 8, "big"))
+    return to_checksum_address(keccak(bytes([0xC0 + len(payload)]) + payload)[12:])
+
+
+def waves(steps):
+    """Groups `steps` so every step comes after the steps it depends on."""
+    wave_of = {}
+    for step in steps:
+        if step.name in wave_of:
+            raise ValueError(f"duplicate step {step.name!r}")
+        unknown = step.dependencies() - set(wave_of)
+        if unknown:
+            raise ValueError(f"step {step.name!r} depends on unknown or later steps {sorted(unknown)}")
+        wave_of[step.name] = 1 + max((wave_of[name] for name in step.dependencies()), default=-1)
+    grouped = [[] for _ in range(1 + max(wave_of.values(), default=-1))]
+    for step in steps:
+        grouped[wave_of[step.name]].append(step)
+    return grouped
+
+
+class Manifest:
+    """Per step record of nonce, tx hash, address and status, kept on disk."""
+
+    def __init__(self, path, network=None, sender=None, steps=None):
+        self.path = Path(path)
+        self.network = network
+        self.sender = sender
+        self.steps = steps or {}
+
+    @classmethod
+    def load(cls, path, network=None):
+        path = Path(path)
+        if not path.exists():
+            return cls(path, network)
+        data = json.loads(path.read_text())
+        if network is not None and data["network"] != network:
+            raise DeployError(f"{path} records a deployment on {data['network']}, not {network}")
+        return cls(path, data["network"], data["sender"], data["steps"])
+
+    def save(self):
+        # write then rename, an interrupted save never leaves a truncated manifest
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"network": self.network, "sender": self.sender, "steps": self.steps}, indent=2) + "\n")
+        os.replace(tmp, self.path)
+
+    def address(self, name):
+        try:
+            return self.steps[name]["address"]
+        except KeyError:
+            raise DeployError(f"step {name!r} has not been deployed") from None
+
+    def mined(self, name):
+        return self.steps.get(name, {}).get("status") == MINED
+
+
+class Deployment:
+    """Runs `steps` on `backend`, recording progress in `manifest`."""
+
+    def __init__(self, steps, manifest, backend, poll_interval=2, timeout=600, log=print):
+        self.waves = waves(steps)
+        self.manifest = manifest
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.log = log
+        self._nonce = None
+
+    def run(self):
+        if self.manifest.sender is None:
+            self.manifest.sender = self.backend.sender
+        elif self.manifest.sender.lower() != self.backend.sender.lower():
+            raise DeployError(f"{self.manifest.path} was deployed from {self.manifest.sender}, not {self.backend.sender}")
+        recorded = [entry["nonce"] for entry in self.manifest.steps.values()]
+        self._nonce = max([self.backend.nonce(), *(nonce + 1 for nonce in recorded)])
+
+        for wave in self.waves:
+            sent = []
+            for step in wave:
+                if self.manifest.mined(step.name):
+                    continue
+                entry = self.manifest.steps.get(step.name)
+                if entry is None:
+                    self._send(step, self._next_nonce())
+                elif self._check(step) == REVERTED:
+                    raise DeployError(f"step {step.name!r} reverted in {entry['tx']}")
+                sent.append(step)
+            self._wait(sent)
+        return {name: entry.get("address") for name, entry in self.manifest.steps.items()}
+
+    def _next_nonce(self):
+        nonce, self._nonce = self._nonce, self._nonce + 1
+        return nonce
+
+    def _resolve(self, value):
+        if isinstance(value, Ref):
+            return self.manifest.address(value.step)
+        if isinstance(value, Calldata):
+            return encode_calldata(value.signature, self._resolve(value.args))
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._resolve(item) for item in value)
+        return value
+
+    def _send(self, step, nonce):
+        tx_hash = self.backend.send(step, self._resolve(step.target), self._resolve(step.args), nonce)
+        entry = {"contract": step.contract, "method": step.method, "nonce": nonce, "tx": tx_hash, "status": PENDING}
+        if step.deploys:
+            entry["address"] = create_address(self.backend.sender, nonce)
+        self.manifest.steps[step.name] = entry
+        self.manifest.save()
+        self.log(f"{step.name}: sent {tx_hash} (nonce {nonce})")
+
+    def _check(self, step):
+        """Refreshes the status of a sent step, resending it if it was dropped."""
+        entry = self.manifest.steps[step.name]
+        status = self.backend.status(entry["tx"])
+        if status == DROPPED:
+            if self.backend.nonce(pending=False) > entry["nonce"]:
+                raise DeployError(
+                    f"step {step.name!r} was dropped and its nonce {entry['nonce']} has been used by another transaction"
+                )
+            self._send(step, entry["nonce"])
+            return PENDING
+        if status != entry["status"]:
+            entry["status"] = status
+            self.manifest.save()
+            self.log(f"{step.name}: {status}")
+        return status
+
+    def _wait(self, steps):
+        deadline = time.monotonic() + self.timeout
+        pending = list(steps)
+        while pending:
+            pending = [step for step in pending if self._check(step) == PENDING]
+            if not pending:
+                break
+            if time.monotonic() > deadline:
+                raise DeployError(f"timed out waiting for {[step.name for step in pending]}, run again to resume")
+            time.sleep(self.poll_interval)
+        reverted = [step.name for step in steps if self.manifest.steps[step.name]["status"] == REVERTED]
+        if reverted:
+            raise DeployError(f"steps {reverted} reverted")
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+def grail_steps(config, deployer):
+    """Steps bringing up a vault and a Camelot/GRAIL strategy from a deploy config.
+
+    See deployments/usdc-weth-grail.yml for the keys.
+    """
+    vault_config = config["vault"]
+    grail = config["grail_manager"]
+    params = config.get("strategy_params") or {}
+    strategy = Ref("strategy")
+    steps = []
+
+    vault, after = vault_config.get("address"), ()
+    if vault is None:
+        governance = _or(vault_config.get("governance"), deployer)
+        vault = Ref("vault")
+        steps += [
+            Step("vault", "Vault"),
+            Step("vault_initialize", "Vault", "initialize", vault, (
+                vault_config["token"],
+                governance,
+                _or(vault_config.get("rewards"), governance),
+                vault_config["name"],
+                vault_config["symbol"],
+                _or(vault_config.get("guardian"), governance),
+                _or(vault_config.get("management"), governance),
+            )),
+        ]
+        # the strategy reads want from the vault in its constructor
+        after = ("vault_initialize",)
+    steps.append(Step("strategy", config["strategy"], args=(vault,), after=after))
+
+    manager = _or(grail.get("manager"), deployer)
+    grail_config = (
+        vault_config["token"], grail["lp"], grail["grail"], grail["xgrail"], grail["pool"], grail["router"], grail["yield_booster"]
+    )
+    initializer = "initialize(address,address,(address,address,address,address,address,address,address))"
+    steps += [
+        Step("grail_manager_implementation", "GrailManager"),
+        # initialize the implementation as well so nobody else can
+        Step("grail_manager_implementation_initialize", "GrailManager", "initialize",
+             Ref("grail_manager_implementation"), (manager, strategy, grail_config)),
+        Step("grail_manager", "GrailManagerProxy",
+             args=(Ref("grail_manager_implementation"), Calldata(initializer, (manager, strategy, grail_config)))),
+        Step("set_grail_manager", config["strategy"], "setGrailManager", strategy, (Ref("grail_manager"),)),
+        Step("insurance", "StrategyInsurance", args=(strategy,)),
+        Step("set_insurance", config["strategy"], "setInsurance", strategy, (Ref("insurance"),)),
+    ]
+    if grail.get("swap_threshold") is not None:
+        # through the proxy, the deployer is the manager's strategist
+        steps.append(Step("set_grail_swap_threshold", "GrailManager", "setGrailSwapThreshold", Ref("grail_manager"),
+                          (grail["swap_threshold"],)))
+
+    health_check = config.get("health_check")
+    if health_check is None:
+        health_check = Ref("health_check")
+        steps.append(Step("health_check", "CommonHealthCheck"))
+    steps.append(Step("set_health_check", config["strategy"], "setHealthCheck", strategy, (health_check,)))
+
+    setters = [
+        ("min_report_delay", "setMinReportDelay"),
+        ("max_report_delay", "setMaxReportDelay"),
+        ("profit_factor", "setProfitFactor"),
+        ("debt_thresholds", "setDebtThresholds"),
+        ("incremental_debt_rebalance", "setIncrementalDebtRebalance"),
+        ("flash_loan_collateral_rebalance", "setFlashLoanCollateralRebalance"),
+        ("collateral_thresholds", "setCollateralThresholds"),
+        ("keeper", "setKeeper"),
+    ]
+    for key, method in setters:
+        value = params.get(key)
+        if value is not None:
+            args = tuple(value) if isinstance(value, (list, tuple)) else (value,)
+            steps.append(Step(f"set_{key}", config["strategy"], method, strategy, args))
+    return steps
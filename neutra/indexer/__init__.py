@@ -0,0 +1,4 @@
+"""Incremental indexer of strategy, insurance, GRAIL manager and vault events into SQLite."""
+from .events import EVENTS, GRAIL_MANAGER, INSURANCE, KINDS, STRATEGY, VAULT, EventSpec
+from .indexer import Indexer
+from .store import Store
@@ -0,0 +1,64 @@
+"""
+Indexes strategy events into a SQLite database:
+
+    python -m neutra.indexer --rpc http://127.0.0.1:8545 --db events.db --from-block 70000000 \
+        --strategy 0x... --insurance 0x... --grail-manager 0x... --vault 0x...
+
+Contracts are remembered in the database, later runs only need `--rpc` and
+`--db` and continue where the last one stopped.
+"""
+import argparse
+import asyncio
+import logging
+
+from ..keeper.rpc import HttpTransport, RpcClient
+from .events import KINDS
+from .indexer import Indexer
+from .store import Store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m neutra.indexer", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rpc", required=True, help="JSON-RPC url of the node")
+    parser.add_argument("--db", required=True, help="SQLite database, created if missing")
+    for kind in KINDS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", dest=kind, action="append", default=[], help=f"{kind} address to index")
+    parser.add_argument("--from-block", type=int, default=0, help="first block to index for newly added contracts")
+    parser.add_argument("--confirmations", type=int, default=5, help="blocks behind the head to stay")
+    parser.add_argument("--chunk-size", type=int, default=2_000, help="initial blocks per eth_getLogs")
+    parser.add_argument("--concurrency", type=int, default=4, help="eth_getLogs requests in flight at once")
+    parser.add_argument("--follow", action="store_true", help="keep indexing new blocks")
+    parser.add_argument("--interval", type=float, default=15, help="seconds between syncs with --follow")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    store = Store(args.db)
+    for kind in KINDS:
+        for address in getattr(args, kind):
+            store.add_contract(address, kind, args.from_block)
+
+    async def run():
+        transport = HttpTransport(args.rpc, max_connections=args.concurrency)
+        client = RpcClient(transport, max_concurrency=args.concurrency)
+        indexer = Indexer(
+            client, store, chunk_size=args.chunk_size, concurrency=args.concurrency, confirmations=args.confirmations
+        )
+        try:
+            if args.follow:
+                await indexer.run(interval=args.interval)
+            else:
+                logging.info("stored %d logs", await indexer.sync())
+        finally:
+            await transport.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
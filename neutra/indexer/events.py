@@ -0,0 +1,69 @@
+"""
+Events the indexer stores, by the kind of contract emitting them.
+
+Every event argument is a static `uint256` or `address`, so logs are decoded
+word by word: indexed arguments from the topics, the rest from the data.
+"""
+from dataclasses import dataclass
+
+from eth_utils import keccak, to_checksum_address
+
+STRATEGY = "strategy"
+INSURANCE = "insurance"
+GRAIL_MANAGER = "grail_manager"
+VAULT = "vault"
+KINDS = (STRATEGY, INSURANCE, GRAIL_MANAGER, VAULT)
+
+
+@dataclass(frozen=True)
+class EventSpec:
+    """One event: `args` are `(name, type, indexed)` triples in declaration order."""
+
+    name: str
+    table: str
+    kind: str
+    args: tuple
+
+    @property
+    def signature(self):
+        return f"{self.name}({','.join(type_ for _, type_, _ in self.args)})"
+
+    @property
+    def topic(self):
+        return "0x" + keccak(text=self.signature).hex()
+
+    @property
+    def columns(self):
+        return [name for name, _, _ in self.args]
+
+    def decode(self, log):
+        """Argument values of `log` in `columns` order."""
+        topics = iter(log["topics"][1:])
+        data = bytes.fromhex(log["data"][2:])
+        words = (data[i:i + 32] for i in range(0, len(data), 32))
+        values = []
+        for _, type_, indexed in self.args:
+            word = bytes.fromhex(next(topics)[2:]) if indexed else next(words)
+            values.append(to_checksum_address(word[12:]) if type_ == "address" else int.from_bytes(word, "big"))
+        return values
+
+
+def _uints(*names, indexed=True):
+    return tuple((name, "uint256", indexed) for name in names)
+
+
+EVENTS = [
+    EventSpec("DebtRebalance", "debt_rebalance", STRATEGY, _uints("debt_ratio", "swap_amount", "slippage")),
+    EventSpec("CollatRebalance", "collat_rebalance", STRATEGY, _uints("collat_ratio", "adj_amount")),
+    EventSpec("SetGrailManager", "set_grail_manager", STRATEGY, (("grail_manager", "address", False),)),
+    EventSpec("InsurancePayment", "insurance_payment", INSURANCE, _uints("strategy_debt", "harvest_profit", "want_payment")),
+    EventSpec("InsurancePayout", "insurance_payout", INSURANCE, _uints("want_payout")),
+    EventSpec("SetStrategy", "grail_manager_set_strategy", GRAIL_MANAGER, (("strategy", "address", False),)),
+    EventSpec("SetManager", "grail_manager_set_manager", GRAIL_MANAGER, (("manager", "address", False),)),
+    EventSpec("SetYieldBooster", "grail_manager_set_yield_booster", GRAIL_MANAGER, (("yield_booster", "address", False),)),
+    EventSpec("StrategyReported", "strategy_reported", VAULT, (("strategy", "address", True),) + _uints(
+        "gain", "loss", "debt_paid", "total_gain", "total_loss", "total_debt", "debt_added", "debt_ratio", indexed=False
+    )),
+]
+
+BY_TOPIC = {event.topic: event for event in EVENTS}
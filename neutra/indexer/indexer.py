@@ -0,0 +1,162 @@
+"""
+Incremental log indexer.
+
+`sync` catches the store up to `confirmations` blocks behind the head. Logs
+of all indexed contracts are fetched with one `eth_getLogs` per block range,
+`concurrency` consecutive ranges at a time, and each range is written
+together with its progress in one transaction, so an interrupted sync
+resumes where it stopped. The range size adapts: it halves when the node
+rejects a range (too many results, timeouts) or returns more than
+`target_logs` logs, and doubles while ranges come back sparse.
+
+Contracts added later are caught up on their own until they reach the
+others, after which all are fetched together again.
+
+Before every sync the hashes of recently indexed blocks are compared with
+the chain. After a reorg everything from the first block that changed is
+dropped and indexed again.
+"""
+import asyncio
+import logging
+
+from ..keeper.rpc import RpcError
+from .events import BY_TOPIC, EVENTS
+
+logger = logging.getLogger(__name__)
+
+
+class Indexer:
+    """Indexes the contracts registered in `store` through `client`, an `RpcClient`."""
+
+    def __init__(
+        self,
+        client,
+        store,
+        chunk_size=2_000,
+        max_chunk_size=100_000,
+        target_logs=5_000,
+        concurrency=4,
+        confirmations=5,
+        keep_blocks=1_000,
+    ):
+        self.client = client
+        self.store = store
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs = target_logs
+        self.concurrency = concurrency
+        self.confirmations = confirmations
+        self.keep_blocks = keep_blocks
+        self._limit = max_chunk_size
+
+    async def head(self):
+        return int(await self.client.call("eth_blockNumber"), 16) - self.confirmations
+
+    async def check_reorg(self):
+        """Rewinds the store past a reorg, returning the last block kept or None."""
+        hashes = self.store.block_hashes()
+        if not hashes:
+            return None
+        numbers = sorted(hashes, reverse=True)
+        blocks = await self.client.batch([("eth_getBlockByNumber", [hex(number), False]) for number in numbers])
+        for i, (number, block) in enumerate(zip(numbers, blocks)):
+            if isinstance(block, dict) and block["hash"] == hashes[number]:
+                if i == 0:
+                    return None
+                break
+        else:
+            # every hash we kept changed, start over below the oldest
+            number = numbers[-1] - 1
+        logger.warning("reorg detected, rewinding to block %d", number)
+        self.store.rewind(number)
+        return number
+
+    async def sync(self):
+        """Indexes up to the confirmed head, returning the number of logs stored."""
+        await self.check_reorg()
+        head = await self.head()
+        # a range size rejected by the node is not retried before the next sync
+        self._limit = self.max_chunk_size
+        stored = 0
+        while True:
+            progress = {address: indexed_to for address, (_, indexed_to) in self.store.contracts().items()}
+            start = min(progress.values(), default=head) + 1
+            if start > head:
+                break
+            # the contracts furthest behind, up to where the next ones are
+            addresses = sorted(address for address, indexed_to in progress.items() if indexed_to == start - 1)
+            end = min([head, *(indexed_to for indexed_to in progress.values() if indexed_to >= start)])
+            stored += await self._index(addresses, start, end)
+        self.store.prune_blocks(head - self.keep_blocks)
+        return stored
+
+    async def run(self, stop=None, interval=15):
+        """Syncs every `interval` seconds until `stop` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                stored = await self.sync()
+                if stored:
+                    logger.info("stored %d logs", stored)
+            except (RpcError, OSError, asyncio.TimeoutError) as exc:
+                logger.warning("sync failed: %s", exc)
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _index(self, addresses, start, end):
+        kinds = {address: kind for address, (kind, _) in self.store.contracts().items()}
+        stored = 0
+        while start <= end:
+            ranges = []
+            for _ in range(self.concurrency):
+                if start > end:
+                    break
+                ranges.append((start, min(end, start + self.chunk_size - 1)))
+                start = ranges[-1][1] + 1
+            results = await asyncio.gather(*(self._fetch(addresses, *block_range) for block_range in ranges))
+            for (first, last), result in zip(ranges, results):
+                if isinstance(result, RpcError):
+                    if last == first:
+                        raise result
+                    # retry the rest with smaller ranges
+                    self.chunk_size = self._limit = max(1, (last - first + 1) // 2)
+                    start = first
+                    break
+                logs, block_hash = result
+                decoded = [
+                    (BY_TOPIC[log["topics"][0]], log)
+                    for log in logs
+                    if not log.get("removed") and log["topics"] and log["topics"][0] in BY_TOPIC
+                    and BY_TOPIC[log["topics"][0]].kind == kinds.get(log["address"].lower())
+                ]
+                self.store.write(addresses, last, block_hash, decoded)
+                stored += len(decoded)
+                self._adapt(last - first + 1, len(logs))
+        return stored
+
+    def _adapt(self, blocks, logs):
+        if logs > self.target_logs:
+            self.chunk_size = max(1, blocks // 2)
+        elif logs < self.target_logs // 4 and blocks >= self.chunk_size:
+            self.chunk_size = min(self._limit, self.chunk_size * 2)
+
+    async def _fetch(self, addresses, first, last):
+        """Logs of `addresses` in `first..last` and the hash of `last`, or the `RpcError`."""
+        log_filter = {
+            "fromBlock": hex(first),
+            "toBlock": hex(last),
+            "address": addresses,
+            "topics": [[event.topic for event in EVENTS]],
+        }
+        logs, block = await self.client.batch([("eth_getLogs", [log_filter]), ("eth_getBlockByNumber", [hex(last), False])])
+        for result in (logs, block):
+            if isinstance(result, RpcError):
+                return result
+        if block is None:
+            return RpcError({"message": f"block {last} not found"})
+        # a reorg between the two calls shows as logs of `last` from another fork
+        if any(int(log["blockNumber"], 16) == last and log["blockHash"] != block["hash"] for log in logs):
+            return RpcError({"message": f"block {last} changed while fetching"})
+        return logs, block["hash"]
@@ -0,0 +1,106 @@
+"""
+SQLite store for indexed events.
+
+Each event has its own table with one column per argument, next to
+`block_number`, `log_index`, `tx_hash`, `block_hash` and the emitting
+`address`. uint256 values do not fit SQLite's 64-bit integers and are
+stored as decimal text; `rows` converts them back, in SQL use
+`CAST(column AS INTEGER)` for values known to be small or `CAST(column AS
+REAL)` for aggregates.
+
+`contracts` records how far each contract has been indexed, `blocks` the
+hashes of recently indexed blocks, used to detect reorgs.
+"""
+import sqlite3
+
+from .events import EVENTS
+
+LOG_COLUMNS = ["block_number", "log_index", "tx_hash", "block_hash", "address"]
+
+
+class Store:
+    """Indexed events and indexing progress in the SQLite database at `path`."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS contracts (address TEXT PRIMARY KEY, kind TEXT NOT NULL, indexed_to INTEGER NOT NULL)"
+            )
+            self.db.execute("CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL)")
+            for event in EVENTS:
+                columns = ", ".join(f"{name} TEXT NOT NULL" for name in event.columns)
+                self.db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {event.table} (block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, "
+                    f"tx_hash TEXT NOT NULL, block_hash TEXT NOT NULL, address TEXT NOT NULL, {columns}, "
+                    "PRIMARY KEY (block_number, log_index))"
+                )
+                self.db.execute(f"CREATE INDEX IF NOT EXISTS {event.table}_address ON {event.table} (address, block_number)")
+
+    def close(self):
+        self.db.close()
+
+    def add_contract(self, address, kind, from_block=0):
+        """Starts indexing `address` at `from_block`, a no-op if it is already indexed."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO contracts VALUES (?, ?, ?)", (address.lower(), kind, from_block - 1)
+            )
+
+    def contracts(self):
+        """`{address: (kind, indexed_to)}`, `indexed_to` being the last block indexed."""
+        return {address: (kind, indexed_to) for address, kind, indexed_to in self.db.execute("SELECT * FROM contracts")}
+
+    def write(self, addresses, to_block, block_hash, logs):
+        """Stores decoded `(event, log)` pairs and marks `addresses` indexed up to `to_block`, atomically."""
+        with self.db:
+            for event, log in logs:
+                values = [
+                    int(log["blockNumber"], 16), int(log["logIndex"], 16), log["transactionHash"], log["blockHash"],
+                    log["address"].lower(), *map(str, event.decode(log)),
+                ]
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO {event.table} ({', '.join(LOG_COLUMNS + event.columns)}) "
+                    f"VALUES ({', '.join('?' * len(values))})",
+                    values,
+                )
+            self.db.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?)", (to_block, block_hash))
+            self.db.executemany(
+                "UPDATE contracts SET indexed_to = ? WHERE address = ?", [(to_block, address) for address in addresses]
+            )
+
+    def block_hashes(self):
+        return dict(self.db.execute("SELECT number, hash FROM blocks"))
+
+    def rewind(self, block):
+        """Drops everything indexed after `block`."""
+        with self.db:
+            for event in EVENTS:
+                self.db.execute(f"DELETE FROM {event.table} WHERE block_number > ?", (block,))
+            self.db.execute("DELETE FROM blocks WHERE number > ?", (block,))
+            self.db.execute("UPDATE contracts SET indexed_to = ? WHERE indexed_to > ?", (block, block))
+
+    def prune_blocks(self, below):
+        """Forgets block hashes older than `below`, too deep to be reorged."""
+        with self.db:
+            self.db.execute("DELETE FROM blocks WHERE number < ? AND number < (SELECT MAX(number) FROM blocks)", (below,))
+
+    def rows(self, event, address=None, from_block=0, to_block=None):
+        """Stored `event` logs as dicts, in chain order, with uint256 values as ints."""
+        spec = next(spec for spec in EVENTS if spec.name == event or spec.table == event)
+        query = f"SELECT {', '.join(LOG_COLUMNS + spec.columns)} FROM {spec.table} WHERE block_number >= ?"
+        params = [from_block]
+        if to_block is not None:
+            query += " AND block_number <= ?"
+            params.append(to_block)
+        if address is not None:
+            query += " AND address = ?"
+            params.append(address.lower())
+        uints = {name for name, type_, _ in spec.args if type_ == "uint256"}
+        return [
+            {
+                column: int(value) if column in uints else value
+                for column, value in zip(LOG_COLUMNS + spec.columns, row)
+            }
+            for row in self.db.execute(query + " ORDER BY block_number, log_index", params)
+        ]
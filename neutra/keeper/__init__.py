@@ -0,0 +1,28 @@
+"""Keeper service calling the strategies' rebalance, harvest and unwind entry points."""
+from .keeper import (
+    HARVEST,
+    IN_RANGE,
+    NOT_DEPLOYED,
+    PAUSED,
+    PRICE_SOURCE_DIFF,
+    READY,
+    REBALANCE_COLLATERAL,
+    REBALANCE_DEBT,
+    Keeper,
+    StrategyState,
+    collateral_trigger,
+    debt_trigger,
+    decide,
+)
+from .healthcheck import (
+    HarvestInputs,
+    HealthPrediction,
+    default_check,
+    predict,
+    predict_harvests,
+    predict_report,
+    read_inputs,
+)
+from .rpc import HttpTransport, RpcClient, RpcError, decode_address, decode_uint, encode_call, selector
+from .scheduler import HarvestScheduler, harvest_target, optimal_interval
+from .unwind import UnwindError, run_unwind
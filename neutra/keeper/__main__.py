@@ -0,0 +1,58 @@
+"""
+Runs the keeper until interrupted:
+
+    python -m neutra.keeper --rpc http://127.0.0.1:8545 --sender 0x... 0xStrategy1 0xStrategy2
+"""
+import argparse
+import asyncio
+import logging
+
+from .keeper import Keeper
+from .rpc import HttpTransport, RpcClient
+from .scheduler import HarvestScheduler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m neutra.keeper", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("strategies", nargs="+", help="strategy addresses")
+    parser.add_argument("--rpc", required=True, help="JSON-RPC url of the node")
+    parser.add_argument("--sender", required=True, help="keeper account, unlocked on the node")
+    parser.add_argument("--interval", type=float, default=15, help="seconds between polls")
+    parser.add_argument("--call-cost", type=int, default=0, help="callCostInWei passed to harvestTrigger")
+    parser.add_argument(
+        "--health-check", action="store_true", help="hold back harvests the health check is predicted to reject"
+    )
+    parser.add_argument(
+        "--apr", type=float, help="yearly return of compounded rewards, schedules harvests from the pending rewards"
+    )
+    parser.add_argument("--harvest-cost", type=int, default=0, help="cost of a harvest in want, for --apr")
+    parser.add_argument("--max-harvest-delay", type=float, help="seconds after which a scheduled harvest is due")
+    parser.add_argument("--batch-size", type=int, default=100, help="calls per JSON-RPC batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="batch requests in flight at once")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    async def run():
+        transport = HttpTransport(args.rpc, max_connections=args.concurrency)
+        client = RpcClient(transport, max_batch_size=args.batch_size, max_concurrency=args.concurrency)
+        scheduler = None
+        if args.apr is not None:
+            scheduler = HarvestScheduler(args.harvest_cost, args.apr, max_delay=args.max_harvest_delay)
+        keeper = Keeper(
+            client, args.strategies, args.sender, call_cost=args.call_cost, poll_interval=args.interval,
+            health_check=args.health_check, scheduler=scheduler,
+        )
+        try:
+            await keeper.run()
+        finally:
+            await transport.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Predicts whether a harvest would pass the health check, before sending it.
+
+`harvest` reports the profit and loss from `prepareReturn` to the vault and
+then reverts with "!healthcheck" if `CommonHealthCheck` rejects them. For
+every strategy the profit and loss the next harvest would report are worked
+out from the strategy, vault, insurance and health check views, all strategies
+being read together in two batched rounds, and run through
+`_executeDefaultCheck` with the strategy's `strategiesLimits` or the global
+limits.
+
+The prediction assumes `_withdraw` frees what `prepareReturn` asks for and
+that the harvest claims `balancePendingHarvest()`, which `GrailStrategy`
+reports in want. Strategies with a
+custom check cannot be predicted, their `passes` is None.
+"""
+import logging
+from dataclasses import dataclass
+
+from .rpc import RpcError, decode_address, decode_uint, encode_call
+
+MAX_BPS = 10_000
+ZERO_ADDRESS = "0x" + "00" * 20
+
+# strategy views, read first to find the other contracts
+STRATEGY_VIEWS = {
+    "vault": "vault()",
+    "insurance": "insurance()",
+    "health_check": "healthCheck()",
+    "do_health_check": "doHealthCheck()",
+    "emergency_exit": "emergencyExit()",
+    "want": "want()",
+    "total_assets": "estimatedTotalAssets()",
+    "pending_harvest": "balancePendingHarvest()",
+}
+INSURANCE_VIEWS = {
+    "loss_sum": "lossSum()",
+    "target_fund_size": "targetFundSize()",
+    "profit_take_rate": "profitTakeRate()",
+    "maximum_compensation_rate": "maximumCompenstionRate()",
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HarvestInputs:
+    """Views that decide what the next harvest of `address` reports, read at `block`."""
+
+    address: str
+    block: int
+    total_assets: int
+    pending_harvest: int
+    total_debt: int
+    debt_outstanding: int
+    emergency_exit: bool
+    insurance_balance: int
+    loss_sum: int
+    target_fund_size: int
+    profit_take_rate: int
+    maximum_compensation_rate: int
+    do_health_check: bool
+    health_check: str
+    custom_check: bool
+    profit_limit_ratio: int
+    loss_limit_ratio: int
+
+
+@dataclass
+class HealthPrediction:
+    """Profit and loss the next harvest would report and whether the health check accepts them."""
+
+    address: str
+    block: int
+    profit: int
+    loss: int
+    insurance_payment: int
+    compensation: int
+    profit_limit: int
+    loss_limit: int
+    passes: bool
+
+
+def _compensate(inputs, loss_sum):
+    """`StrategyInsurance.compensate`, returns (compensation, lossSum after)."""
+    if inputs.insurance_balance == 0:
+        return 0, 0
+    max_comp = inputs.maximum_compensation_rate * inputs.total_debt // MAX_BPS
+    compensation = min(inputs.insurance_balance, loss_sum, max_comp)
+    return compensation, loss_sum - compensation
+
+
+def predict_report(inputs):
+    """Mirrors `harvest` up to `vault.report`.
+
+    Returns:
+        (profit, loss, insurance payment, compensation)
+    """
+    if inputs.emergency_exit:
+        # liquidateAllPositions frees the total assets, nothing goes through the insurance
+        freed = inputs.total_assets
+        loss = max(inputs.debt_outstanding - freed, 0)
+        profit = max(freed - inputs.debt_outstanding, 0)
+        return profit, loss, 0, 0
+
+    profit = max(inputs.total_assets - inputs.total_debt, 0)
+    loss = max(inputs.total_debt - inputs.total_assets, 0)
+    profit += inputs.pending_harvest
+
+    if loss >= profit:
+        compensation, _ = _compensate(inputs, inputs.loss_sum + loss)
+        return 0, loss - compensation, 0, compensation
+
+    profit -= loss
+    payment = compensation = 0
+    if inputs.loss_sum > profit:
+        compensation, _ = _compensate(inputs, inputs.loss_sum - profit)
+    elif inputs.insurance_balance < inputs.total_debt * inputs.target_fund_size // MAX_BPS:
+        payment = profit * inputs.profit_take_rate // MAX_BPS
+    return profit - payment + compensation, 0, payment, compensation
+
+
+def default_check(profit, loss, total_debt, profit_limit_ratio, loss_limit_ratio):
+    """`_executeDefaultCheck`."""
+    return profit <= total_debt * profit_limit_ratio // MAX_BPS and loss <= total_debt * loss_limit_ratio // MAX_BPS
+
+
+def predict(inputs):
+    """HealthPrediction for one strategy's HarvestInputs."""
+    profit, loss, payment, compensation = predict_report(inputs)
+    if not inputs.do_health_check or inputs.health_check == ZERO_ADDRESS:
+        # harvest skips the check, turning it on for the next one
+        passes = True
+    elif inputs.custom_check:
+        passes = None
+    else:
+        passes = default_check(profit, loss, inputs.total_debt, inputs.profit_limit_ratio, inputs.loss_limit_ratio)
+    return HealthPrediction(
+        inputs.address,
+        inputs.block,
+        profit,
+        loss,
+        payment,
+        compensation,
+        inputs.total_debt * inputs.profit_limit_ratio // MAX_BPS,
+        inputs.total_debt * inputs.loss_limit_ratio // MAX_BPS,
+        passes,
+    )
+
+
+async def read_inputs(client, strategies, block="latest"):
+    """Reads the HarvestInputs of `strategies` at `block` in two batched rounds.
+
+    Strategies with a view that reverts are left out of the result.
+    """
+    if block == "latest":
+        block = await client.call("eth_blockNumber")
+    strategies = list(strategies)
+    results = await client.eth_calls(
+        [(address, encode_call(signature)) for address in strategies for signature in STRATEGY_VIEWS.values()], block
+    )
+    first = {}
+    for i, address in enumerate(strategies):
+        values = results[i * len(STRATEGY_VIEWS):(i + 1) * len(STRATEGY_VIEWS)]
+        if any(isinstance(value, RpcError) for value in values):
+            logger.debug("%s: skipped, strategy views reverted", address)
+            continue
+        first[address] = dict(zip(STRATEGY_VIEWS, values))
+
+    calls = []
+    for address, views in first.items():
+        vault, insurance, health_check = (decode_address(views[name]) for name in ("vault", "insurance", "health_check"))
+        calls += [
+            (vault, encode_call("strategies(address)", address)),
+            (vault, encode_call("debtOutstanding(address)", address)),
+            (decode_address(views["want"]), encode_call("balanceOf(address)", insurance)),
+            *((insurance, encode_call(signature)) for signature in INSURANCE_VIEWS.values()),
+            (health_check, encode_call("profitLimitRatio()")),
+            (health_check, encode_call("lossLimitRatio()")),
+            (health_check, encode_call("strategiesLimits(address)", address)),
+            (health_check, encode_call("checks(address)", address)),
+        ]
+    results = await client.eth_calls(calls, block)
+
+    inputs = []
+    per_strategy = len(calls) // len(first) if first else 0
+    for i, (address, views) in enumerate(first.items()):
+        values = results[i * per_strategy:(i + 1) * per_strategy]
+        health_check = decode_address(views["health_check"])
+        # nothing to read from a missing health check, its limits are never applied
+        checked = health_check != ZERO_ADDRESS
+        if any(isinstance(value, RpcError) for value in values[:-4]) or (
+            checked and any(isinstance(value, RpcError) for value in values[-4:])
+        ):
+            logger.debug("%s: skipped, vault, insurance or health check views reverted", address)
+            continue
+        strategy_params, debt_outstanding, insurance_balance, *insurance, profit_limit, loss_limit, limits, check = values
+        profit_limit_ratio = loss_limit_ratio = 0
+        custom_check = False
+        if checked:
+            profit_limit_ratio, loss_limit_ratio = decode_uint(profit_limit), decode_uint(loss_limit)
+            if decode_uint(limits, 2):
+                profit_limit_ratio, loss_limit_ratio = decode_uint(limits, 0), decode_uint(limits, 1)
+            custom_check = decode_address(check) != ZERO_ADDRESS
+        inputs.append(
+            HarvestInputs(
+                address=address,
+                block=int(block, 16),
+                total_assets=decode_uint(views["total_assets"]),
+                pending_harvest=decode_uint(views["pending_harvest"]),
+                total_debt=decode_uint(strategy_params, 6),
+                debt_outstanding=decode_uint(debt_outstanding),
+                emergency_exit=bool(decode_uint(views["emergency_exit"])),
+                insurance_balance=decode_uint(insurance_balance),
+                **dict(zip(INSURANCE_VIEWS, map(decode_uint, insurance))),
+                do_health_check=bool(decode_uint(views["do_health_check"])),
+                health_check=health_check,
+                custom_check=custom_check,
+                profit_limit_ratio=profit_limit_ratio,
+                loss_limit_ratio=loss_limit_ratio,
+            )
+        )
+    return inputs
+
+
+async def predict_harvests(client, strategies, block="latest"):
+    """HealthPredictions for all `strategies` at `block`, see `read_inputs`."""
+    return [predict(inputs) for inputs in await read_inputs(client, strategies, block)]
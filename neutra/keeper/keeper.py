@@ -0,0 +1,260 @@
+"""
+Keeper for many `CoreStrategyAaveGrail` strategies.
+
+Every poll reads the views the keeper needs from all strategies at one block
+in batched JSON-RPC requests, decides on at most one action per strategy
+from the strategy's own checks (`debtInRange()`, `collateralInRange()` and
+`priceSourceOk()`), and sends the transactions concurrently. A strategy with a transaction in flight is skipped until the
+transaction is mined.
+
+Harvests are sent when `harvestTrigger` says so or, with a
+`HarvestScheduler`, once the pending rewards are worth compounding.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .healthcheck import predict_harvests
+from .rpc import RpcError, decode_uint, encode_call
+
+BASIS_PRECISION = 10_000
+
+REBALANCE_DEBT = "rebalanceDebt"
+REBALANCE_COLLATERAL = "rebalanceCollateral"
+HARVEST = "harvest"
+
+# `RebalanceTrigger` codes of StrategyLens.rebalanceDebtTrigger() and rebalanceCollateralTrigger()
+READY, PAUSED, NOT_DEPLOYED, IN_RANGE, PRICE_SOURCE_DIFF = range(5)
+
+# StrategyState field -> view read from the strategy
+VIEWS = {
+    "debt_in_range": "debtInRange()",
+    "collateral_in_range": "collateralInRange()",
+    "harvest_trigger": "harvestTrigger(uint256)",
+    "pending_harvest": "balancePendingHarvest()",
+    "price_source_diff": "priceSourceDiffKeeper()",
+    "is_paused": "isPaused()",
+}
+
+# Views that revert with nothing deployed (no LP or no lend), read as None
+# then so the strategy can still be harvested
+POSITION_VIEWS = ("debt_in_range", "collateral_in_range")
+
+# Read with `price_source_diff` once a ratio is out of range, see `Keeper.poll`
+PRICE_SOURCE_OK = "priceSourceOk(uint256)"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StrategyState:
+    """Keeper views of one strategy, read at `block`.
+
+    `debt_in_range` and `collateral_in_range` are None when nothing is
+    deployed. `price_source_ok` is only read once a ratio is out of range.
+    """
+
+    address: str
+    block: int
+    debt_in_range: Optional[bool]
+    collateral_in_range: Optional[bool]
+    harvest_trigger: bool
+    pending_harvest: int
+    price_source_diff: int
+    is_paused: bool
+    price_source_ok: Optional[bool] = None
+
+    def out_of_range(self):
+        """Whether a rebalance may be due, which then needs `price_source_ok`."""
+        return not self.is_paused and False in (self.debt_in_range, self.collateral_in_range)
+
+
+def _trigger(state, in_range):
+    if state.is_paused:
+        return PAUSED
+    if in_range is None:
+        return NOT_DEPLOYED
+    if in_range:
+        return IN_RANGE
+    return READY if state.price_source_ok else PRICE_SOURCE_DIFF
+
+
+def debt_trigger(state):
+    """`StrategyLens.rebalanceDebtTrigger()` from the views in `state`, `READY` if `rebalanceDebt` would go through."""
+    return _trigger(state, state.debt_in_range)
+
+
+def collateral_trigger(state):
+    """`StrategyLens.rebalanceCollateralTrigger()` from the views in `state`, `READY` if `rebalanceCollateral` would go through."""
+    return _trigger(state, state.collateral_in_range)
+
+
+def decide(state, harvest_due=False):
+    """The keeper call `state` needs, None if it needs none.
+
+    A debt rebalance redeploys at the collateral target, so it takes priority
+    over a collateral rebalance, and both over a harvest. `harvest_due` asks
+    for a harvest the trigger doesn't, see `HarvestScheduler`.
+    """
+    if state.is_paused:
+        return None
+    if debt_trigger(state) == READY:
+        return REBALANCE_DEBT
+    if collateral_trigger(state) == READY:
+        return REBALANCE_COLLATERAL
+    if state.harvest_trigger or harvest_due:
+        return HARVEST
+    return None
+
+
+class Keeper:
+    """Polls `strategies` and sends the keeper calls they need from `sender`.
+
+    Transactions are sent with `eth_sendTransaction`, so `sender` has to be
+    unlocked on the node (or a signing proxy in front of it).
+
+    Args:
+        client: `RpcClient` connected to the node.
+        strategies: Strategy addresses.
+        sender: Keeper account address.
+        call_cost: `callCostInWei` passed to `harvestTrigger`.
+        poll_interval: Seconds between polls in `run`.
+        gas: Gas limit of the keeper transactions, estimated by the node if None.
+        health_check: Hold back harvests the health check is predicted to
+            reject, see `healthcheck.predict_harvests`.
+        scheduler: `HarvestScheduler` fed the pending rewards of every poll,
+            harvests are also sent when it says they are due. It is told of
+            every harvest sent.
+        clock: Time source in seconds for the scheduler.
+    """
+
+    def __init__(
+        self, client, strategies, sender, call_cost=0, poll_interval=15, gas=None, health_check=False, scheduler=None,
+        clock=time.time,
+    ):
+        self.client = client
+        self.strategies = list(strategies)
+        self.sender = sender
+        self.call_cost = call_cost
+        self.poll_interval = poll_interval
+        self.gas = gas
+        self.health_check = health_check
+        self.scheduler = scheduler
+        self.clock = clock
+        self.pending = {}
+        self._view_data = [
+            encode_call(signature, call_cost) if name == "harvest_trigger" else encode_call(signature)
+            for name, signature in VIEWS.items()
+        ]
+
+    async def poll(self):
+        """Reads every strategy without a pending transaction at the latest block.
+
+        A strategy with nothing deployed reads None for the position views
+        (`POSITION_VIEWS`) and can still be harvested. Strategies whose other
+        views revert are left out of the result. The strategies with a ratio
+        out of range then read `priceSourceOk(priceSourceDiffKeeper())` at the
+        same block, a revert reads as a failed check.
+        """
+        block = await self.client.call("eth_blockNumber")
+        pending = list(self.pending.items())
+        receipts = await self.client.batch([("eth_getTransactionReceipt", [tx_hash]) for _, tx_hash in pending])
+        for (address, tx_hash), receipt in zip(pending, receipts):
+            if isinstance(receipt, RpcError) or receipt is None:
+                continue
+            if int(receipt["status"], 16) == 0:
+                logger.warning("%s: transaction %s reverted", address, tx_hash)
+            del self.pending[address]
+
+        addresses = [address for address in self.strategies if address not in self.pending]
+        calls = [(address, data) for address in addresses for data in self._view_data]
+        results = await self.client.eth_calls(calls, block)
+
+        states = []
+        for i, address in enumerate(addresses):
+            values = dict(zip(VIEWS, results[i * len(VIEWS):(i + 1) * len(VIEWS)]))
+            errors = [
+                value for name, value in values.items() if isinstance(value, RpcError) and name not in POSITION_VIEWS
+            ]
+            if errors:
+                logger.debug("%s: skipped, %s", address, errors[0])
+                continue
+            fields = {
+                name: None if isinstance(value, RpcError) else decode_uint(value) for name, value in values.items()
+            }
+            for name in ("debt_in_range", "collateral_in_range", "harvest_trigger", "is_paused"):
+                if fields[name] is not None:
+                    fields[name] = bool(fields[name])
+            states.append(StrategyState(address=address, block=int(block, 16), **fields))
+
+        checks = [state for state in states if state.out_of_range()]
+        results = await self.client.eth_calls(
+            [(state.address, encode_call(PRICE_SOURCE_OK, state.price_source_diff)) for state in checks], block
+        )
+        for state, result in zip(checks, results):
+            state.price_source_ok = not isinstance(result, RpcError) and bool(decode_uint(result))
+        return states
+
+    async def send(self, address, action):
+        """Sends keeper call `action` to the strategy at `address`, returning the tx hash."""
+        tx = {"from": self.sender, "to": address, "data": encode_call(f"{action}()")}
+        if self.gas is not None:
+            tx["gas"] = hex(self.gas)
+        tx_hash = await self.client.call("eth_sendTransaction", tx)
+        self.pending[address] = tx_hash
+        logger.info("%s: %s sent in %s", address, action, tx_hash)
+        return tx_hash
+
+    async def run_once(self):
+        """Polls all strategies once and sends the calls they need.
+
+        Returns:
+            dict: Action sent to each strategy that needed one.
+        """
+        actions = {}
+        block = None
+        now = self.clock()
+        for state in await self.poll():
+            block = state.block
+            due = self.scheduler is not None and self.scheduler.observe(state.address, now, state.pending_harvest)
+            action = decide(state, due)
+            if action is not None:
+                actions[state.address] = action
+        harvests = [address for address, action in actions.items() if action == HARVEST]
+        if self.health_check and harvests:
+            for prediction in await predict_harvests(self.client, harvests, hex(block)):
+                if prediction.passes is False:
+                    logger.warning(
+                        "%s: harvest held back, profit %d / %d, loss %d / %d over the health check limits",
+                        prediction.address,
+                        prediction.profit,
+                        prediction.profit_limit,
+                        prediction.loss,
+                        prediction.loss_limit,
+                    )
+                    del actions[prediction.address]
+        results = await asyncio.gather(
+            *(self.send(address, action) for address, action in actions.items()), return_exceptions=True
+        )
+        for (address, action), result in zip(list(actions.items()), results):
+            if isinstance(result, Exception):
+                logger.warning("%s: %s failed to send, %s", address, action, result)
+                del actions[address]
+            elif action == HARVEST and self.scheduler is not None:
+                self.scheduler.harvested(address)
+        return actions
+
+    async def run(self, stop=None):
+        """Runs `run_once` every `poll_interval` seconds until `stop` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.run_once()
+            except (RpcError, OSError, asyncio.TimeoutError) as e:
+                logger.warning("poll failed, %s", e)
+            try:
+                await asyncio.wait_for(stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,127 @@
+"""
+Batched JSON-RPC reads.
+
+Calls are grouped into JSON-RPC batch requests, so polling many views on many
+contracts costs a handful of round trips instead of one per view. Requests
+share a single connection pool and at most `max_concurrency` of them are in
+flight at once.
+"""
+import asyncio
+import itertools
+
+from eth_utils import keccak
+
+
+class RpcError(Exception):
+    """A JSON-RPC request returned an error."""
+
+    def __init__(self, error):
+        super().__init__(error.get("message", error))
+        self.error = error
+
+
+def selector(signature):
+    """4-byte selector of a function signature such as `harvestTrigger(uint256)`."""
+    return keccak(text=signature)[:4]
+
+
+def encode_call(signature, *args):
+    """Call data for `signature` with static (uint/bool/address) arguments."""
+    data = selector(signature)
+    for arg in args:
+        if isinstance(arg, str):
+            arg = int(arg, 16)
+        data += int(arg).to_bytes(32, "big")
+    return "0x" + data.hex()
+
+
+def decode_uint(result, index=0):
+    """Word `index` of an `eth_call` result as an int, bools decode to 0 / 1."""
+    return int(result[2 + 64 * index:66 + 64 * index] or "0", 16)
+
+
+def decode_address(result):
+    """First word of an `eth_call` result as a lowercase address."""
+    return "0x" + (result[26:66] or "00" * 20)
+
+
+class HttpTransport:
+    """Posts JSON-RPC payloads to `url` over a pooled aiohttp session.
+
+    aiohttp ships with web3, which brownie already depends on.
+    """
+
+    def __init__(self, url, max_connections=8, timeout=30):
+        self.url = url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+
+    async def request(self, payload):
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        async with self._session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class RpcClient:
+    """JSON-RPC client that sends every list of calls as batch requests.
+
+    Args:
+        transport: Object with an async `request(payload)` returning the
+            decoded JSON response, e.g. `HttpTransport`.
+        max_batch_size: Calls per batch request, nodes and providers cap it.
+        max_concurrency: Batch requests in flight at once.
+    """
+
+    def __init__(self, transport, max_batch_size=100, max_concurrency=4):
+        self.transport = transport
+        self.max_batch_size = max_batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._ids = itertools.count()
+
+    async def _send(self, calls):
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        async with self._semaphore:
+            response = await self.transport.request(payload)
+        by_id = {item["id"]: item for item in response}
+        return [by_id[request["id"]] for request in payload]
+
+    async def batch(self, calls):
+        """Sends `(method, params)` calls, returning one result per call.
+
+        A call that fails returns its `RpcError` in place of the result, so one
+        reverting view does not discard the rest of the batch.
+        """
+        chunks = [calls[i:i + self.max_batch_size] for i in range(0, len(calls), self.max_batch_size)]
+        responses = await asyncio.gather(*(self._send(chunk) for chunk in chunks))
+        return [
+            RpcError(item["error"]) if "error" in item else item["result"]
+            for chunk in responses
+            for item in chunk
+        ]
+
+    async def call(self, method, *params):
+        """Sends a single call, raising `RpcError` if it fails."""
+        (result,) = await self.batch([(method, list(params))])
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def eth_calls(self, calls, block="latest"):
+        """`eth_call`s `(address, data)` pairs in batches, returning raw results or `RpcError`s."""
+        return await self.batch([("eth_call", [{"to": to, "data": data}, block]) for to, data in calls])
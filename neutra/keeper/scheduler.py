@@ -0,0 +1,122 @@
+"""
+Picks when to harvest from the want value of the pending rewards.
+
+Rewards accrue at a rate r (want per second) and earn nothing until a
+harvest compounds them, while every harvest costs c want of gas. Harvesting
+every T seconds loses c / T to gas and on average a r T / 2 of yield on the
+idle rewards, a being the strategy's return per second. The sum is lowest
+for
+
+    T* = sqrt(2 c / (a r))
+
+that is once the pending rewards reach r T* = sqrt(2 c r / a). The scheduler
+estimates r from successive readings of `balancePendingHarvest()`, which
+`GrailStrategy` reports in want, and calls a harvest due once the pending
+rewards reach that target. The keeper restarts the estimate whenever it
+sends a harvest, see `HarvestScheduler.harvested`.
+"""
+import math
+from dataclasses import dataclass
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def optimal_interval(call_cost, reward_rate, apr):
+    """Seconds between harvests minimising gas plus idle yield, see module docstring.
+
+    Args:
+        call_cost: Cost of one harvest in want.
+        reward_rate: Rewards accruing in want per second.
+        apr: Yearly return of the compounded rewards, e.g. 0.2 for 20%.
+
+    Returns:
+        float, inf if nothing accrues or compounding earns nothing.
+    """
+    if reward_rate <= 0 or apr <= 0:
+        return math.inf
+    return math.sqrt(2 * call_cost * SECONDS_PER_YEAR / (apr * reward_rate))
+
+
+def harvest_target(call_cost, reward_rate, apr):
+    """Pending rewards in want at which a harvest is due."""
+    if reward_rate <= 0 or apr <= 0:
+        return math.inf
+    return math.sqrt(2 * call_cost * reward_rate * SECONDS_PER_YEAR / apr)
+
+
+@dataclass
+class _Accrual:
+    """Pending rewards of one strategy since its last harvest."""
+
+    start: float
+    start_pending: int
+    last: float
+    last_pending: int
+
+    @property
+    def rate(self):
+        elapsed = self.last - self.start
+        return (self.last_pending - self.start_pending) / elapsed if elapsed > 0 else 0.0
+
+
+class HarvestScheduler:
+    """Tracks the pending rewards of many strategies and says which are due a harvest.
+
+    Args:
+        call_cost: Cost of one harvest in want.
+        apr: Yearly return of the compounded rewards.
+        max_delay: Seconds after which a harvest is due whatever the rewards,
+            None for no limit.
+        min_samples: Readings since the last harvest needed before the
+            accrual rate is trusted.
+    """
+
+    def __init__(self, call_cost, apr, max_delay=None, min_samples=2):
+        self.call_cost = call_cost
+        self.apr = apr
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._accruals = {}
+        self._samples = {}
+
+    def observe(self, address, timestamp, pending):
+        """Records `pending` rewards of `address` at `timestamp`, True if a harvest is due."""
+        accrual = self._accruals.get(address)
+        if accrual is None or pending < accrual.last_pending:
+            # first reading or the rewards were harvested since the last one
+            accrual = self._accruals[address] = _Accrual(timestamp, pending, timestamp, pending)
+            self._samples[address] = 1
+        else:
+            accrual.last, accrual.last_pending = timestamp, pending
+            self._samples[address] += 1
+
+        if self.max_delay is not None and timestamp - accrual.start >= self.max_delay:
+            return True
+        if self._samples[address] < self.min_samples:
+            return False
+        return pending >= harvest_target(self.call_cost, accrual.rate, self.apr)
+
+    def harvested(self, address):
+        """Restarts the accrual of `address` from its next reading, once a harvest is sent.
+
+        The accrual also restarts when the pending rewards drop, but a harvest
+        that reverts or leaves them where they were would otherwise be due
+        again on every reading once `max_delay` has passed.
+        """
+        self._accruals.pop(address, None)
+
+    def reward_rate(self, address):
+        """Estimated want per second accruing to `address`, 0 before two readings."""
+        accrual = self._accruals.get(address)
+        return accrual.rate if accrual else 0.0
+
+    def next_harvest(self, address):
+        """Estimated timestamp at which `address` is due a harvest, None if unknown."""
+        accrual = self._accruals.get(address)
+        if accrual is None or accrual.rate <= 0:
+            return None
+        target = harvest_target(self.call_cost, accrual.rate, self.apr)
+        due = accrual.last + max(target - accrual.last_pending, 0) / accrual.rate
+        if self.max_delay is not None:
+            due = min(due, accrual.start + self.max_delay)
+        return due
@@ -0,0 +1,138 @@
+"""
+Drives the chunked unwind of a strategy to completion:
+
+    python -m neutra.keeper.unwind --rpc http://127.0.0.1:8545 --sender 0x... --chunk 1000 0xStrategy
+
+`startUnwind(chunk)` pauses the strategy and records how much LP every
+`unwindStep()` removes, each step then unwinds that much LP and repays its
+share of the debt. The progress lives on chain in `unwindLpPerStep()`, so a
+driver that is stopped halfway picks the unwind up where it was left.
+Reverted steps, e.g. while the pool price is too far from the oracle, are
+retried on the next poll. `cancelUnwind()` stops the unwind and unpauses the
+strategy.
+"""
+import argparse
+import asyncio
+import logging
+
+from .keeper import BASIS_PRECISION
+from .rpc import HttpTransport, RpcClient, RpcError, decode_uint, encode_call
+
+logger = logging.getLogger(__name__)
+
+
+class UnwindError(Exception):
+    """The unwind could not be started, went on reverting or was cancelled."""
+
+
+async def _view(client, strategy, signature):
+    return decode_uint(await client.call("eth_call", {"to": strategy, "data": encode_call(signature)}, "latest"))
+
+
+async def _transact(client, strategy, sender, data, gas, poll_interval, sleep):
+    """Sends a transaction and waits until it is mined, returning its hash and whether it succeeded."""
+    tx = {"from": sender, "to": strategy, "data": data}
+    if gas is not None:
+        tx["gas"] = hex(gas)
+    tx_hash = await client.call("eth_sendTransaction", tx)
+    while True:
+        receipt = await client.call("eth_getTransactionReceipt", tx_hash)
+        if receipt is not None:
+            return tx_hash, int(receipt["status"], 16) == 1
+        await sleep(poll_interval)
+
+
+async def run_unwind(
+    client, strategy, sender, chunk=1000, gas=None, poll_interval=15, max_reverts=3, sleep=asyncio.sleep
+):
+    """Unwinds `strategy` in steps of `chunk` basis points of its LP.
+
+    Args:
+        client: `RpcClient` connected to the node.
+        strategy: Strategy address.
+        sender: Keeper account, unlocked on the node.
+        chunk: Share of the LP removed per step in basis points, ignored when
+            resuming an unwind in progress.
+        gas: Gas limit of the transactions, estimated by the node if None.
+        poll_interval: Seconds between receipt polls and between retries.
+        max_reverts: Reverted steps in a row after which the driver gives up.
+        sleep: Coroutine function waiting a number of seconds.
+
+    Returns:
+        list: Hashes of the transactions sent, empty if the strategy was
+        already paused with no unwind in progress.
+
+    Raises:
+        UnwindError: If `startUnwind` reverts, `max_reverts` steps in a row
+            revert, in which case the unwind stays in progress and can be
+            resumed, or `cancelUnwind()` is called meanwhile.
+    """
+    if not 0 < chunk <= BASIS_PRECISION:
+        raise ValueError(f"chunk must be in (0, {BASIS_PRECISION}], got {chunk}")
+    sent = []
+    if await _view(client, strategy, "unwindLpPerStep()") == 0:
+        if await _view(client, strategy, "isPaused()"):
+            logger.info("%s: paused, nothing to unwind", strategy)
+            return sent
+        tx_hash, ok = await _transact(
+            client, strategy, sender, encode_call("startUnwind(uint256)", chunk), gas, poll_interval, sleep
+        )
+        sent.append(tx_hash)
+        if not ok:
+            raise UnwindError(f"{strategy}: startUnwind reverted in {tx_hash}")
+        logger.info("%s: unwind started in %s", strategy, tx_hash)
+
+    reverts = 0
+    while await _view(client, strategy, "unwindLpPerStep()") > 0:
+        tx_hash, ok = await _transact(client, strategy, sender, encode_call("unwindStep()"), gas, poll_interval, sleep)
+        sent.append(tx_hash)
+        if ok:
+            reverts = 0
+            # balanceLpInShort() counts the LP tokens, pooled or held
+            lp_left = await _view(client, strategy, "balanceLpInShort()")
+            logger.info("%s: unwound in %s, %d LP tokens left", strategy, tx_hash, lp_left)
+            continue
+        reverts += 1
+        logger.warning("%s: unwindStep reverted in %s (%d / %d)", strategy, tx_hash, reverts, max_reverts)
+        if reverts >= max_reverts:
+            raise UnwindError(f"{strategy}: {reverts} unwind steps reverted in a row")
+        await sleep(poll_interval)
+    if not await _view(client, strategy, "isPaused()"):
+        raise UnwindError(f"{strategy}: unwind cancelled")
+    logger.info("%s: unwind complete", strategy)
+    return sent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m neutra.keeper.unwind", description=__doc__.split("\n\n")[0].strip()
+    )
+    parser.add_argument("strategy", help="strategy address")
+    parser.add_argument("--rpc", required=True, help="JSON-RPC url of the node")
+    parser.add_argument("--sender", required=True, help="keeper account, unlocked on the node")
+    parser.add_argument("--chunk", type=int, default=1000, help="LP removed per step in basis points")
+    parser.add_argument("--gas", type=int, help="gas limit of the transactions")
+    parser.add_argument("--interval", type=float, default=15, help="seconds between receipt polls")
+    parser.add_argument("--max-reverts", type=int, default=3, help="reverted steps in a row before giving up")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    async def run():
+        transport = HttpTransport(args.rpc)
+        try:
+            await run_unwind(
+                RpcClient(transport), args.strategy, args.sender, chunk=args.chunk, gas=args.gas,
+                poll_interval=args.interval, max_reverts=args.max_reverts,
+            )
+        finally:
+            await transport.close()
+
+    try:
+        asyncio.run(run())
+    except (UnwindError, RpcError) as e:
+        parser.exit(1, f"{e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Vectorised off-chain models of the strategy contracts."""
+from .pool import FEE_DENOMINATOR, Pool, get_amount_out
+from .strategy import (
+    BASIS_PRECISION,
+    Position,
+    SimulationResult,
+    StrategyParams,
+    calc_collateral,
+    calc_debt_ratio,
+    calc_deployment,
+    deploy,
+    deploy_from_lend,
+    estimated_total_assets,
+    keeper_step,
+    price_source_ok,
+    rebalance_collateral,
+    rebalance_debt,
+    rebalance_debt_incremental,
+    simulate,
+)
+from .replay import ReplayResult, Tick, read_csv, replay, replay_arrays
+from .optimize import Evaluation, Paths, SearchSpace, gbm_prices, search
+from .insurance import InsuranceParams, InsuranceResult, harvest_returns, simulate_insurance
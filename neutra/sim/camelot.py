@@ -0,0 +1,167 @@
+"""
+Exact integer quotes for the swaps `CoreStrategyAaveGrail` makes on Camelot.
+
+Every function reproduces the contract's uint256 arithmetic, including the
+order of multiplications and floor divisions, so quotes match the chain to
+the wei. Arguments may be Python ints or array-likes; arrays are broadcast
+against each other and computed elementwise on Python ints (numpy object
+arrays), so a whole grid of sizes and reserve states is quoted in one call
+without overflow. Scalar inputs give scalar results.
+
+Where the contract would revert (insufficient liquidity, output below the
+`slippageAdj` limit) the quote is flagged in `reverted` instead of raising.
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .pool import FEE_DENOMINATOR
+from .strategy import BASIS_PRECISION
+
+SLIPPAGE_ADJ = 9900
+
+
+def _uint(value):
+    return np.asarray(value).astype(object)
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+
+def _where(condition, a, b):
+    return np.where(np.asarray(condition, dtype=bool), _uint(a), _uint(b))
+
+
+def _safe_div(numerator, denominator):
+    # floor division that yields 0 where the contract would divide by zero
+    denominator = _uint(denominator)
+    ok = np.asarray(denominator > 0, dtype=bool)
+    return _where(ok, _uint(numerator) // _where(ok, denominator, 1), 0), ~ok
+
+
+@dataclass
+class LpState:
+    """Want/short reserves and directional fees, as returned by `getLpReservesAndFee`.
+
+    `want_fee` is charged when want is the swap input, `short_fee` when short
+    is, both in FEE_DENOMINATOR units.
+    """
+
+    want: object
+    short: object
+    want_fee: object = 300
+    short_fee: object = 300
+
+    @classmethod
+    def from_pair(cls, reserve0, reserve1, fee0, fee1, want_is_token0=True):
+        """From the pair's `getReserves()`, ordered as `getLpReservesAndFee` does."""
+        if want_is_token0:
+            return cls(reserve0, reserve1, fee0, fee1)
+        return cls(reserve1, reserve0, fee1, fee0)
+
+
+@dataclass
+class SwapQuote:
+    """Outcome of one of the strategy's swaps.
+
+    `amount_in` and `amount_out` are what goes in and out of the pair, `slippage_want`
+    is what the contract function returns as its slippage, and `state` holds
+    the reserves after the swap.
+    """
+
+    amount_in: object
+    amount_out: object
+    slippage_want: object
+    reverted: object
+    state: LpState
+
+
+def get_amount_out(amount_in, reserve_in, reserve_out, fee_in):
+    """Camelot pair `getAmountOut` for a volatile pair."""
+    amount_in_with_fee = _uint(amount_in) * (FEE_DENOMINATOR - _uint(fee_in))
+    amount_out, _ = _safe_div(
+        amount_in_with_fee * _uint(reserve_out), _uint(reserve_in) * FEE_DENOMINATOR + amount_in_with_fee
+    )
+    return _scalar(amount_out)
+
+
+def get_amount_in(amount_out, state):
+    """`getAmountIn`: want needed to buy exactly `amount_out` short.
+
+    Returns:
+        (amount_in, reverted)
+    """
+    amount_out = _uint(amount_out)
+    reserve_in, reserve_out = _uint(state.want), _uint(state.short)
+    reverted = np.asarray((amount_out <= 0) | (reserve_in <= 0) | (reserve_out <= amount_out), dtype=bool)
+    numerator = reserve_in * amount_out * FEE_DENOMINATOR
+    denominator = _where(reverted, 0, reserve_out - amount_out) * (FEE_DENOMINATOR - _uint(state.want_fee))
+    amount_in, zero = _safe_div(numerator, denominator)
+    return _scalar(amount_in + 1), _scalar(reverted | zero)
+
+
+def convert_short_to_want_lp(amount_short, state):
+    amount, _ = _safe_div(_uint(amount_short) * _uint(state.want), state.short)
+    return _scalar(amount)
+
+
+def convert_want_to_short_lp(amount_want, state):
+    amount, _ = _safe_div(_uint(amount_want) * _uint(state.short), state.want)
+    return _scalar(amount)
+
+
+def _after_swap(state, want_in, short_in, want_out, short_out):
+    return replace(
+        state,
+        want=_scalar(_uint(state.want) + want_in - want_out),
+        short=_scalar(_uint(state.short) + short_in - short_out),
+    )
+
+
+def swap_exact_want_short(amount, state, slippage_adj=SLIPPAGE_ADJ):
+    """`_swapExactWantShort`: sells `amount` want for short.
+
+    The contract values the slippage at the reserves before the swap.
+    """
+    amount = _uint(amount)
+    amount_out_min = _uint(convert_want_to_short_lp(amount, state))
+    amount_out = _uint(get_amount_out(amount, state.want, state.short, state.want_fee))
+    reverted = np.asarray(amount_out < amount_out_min * slippage_adj // BASIS_PRECISION, dtype=bool)
+    slippage = convert_short_to_want_lp(_where(amount_out_min > amount_out, amount_out_min - amount_out, 0), state)
+    return SwapQuote(
+        _scalar(amount), _scalar(amount_out), slippage, _scalar(reverted), _after_swap(state, amount, 0, 0, amount_out)
+    )
+
+
+def swap_exact_short_want(amount_short, state, slippage_adj=SLIPPAGE_ADJ):
+    """`_swapExactShortWant`: sells `amount_short` short for want.
+
+    The contract also returns the spot value of the short sold,
+    `convert_short_to_want_lp(amount_short)`, which is `amount_out + slippage_want`.
+    """
+    amount_short = _uint(amount_short)
+    amount_want = _uint(convert_short_to_want_lp(amount_short, state))
+    amount_out = _uint(get_amount_out(amount_short, state.short, state.want, state.short_fee))
+    reverted = np.asarray(amount_out < amount_want * slippage_adj // BASIS_PRECISION, dtype=bool)
+    slippage = _where(amount_want > amount_out, amount_want - amount_out, 0)
+    return SwapQuote(
+        _scalar(amount_short), _scalar(amount_out), _scalar(slippage), _scalar(reverted),
+        _after_swap(state, 0, amount_short, amount_out, 0),
+    )
+
+
+def swap_want_short_exact(amount_out, state):
+    """`_swapWantShortExact`: buys exactly `amount_out` short with the want `getAmountIn` quotes."""
+    amount_out = _uint(amount_out)
+    amount_in, reverted = get_amount_in(amount_out, state)
+    # nothing to buy is a no-op
+    buying = np.asarray(amount_out > 0, dtype=bool)
+    amount_in = _where(buying, amount_in, 0)
+    reverted = np.asarray(reverted, dtype=bool) & buying
+    amount_in_want = _uint(convert_short_to_want_lp(amount_out, state))
+    slippage = _where(amount_in > amount_in_want, amount_in - amount_in_want, 0)
+    return SwapQuote(
+        _scalar(amount_in), _scalar(amount_out), _scalar(slippage), _scalar(reverted),
+        _after_swap(state, amount_in, 0, 0, amount_out),
+    )
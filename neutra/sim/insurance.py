@@ -0,0 +1,190 @@
+"""
+Vectorised model of `StrategyInsurance` and the strategy's side of it in
+`prepareReturn`.
+
+Every harvest the strategy reports its net profit or loss against the
+vault's total debt. Profits pay `profitTakeRate` into the fund while it is
+below `targetFundSize` of the debt, losses are added to `lossSum` and paid
+back at most `maximumCompenstionRate` of the debt per harvest, for as long
+as the fund lasts. Amounts are in whole want units, one row per scenario
+and one column per harvest, and the uint rounding of the contract is
+ignored.
+
+As in `prepareReturn`, an insurance payment that is not below the profit
+left after it is not transferred: the want stays in the strategy and shows
+up as profit at the next harvest.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+BPS_MAX = 10_000
+
+
+@dataclass
+class InsuranceParams:
+    """Fund settings, defaults match `StrategyInsurance`. Fields may be per scenario arrays."""
+
+    target_fund_size: int = 50
+    profit_take_rate: int = 1000
+    maximum_compensation_rate: int = 5
+
+    def valid(self):
+        """True where the setters accept the settings."""
+        return (
+            (np.asarray(self.target_fund_size) < 500)
+            & (np.asarray(self.profit_take_rate) < 4000)
+            & (np.asarray(self.maximum_compensation_rate) < 50)
+        )
+
+
+@dataclass
+class InsuranceState:
+    """Fund balance and pending `lossSum` on every scenario."""
+
+    balance: np.ndarray
+    loss_sum: np.ndarray
+
+    @classmethod
+    def empty(cls, n_scenarios):
+        return cls(np.zeros(n_scenarios), np.zeros(n_scenarios))
+
+
+def compensate(state, total_debt, params, mask):
+    """`compensate`: pays out of the fund towards `lossSum`, returns the payout."""
+    empty = mask & (state.balance <= 0)
+    state.loss_sum[empty] = 0
+    max_comp = params.maximum_compensation_rate * total_debt / BPS_MAX
+    compensation = np.where(mask & ~empty, np.minimum(np.minimum(state.balance, state.loss_sum), max_comp), 0.0)
+    state.balance -= compensation
+    state.loss_sum -= compensation
+    return compensation
+
+
+def report_loss(state, total_debt, loss, params, mask):
+    """`reportLoss`: returns the compensation sent to the strategy."""
+    state.loss_sum += np.where(mask, loss, 0.0)
+    return compensate(state, total_debt, params, mask)
+
+
+def report_profit(state, total_debt, profit, params, mask):
+    """`reportProfit`: returns (payment requested, compensation sent)."""
+    pending = mask & (state.loss_sum > profit)
+    state.loss_sum -= np.where(pending, profit, 0.0)
+    compensation = compensate(state, total_debt, params, pending)
+
+    settled = mask & ~pending
+    state.loss_sum[settled] = 0
+    below_target = settled & (state.balance < total_debt * params.target_fund_size / BPS_MAX)
+    payment = np.where(below_target, profit * params.profit_take_rate / BPS_MAX, 0.0)
+    return payment, compensation
+
+
+@dataclass
+class InsuranceResult:
+    """Per harvest (scenarios, harvests) fund activity and what the vault sees."""
+
+    balance: np.ndarray
+    loss_sum: np.ndarray
+    payments: np.ndarray
+    compensation: np.ndarray
+    profit: np.ndarray
+    loss: np.ndarray
+    gross_profit: np.ndarray
+    gross_loss: np.ndarray
+    total_debt: np.ndarray
+
+    @property
+    def coverage(self):
+        """Share of the losses paid back by the fund, per scenario (NaN without losses)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.compensation.sum(axis=1) / self.gross_loss.sum(axis=1)
+
+    @property
+    def uncovered_loss(self):
+        return self.gross_loss.sum(axis=1) - self.compensation.sum(axis=1)
+
+    @property
+    def profit_drag(self):
+        """Share of the profits paid into the fund, per scenario."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.payments.sum(axis=1) / self.gross_profit.sum(axis=1)
+
+    def apr_drag(self, harvests_per_year):
+        """Net flow into the fund as an APR on the mean total debt, per scenario."""
+        years = self.payments.shape[1] / harvests_per_year
+        net = self.payments.sum(axis=1) - self.compensation.sum(axis=1)
+        return net / self.total_debt.mean(axis=1) / years
+
+
+def simulate_insurance(returns, total_debt, params=None, compound=False, initial_balance=0.0):
+    """
+    Runs the fund through a sequence of harvests on every scenario.
+
+    Args:
+        returns: (scenarios, harvests) net strategy return per harvest as a
+            fraction of the total debt, before insurance.
+        total_debt: Vault debt of the strategy, a scalar, per scenario or
+            (scenarios, harvests).
+        params: InsuranceParams, defaults to the contract defaults.
+        compound: Grow the debt by what the vault is reported each harvest,
+            instead of reading it from `total_debt` every harvest.
+        initial_balance: Fund balance before the first harvest.
+
+    Returns:
+        InsuranceResult
+    """
+    params = params or InsuranceParams()
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    n_scenarios, n_harvests = returns.shape
+    debt_path = np.broadcast_to(
+        np.asarray(total_debt, dtype=float).reshape(-1, 1) if np.ndim(total_debt) == 1 else np.asarray(total_debt, dtype=float),
+        returns.shape,
+    )
+    state = InsuranceState.empty(n_scenarios)
+    state.balance += initial_balance
+    debt = debt_path[:, 0].copy()
+    stranded = np.zeros(n_scenarios)
+
+    out = {name: np.zeros(returns.shape) for name in InsuranceResult.__dataclass_fields__}
+    for t in range(n_harvests):
+        if not compound:
+            debt = debt_path[:, t].copy()
+        pnl = returns[:, t] * debt
+        gross_profit = np.maximum(pnl, 0.0) + stranded
+        gross_loss = np.maximum(-pnl, 0.0)
+        stranded = np.zeros(n_scenarios)
+
+        # `_loss >= _profit`, a harvest without profit or loss reports a zero loss
+        losing = gross_loss >= gross_profit
+        compensation = report_loss(state, debt, gross_loss, params, losing)
+        loss = np.where(losing, gross_loss - compensation, 0.0)
+
+        winning = ~losing
+        net_profit = np.where(winning, gross_profit - gross_loss, 0.0)
+        payment, profit_compensation = report_profit(state, debt, net_profit, params, winning)
+        profit = np.where(winning, net_profit - payment + profit_compensation, 0.0)
+        transferred = winning & (payment > 0) & (payment < profit)
+        state.balance += np.where(transferred, payment, 0.0)
+        stranded = np.where(winning & ~transferred, payment, 0.0)
+
+        out["balance"][:, t] = state.balance
+        out["loss_sum"][:, t] = state.loss_sum
+        out["payments"][:, t] = np.where(transferred, payment, 0.0)
+        out["compensation"][:, t] = compensation + profit_compensation
+        out["profit"][:, t] = profit
+        out["loss"][:, t] = loss
+        out["gross_profit"][:, t] = np.where(winning, gross_profit, 0.0)
+        out["gross_loss"][:, t] = gross_loss
+        out["total_debt"][:, t] = debt
+        if compound:
+            debt = debt + profit - loss
+    return InsuranceResult(**out)
+
+
+def harvest_returns(n_scenarios, n_harvests, mean=0.0005, vol=0.0005, loss_probability=0.02, loss_size=0.005, seed=0):
+    """Per harvest returns: normal noise around `mean` plus occasional losses of about `loss_size`."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(mean, vol, size=(n_scenarios, n_harvests))
+    shocks = rng.random((n_scenarios, n_harvests)) < loss_probability
+    return returns - shocks * rng.exponential(loss_size, size=(n_scenarios, n_harvests))
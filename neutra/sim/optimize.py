@@ -0,0 +1,208 @@
+"""
+Parallel search for the strategy's debt, collateral and slippage settings.
+
+Candidates are combinations of the values listed in a `SearchSpace` that the
+contract setters accept. Each one is replayed over every price path with
+`replay_arrays` and scored by the want lost to keeper costs and hedge drift,
+i.e. minus its mean PnL after gas. Gas and slippage are paid out of the
+position, so scoring on PnL keeps the search from trading them for a hedge
+that drifts unchecked. A candidate whose collateral ratio reaches its
+`collatLimit` on any path is ruled out.
+
+The paths live in one shared memory block that every worker of the process
+pool maps, so they are copied once rather than once per task, and workers
+replay batches of candidates side by side.
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .replay import replay_arrays
+from .strategy import BASIS_PRECISION, StrategyParams
+
+_paths = None
+_shm = None
+
+
+@dataclass
+class Paths:
+    """Pair reserves and oracle prices, (paths, steps) arrays."""
+
+    want: np.ndarray
+    short: np.ndarray
+    oracle_price: np.ndarray
+
+    @classmethod
+    def from_prices(cls, prices, want_reserve, oracle_prices=None):
+        """Paths of a pair holding `want_reserve` want and trading at `prices`."""
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        want = np.full(prices.shape, float(want_reserve))
+        oracle_prices = prices if oracle_prices is None else np.atleast_2d(np.asarray(oracle_prices, dtype=float))
+        return cls(want, want / prices, oracle_prices)
+
+    @classmethod
+    def from_ticks(cls, ticks):
+        """A single path from recorded `Tick`s, missing oracle prices are NaN and carried forward by the replay."""
+        ticks = list(ticks)
+        return cls(
+            np.array([[tick.want for tick in ticks]], dtype=float),
+            np.array([[tick.short for tick in ticks]], dtype=float),
+            np.array([[np.nan if tick.oracle_price is None else tick.oracle_price for tick in ticks]], dtype=float),
+        )
+
+    def stacked(self):
+        return np.stack([self.want, self.short, self.oracle_price])
+
+
+def gbm_prices(n_paths, n_steps, price, vol, seed=0):
+    """Geometric Brownian motion price paths with `vol` per step volatility."""
+    steps = np.random.default_rng(seed).normal(-0.5 * vol ** 2, vol, size=(n_paths, n_steps))
+    steps[:, 0] = 0
+    return price * np.exp(np.cumsum(steps, axis=1))
+
+
+@dataclass
+class SearchSpace:
+    """Values to try for each setting, the other settings stay at `base`."""
+
+    debt_lower: tuple = (9610,)
+    debt_upper: tuple = (10390,)
+    rebalance_percent: tuple = (10000,)
+    collat_lower: tuple = (6500,)
+    collat_target: tuple = (7000,)
+    collat_upper: tuple = (7500,)
+    collat_limit: tuple = (8100,)
+    slippage_adj: tuple = (9900,)
+    base: StrategyParams = field(default_factory=StrategyParams)
+
+    def _dimensions(self):
+        return [f.name for f in fields(self) if f.name != "base"]
+
+    def _params(self, values):
+        params = replace(self.base, **dict(zip(self._dimensions(), values)))
+        return params if valid(params) else None
+
+    def grid(self):
+        """Every valid combination."""
+        combinations = itertools.product(*(getattr(self, name) for name in self._dimensions()))
+        return [params for params in map(self._params, combinations) if params is not None]
+
+    def sample(self, n, seed=0):
+        """Up to `n` distinct valid combinations drawn at random."""
+        rng = np.random.default_rng(seed)
+        seen, candidates = set(), []
+        for _ in range(n * 20):
+            if len(candidates) == n:
+                break
+            values = tuple(int(rng.choice(getattr(self, name))) for name in self._dimensions())
+            if values not in seen:
+                seen.add(values)
+                params = self._params(values)
+                if params is not None:
+                    candidates.append(params)
+        return candidates
+
+
+def valid(params):
+    """True if `setDebtThresholds` and `setCollateralThresholds` accept `params`."""
+    return (
+        params.debt_lower <= BASIS_PRECISION <= params.debt_upper
+        and params.rebalance_percent <= BASIS_PRECISION
+        and params.collat_lower <= params.collat_target <= params.collat_upper < params.collat_limit <= BASIS_PRECISION
+        and params.slippage_adj <= BASIS_PRECISION
+    )
+
+
+@dataclass
+class Evaluation:
+    """A candidate's results, means over the paths except `max_collat_ratio`."""
+
+    params: StrategyParams
+    score: float
+    net_pnl: float
+    gas_cost: float
+    slippage: float
+    rebalances: float
+    reverted: float
+    max_collat_ratio: float
+
+    @property
+    def feasible(self):
+        return np.isfinite(self.score)
+
+
+def _attach(name, shape):
+    global _paths, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    _paths = np.ndarray(shape, dtype=float, buffer=_shm.buf)
+
+
+def _evaluate(candidates, deposit, kwargs):
+    want, short, oracle = _paths
+    net_pnl, gas, slippage, calls, reverted = (np.zeros(len(candidates)) for _ in range(5))
+    max_collat = np.full(len(candidates), -np.inf)
+    for path in range(want.shape[0]):
+        result = replay_arrays(want[path], short[path], deposit, candidates, oracle_price=oracle[path], **kwargs)
+        net_pnl += result.net_pnl
+        gas += result.gas_cost
+        slippage += result.slippage
+        calls += result.debt_rebalances + result.collat_rebalances
+        reverted += result.reverted
+        max_collat = np.fmax(max_collat, result.collat_ratio_range[:, 1])
+    n = want.shape[0]
+    return [
+        Evaluation(
+            params,
+            -net_pnl[i] / n if max_collat[i] < params.collat_limit else np.inf,
+            net_pnl[i] / n,
+            gas[i] / n,
+            slippage[i] / n,
+            calls[i] / n,
+            reverted[i] / n,
+            max_collat[i],
+        )
+        for i, params in enumerate(candidates)
+    ]
+
+
+def search(paths, candidates, deposit, workers=None, batch_size=16, **kwargs):
+    """
+    Replays every candidate over `paths` on a process pool.
+
+    Args:
+        paths: Paths to replay.
+        candidates: StrategyParams to try, e.g. `SearchSpace.grid()` or `.sample(n)`.
+        deposit: want deployed on every path.
+        workers: Processes to use, defaults to one per core.
+        batch_size: Candidates replayed side by side in one task.
+        kwargs: Passed on to `replay_arrays`, e.g. `gas_per_call` or `chunk_size`.
+
+    Returns:
+        Evaluations sorted best first.
+    """
+    data = paths.stacked()
+    shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+    try:
+        np.ndarray(data.shape, dtype=float, buffer=shm.buf)[:] = data
+        del data
+        # the price-check setting must match within a batch, see StrategyParams.stack
+        candidates = sorted(candidates, key=lambda params: params.do_price_check)
+        batches = [
+            list(batch)
+            for _, group in itertools.groupby(candidates, key=lambda params: params.do_price_check)
+            for batch in _batched(list(group), batch_size)
+        ]
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shm.name, (3, *paths.want.shape))) as pool:
+            futures = [pool.submit(_evaluate, batch, deposit, kwargs) for batch in batches]
+            evaluations = [evaluation for future in futures for evaluation in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+    return sorted(evaluations, key=lambda evaluation: evaluation.score)
+
+
+def _batched(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
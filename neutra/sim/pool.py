@@ -0,0 +1,94 @@
+"""
+Vectorised model of the Camelot want/short pair.
+
+Every field is an array with one entry per simulated path, so a single call
+moves all paths at once.
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+FEE_DENOMINATOR = 100_000
+
+
+def get_amount_out(amount_in, reserve_in, reserve_out, fee):
+    """Camelot `getAmountOut` for a single hop, `fee` in FEE_DENOMINATOR units."""
+    amount_in_with_fee = amount_in * (FEE_DENOMINATOR - fee)
+    return amount_in_with_fee * reserve_out / (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+@dataclass
+class Pool:
+    """Reserves and LP supply of the want/short pair.
+
+    `want_fee` / `short_fee` are the Camelot directional fees charged when
+    that token is the swap input (see `getLpReservesAndFee`).
+    """
+
+    want: np.ndarray
+    short: np.ndarray
+    supply: np.ndarray
+    want_fee: float = 300
+    short_fee: float = 300
+
+    @classmethod
+    def from_price(cls, price, want_reserve, want_fee=300, short_fee=300):
+        """Pool holding `want_reserve` want at `price` (want per short)."""
+        price = np.asarray(price, dtype=float)
+        want = np.array(np.broadcast_to(np.asarray(want_reserve, dtype=float), price.shape))
+        short = want / price
+        return cls(want, short, np.sqrt(want * short), want_fee, short_fee)
+
+    @property
+    def price(self):
+        return self.want / self.short
+
+    def copy(self):
+        return replace(self, want=self.want.copy(), short=self.short.copy(), supply=self.supply.copy())
+
+    def restore(self, other, mask):
+        """Reset the paths selected by `mask` to the state held in `other`."""
+        np.copyto(self.want, other.want, where=mask)
+        np.copyto(self.short, other.short, where=mask)
+        np.copyto(self.supply, other.supply, where=mask)
+
+    def move_to(self, price):
+        """Arbitrage the reserves to `price` along the constant product curve."""
+        k = self.want * self.short
+        self.want[:] = np.sqrt(k * price)
+        self.short[:] = np.sqrt(k / price)
+
+    def swap_want_for_short(self, amount_want):
+        amount_out = get_amount_out(amount_want, self.want, self.short, self.want_fee)
+        self.want += amount_want
+        self.short -= amount_out
+        return amount_out
+
+    def swap_short_for_want(self, amount_short):
+        amount_out = get_amount_out(amount_short, self.short, self.want, self.short_fee)
+        self.short += amount_short
+        self.want -= amount_out
+        return amount_out
+
+    def add_liquidity(self, want_desired, short_desired):
+        """Router `addLiquidity`: returns (want used, short used, LP minted)."""
+        short_optimal = want_desired * self.short / self.want
+        use_want = short_optimal <= short_desired
+        amount_want = np.where(use_want, want_desired, short_desired * self.want / self.short)
+        amount_short = np.where(use_want, short_optimal, short_desired)
+        liquidity = np.minimum(
+            amount_want * self.supply / self.want, amount_short * self.supply / self.short
+        )
+        self.want += amount_want
+        self.short += amount_short
+        self.supply += liquidity
+        return amount_want, amount_short, liquidity
+
+    def remove_liquidity(self, liquidity):
+        """Router `removeLiquidity`: returns (want out, short out)."""
+        amount_want = liquidity * self.want / self.supply
+        amount_short = liquidity * self.short / self.supply
+        self.want -= amount_want
+        self.short -= amount_short
+        self.supply -= liquidity
+        return amount_want, amount_short
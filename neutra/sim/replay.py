@@ -0,0 +1,256 @@
+"""
+Replays recorded pair reserves and oracle prices through the keeper logic.
+
+The history is a stream of `Tick`s, typically one per `Sync` event of the
+want/short pair, consumed `chunk_size` ticks at a time so a long history
+never sits in memory at once. The position only changes when the keeper
+acts, so the debt and collateral ratios of a whole chunk are computed in
+one go and the loop only stops at the ticks where a rebalance fires.
+
+Every parameter set passed is replayed side by side over the same history,
+one simulated path per set.
+
+At every tick the pair is reset to the recorded reserves: the strategy's
+own swaps move the simulated pair until the next tick and arbitrage is
+assumed to have undone them by then. Without a recorded LP supply the
+supply follows sqrt(k), which leaves out the swap fees accruing to LPs.
+Farming rewards, Aave interest and harvests are not modelled.
+"""
+import csv
+import itertools
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .pool import Pool
+from .strategy import BASIS_PRECISION, Position, StrategyParams, deploy, estimated_total_assets, keeper_step
+
+
+@dataclass
+class Tick:
+    """Pair reserves in whole tokens and the oracle price in want per short at `block`.
+
+    A missing `oracle_price` keeps the previous one. `supply` is the pair's
+    LP supply, give it on every tick or on none.
+    """
+
+    block: int
+    want: float
+    short: float
+    oracle_price: float = None
+    supply: float = None
+
+
+def read_csv(path, want_decimals=6, short_decimals=18, supply_decimals=18):
+    """
+    Streams ticks from a csv with the columns `block`, `want`, `short` and
+    optionally `oracle_price` and `supply`. Reserves and supply are raw token
+    amounts, `oracle_price` is in want per short.
+    """
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            oracle_price = row.get("oracle_price")
+            supply = row.get("supply")
+            yield Tick(
+                int(row["block"]),
+                int(row["want"]) / 10 ** want_decimals,
+                int(row["short"]) / 10 ** short_decimals,
+                float(oracle_price) if oracle_price else None,
+                int(supply) / 10 ** supply_decimals if supply else None,
+            )
+
+
+@dataclass
+class ReplayResult:
+    """Keeper activity and PnL per parameter set over the replayed history.
+
+    The ratio ranges are observed before keeper calls, `equity` holds the
+    total assets every `record_every` ticks.
+    """
+
+    ticks: int
+    first_block: int
+    last_block: int
+    debt_rebalances: np.ndarray
+    collat_rebalances: np.ndarray
+    reverted: np.ndarray
+    slippage: np.ndarray
+    gas_cost: np.ndarray
+    debt_ratio_range: np.ndarray
+    collat_ratio_range: np.ndarray
+    total_assets: np.ndarray
+    pnl: np.ndarray
+    equity_blocks: np.ndarray
+    equity: np.ndarray
+    position: Position = field(repr=False)
+    pool: Pool = field(repr=False)
+
+    @property
+    def net_pnl(self):
+        return self.pnl - self.gas_cost
+
+
+def _chunks(ticks, chunk_size):
+    ticks = iter(ticks)
+    while True:
+        chunk = list(itertools.islice(ticks, chunk_size))
+        if not chunk:
+            return
+        yield (
+            np.array([tick.block for tick in chunk]),
+            np.array([tick.want for tick in chunk], dtype=float),
+            np.array([tick.short for tick in chunk], dtype=float),
+            np.array([np.nan if tick.oracle_price is None else tick.oracle_price for tick in chunk], dtype=float),
+            np.array([np.nan if tick.supply is None else tick.supply for tick in chunk], dtype=float),
+        )
+
+
+def _forward_fill(values, last):
+    values = np.concatenate([[last], values])
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    return values[np.maximum.accumulate(index)][1:]
+
+
+def _set_pool(pool, want, short, supply):
+    pool.want[:] = want
+    pool.short[:] = short
+    pool.supply[:] = supply
+
+
+def replay(ticks, deposit, params=None, chunk_size=10_000, **kwargs):
+    """
+    Deploys `deposit` want at the first tick and runs the keeper
+    (`rebalanceDebt` then `rebalanceCollateral`) at every tick.
+
+    Args:
+        ticks: Iterable of `Tick`s in block order.
+        deposit: want deployed for every parameter set.
+        params: StrategyParams or a list of them, defaults to the contract defaults.
+        want_fee, short_fee: Pair fees in FEE_DENOMINATOR units.
+        gas_per_call: Cost of one keeper transaction in want, reverted ones included.
+        record_every: Sample the total assets every that many ticks.
+
+    Returns:
+        ReplayResult
+    """
+    return _replay(_chunks(ticks, chunk_size), deposit, params, **kwargs)
+
+
+def replay_arrays(want, short, deposit, params=None, oracle_price=None, supply=None, block=None, chunk_size=10_000, **kwargs):
+    """`replay` over a history held in arrays, one entry per tick.
+
+    `oracle_price` and `supply` may hold NaN where `Tick` would hold None,
+    `block` defaults to the tick index.
+    """
+    n = len(want)
+    columns = [
+        np.arange(n) if block is None else np.asarray(block),
+        np.asarray(want, dtype=float),
+        np.asarray(short, dtype=float),
+        np.full(n, np.nan) if oracle_price is None else np.asarray(oracle_price, dtype=float),
+        np.full(n, np.nan) if supply is None else np.asarray(supply, dtype=float),
+    ]
+    chunks = (tuple(column[i:i + chunk_size] for column in columns) for i in range(0, n, chunk_size))
+    return _replay(chunks, deposit, params, **kwargs)
+
+
+def _replay(chunks, deposit, params=None, want_fee=300, short_fee=300, gas_per_call=0.0, record_every=None):
+    params = params or StrategyParams()
+    params = StrategyParams.stack(params if isinstance(params, (list, tuple)) else [params])
+    n_paths = len(params.collat_target)
+
+    pos = pool = None
+    oracle_price = np.nan
+    ticks_seen = 0
+    first_block = last_block = None
+    debt_rebalances = np.zeros(n_paths, dtype=int)
+    collat_rebalances = np.zeros(n_paths, dtype=int)
+    reverted = np.zeros(n_paths, dtype=int)
+    slippage = np.zeros(n_paths)
+    debt_range = np.array([[np.inf, -np.inf]] * n_paths)
+    collat_range = np.array([[np.inf, -np.inf]] * n_paths)
+    equity_blocks, equity = [], []
+
+    for block, want, short, oracle, supply in chunks:
+        oracle = _forward_fill(oracle, oracle_price)
+        oracle = np.where(np.isnan(oracle), want / short, oracle)
+        oracle_price = oracle[-1]
+        if np.isnan(supply).all():
+            supply = np.sqrt(want * short)
+        elif np.isnan(supply).any():
+            raise ValueError("supply must be given on every tick or on none")
+
+        start = 0
+        if pos is None:
+            first_block = block[0]
+            pool = Pool(np.full(n_paths, want[0]), np.full(n_paths, short[0]), np.full(n_paths, supply[0]), want_fee, short_fee)
+            pos = Position.empty(n_paths)
+            pos.want += deposit
+            deploy(pos, pool, pos.want.copy(), oracle[0], params)
+            pos.reverted[:] = False
+
+        while start < len(block):
+            w, s, lp_supply, o = want[start:, None], short[start:, None], supply[start:, None], oracle[start:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                balance_lp = pos.lp * w * 2 / lp_supply
+                debt_ratio = pos.debt * w / s * BASIS_PRECISION * 2 / balance_lp
+                collat_ratio = pos.debt * o * BASIS_PRECISION / pos.lend
+            fires = (
+                (debt_ratio < params.debt_lower) | (debt_ratio > params.debt_upper)
+                | (collat_ratio <= params.collat_lower) | (collat_ratio >= params.collat_upper)
+            )
+            if params.do_price_check:
+                price_ratio = o * BASIS_PRECISION * s / w
+                diff = params.price_source_diff_keeper
+                fires &= (price_ratio > BASIS_PRECISION - diff) & (price_ratio < BASIS_PRECISION + diff)
+
+            rows = fires.any(axis=1)
+            scanned = rows.argmax() + 1 if rows.any() else len(rows)
+            with np.errstate(invalid="ignore"):
+                debt_range[:, 0] = np.fmin(debt_range[:, 0], np.nanmin(debt_ratio[:scanned], axis=0, initial=np.inf))
+                debt_range[:, 1] = np.fmax(debt_range[:, 1], np.nanmax(debt_ratio[:scanned], axis=0, initial=-np.inf))
+                collat_range[:, 0] = np.fmin(collat_range[:, 0], np.nanmin(collat_ratio[:scanned], axis=0, initial=np.inf))
+                collat_range[:, 1] = np.fmax(collat_range[:, 1], np.nanmax(collat_ratio[:scanned], axis=0, initial=-np.inf))
+            if record_every:
+                index = np.arange(ticks_seen + start, ticks_seen + start + scanned)
+                sampled = index % record_every == 0
+                if sampled.any():
+                    assets = pos.want + pos.lend + balance_lp + (pos.short - pos.debt) * w / s
+                    equity_blocks.extend(block[start:start + scanned][sampled])
+                    equity.extend(assets[:scanned][sampled])
+
+            if rows.any():
+                t = start + scanned - 1
+                _set_pool(pool, want[t], short[t], supply[t])
+                debt_done, collat_done, failed, slip = keeper_step(pos, pool, oracle[t], params)
+                debt_rebalances += debt_done
+                collat_rebalances += collat_done
+                reverted += failed
+                slippage += slip
+            start += scanned
+
+        ticks_seen += len(block)
+        last_block = block[-1]
+        _set_pool(pool, want[-1], short[-1], supply[-1])
+
+    if pos is None:
+        raise ValueError("no ticks to replay")
+    total_assets = estimated_total_assets(pos, pool)
+    return ReplayResult(
+        ticks_seen,
+        int(first_block),
+        int(last_block),
+        debt_rebalances,
+        collat_rebalances,
+        reverted,
+        slippage,
+        (debt_rebalances + collat_rebalances + reverted) * gas_per_call,
+        debt_range,
+        collat_range,
+        total_assets,
+        total_assets - deposit,
+        np.array(equity_blocks, dtype=int),
+        np.array(equity).reshape(-1, n_paths),
+        pos,
+        pool,
+    )
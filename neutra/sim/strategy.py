@@ -0,0 +1,508 @@
+"""
+Vectorised model of the `CoreStrategyAaveGrail` position maths.
+
+Each function mirrors the contract function of the same (snake cased) name
+and operates on arrays holding one value per simulated path. Amounts are in
+whole token units and prices are want per short, so the 1e18 / decimal
+scaling of the contract cancels out.
+
+Like the contract, the functions mutate the `Position` and `Pool` they are
+given. Operations that would revert on-chain (slippage limits, SafeMath
+underflows) set `Position.reverted` for the affected paths; `simulate`
+rolls those paths back to their state before the keeper call.
+"""
+from dataclasses import dataclass, field, fields, replace
+
+import numpy as np
+
+from .pool import Pool
+
+BASIS_PRECISION = 10_000
+
+
+@dataclass
+class StrategyParams:
+    """Strategy configuration, defaults match `CoreStrategyAaveGrail`."""
+
+    collat_upper: int = 7500
+    collat_target: int = 7000
+    collat_lower: int = 6500
+    collat_limit: int = 8100
+    debt_upper: int = 10390
+    debt_lower: int = 9610
+    rebalance_percent: int = 10000
+    incremental_debt_rebalance: bool = False
+    slippage_adj: int = 9900
+    price_source_diff_keeper: int = 500
+    price_source_diff_user: int = 200
+    do_price_check: bool = True
+    min_deploy: float = 0.0
+
+    @classmethod
+    def stack(cls, params):
+        """Params holding one value per path, from a list with one StrategyParams per path."""
+        if len({p.do_price_check for p in params}) > 1:
+            raise ValueError("do_price_check must be the same on every path")
+        values = {f.name: np.array([getattr(p, f.name) for p in params]) for f in fields(cls) if f.name != "do_price_check"}
+        return cls(**values, do_price_check=params[0].do_price_check)
+
+
+@dataclass
+class Position:
+    """Balances held by the strategy on every path."""
+
+    want: np.ndarray
+    short: np.ndarray
+    lend: np.ndarray
+    debt: np.ndarray
+    lp: np.ndarray
+    reverted: np.ndarray = None
+
+    def __post_init__(self):
+        if self.reverted is None:
+            self.reverted = np.zeros(self.want.shape, dtype=bool)
+
+    @classmethod
+    def empty(cls, n_paths):
+        return cls(*(np.zeros(n_paths) for _ in range(5)))
+
+    def copy(self):
+        return replace(
+            self,
+            want=self.want.copy(),
+            short=self.short.copy(),
+            lend=self.lend.copy(),
+            debt=self.debt.copy(),
+            lp=self.lp.copy(),
+            reverted=self.reverted.copy(),
+        )
+
+    def restore(self, other, mask):
+        """Reset the paths selected by `mask` to the state held in `other`."""
+        for name in ("want", "short", "lend", "debt", "lp", "reverted"):
+            np.copyto(getattr(self, name), getattr(other, name), where=mask)
+
+
+def _active(pos, mask):
+    if mask is None:
+        return np.ones(pos.want.shape, dtype=bool)
+    return np.asarray(mask, dtype=bool)
+
+
+def _revert_where(pos, condition, mask):
+    pos.reverted |= condition & mask
+
+
+# ---------------------------------------------------------------------------
+# Views
+# ---------------------------------------------------------------------------
+
+
+def get_lp_price(pool):
+    return pool.want / pool.short
+
+
+def convert_short_to_want_lp(pool, amount_short):
+    return amount_short * pool.want / pool.short
+
+
+def convert_want_to_short_lp(pool, amount_want):
+    return amount_want * pool.short / pool.want
+
+
+def balance_lp(pos, pool):
+    return pos.lp * pool.want * 2 / pool.supply
+
+
+def balance_debt(pos, pool):
+    return convert_short_to_want_lp(pool, pos.debt)
+
+
+def balance_debt_oracle(pos, oracle_price):
+    return pos.debt * oracle_price
+
+
+def balance_short_want_eq(pos, pool):
+    return convert_short_to_want_lp(pool, pos.short)
+
+
+def balance_deployed(pos, pool):
+    return pos.lend + balance_lp(pos, pool) + balance_short_want_eq(pos, pool) - balance_debt(pos, pool)
+
+
+def estimated_total_assets(pos, pool):
+    return pos.want + balance_deployed(pos, pool)
+
+
+def calc_debt_ratio(pos, pool):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return balance_debt(pos, pool) * BASIS_PRECISION * 2 / balance_lp(pos, pool)
+
+
+def calc_collateral(pos, oracle_price):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return balance_debt_oracle(pos, oracle_price) * BASIS_PRECISION / pos.lend
+
+
+def price_source_ok(pool, oracle_price, price_diff, params):
+    """`_testPriceSource`: True where oracle and LP prices agree within `price_diff`."""
+    if not params.do_price_check:
+        return np.ones(np.shape(pool.want), dtype=bool)
+    ratio = oracle_price * BASIS_PRECISION / get_lp_price(pool)
+    return (ratio > BASIS_PRECISION - price_diff) & (ratio < BASIS_PRECISION + price_diff)
+
+
+# ---------------------------------------------------------------------------
+# Money market and AMM primitives
+# ---------------------------------------------------------------------------
+
+
+def _lend_want(pos, amount):
+    pos.want -= amount
+    pos.lend += amount
+
+
+def _redeem_want(pos, amount, mask):
+    _revert_where(pos, amount > pos.lend, mask)
+    amount = np.minimum(amount, pos.lend)
+    pos.lend -= amount
+    pos.want += amount
+
+
+def _borrow(pos, amount):
+    pos.debt += amount
+    pos.short += amount
+
+
+def _repay_debt(pos, mask):
+    amount = np.where(mask, np.minimum(pos.short, pos.debt), 0.0)
+    pos.short -= amount
+    pos.debt -= amount
+
+
+def _add_to_lp(pos, pool, amount_short, params, mask):
+    amount_want = np.minimum(convert_short_to_want_lp(pool, amount_short), pos.want)
+    used_want, used_short, liquidity = pool.add_liquidity(amount_want, amount_short)
+    slippage = params.slippage_adj / BASIS_PRECISION
+    _revert_where(
+        pos, (used_short < amount_short * slippage) | (used_want < amount_want * slippage), mask
+    )
+    pos.want -= used_want
+    pos.short -= used_short
+    pos.lp += liquidity
+
+
+def _remove_lp(pos, pool, liquidity):
+    amount_want, amount_short = pool.remove_liquidity(liquidity)
+    pos.lp -= liquidity
+    pos.want += amount_want
+    pos.short += amount_short
+
+
+def _swap_exact_want_short(pos, pool, amount, params, mask):
+    """Returns the fees + slippage of the swap in want, valued at the reserves before it."""
+    short_price = convert_short_to_want_lp(pool, 1.0)
+    amount_out_min = convert_want_to_short_lp(pool, amount)
+    amount_out = pool.swap_want_for_short(amount)
+    _revert_where(pos, amount_out < amount_out_min * params.slippage_adj / BASIS_PRECISION, mask)
+    pos.want -= amount
+    pos.short += amount_out
+    return (amount_out_min - amount_out) * short_price
+
+
+def _swap_exact_short_want(pos, pool, amount_short, params, mask):
+    """Returns (want expected at the LP price, fees + slippage in want)."""
+    amount_want = convert_short_to_want_lp(pool, amount_short)
+    amount_out = pool.swap_short_for_want(amount_short)
+    _revert_where(pos, amount_out < amount_want * params.slippage_adj / BASIS_PRECISION, mask)
+    pos.short -= amount_short
+    pos.want += amount_out
+    return amount_want, amount_want - amount_out
+
+
+# ---------------------------------------------------------------------------
+# Strategy logic
+# ---------------------------------------------------------------------------
+
+
+def deploy(pos, pool, amount, oracle_price, params, mask=None):
+    """`_deploy`: lend collateral and farm borrowed short paired with want."""
+    mask = _active(pos, mask) & (amount >= params.min_deploy)
+    amount = np.where(mask, amount, 0.0)
+    lp_price = get_lp_price(pool)
+    cr = params.collat_target / BASIS_PRECISION
+    borrow = cr * amount / (cr * lp_price + oracle_price)
+    debt_allocation = borrow * lp_price
+
+    _lend_want(pos, amount - debt_allocation)
+    _borrow(pos, borrow)
+    _add_to_lp(pos, pool, borrow, params, mask)
+
+
+def calc_deployment(pos, pool, amount, oracle_price, params, mask=None):
+    """`_calcDeployment`: returns (lend needed, borrow) to deploy `amount` from lend.
+
+    B = (T*Cr - Cr*Plp*(2Si - Di) - Po*Di) / (Po + Cr*Plp)
+    """
+    mask = _active(pos, mask)
+    lp_price = get_lp_price(pool)
+    cr = params.collat_target / BASIS_PRECISION
+    si2 = pos.short * 2
+    di = pos.debt
+    numerator = cr * amount + cr * lp_price * (di - si2) - oracle_price * di
+    _revert_where(pos, numerator < 0, mask)
+    borrow = np.maximum(numerator, 0.0) / (oracle_price + cr * lp_price)
+    lend_needed = amount - (borrow + si2 - di) * lp_price
+    _revert_where(pos, lend_needed < 0, mask)
+    return np.maximum(lend_needed, 0.0), borrow
+
+
+def deploy_from_lend(pos, pool, amount, oracle_price, params, mask=None):
+    """`_deployFromLend`: redeploy `amount` assuming everything sits in lend."""
+    mask = _active(pos, mask)
+    lend_needed, borrow = calc_deployment(pos, pool, amount, oracle_price, params, mask)
+    redeem = pos.lend - lend_needed
+    _revert_where(pos, redeem < 0, mask)
+    _redeem_want(pos, np.where(mask, np.maximum(redeem, 0.0), 0.0), mask)
+    _borrow(pos, np.where(mask, borrow, 0.0))
+    _add_to_lp(pos, pool, np.where(mask, pos.short, 0.0), params, mask)
+
+
+def liquidate_all_to_lend(pos, pool, mask=None):
+    """`liquidateAllToLend`: remove all LP and lend the freed want."""
+    mask = _active(pos, mask)
+    _remove_lp(pos, pool, np.where(mask, pos.lp, 0.0))
+    _lend_want(pos, np.where(mask, pos.want, 0.0))
+
+
+def rebalance_debt(pos, pool, oracle_price, params, mask=None):
+    """`rebalanceDebt` after its checks: returns (swap amount in want, slippage in want).
+
+    Runs `rebalance_debt_incremental` on the paths with
+    `incremental_debt_rebalance` set and `_rebalanceDebtInternal` on the others.
+    """
+    mask = _active(pos, mask)
+    incremental = mask & np.asarray(params.incremental_debt_rebalance, dtype=bool)
+    full = mask & ~incremental
+    swap_amount, slippage = np.zeros(pos.want.shape), np.zeros(pos.want.shape)
+    if incremental.any():
+        swap_amount, slippage = rebalance_debt_incremental(pos, pool, oracle_price, params, incremental)
+    if full.any():
+        full_swap, full_slippage = _rebalance_debt_full(pos, pool, oracle_price, params, full)
+        swap_amount, slippage = swap_amount + full_swap, slippage + full_slippage
+    return swap_amount, slippage
+
+
+def _rebalance_debt_full(pos, pool, oracle_price, params, mask):
+    """`_rebalanceDebtInternal`: unwinds to lend and redeploys everything."""
+    rebalance = params.rebalance_percent / BASIS_PRECISION
+    liquidate_all_to_lend(pos, pool, mask)
+
+    excess_debt = pos.debt > pos.short
+    repay_mask = mask & excess_debt
+    swap_want = np.where(
+        repay_mask, convert_short_to_want_lp(pool, pos.debt - pos.short) * rebalance, 0.0
+    )
+    _redeem_want(pos, swap_want, repay_mask)
+    slippage_debt = _swap_exact_want_short(pos, pool, swap_want, params, repay_mask)
+
+    sell_mask = mask & ~excess_debt
+    excess_short = np.where(sell_mask, (pos.short - pos.debt) * rebalance, 0.0)
+    want_out, slippage_short = _swap_exact_short_want(pos, pool, excess_short, params, sell_mask)
+
+    _repay_debt(pos, mask)
+    deploy_from_lend(pos, pool, estimated_total_assets(pos, pool), oracle_price, params, mask)
+
+    swap_amount = np.where(excess_debt, swap_want, want_out)
+    slippage = np.where(excess_debt, slippage_debt, slippage_short)
+    return np.where(mask, swap_amount, 0.0), np.where(mask, slippage, 0.0)
+
+
+def rebalance_debt_incremental(pos, pool, oracle_price, params, mask=None):
+    """`_rebalanceDebtIncremental`: repays or borrows the drift, the LP stays.
+
+    Returns (swap amount in want, slippage in want).
+    """
+    mask = _active(pos, mask)
+    rebalance = params.rebalance_percent / BASIS_PRECISION
+    _repay_debt(pos, mask)
+    short_in_lp = pos.lp * pool.short / pool.supply
+    excess_debt = pos.debt > short_in_lp
+
+    repay_mask = mask & excess_debt
+    swap_want = np.where(repay_mask, convert_short_to_want_lp(pool, pos.debt - short_in_lp) * rebalance, 0.0)
+    _redeem_want(pos, swap_want, repay_mask)
+    slippage_debt = _swap_exact_want_short(pos, pool, swap_want, params, repay_mask)
+    _repay_debt(pos, repay_mask)
+
+    borrow_mask = mask & ~excess_debt
+    borrow = np.where(borrow_mask, (short_in_lp - pos.debt) * rebalance, 0.0)
+    want_before = pos.want.copy()
+    _borrow(pos, borrow)
+    want_out, slippage_short = _swap_exact_short_want(pos, pool, borrow, params, borrow_mask)
+    _lend_want(pos, np.where(borrow_mask, pos.want - want_before, 0.0))
+
+    swap_amount = np.where(excess_debt, swap_want, want_out)
+    slippage = np.where(excess_debt, slippage_debt, slippage_short)
+    return np.where(mask, swap_amount, 0.0), np.where(mask, slippage, 0.0)
+
+
+def _withdraw_lp_rebalance_collateral(pos, pool, amount, mask):
+    lp_req = np.where(mask, amount * pos.lp / balance_lp(pos, pool), 0.0)
+    _remove_lp(pos, pool, np.minimum(lp_req, pos.lp))
+    _lend_want(pos, np.minimum(amount / 2, pos.want))
+    _repay_debt(pos, mask)
+
+
+def rebalance_collateral(pos, pool, oracle_price, params, mask=None):
+    """`_rebalanceCollateralInternal`: returns the adjustment amount in want."""
+    mask = _active(pos, mask)
+    collat_ratio = calc_collateral(pos, oracle_price)
+    short_pos = balance_debt(pos, pool)
+    lend_pos = pos.lend
+    cr = params.collat_target / BASIS_PRECISION
+
+    over = mask & (collat_ratio > params.collat_target)
+    adj_over = (short_pos - lend_pos * cr) / (1 + cr)
+    _revert_where(pos, adj_over < 0, over)
+    adj_over = np.where(over, np.maximum(adj_over, 0.0), 0.0)
+    _withdraw_lp_rebalance_collateral(pos, pool, adj_over * 2, over)
+
+    under = mask & (collat_ratio < params.collat_target)
+    adj_under = (lend_pos * cr - short_pos) / (1 + cr)
+    _revert_where(pos, adj_under < 0, under)
+    adj_under = np.where(under, np.maximum(adj_under, 0.0), 0.0)
+    borrow = convert_want_to_short_lp(pool, adj_under)
+    _borrow(pos, borrow)
+    _redeem_want(pos, adj_under, under)
+    _add_to_lp(pos, pool, borrow, params, under)
+
+    return adj_over + adj_under
+
+
+# ---------------------------------------------------------------------------
+# Path simulation
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SimulationResult:
+    """Per step (paths x steps) ratios and assets, per path keeper counters."""
+
+    debt_ratio: np.ndarray
+    collat_ratio: np.ndarray
+    total_assets: np.ndarray
+    debt_rebalances: np.ndarray
+    collat_rebalances: np.ndarray
+    reverted: np.ndarray
+    slippage: np.ndarray
+    position: Position = field(repr=False)
+    pool: Pool = field(repr=False)
+
+
+def _keeper_call(pos, pool, mask, action):
+    before_pos, before_pool = pos.copy(), pool.copy()
+    result = action(mask)
+    failed = pos.reverted.copy()
+    pos.restore(before_pos, failed)
+    pool.restore(before_pool, failed)
+    pos.reverted[:] = False
+    return result, mask & ~failed, failed
+
+
+def keeper_step(pos, pool, oracle_price, params):
+    """
+    One keeper pass at the current prices: `rebalanceDebt` on the paths whose
+    debt ratio is out of band, then `rebalanceCollateral` on the paths whose
+    collateral ratio is. Calls that revert are rolled back.
+
+    Returns:
+        (debt rebalanced, collateral rebalanced, reverted calls, slippage in want), per path
+    """
+    n_paths = pos.want.shape
+    debt_done = np.zeros(n_paths, dtype=bool)
+    collat_done = np.zeros(n_paths, dtype=bool)
+    reverted = np.zeros(n_paths, dtype=int)
+    slippage = np.zeros(n_paths)
+
+    ratio = calc_debt_ratio(pos, pool)
+    price_ok = price_source_ok(pool, oracle_price, params.price_source_diff_keeper, params)
+    mask = price_ok & ((ratio < params.debt_lower) | (ratio > params.debt_upper))
+    if mask.any():
+        (_, slip), debt_done, failed = _keeper_call(
+            pos, pool, mask, lambda m: rebalance_debt(pos, pool, oracle_price, params, m)
+        )
+        reverted += failed
+        slippage += np.where(debt_done, slip, 0.0)
+
+    # the debt rebalance swaps on the pair, each call checks the prices it sees
+    ratio = calc_collateral(pos, oracle_price)
+    price_ok = price_source_ok(pool, oracle_price, params.price_source_diff_keeper, params)
+    mask = price_ok & ((ratio <= params.collat_lower) | (ratio >= params.collat_upper))
+    if mask.any():
+        _, collat_done, failed = _keeper_call(
+            pos, pool, mask, lambda m: rebalance_collateral(pos, pool, oracle_price, params, m)
+        )
+        reverted += failed
+
+    return debt_done, collat_done, reverted, slippage
+
+
+def simulate(prices, deposit, want_reserve, oracle_prices=None, params=None, want_fee=300, short_fee=300):
+    """
+    Deploys `deposit` want at the first price and runs the keeper
+    (`rebalanceDebt` then `rebalanceCollateral`) after every price step.
+
+    Args:
+        prices: (paths, steps) pair prices in want per short.
+        deposit: want deployed on every path.
+        want_reserve: want side reserve of the pair at the first price.
+        oracle_prices: Aave oracle prices, defaults to `prices`.
+        params: StrategyParams, defaults to the contract defaults.
+
+    Returns:
+        SimulationResult
+    """
+    params = params or StrategyParams()
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    oracle_prices = prices if oracle_prices is None else np.atleast_2d(np.asarray(oracle_prices, dtype=float))
+    n_paths, n_steps = prices.shape
+
+    pool = Pool.from_price(prices[:, 0], want_reserve, want_fee, short_fee)
+    pos = Position.empty(n_paths)
+    pos.want += deposit
+    deploy(pos, pool, pos.want.copy(), oracle_prices[:, 0], params)
+    pos.reverted[:] = False
+
+    debt_ratio = np.empty((n_paths, n_steps))
+    collat_ratio = np.empty((n_paths, n_steps))
+    total_assets = np.empty((n_paths, n_steps))
+    debt_rebalances = np.zeros(n_paths, dtype=int)
+    collat_rebalances = np.zeros(n_paths, dtype=int)
+    reverted = np.zeros(n_paths, dtype=int)
+    slippage = np.zeros(n_paths)
+
+    for t in range(n_steps):
+        pool.move_to(prices[:, t])
+        oracle = oracle_prices[:, t]
+        debt_done, collat_done, failed, slip = keeper_step(pos, pool, oracle, params)
+        debt_rebalances += debt_done
+        collat_rebalances += collat_done
+        reverted += failed
+        slippage += slip
+
+        debt_ratio[:, t] = calc_debt_ratio(pos, pool)
+        collat_ratio[:, t] = calc_collateral(pos, oracle)
+        total_assets[:, t] = estimated_total_assets(pos, pool)
+
+    return SimulationResult(
+        debt_ratio,
+        collat_ratio,
+        total_assets,
+        debt_rebalances,
+        collat_rebalances,
+        reverted,
+        slippage,
+        pos,
+        pool,
+    )
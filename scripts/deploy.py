@@ -1,9 +1,14 @@
+import os
 from pathlib import Path
 
+import brownie
 from brownie import accounts, config, network, project, web3, StrategyInsurance
 from eth_utils import is_checksum_address
+from neutra.deploy import DROPPED, MINED, PENDING, REVERTED, Deployment, Manifest, grail_steps
 from tests.helper import encode_function_data
+from web3.exceptions import TransactionNotFound
 import click
+import yaml
 
 API_VERSION = config["dependencies"][0].split("@")[-1]
 Vault = project.load(
@@ -34,6 +39,62 @@ def get_address(msg: str, default: str = None) -> str:
         val = click.prompt(msg)
 
 
+class BrownieBackend:
+    """Sends deployment steps from `account` without waiting for them."""
+
+    def __init__(self, account):
+        self.account = account
+        self.sender = account.address
+
+    def nonce(self, pending=True):
+        return web3.eth.get_transaction_count(self.sender, "pending" if pending else "latest")
+
+    def send(self, step, target, args, nonce):
+        container = Vault if step.contract == "Vault" else getattr(brownie, step.contract)
+        tx = {"from": self.account, "nonce": nonce, "required_confs": 0}
+        if step.deploys:
+            return container.deploy(*args, tx).txid
+        return getattr(container.at(target), step.method)(*args, tx).txid
+
+    def status(self, tx_hash):
+        try:
+            receipt = web3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            try:
+                web3.eth.get_transaction(tx_hash)
+                return PENDING
+            except TransactionNotFound:
+                return DROPPED
+        return MINED if receipt.status == 1 else REVERTED
+
+
+def deploy_from_config(config_path, manifest_path=None):
+    """
+    Non-interactive deployment described by a config file, e.g.
+
+        brownie run deploy deploy_from_config deployments/usdc-weth-grail.yml --network arbitrum-main
+
+    Progress is recorded in `deployments/<config>.<network>.json`; run the
+    same command again to resume an interrupted deployment.
+    """
+    config_path = Path(config_path)
+    deploy_config = yaml.safe_load(config_path.read_text())
+    if "DEPLOYER_PRIVATE_KEY" in os.environ:
+        dev = accounts.add(os.environ["DEPLOYER_PRIVATE_KEY"])
+    else:
+        dev = accounts.load(deploy_config["deployer"], password=os.environ.get("DEPLOYER_PASSWORD"))
+    if manifest_path is None:
+        manifest_path = config_path.with_name(f"{config_path.stem}.{network.show_active()}.json")
+    print(f"Deploying {config_path} from {dev.address} on '{network.show_active()}', manifest {manifest_path}")
+
+    manifest = Manifest.load(manifest_path, network.show_active())
+    addresses = Deployment(grail_steps(deploy_config, dev.address), manifest, BrownieBackend(dev)).run()
+    for name, address in addresses.items():
+        if address is not None:
+            print(f"{name:>30}: {address}")
+    return addresses
+
+
 def main():
     print(f"You are using the '{network.show_active()}' network")
     dev = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
@@ -0,0 +1,35 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--gas",
+        action="store_true",
+        help="Run the gas benchmarks in tests/grail/test_gas.py against the stored baseline",
+    )
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="Store the gas measured by tests/grail/test_gas.py as the new baseline",
+    )
+    parser.addoption(
+        "--gas-tolerance",
+        type=float,
+        default=0.02,
+        help="Fraction above its baseline a gas benchmark may use before failing",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "gas: gas benchmark, only run with --gas or --update-gas-baseline")
+
+
+# The benchmarks need a baseline recorded on the same network, so they are
+# opt-in and a plain `brownie test` skips them.
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("gas") or config.getoption("update_gas_baseline"):
+        return
+    skip = pytest.mark.skip(reason="gas benchmark, run with --gas")
+    for item in items:
+        if item.get_closest_marker("gas"):
+            item.add_marker(skip)
@@ -0,0 +1,75 @@
+import json
+import os
+
+
+class GasBaseline:
+    """Gas used by the benchmarks, checked against the values stored in a JSON file.
+
+    The file maps each network to the gas used by every benchmark on it, as
+    forks and the local mocks cost different amounts of gas. A benchmark without
+    a stored value fails like a regression, so a clean checkout cannot pass by
+    recording its own numbers. With `update` set nothing is checked and the
+    results are written to the file when the session ends.
+
+    Args:
+        path (str):
+        The JSON file holding the baseline.
+
+        network (str):
+        The network the benchmarks run on.
+
+        tolerance (float):
+        How far above its baseline a benchmark may go, as a fraction.
+
+        update (bool, optional):
+        Store the results instead of checking against the baseline.
+        Defaults to False.
+    """
+
+    def __init__(self, path, network, tolerance, update=False):
+        self._path = path
+        self._network = network
+        self.tolerance = tolerance
+        self._update = update
+        self._baseline = self._load().get(network, {})
+        self.results = {}
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return {}
+        with open(self._path) as fp:
+            return json.load(fp)
+
+    def check(self, name, gas_used):
+        """Records the gas used by benchmark `name`.
+
+        Returns:
+            [str]: Why the benchmark failed, None if it is within the tolerance.
+        """
+        self.results[name] = gas_used
+        if self._update:
+            return None
+        baseline = self._baseline.get(name)
+        if baseline is None:
+            return (
+                f"{name} used {gas_used} gas and has no baseline on {self._network}, "
+                f"store one with --update-gas-baseline"
+            )
+        if gas_used <= baseline * (1 + self.tolerance):
+            return None
+        return (
+            f"{name} used {gas_used} gas, {gas_used / baseline - 1:.2%} over its baseline "
+            f"of {baseline} (tolerance {self.tolerance:.2%})"
+        )
+
+    def save(self):
+        """Writes the recorded results into the baseline file when updating."""
+        if not self._update or not self.results:
+            return
+        data = self._load()
+        stored = data.setdefault(self._network, {})
+        stored.update(self.results)
+        data[self._network] = dict(sorted(stored.items()))
+        with open(self._path, "w") as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+            fp.write("\n")
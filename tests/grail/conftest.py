@@ -1,8 +1,14 @@
+import os
 import pytest
-from brownie import config
+from types import SimpleNamespace
+from brownie import config, network
+from brownie._config import CONFIG
 from brownie import Contract
-from brownie import interface, StrategyInsurance, GrailManager, GrailManagerProxy, USDCWETHGRAIL ,accounts
-from tests.helper import encode_function_data
+from brownie import interface, StrategyInsurance, StrategyLens, GrailManager, GrailManagerProxy, USDCWETHGRAIL, MockGrailStrategy, MockAaveOracle ,accounts
+from tests.helper import encode_function_data, advance_chain, find_wall_clock_sleeps, pin_fork_block
+from tests.gas import GasBaseline
+from tests.local_stack import deploy_local_stack
+from tests.snapshots import ChainSnapshots, deepest_layer, layer_path
 
 DQUICK_PRICE = 159.41
 FTM_PRICE = 1.57
@@ -16,6 +22,14 @@ GRAIL = '0x3d9907F9a368ad0a51Be60f7Da3b97cf940982D8'
 GRAIL_PRICE = 3000
 SUSHI_FARM = '0xF4d73326C13a4Fc5FD7A064217e12780e9Bd62c3'
 
+# Every Arbitrum fork starts from this block, so parallel workers and repeated
+# runs all test against the same state. Override with FORK_BLOCK.
+ARBITRUM_CHAIN_ID = 42161
+FORK_BLOCK = int(os.environ.get('FORK_BLOCK', 70_000_000))
+
+# Gas used by the benchmarks in test_gas.py, per network
+GAS_BASELINE = os.path.join(os.path.dirname(__file__), 'gas_baseline.json')
+
 ORACLE = '0xb56c2F0B653B2e0b10C9b928C8580Ac5Df02C7C7'
 
 POOL_ADDRESS_PROVIDER = '0xa97684ead0e402dC232d5A977953DF7ECBaB3CDb'
@@ -26,6 +40,8 @@ WETH_WHALE = '0x489ee077994B6658eAfA855C308275EAd8097C4A'
 SUSHI = '0xd4d42F0b6DEF4CE0383636770eF773390d85c61A'
 
 GRAIL_ROUTER = '0xc873fEcbd354f5A56E00E710B90EF4201db2448d'
+GRAIL_YIELD_BOOSTER = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
+XGRAIL = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
 
 SUSHISWAP_ROUTER = '0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506'
 CONFIG = {
@@ -57,58 +73,287 @@ CONFIG = {
         'lp_farm': '0x6BC938abA940fB828D39Daa23A94dfc522120C11',
         'pid': 0,
         'router': GRAIL_ROUTER,
+        'xGrail': XGRAIL,
+        'yieldBooster': GRAIL_YIELD_BOOSTER,
+        'pool_address_provider': POOL_ADDRESS_PROVIDER,
     },
 
 }
 
+
+# Deployment states the tests start from. Each layer is deployed once, then
+# snapshotted and restored for every test that needs it.
+SNAPSHOT_LAYERS = {
+    'stack': None,
+    'funded': 'stack',
+    'strategy': 'funded',
+    'deployed_vault': 'strategy',
+    'deployed_vault_large_deposit': 'strategy',
+    'mock_oracle': 'funded',
+    'strategy_mock_initialized_vault': 'mock_oracle',
+}
+
+# Fixtures whose value is read from a snapshot layer
+FIXTURE_LAYERS = {
+    'amount': 'funded',
+    'vault': 'strategy',
+    'strategy_before_set': 'strategy',
+    'grailManager': 'strategy',
+    'strategy': 'strategy',
+    'deployed_vault': 'deployed_vault',
+    'large_amount': 'deployed_vault_large_deposit',
+    'deployed_vault_large_deposit': 'deployed_vault_large_deposit',
+    'vault_mock_oracle': 'mock_oracle',
+    'strategy_mock_oracle_before_set': 'mock_oracle',
+    'grailManager_mock_oracle': 'mock_oracle',
+    'strategy_mock_oracle': 'mock_oracle',
+    'strategy_mock_initialized_vault': 'strategy_mock_initialized_vault',
+}
+
+
+def snapshot_layer(fixturenames):
+    return deepest_layer(SNAPSHOT_LAYERS, ['stack'] + [FIXTURE_LAYERS[f] for f in fixturenames if f in FIXTURE_LAYERS])
+
+
+def pytest_collection_modifyitems(items):
+    # Run the tests of a module that share a snapshot back to back, restoring a
+    # layer from another branch discards the current one and it gets rebuilt
+    modules = {}
+    def key(item):
+        try:
+            path = layer_path(SNAPSHOT_LAYERS, snapshot_layer(getattr(item, 'fixturenames', ())))
+        except ValueError:
+            path = []
+        return (modules.setdefault(item.nodeid.split("::")[0], len(modules)), path)
+    items.sort(key=key)
+
+
+def strategy_deployer(strategist, local_stack):
+    def deploy(vault):
+        if local_stack is not None:
+            return strategist.deploy(MockGrailStrategy, vault, local_stack.strategy_config)
+        return strategist.deploy(USDCWETHGRAIL, vault)
+    return deploy
+
+
+def grail_manager_deployer(gov, conf):
+    def deploy(strategy, deployer=gov):
+        grailManager = deployer.deploy(GrailManager)
+
+        # grailManager.initialize(gov, strategy, grailConfig, {'from': gov})
+        grailConfig = [strategy.want(), conf['lp_token'], conf['harvest_token'], conf['xGrail'], conf['lp_farm'], conf['router'], conf['yieldBooster']]
+
+        encoded_initializer_function = encode_function_data(grailManager.initialize, gov, strategy, grailConfig)
+
+        return deployer.deploy(GrailManagerProxy, grailManager.address, encoded_initializer_function)
+    return deploy
+
+
+# Runs in every xdist worker before it launches its node, brownie already moves
+# each worker's node to its own port.
+def pytest_configure(config):
+    pin_fork_block(CONFIG.networks, FORK_BLOCK, ARBITRUM_CHAIN_ID)
+
+
+# Without a fork (e.g. `brownie test --network development`) the suite runs
+# against the mock protocols deployed by tests/local_stack.py.
+@pytest.fixture(scope="session")
+def local_mode():
+    yield not network.show_active().endswith("fork")
+
+@pytest.fixture(scope="session")
+def snapshots(chain, pm, local_mode, strategy_contract, gov, user, rewards, guardian, management, strategist, keeper, RELATIVE_APPROX):
+    layers = ChainSnapshots(chain, SNAPSHOT_LAYERS)
+    Vault = pm(config["dependencies"][0]).Vault
+
+    def deploy_vault(token):
+        vault = guardian.deploy(Vault)
+        vault.initialize(token, gov, rewards, "", "", guardian, management)
+        vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+        assert vault.token() == token.address
+        return vault
+
+    def deploy_strategy(state, vault):
+        strategy = strategy_deployer(strategist, state.local_stack)(vault)
+        insurance = strategist.deploy(StrategyInsurance, strategy)
+        strategy.setKeeper(keeper)
+        strategy.setInsurance(insurance, {'from': gov})
+        vault.addStrategy(strategy, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        grailManager = grail_manager_deployer(gov, state.conf)(strategy)
+        strategy.setGrailManager(grailManager, {'from': gov})
+        return strategy, grailManager
+
+    def deposit_and_harvest(token, vault, strategy, amount):
+        token.approve(vault.address, amount, {"from": user})
+        vault.deposit(amount, {"from": user})
+        assert token.balanceOf(vault.address) == amount
+
+        # harvest
+        advance_chain(chain)
+        strategy.harvest()
+        assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
+
+    @layers.builder('stack')
+    def build_stack(_):
+        if local_mode:
+            local_stack = deploy_local_stack(accounts[6])
+            return SimpleNamespace(local_stack=local_stack, conf=local_stack.conf)
+        return SimpleNamespace(local_stack=None, conf=CONFIG[strategy_contract._name])
+
+    @layers.builder('funded')
+    def build_funded(state):
+        conf = state.conf
+        token = interface.IERC20Extended(conf['token'])
+        amount = 10_000 * 10 ** token.decimals()
+        amount = min(amount, int(0.5*token.balanceOf(conf['whale'])))
+        amount = min(amount, int(0.005*token.balanceOf(conf['lp_token'])))
+
+        # In order to get some funds for the token you are about to use,
+        # it impersonate an exchange address to use it's funds.
+        reserve = accounts.at(conf['whale'], force=True)
+        token.transfer(user, amount, {"from": reserve})
+        return SimpleNamespace(**vars(state), token=token, amount=amount)
+
+    @layers.builder('strategy')
+    def build_strategy(state):
+        vault = deploy_vault(state.token)
+        vault.setManagement(management, {"from": gov})
+        strategy, grailManager = deploy_strategy(state, vault)
+        return SimpleNamespace(**vars(state), vault=vault, strategy=strategy, grailManager=grailManager)
+
+    @layers.builder('deployed_vault')
+    def build_deployed_vault(state):
+        deposit_and_harvest(state.token, state.vault, state.strategy, state.amount)
+        return state
+
+    @layers.builder('deployed_vault_large_deposit')
+    def build_deployed_vault_large_deposit(state):
+        conf, token = state.conf, state.token
+        large_amount = 10_000_000 * 10 ** token.decimals()
+        # In order to get some funds for the token you are about to use,
+        # it impersonate an exchange address to use it's funds.
+        reserve = accounts.at(conf['whale'], force=True)
+
+        large_amount = min(large_amount, int(0.5*token.balanceOf(reserve)))
+        large_amount = min(large_amount, int(0.2*token.balanceOf(conf['lp_token'])))
+        token.transfer(user, large_amount, {"from": reserve})
+        deposit_and_harvest(token, state.vault, state.strategy, large_amount)
+        return SimpleNamespace(**vars(state), large_amount=large_amount)
+
+    @layers.builder('mock_oracle')
+    def build_mock_oracle(state):
+        pool_address_provider = interface.IPoolAddressesProvider(state.conf['pool_address_provider'])
+        old_oracle = pool_address_provider.getPriceOracle()
+        # Set the mock price oracle
+        oracle = MockAaveOracle.deploy(old_oracle, {'from': accounts[0]})
+
+        admin = accounts.at(pool_address_provider.owner(), True)
+        pool_address_provider.setPriceOracle(oracle, {'from': admin})
+
+        vault = deploy_vault(state.token)
+        strategy, grailManager = deploy_strategy(state, vault)
+        return SimpleNamespace(**vars(state), vault_mock_oracle=vault, strategy_mock_oracle=strategy, grailManager_mock_oracle=grailManager)
+
+    @layers.builder('strategy_mock_initialized_vault')
+    def build_strategy_mock_initialized_vault(state):
+        deposit_and_harvest(state.token, state.vault_mock_oracle, state.strategy_mock_oracle, state.amount)
+        return state
+
+    yield layers
+
+# brownie's module_isolation resets the chain before and after every module,
+# serially and under xdist, which discards the snapshots. Each module builds
+# the layers it uses again.
+@pytest.fixture(scope="module", autouse=True)
+def module_snapshots(module_isolation, snapshots):
+    snapshots.clear()
+    yield
+
+# Restores the deepest snapshot the test's fixtures need, so every test starts
+# from a freshly deployed state without redeploying it.
+@pytest.fixture(autouse=True)
+def isolation(request, snapshots):
+    snapshots.restore(snapshot_layer(request.fixturenames))
+
+# Chain time is advanced with advance_chain, sleeping on the wall clock only
+# slows the suite down.
+@pytest.fixture(scope="module", autouse=True)
+def no_wall_clock_sleep(request):
+    lines = find_wall_clock_sleeps(request.module.__file__)
+    if lines:
+        pytest.fail(f"{request.module.__name__} calls time.sleep on line(s) {lines}, use advance_chain instead", pytrace=False)
+
+@pytest.fixture(scope="session")
+def gas_baseline(request):
+    baseline = GasBaseline(
+        GAS_BASELINE,
+        network.show_active(),
+        request.config.getoption('gas_tolerance'),
+        request.config.getoption('update_gas_baseline'),
+    )
+    yield baseline
+    baseline.save()
+
 @pytest.fixture
+def local_stack(snapshots):
+    yield snapshots.value('stack').local_stack
+
+@pytest.fixture(scope="session")
 def grail_manager_contract():
     yield  GrailManager
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def grail_manager_proxy_contract():
     yield GrailManagerProxy
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strategy_contract():
     yield  USDCWETHGRAIL
 
 
 @pytest.fixture
-def conf(strategy_contract):
-    yield CONFIG[strategy_contract._name]
+def conf(snapshots):
+    yield snapshots.value('stack').conf
+
+@pytest.fixture
+def deploy_strategy(strategist, local_stack):
+    yield strategy_deployer(strategist, local_stack)
 
 @pytest.fixture
+def deploy_grail_manager(gov, conf):
+    yield grail_manager_deployer(gov, conf)
+
+@pytest.fixture(scope="session")
 def gov(accounts):
     #yield accounts.at("0x7601630eC802952ba1ED2B6e4db16F699A0a5A87", force=True)
     yield accounts[1]
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def user(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rewards(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def management(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strategist(accounts):
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def keeper(accounts):
     yield accounts[5]
 
@@ -136,28 +381,12 @@ def shortWhale(token, conf ,Contract, accounts) :
 
 
 @pytest.fixture
-def amount(accounts, token, user, conf, whale):
-    amount = 10_000 * 10 ** token.decimals()
-    amount = min(amount, int(0.5*token.balanceOf(whale)))
-    amount = min(amount, int(0.005*token.balanceOf(conf['lp_token'])))
-
-    # In order to get some funds for the token you are about to use,
-    # it impersonate an exchange address to use it's funds.
-    reserve = accounts.at(whale, force=True)
-    token.transfer(user, amount, {"from": reserve})
-    yield amount
+def amount(snapshots):
+    yield snapshots.value('funded').amount
 
 @pytest.fixture
-def large_amount(accounts, token, user, conf, whale):
-    amount = 10_000_000 * 10 ** token.decimals()
-    # In order to get some funds for the token you are about to use,
-    # it impersonate an exchange address to use it's funds.
-    reserve = accounts.at(whale, force=True)
-
-    amount = min(amount, int(0.5*token.balanceOf(reserve)))
-    amount = min(amount, int(0.2*token.balanceOf(conf['lp_token'])))
-    token.transfer(user, amount, {"from": reserve})
-    yield amount
+def large_amount(snapshots):
+    yield snapshots.value('deployed_vault_large_deposit').large_amount
 
 
 @pytest.fixture
@@ -174,53 +403,28 @@ def weth_amout(user, weth):
 
 
 @pytest.fixture
-def vault(pm, gov, rewards, guardian, management, token):
-    Vault = pm(config["dependencies"][0]).Vault
-    vault = guardian.deploy(Vault)
-    vault.initialize(token, gov, rewards, "", "", guardian, management)
-    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
-    vault.setManagement(management, {"from": gov})
-    assert vault.token() == token.address
-    yield vault
+def vault(snapshots):
+    yield snapshots.value('strategy').vault
 
 @pytest.fixture
-def vault_mock_oracle(pm, gov, rewards, guardian, management, token):
-    Vault = pm(config["dependencies"][0]).Vault
-    vault = guardian.deploy(Vault)
-    vault.initialize(token, gov, rewards, "", "", guardian, management)
-    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
-    assert vault.token() == token.address
-    yield vault
+def vault_mock_oracle(snapshots):
+    yield snapshots.value('mock_oracle').vault_mock_oracle
 
 @pytest.fixture
-def strategy_before_set(strategist, keeper, vault, strategy_contract, gov, conf):
-    # strategy = strategy_contract.deploy(vault, {'from': strategist,'gas_limit': 20000000})
-    strategy = strategist.deploy(strategy_contract, vault)
-    insurance = strategist.deploy(StrategyInsurance, strategy)
-    strategy.setKeeper(keeper)
-    strategy.setInsurance(insurance, {'from': gov})
-    vault.addStrategy(strategy, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
-    yield strategy
+def strategy_before_set(snapshots):
+    yield snapshots.value('strategy').strategy
 
 @pytest.fixture
-def grailManager(grail_manager_proxy_contract, strategy_before_set, grail_manager_contract, gov, conf) : 
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    
-    grailManager = gov.deploy(grail_manager_contract)
-
-    # grailManager.initialize(gov, strategy, grailConfig, {'from': gov})
-    grailConfig = [strategy_before_set.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
+def grailManager(snapshots) : 
+    yield snapshots.value('strategy').grailManager
 
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, strategy_before_set, grailConfig)
-    
-    grailManagerProxy = gov.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
-    yield grailManagerProxy
+@pytest.fixture
+def strategy(snapshots):
+    yield snapshots.value('strategy').strategy
 
 @pytest.fixture
-def strategy(strategy_before_set, grailManager, gov):
-    strategy_before_set.setGrailManager(grailManager, {'from': gov})
-    yield strategy_before_set
+def lens(strategist):
+    yield strategist.deploy(StrategyLens)
 
 @pytest.fixture(scope="session")
 def RELATIVE_APPROX():
@@ -251,104 +455,26 @@ def lp_price(token, lp_token):
     yield (token.balanceOf(lp_token) * 2) / lp_token.totalSupply()  
 
 @pytest.fixture
-def deployed_vault(chain, accounts, gov, token, vault, strategy, user, strategist, amount, RELATIVE_APPROX):
-    # Deposit to the vault
-    token.approve(vault.address, amount, {"from": user})
-    print("Amount: ", amount)
-    print("User: ", user)
-    vault.deposit(amount, {"from": user})
-    assert token.balanceOf(vault.address) == amount
-    
-    # harvest
-    chain.sleep(1)
-    
-    print("Vault: ",token.balanceOf(vault.address))
-    print("Strategy: ",token.balanceOf(strategy.address))
-    strategy.harvest()
-    strat = strategy
-    assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
-    yield vault 
+def deployed_vault(snapshots):
+    yield snapshots.value('deployed_vault').vault
 
 @pytest.fixture
-def deployed_vault_large_deposit(chain, accounts, gov, token, vault, strategy, user, strategist, large_amount, RELATIVE_APPROX):
-    # Deposit to the vault
-    token.approve(vault.address, large_amount, {"from": user})
-    vault.deposit(large_amount, {"from": user})
-    assert token.balanceOf(vault.address) == large_amount
-    
-    # harvest
-    chain.sleep(1)
-    #strategy.approveContracts({'from':gov})
-    strategy.harvest()
-    strat = strategy
-    assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == large_amount
-    yield vault  
+def deployed_vault_large_deposit(snapshots):
+    yield snapshots.value('deployed_vault_large_deposit').vault
 
 
 @pytest.fixture
-def strategy_mock_initialized_vault(chain, accounts, gov, token, vault_mock_oracle, strategy_mock_oracle, user, strategist, amount, RELATIVE_APPROX):
-    # Deposit to the vault
-    token.approve(vault_mock_oracle.address, amount, {"from": user})
-    print("Amount: ", amount)
-    print("User: ", user)
-    vault_mock_oracle.deposit(amount, {"from": user})
-    assert token.balanceOf(vault_mock_oracle.address) == amount
-    
-    # harvest
-    chain.sleep(1)
-    
-    print("Vault: ",token.balanceOf(vault_mock_oracle.address))
-    print("Strategy: ",token.balanceOf(strategy_mock_oracle.address))
-    strategy_mock_oracle.harvest()
-    strat = strategy_mock_oracle
-    assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
-    yield vault_mock_oracle 
+def strategy_mock_initialized_vault(snapshots):
+    yield snapshots.value('strategy_mock_initialized_vault').vault_mock_oracle
 
 @pytest.fixture
-def strategy_mock_oracle_before_set(token, amount, user, strategist, keeper, vault_mock_oracle, strategy_contract, gov ,MockAaveOracle, conf):
-    pool_address_provider = interface.IPoolAddressesProvider(POOL_ADDRESS_PROVIDER)
-    old_oracle = pool_address_provider.getPriceOracle()
-    # Set the mock price oracle
-    oracle = MockAaveOracle.deploy(old_oracle, {'from': accounts[0]})
-
-    admin = accounts.at(pool_address_provider.owner(), True)
-    pool_address_provider.setPriceOracle(oracle, {'from': admin})
-
-    strategy_mock_oracle = strategist.deploy(strategy_contract, vault_mock_oracle)
-    insurance = strategist.deploy(StrategyInsurance, strategy_mock_oracle)
-    strategy_mock_oracle.setKeeper(keeper)
-    strategy_mock_oracle.setInsurance(insurance, {'from': gov})
-
-    vault_mock_oracle.addStrategy(strategy_mock_oracle, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
-    yield strategy_mock_oracle
+def strategy_mock_oracle_before_set(snapshots):
+    yield snapshots.value('mock_oracle').strategy_mock_oracle
 
 @pytest.fixture
-def grailManager_mock_oracle(grail_manager_proxy_contract, grail_manager_contract, gov, strategy_mock_oracle_before_set, conf) : 
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    
-    grailManager = gov.deploy(grail_manager_contract)
-
-    # grailManager.initialize(gov, strategy, grailConfig, {'from': gov})
-    grailConfig = [strategy_mock_oracle_before_set.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
-
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, strategy_mock_oracle_before_set, grailConfig)
-    
-    grailManagerProxy = gov.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
-
-    yield grailManagerProxy
+def grailManager_mock_oracle(snapshots) : 
+    yield snapshots.value('mock_oracle').grailManager_mock_oracle
 
 @pytest.fixture
-def strategy_mock_oracle(strategy_mock_oracle_before_set, grailManager_mock_oracle, gov):
-    strategy_mock_oracle_before_set.setGrailManager(grailManager_mock_oracle, {'from': gov})
-    yield strategy_mock_oracle_before_set
-
-
-# Function scoped isolation fixture to enable xdist.
-# Snapshots the chain before each test and reverts after test completion.
-#@pytest.fixture(scope="function", autouse=True)
-#def shared_setup(strategy, strategy_mock_oracle, grailManager, grailManager_mock_oracle):
-#    pass
-@pytest.fixture(autouse=True)
-def isolation(fn_isolation):
-    pass
+def strategy_mock_oracle(snapshots):
+    yield snapshots.value('mock_oracle').strategy_mock_oracle
@@ -0,0 +1,44 @@
+from brownie import Contract, interface
+import pytest
+from neutra.sim.camelot import LpState, get_amount_out, swap_exact_short_want, swap_exact_want_short
+
+
+def lp_state(strategy):
+    return LpState(*strategy.getLpReservesAndFee())
+
+
+def test_quotes_match_router(deployed_vault, strategy, token, router):
+    short = strategy.short()
+    state = lp_state(strategy)
+    sizes = [10 ** (token.decimals() + i) for i in range(4)]
+
+    quotes = get_amount_out(sizes, state.want, state.short, state.want_fee)
+    for size, quote in zip(sizes, quotes):
+        assert router.getAmountsOut(size, [token, short])[1] == quote
+
+    short_sizes = [10 ** (interface.IERC20Extended(short).decimals() - 3 + i) for i in range(4)]
+    quotes = get_amount_out(short_sizes, state.short, state.want, state.short_fee)
+    for size, quote in zip(short_sizes, quotes):
+        assert router.getAmountsOut(size, [short, token])[1] == quote
+
+
+def test_quote_matches_swap(deployed_vault, strategy, token, router, whale):
+    short = Contract(strategy.short())
+
+    amount = 10_000 * 10 ** token.decimals()
+    quote = swap_exact_want_short(amount, lp_state(strategy))
+    assert not quote.reverted
+    token.approve(router, amount, {'from': whale})
+    before = short.balanceOf(whale)
+    router.swapExactTokensForTokensSupportingFeeOnTransferTokens(amount, 0, [token, short], whale, whale, 2**256-1, {'from': whale})
+    assert short.balanceOf(whale) - before == quote.amount_out
+    after = strategy.getLpReserves()
+    assert (quote.state.want, quote.state.short) == (after[0], after[1])
+
+    amountShort = quote.amount_out
+    quote = swap_exact_short_want(amountShort, lp_state(strategy))
+    short.approve(router, amountShort, {'from': whale})
+    before = token.balanceOf(whale)
+    router.swapExactTokensForTokensSupportingFeeOnTransferTokens(amountShort, 0, [short, token], whale, whale, 2**256-1, {'from': whale})
+    assert token.balanceOf(whale) - before == quote.amount_out
+    assert pytest.approx(amount, rel=1e-2) == quote.amount_out
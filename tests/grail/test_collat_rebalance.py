@@ -1,6 +1,7 @@
 import brownie
 from brownie import Contract, interface, accounts
 import pytest
+from tests.helper import advance_chain
 
 
 def farmWithdraw(grailManager, grail_manager_contract, strategy, amount):
@@ -43,6 +44,67 @@ def test_collat_rebalance(chain, accounts, token, deployed_vault, strategy, user
     assert pytest.approx(target, rel=1e-2) == debtCollat
 
 
+def test_flash_loan_collat_rebalance(chain, accounts, token, deployed_vault, strategy, user, conf, gov, lp_token, lp_whale, lp_price, pid):
+    strategy.setFlashLoanCollateralRebalance(True, {'from': gov})
+
+    # a large move down in one keeper call, the LP covers it without a flash loan
+    target = 2000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500)
+    lendBefore = strategy.balanceLend()
+    strategy.rebalanceCollateral()
+    debtAfter = strategy.calcDebtRatio()
+    debtCollat = strategy.calcCollateral()
+    print('debtRatio:   {0}'.format(debtAfter))
+    print('CollatRatio: {0}'.format(debtCollat))
+    assert pytest.approx(10000, rel=1e-3) == debtAfter
+    assert pytest.approx(target, rel=1e-2) == debtCollat
+    assert strategy.balanceLend() > lendBefore
+    assert strategy.balanceShort() == 0
+
+    # levering back up doesn't need the flash loan
+    target = 6000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500)
+    strategy.rebalanceCollateral()
+    assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
+    assert pytest.approx(target, rel=1e-2) == strategy.calcCollateral()
+
+
+@pytest.mark.parametrize("flash_loan", [True, False])
+def test_flash_loan_collat_rebalance_lp_short(chain, accounts, deployed_vault, strategy, user, gov, lp_token, grailManager, lp_price, grail_manager_contract, flash_loan):
+    strategy.setFlashLoanCollateralRebalance(flash_loan, {'from': gov})
+    # Lose half of the LP, what is left can't repay the debt down to the target
+    sendAmount = round(strategy.balanceLp() * 0.5 / lp_price)
+    farmWithdraw(grailManager, grail_manager_contract, strategy, sendAmount)
+    lp_token.transfer(user, sendAmount, {'from': accounts.at(strategy, True)})
+
+    target = 2000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500, {'from': gov})
+    strategy.rebalanceCollateral({'from': gov})
+    assert strategy.balanceShort() == 0
+    # only the flash loan gets back in range in one call
+    assert (strategy.calcCollateral() < target+500) == flash_loan
+
+
+def test_flash_loan_deleverage(chain, accounts, token, vault, deployed_vault, strategy, user, gov, strategist, lp_token, grailManager, lp_price, grail_manager_contract):
+    # Lose 60% of the LP, the want left in the rest can't buy back the debt
+    sendAmount = round(strategy.balanceLp() * 0.6 / lp_price)
+    auth = accounts.at(strategy, True)
+    farmWithdraw(grailManager, grail_manager_contract, strategy, sendAmount)
+    lp_token.transfer(user, sendAmount, {'from': auth})
+    assert strategy.calcDebtRatio() > 20000
+
+    totalAssets = strategy.estimatedTotalAssets()
+    vaultBefore = token.balanceOf(vault)
+    strategy.setEmergencyExit({"from": strategist})
+    strategy.harvest()
+
+    assert strategy.balanceDebt() == 0
+    assert strategy.balanceLend() == 0
+    assert strategy.estimatedTotalAssets() < totalAssets * 1e-5
+    # the flash loan premium and swap fees on the bought back debt
+    assert pytest.approx(token.balanceOf(vault) - vaultBefore, rel=1e-2) == totalAssets
+
+
 def test_set_collat_thresholds(chain, accounts, token, deployed_vault, strategy, user, conf, gov, lp_token, lp_whale, lp_price, pid):
     # Vault share token doesn't work
     with brownie.reverts():
@@ -157,8 +219,7 @@ def test_typical_rebalance_with_low_debt(chain, accounts, token, deployed_vault,
     target = 5200
     
     strategy.setCollateralThresholds(target-500, target, target+500, 8000)
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.rebalanceCollateral()
     
     # Change the debt ratio to ~98%
@@ -210,8 +271,7 @@ def test_typical_collat_rebalance_with_high_debt(chain, accounts, token, deploye
     target = 7000
     strategy.setCollateralThresholds(target-500, target, target+500, 8000)
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.rebalanceCollateral()
     debtAfter = strategy.calcDebtRatio()
@@ -0,0 +1,124 @@
+import brownie
+from brownie import web3, MockGrailStrategy
+
+# StrategyConfig field order, packed from the low bits of one slot
+UINT16_FIELDS = [
+    'collatUpper', 'collatTarget', 'collatLower', 'collatLimit', 'debtUpper', 'debtLower',
+    'rebalancePercent', 'slippageAdj', 'priceSourceDiffKeeper', 'priceSourceDiffUser',
+]
+BOOL_FIELDS = ['doPriceCheck', 'isPaused', 'incrementalDebtRebalance', 'flashLoanCollateralRebalance']
+
+
+def packed(config):
+    word, offset = 0, 0
+    for name in UINT16_FIELDS:
+        word |= config[name] << offset
+        offset += 16
+    for name in BOOL_FIELDS:
+        word |= int(config[name]) << offset
+        offset += 8
+    return word
+
+
+def config_slots(strategy, config, max_slot=64):
+    word = packed(config).to_bytes(32, 'big')
+    return [i for i in range(max_slot) if bytes(web3.eth.get_storage_at(strategy.address, i)).rjust(32, b'\0') == word]
+
+
+def test_config_matches_views(strategy, lens):
+    config = lens.getConfig(strategy).dict()
+    for name in UINT16_FIELDS + BOOL_FIELDS:
+        assert config[name] == getattr(strategy, name)()
+    assert config['collatTarget'] == 7000
+    assert config['debtUpper'] == 10390
+    assert config['slippageAdj'] == 9900
+    assert config['doPriceCheck'] and not config['isPaused']
+
+
+def test_config_fits_one_slot(strategy, lens, gov):
+    slots = config_slots(strategy, lens.getConfig(strategy).dict())
+    assert len(slots) == 1
+
+    strategy.setDebtThresholds(9800, 10200, 5000, {'from': gov})
+    strategy.setFlashLoanCollateralRebalance(True, {'from': gov})
+    config = lens.getConfig(strategy).dict()
+    assert config_slots(strategy, config) == slots
+    assert (config['debtLower'], config['debtUpper'], config['rebalancePercent']) == (9800, 10200, 5000)
+    assert config['flashLoanCollateralRebalance']
+    assert strategy.collatTarget() == 7000
+
+
+def test_min_deploy_keeps_its_own_slot(strategy, gov, vault, strategist, local_stack):
+    assert strategy.minDeploy() == 1e4
+    strategy.setDebtThresholds(9800, 10200, 5000, {'from': gov})
+    assert strategy.minDeploy() == 1e4
+
+    # USDCWETHGRAIL sets its own, only the mock takes any
+    if local_stack is not None:
+        config = list(local_stack.strategy_config)
+        config[-1] = 10 ** 24
+        assert strategist.deploy(MockGrailStrategy, vault, config).minDeploy() == 10 ** 24
+
+
+def test_legacy_setters_keep_other_fields(strategy, lens, gov):
+    before = lens.getConfig(strategy).dict()
+    strategy.setCollateralThresholds(6000, 6500, 7000, 7500, {'from': gov})
+    strategy.setSlippageConfig(9800, 300, 100, False, {'from': gov})
+    strategy.setIncrementalDebtRebalance(True, {'from': gov})
+    after = lens.getConfig(strategy).dict()
+
+    changed = {
+        'collatLower': 6000, 'collatTarget': 6500, 'collatUpper': 7000, 'collatLimit': 7500,
+        'slippageAdj': 9800, 'priceSourceDiffUser': 300, 'priceSourceDiffKeeper': 100,
+        'doPriceCheck': False, 'incrementalDebtRebalance': True,
+    }
+    for name, value in before.items():
+        assert after[name] == changed.get(name, value)
+
+
+def test_set_config(strategy, lens, gov, user):
+    config = lens.getConfig(strategy).dict()
+    config['collatTarget'] = 6800
+    config['slippageAdj'] = 9700
+    config['flashLoanCollateralRebalance'] = True
+    # isPaused is left to pauseStrat and unpauseStrat
+    config['isPaused'] = True
+
+    with brownie.reverts():
+        strategy.setConfig(tuple(config.values()), {'from': user})
+    strategy.setConfig(tuple(config.values()), {'from': gov})
+
+    after = lens.getConfig(strategy).dict()
+    assert after['collatTarget'] == 6800
+    assert after['slippageAdj'] == 9700
+    assert after['flashLoanCollateralRebalance']
+    assert not after['isPaused']
+
+
+def test_set_config_validation(strategy, lens, gov):
+    base = lens.getConfig(strategy).dict()
+    invalid = [
+        {'debtLower': 10001},
+        {'debtUpper': 9999},
+        {'rebalancePercent': 10001},
+        {'collatLimit': 10001},
+        {'collatUpper': base['collatLimit']},
+        {'collatTarget': base['collatUpper'] + 1},
+        {'collatLower': base['collatTarget'] + 1},
+        {'slippageAdj': 10001},
+        # _testPriceSource() subtracts them from BASIS_PRECISION
+        {'priceSourceDiffKeeper': 10001},
+        {'priceSourceDiffUser': 10001},
+    ]
+    for changes in invalid:
+        with brownie.reverts():
+            strategy.setConfig(tuple({**base, **changes}.values()), {'from': gov})
+
+    # the legacy setters take uint256 and refuse values that don't fit the packed fields
+    with brownie.reverts():
+        strategy.setSlippageConfig(9900, 2 ** 16, 200, True, {'from': gov})
+    with brownie.reverts():
+        strategy.setDebtThresholds(9610, 2 ** 16 + 10390, 10000, {'from': gov})
+    with brownie.reverts():
+        strategy.setSlippageConfig(9900, 200, 10001, True, {'from': gov})
+    assert lens.getConfig(strategy).dict() == base
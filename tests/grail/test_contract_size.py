@@ -0,0 +1,11 @@
+from brownie import web3
+
+# EIP-170, deployments of larger runtime code revert
+MAX_CODE_SIZE = 24_576
+
+
+def test_strategy_fits_eip170(strategy, lens):
+    for contract in (strategy, lens):
+        size = len(web3.eth.get_code(contract.address))
+        print(f'{contract._name}: {size} bytes')
+        assert size <= MAX_CODE_SIZE
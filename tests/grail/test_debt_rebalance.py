@@ -1,6 +1,7 @@
 import brownie
 from brownie import Contract, interface, accounts
 import pytest
+from tests.helper import advance_chain
 
 
 def farmWithdraw(grailManager, grail_manager_contract, strategy, amount):
@@ -30,8 +31,7 @@ def test_debt_rebalance(chain, accounts, token, deployed_vault, strategy, user,
     print('collatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(9500, rel=1e-3) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
@@ -53,8 +53,7 @@ def test_debt_rebalance(chain, accounts, token, deployed_vault, strategy, user,
     print('collatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(4000, rel=1e-2) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
@@ -78,8 +77,7 @@ def test_debt_rebalance(chain, accounts, token, deployed_vault, strategy, user,
     print('collatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(10500, rel=2e-3) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
@@ -104,8 +102,7 @@ def test_debt_rebalance(chain, accounts, token, deployed_vault, strategy, user,
     print('collatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(15000, rel=1e-2) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
@@ -115,6 +112,46 @@ def test_debt_rebalance(chain, accounts, token, deployed_vault, strategy, user,
     assert pytest.approx(collatRatioBefore, rel=1e-2) == strategy.calcCollateral()
 
 
+@pytest.mark.parametrize("debt_ratio", [0.95, 1.05])
+def test_debt_rebalance_incremental(chain, accounts, token, deployed_vault, strategy, user, gov, lp_token, lp_whale, grailManager, lp_price, grail_manager_contract, debt_ratio):
+    strategy.setIncrementalDebtRebalance(True, {'from': gov})
+    if debt_ratio < 1:
+        sendAmount = round(strategy.balanceLp() * (1/debt_ratio - 1) / lp_price)
+        lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    else:
+        # steal some lp from the strat
+        sendAmount = round(strategy.balanceLp() * (1 - 1/debt_ratio) / lp_price)
+        farmWithdraw(grailManager, grail_manager_contract, strategy, sendAmount)
+        lp_token.transfer(user, sendAmount, {'from': accounts.at(strategy, True)})
+    assert pytest.approx(debt_ratio * 10000, rel=2e-3) == strategy.calcDebtRatio()
+    collatRatioBefore = strategy.calcCollateral()
+    lpBefore = strategy.balanceLpInShort()
+    advance_chain(chain)
+
+    # only the debt moves, the LP stays where it is
+    strategy.rebalanceDebt()
+    assert pytest.approx(10000, rel=2e-3) == strategy.calcDebtRatio()
+    assert strategy.balanceLpInShort() == lpBefore
+    assert pytest.approx(collatRatioBefore, rel=2e-2) == strategy.calcCollateral()
+
+
+def test_debt_rebalance_incremental_collat_limit(chain, deployed_vault, strategy, gov, lp_token, lp_whale, lp_price):
+    strategy.setIncrementalDebtRebalance(True, {'from': gov})
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    advance_chain(chain)
+
+    # borrowing the missing debt would take the collateral ratio past the limit
+    collatRatio = strategy.calcCollateral()
+    strategy.setCollateralThresholds(collatRatio - 1000, collatRatio - 500, collatRatio + 10, collatRatio + 20, {'from': gov})
+    with brownie.reverts():
+        strategy.rebalanceDebt()
+
+    strategy.setCollateralThresholds(collatRatio - 1000, collatRatio - 500, collatRatio + 500, collatRatio + 1000, {'from': gov})
+    strategy.rebalanceDebt()
+    assert strategy.calcCollateral() <= strategy.collatLimit()
+
+
 def test_debt_rebalance_partial(chain, accounts, token, deployed_vault, strategy, user, strategist, gov, lp_token, lp_whale, grailManager, lp_price, pid, grail_manager_contract):
     strategy.setDebtThresholds(9800, 10200, 5000)
 
@@ -123,18 +160,15 @@ def test_debt_rebalance_partial(chain, accounts, token, deployed_vault, strategy
     lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
     print('Send amount: {0}'.format(sendAmount))
     print('debt Ratio:  {0}'.format(strategy.calcDebtRatio()))
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     debtRatio = strategy.calcDebtRatio()
     collatRatioBefore = strategy.calcCollateral()
     print('debtRatio:   {0}'.format(debtRatio))
     print('collatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(9500, rel=1e-3) == debtRatio
     assert pytest.approx(7000, rel=1e-3) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
+    advance_chain(chain)
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
     debtRatio = strategy.calcDebtRatio()
@@ -146,8 +180,7 @@ def test_debt_rebalance_partial(chain, accounts, token, deployed_vault, strategy
 
     # rebalance the whole way now
     strategy.setDebtThresholds(9800, 10200, 10000)
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.rebalanceDebt()
     assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
@@ -168,8 +201,7 @@ def test_debt_rebalance_partial(chain, accounts, token, deployed_vault, strategy
     print('CollatRatio: {0}'.format(collatRatioBefore))
     assert pytest.approx(10500, rel=1e-3) == debtRatio
     assert pytest.approx(7000, rel=1e-3) == collatRatioBefore
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     # Rebalance Debt  and check it's back to the target
     strategy.rebalanceDebt()
     collatRatio = strategy.calcCollateral()
@@ -179,3 +211,64 @@ def test_debt_rebalance_partial(chain, accounts, token, deployed_vault, strategy
     assert pytest.approx(10250, rel=1e-3) == debtRatio
     assert pytest.approx(7000, rel=1e-3) == collatRatio
 
+
+
+def set_pair_fees(pair, token, want_fee, short_fee):
+    """Sets the directional Camelot fees of the mock pair by side of the trade."""
+    if pair.token0() == token.address:
+        pair.setFeePercent(want_fee, short_fee)
+    else:
+        pair.setFeePercent(short_fee, want_fee)
+
+
+def rebalance_cost(chain, strategy, pair, token, want_fee, short_fee):
+    """Slippage per want swapped by rebalanceDebt() under the given fees, the chain is left untouched."""
+    chain.snapshot()
+    set_pair_fees(pair, token, want_fee, short_fee)
+    tx = strategy.rebalanceDebt()
+    assert pytest.approx(10000, rel=2e-3) == strategy.calcDebtRatio()
+    event = tx.events["DebtRebalance"]
+    chain.revert()
+    assert event["swapAmount"] > 0
+    return event["slippage"] / event["swapAmount"]
+
+
+def test_debt_rebalance_dynamic_fees(chain, local_mode, token, deployed_vault, strategy, user, lp_token, lp_whale, grailManager, lp_price, grail_manager_contract, MockCamelotPair):
+    if not local_mode:
+        pytest.skip("pair fees can only be changed on the local mock stack")
+
+    # Camelot fees are directional, the rebalance only pays the fee of the
+    # token it sells, so it costs more when that side is dearer
+    pair = MockCamelotPair.at(lp_token.address)
+
+    # Change the debt ratio to ~95%, the excess short is sold for want
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    assert pytest.approx(9500, rel=1e-3) == strategy.calcDebtRatio()
+    advance_chain(chain)
+
+    cheap = rebalance_cost(chain, strategy, pair, token, 100, 100)
+    dear = rebalance_cost(chain, strategy, pair, token, 100, 500)
+    assert dear > cheap
+    # only the short fee matters when selling short
+    assert pytest.approx(cheap, rel=1e-2) == rebalance_cost(chain, strategy, pair, token, 500, 100)
+
+    set_pair_fees(pair, token, 100, 500)
+    strategy.rebalanceDebt()
+    assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
+
+    # Change the debt ratio to ~105% - steal some lp from the strat, want is sold for short
+    sendAmount = round(strategy.balanceLp() * 0.05/1.05 / lp_price)
+    auth = accounts.at(strategy, True)
+    farmWithdraw(grailManager, grail_manager_contract, strategy, sendAmount)
+    lp_token.transfer(user, sendAmount, {'from': auth})
+    assert pytest.approx(10500, rel=2e-3) == strategy.calcDebtRatio()
+    advance_chain(chain)
+
+    cheap = rebalance_cost(chain, strategy, pair, token, 100, 100)
+    dear = rebalance_cost(chain, strategy, pair, token, 500, 100)
+    assert dear > cheap
+    assert pytest.approx(cheap, rel=1e-2) == rebalance_cost(chain, strategy, pair, token, 100, 500)
+
+    strategy.rebalanceDebt()
+    assert pytest.approx(10000, rel=2e-3) == strategy.calcDebtRatio()
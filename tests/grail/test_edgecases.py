@@ -1,8 +1,7 @@
 import brownie
 from brownie import interface, Contract, accounts, MockAaveOracle
 import pytest
-import time 
-from tests.helper import encode_function_data
+from tests.helper import advance_chain
 
 
 POOL = '0x794a61358D6845594F94dc1DB02A252b5b4814aD' 
@@ -18,8 +17,7 @@ def steal(stealPercent, strategy_mock_oracle, token, chain, gov, user):
     steal = round(strategy_mock_oracle.estimatedTotalAssets() * stealPercent)
     strategy_mock_oracle.liquidatePositionAuth(steal, {'from': gov})
     token.transfer(user, strategy_mock_oracle.balanceOfWant(), {"from": accounts.at(strategy_mock_oracle, True)})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
 
 def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct, router, shortWhale):
@@ -32,7 +30,7 @@ def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct,
     swapAmt = min(swapAmtMax, short.balanceOf(shortWhale))
     print("Force Large Swap - to offset debt ratios")
     short.approve(router, 2**256-1, {"from": shortWhale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [short, token], shortWhale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": shortWhale})
 
@@ -48,7 +46,7 @@ def offSetDebtRatioHigh(strategy_mock_oracle, lp_token, token, Contract, swapPct
     swapAmt = min(swapAmtMax, token.balanceOf(whale))
     print("Force Large Swap - to offset debt ratios")
     token.approve(router, 2**256-1, {"from": whale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [token, short], whale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": whale})
     else :
@@ -63,7 +61,7 @@ def offSetDebtRatioLowAmtIn(strategy_mock_oracle, lp_token, token, Contract, swa
     swapAmt = min(swapAmtMax, short.balanceOf(shortWhale))
     print("Force Large Swap - to offset debt ratios")
     short.approve(router, 2**256-1, {"from": shortWhale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [short, token], shortWhale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": shortWhale})
 
@@ -78,7 +76,7 @@ def offSetDebtRatioHighAmtIn(strategy_mock_oracle, lp_token, token, Contract, sw
     swapAmt = min(swapAmtMax, token.balanceOf(whale))
     print("Force Large Swap - to offset debt ratios")
     token.approve(router, 2**256-1, {"from": whale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [token, short], whale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": whale})
     else :
@@ -87,8 +85,7 @@ def offSetDebtRatioHighAmtIn(strategy_mock_oracle, lp_token, token, Contract, sw
 def setOracleShortPriceToLpPrice(strategy_mock_oracle):
     short = Contract(strategy_mock_oracle.short())
     # Oracle should reflect the "new" price
-    pool_address_provider = interface.IPoolAddressesProvider(POOL_ADDRESS_PROVIDER)
-    oracle = MockAaveOracle.at(pool_address_provider.getPriceOracle())
+    oracle = MockAaveOracle.at(strategy_mock_oracle.oracle())
     new_price = strategy_mock_oracle.getLpPrice()
     print("Oracle price before", oracle.getAssetPrice(short))
     oracle.setAssetPrice(short, new_price * 100)
@@ -108,7 +105,7 @@ def test_lossy_withdrawal_partial(
     vault_mock_oracle.deposit(amount, {"from": user})
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
     # Steal from the strategy
@@ -116,9 +113,6 @@ def test_lossy_withdrawal_partial(
     steal(stealPercent, strategy_mock_oracle, token, chain, gov, user)
     balBefore = token.balanceOf(user)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
-
     half = int(amount / 2)
     vault_mock_oracle.withdraw(half, user, 100, {'from' : user}) 
     balAfter = token.balanceOf(user)
@@ -135,7 +129,7 @@ def test_partialWithdrawal_unbalancedDebtLow(
     vault_mock_oracle.deposit(amount, {"from": user})
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -149,13 +143,10 @@ def test_partialWithdrawal_unbalancedDebtLow(
     strategyLoss = amount - strategy_mock_oracle.estimatedTotalAssets()
     lossPercent = strategyLoss / amount
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy_mock_oracle, vault_mock_oracle)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
     percentWithdrawn = 0.7
 
     withdrawAmt = int(amount * percentWithdrawn)
@@ -184,7 +175,7 @@ def test_partialWithdrawal_unbalancedDebtHigh(
     vault_mock_oracle.deposit(amount, {"from": user})
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -198,13 +189,10 @@ def test_partialWithdrawal_unbalancedDebtHigh(
     preWithdrawDebtRatio = strategy_mock_oracle.calcDebtRatio()
     print('Pre Withdraw debt Ratio :  {0}'.format(preWithdrawDebtRatio))
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy_mock_oracle, vault_mock_oracle)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
     percentWithdrawn = 0.7
 
     withdrawAmt = int(amount * percentWithdrawn)
@@ -226,27 +214,18 @@ def test_partialWithdrawal_unbalancedDebtHigh(
 
 # Load up the vault with 2 strategies, deploy them with harvests and then withdraw 75% from the vault to test  withdrawing 100% from one of the strats is okay. 
 def test_withdraw_all_from_multiple_strategies(
-    gov, vault_mock_oracle, strategy_mock_oracle, token, user, amount, conf, chain, strategy_contract, strategist, StrategyInsurance, keeper, grail_manager_contract, grail_manager_proxy_contract
+    gov, vault_mock_oracle, strategy_mock_oracle, token, user, amount, conf, chain, deploy_strategy, strategist, StrategyInsurance, keeper, deploy_grail_manager
 ):
     # Deposit to the vault and harvest
     user_balance_before = token.balanceOf(user)
     token.approve(vault_mock_oracle.address, amount, {"from": user})
     vault_mock_oracle.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
 
-    new_strategy = strategist.deploy(strategy_contract, vault_mock_oracle)
-
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    grailManager = gov.deploy(grail_manager_contract)
+    new_strategy = deploy_strategy(vault_mock_oracle)
 
-    # grailManager.initialize(gov, strategy, grailConfig, {'from': gov})
-    grailConfig = [new_strategy.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
-
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, new_strategy, grailConfig)
-    
-    grailManagerProxy = gov.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
+    grailManagerProxy = deploy_grail_manager(new_strategy)
 
     new_strategy.setGrailManager(grailManagerProxy.address, {'from': gov})
 
@@ -255,7 +234,7 @@ def test_withdraw_all_from_multiple_strategies(
     new_strategy.setInsurance(newInsurance, {'from': gov})
     vault_mock_oracle.addStrategy(new_strategy, 50_00, 0, 2 ** 256 - 1, 1_000, {"from": gov})
     strategy_mock_oracle.harvest()
-    chain.sleep(1)
+    advance_chain(chain)
     new_strategy.harvest()
 
     half = int(amount/2)
@@ -282,7 +261,7 @@ def test_Sandwhich_High(
     balBefore = token.balanceOf(user)
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -307,15 +286,11 @@ def test_Sandwhich_High(
         strategy_mock_oracle.rebalanceDebt()
     assert preWithdrawDebtRatio == strategy_mock_oracle.calcDebtRatio()
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     balBefore = token.balanceOf(user)
 
     balAftereWhale = short.balanceOf(whale)
 
-
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
     percentWithdrawn = 0.7
 
     withdrawAmt = int(amount * percentWithdrawn)
@@ -342,7 +317,7 @@ def test_Sandwhich_Low(
     balBefore = token.balanceOf(user)
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -362,12 +337,9 @@ def test_Sandwhich_Low(
     preWithdrawDebtRatio = strategy_mock_oracle.calcDebtRatio()
     print('Pre Withdraw debt Ratio :  {0}'.format(preWithdrawDebtRatio))
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     balBefore = token.balanceOf(user)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
     percentWithdrawn = 0.7
 
     withdrawAmt = int(amount * percentWithdrawn)
@@ -0,0 +1,163 @@
+from brownie import Contract, accounts
+import pytest
+from tests.helper import advance_chain
+
+pytestmark = pytest.mark.gas
+
+# Position sizes benchmarked, in units of want. Each is capped by what the whale
+# and the LP can absorb, like the deposits in conftest.py.
+POSITION_SIZES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '5m': 5_000_000,
+}
+
+# Share of the user's vault shares withdrawn to land in each stratPercent band
+# of CoreStrategyAaveGrail._withdraw
+WITHDRAW_BANDS = {
+    'under5': 0.02,
+    '5to95': 0.5,
+    'over95': 0.99,
+}
+
+
+def check_gas(gas_baseline, name, size, tx):
+    regression = gas_baseline.check(f"{name}[{size}]", tx.gas_used)
+    assert regression is None, regression
+
+
+def open_position(chain, token, vault, strategy, user, keeper, conf, size):
+    amount = POSITION_SIZES[size] * 10 ** token.decimals()
+    reserve = accounts.at(conf['whale'], force=True)
+    amount = min(amount, int(0.5*token.balanceOf(reserve)))
+    amount = min(amount, int(0.2*token.balanceOf(conf['lp_token'])))
+    token.transfer(user, amount, {"from": reserve})
+
+    token.approve(vault.address, amount, {"from": user})
+    vault.deposit(amount, {"from": user})
+    advance_chain(chain)
+    return strategy.harvest({"from": keeper})
+
+
+@pytest.fixture(params=POSITION_SIZES)
+def size(request):
+    yield request.param
+
+
+def test_gas_harvest(chain, token, vault, strategy, user, keeper, conf, size, gas_baseline):
+    # the first harvest deploys the deposit, the next one takes profit and tends
+    tx = open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    check_gas(gas_baseline, 'harvest_deploy', size, tx)
+
+    advance_chain(chain, 3600 * 6)
+    tx = strategy.harvest({"from": keeper})
+    check_gas(gas_baseline, 'harvest', size, tx)
+
+
+def test_gas_tend(chain, token, vault, strategy, user, keeper, conf, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    advance_chain(chain)
+    tx = strategy.tend({"from": keeper})
+    check_gas(gas_baseline, 'tend', size, tx)
+
+
+def test_gas_rebalance_debt(chain, token, vault, strategy, user, keeper, conf, lp_token, lp_whale, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    # Change the debt ratio to ~95%, as in test_debt_rebalance
+    lp_price = (token.balanceOf(lp_token) * 2) / lp_token.totalSupply()
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    advance_chain(chain)
+
+    tx = strategy.rebalanceDebt({"from": keeper})
+    assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
+    check_gas(gas_baseline, 'rebalanceDebt', size, tx)
+
+
+def test_gas_rebalance_debt_incremental(chain, token, vault, strategy, user, keeper, gov, conf, lp_token, lp_whale, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    strategy.setIncrementalDebtRebalance(True, {'from': gov})
+    lp_price = (token.balanceOf(lp_token) * 2) / lp_token.totalSupply()
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    advance_chain(chain)
+
+    tx = strategy.rebalanceDebt({"from": keeper})
+    assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
+    check_gas(gas_baseline, 'rebalanceDebtIncremental', size, tx)
+
+
+def test_gas_rebalance_collateral(chain, token, vault, strategy, user, keeper, gov, conf, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    target = 2000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500, {'from': gov})
+    advance_chain(chain)
+
+    tx = strategy.rebalanceCollateral({"from": keeper})
+    assert pytest.approx(target, rel=1e-2) == strategy.calcCollateral()
+    check_gas(gas_baseline, 'rebalanceCollateral', size, tx)
+
+
+def test_gas_rebalance_collateral_flash_loan(chain, token, vault, strategy, grailManager, grail_manager_contract, user, keeper, gov, conf, lp_token, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    strategy.setFlashLoanCollateralRebalance(True, {'from': gov})
+    # the flash loan is only taken once the LP can't repay the debt, lose half of it
+    grailManager_box = Contract.from_abi("GrailManager", grailManager.address, grail_manager_contract.abi)
+    auth = accounts.at(strategy, True)
+    lostLp = grailManager_box.balance() // 2
+    grailManager_box.withdraw(lostLp, {'from': auth})
+    lp_token.transfer(user, lostLp, {'from': auth})
+    target = 2000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500, {'from': gov})
+    advance_chain(chain)
+
+    tx = strategy.rebalanceCollateral({"from": keeper})
+    assert strategy.calcCollateral() < target + 500
+    check_gas(gas_baseline, 'rebalanceCollateralFlashLoan', size, tx)
+
+
+def test_gas_liquidate_position_auth(chain, token, vault, strategy, user, keeper, gov, conf, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    advance_chain(chain)
+
+    tx = strategy.liquidatePositionAuth(strategy.estimatedTotalAssets() // 2, {'from': gov})
+    check_gas(gas_baseline, 'liquidatePositionAuth', size, tx)
+
+
+@pytest.mark.parametrize("band", WITHDRAW_BANDS)
+def test_gas_withdraw(chain, token, vault, strategy, user, keeper, conf, size, band, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    advance_chain(chain)
+
+    shares = int(vault.balanceOf(user) * WITHDRAW_BANDS[band])
+    tx = vault.withdraw(shares, user, 100, {'from': user})
+    check_gas(gas_baseline, f'withdraw_{band}', size, tx)
+
+
+def test_gas_grail_manager(chain, token, vault, strategy, grailManager, grail_manager_contract, user, keeper, gov, conf, lp_token, lp_whale, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    grailManager_box = Contract.from_abi("GrailManager", grailManager.address, grail_manager_contract.abi)
+    auth = accounts.at(strategy, True)
+
+    # add another 10% to the position, as the strategy does when it deploys more
+    depositAmount = grailManager_box.balance() // 10
+    lp_token.transfer(strategy, depositAmount, {'from': lp_whale})
+    tx = grailManager_box.deposit(depositAmount, {'from': auth})
+    check_gas(gas_baseline, 'GrailManager.deposit', size, tx)
+
+    advance_chain(chain, 3600)
+    tx = grailManager_box.harvest({'from': gov})
+    check_gas(gas_baseline, 'GrailManager.harvest', size, tx)
+
+    advance_chain(chain, 3600)
+    tx = grailManager_box.withdraw(grailManager_box.balance() // 2, {'from': auth})
+    check_gas(gas_baseline, 'GrailManager.withdraw', size, tx)
+
+
+def test_gas_unwind_step(chain, token, vault, strategy, user, keeper, conf, size, gas_baseline):
+    open_position(chain, token, vault, strategy, user, keeper, conf, size)
+    strategy.startUnwind(1000, {"from": keeper})
+    advance_chain(chain)
+
+    tx = strategy.unwindStep({"from": keeper})
+    check_gas(gas_baseline, 'unwindStep', size, tx)
@@ -0,0 +1,80 @@
+import brownie
+import pytest
+from brownie import Contract, interface, accounts
+from tests.helper import advance_chain
+
+
+@pytest.fixture
+def manager(grailManager, grail_manager_contract):
+    return Contract.from_abi("GrailManager", grailManager.address, grail_manager_contract.abi)
+
+
+def deposit_and_send_grail(chain, gov, token, vault, strategy, grailManager, user, amount, conf):
+    token.approve(vault.address, amount, {"from": user})
+    vault.deposit(amount, {"from": user})
+    vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
+    advance_chain(chain)
+    strategy.harvest()
+
+    # stands in for rewards claimed by a withdrawal, worth 0.1% of the vault
+    grail = interface.ERC20(conf['harvest_token'])
+    sendAmount = round(amount * 1e-3 / conf['harvest_token_price'])
+    grail.transfer(grailManager, sendAmount, {'from': accounts.at(conf['harvest_token_whale'], True)})
+    return grail
+
+
+def test_withdraw_keeps_grail_below_threshold(chain, gov, token, vault, strategy, grailManager, manager, user, amount, conf):
+    grail = deposit_and_send_grail(chain, gov, token, vault, strategy, grailManager, user, amount, conf)
+    held = grail.balanceOf(grailManager)
+    worth = strategy.balancePendingHarvest()
+
+    manager.setGrailSwapThreshold(worth * 2, {'from': gov})
+    vault.withdraw(int(amount * 0.1), user, 100, {'from': user})
+    assert grail.balanceOf(grailManager) >= held
+
+    # sold once it's worth the swap
+    manager.setGrailSwapThreshold(worth // 2, {'from': gov})
+    vault.withdraw(int(amount * 0.1), user, 100, {'from': user})
+    assert grail.balanceOf(grailManager) == 0
+
+
+def test_harvest_sells_kept_grail(chain, gov, token, vault, strategy, grailManager, manager, user, amount, conf):
+    grail = deposit_and_send_grail(chain, gov, token, vault, strategy, grailManager, user, amount, conf)
+    manager.setGrailSwapThreshold(2 ** 256 - 1, {'from': gov})
+    vault.withdraw(int(amount * 0.1), user, 100, {'from': user})
+    assert grail.balanceOf(grailManager) > 0
+
+    pending = strategy.balancePendingHarvest()
+    totalGain = vault.strategies(strategy)['totalGain']
+    advance_chain(chain)
+    strategy.harvest()
+    assert grail.balanceOf(grailManager) == 0
+    assert vault.strategies(strategy)['totalGain'] - totalGain >= pending * 0.8
+
+
+def test_closing_the_position_sells_kept_grail(chain, gov, token, vault, strategy, grailManager, manager, user, amount, conf):
+    grail = deposit_and_send_grail(chain, gov, token, vault, strategy, grailManager, user, amount, conf)
+    manager.setGrailSwapThreshold(2 ** 256 - 1, {'from': gov})
+    vault.withdraw({'from': user})
+    assert manager.tokenId() == 0
+    assert grail.balanceOf(grailManager) == 0
+
+
+def test_kept_grail_is_pending_without_a_position(chain, gov, token, vault, strategy, grailManager, manager, user, amount, conf):
+    grail = deposit_and_send_grail(chain, gov, token, vault, strategy, grailManager, user, amount, conf)
+    vault.withdraw({'from': user})
+    assert manager.tokenId() == 0
+
+    # held GRAIL still counts towards the next harvest
+    grail.transfer(grailManager, 10 ** 18, {'from': accounts.at(conf['harvest_token_whale'], True)})
+    assert strategy.balancePendingHarvest() > 0
+    # swaps go to the pair, the router is never approved
+    assert grail.allowance(grailManager, manager.router()) == 0
+
+
+def test_set_grail_swap_threshold(manager, gov, user):
+    assert manager.grailSwapThreshold() == 0
+    with brownie.reverts():
+        manager.setGrailSwapThreshold(1e6, {'from': user})
+    manager.setGrailSwapThreshold(1e6, {'from': gov})
+    assert manager.grailSwapThreshold() == 1e6
@@ -0,0 +1,47 @@
+import pytest
+from brownie import interface, accounts
+from tests.helper import advance_chain
+
+
+def send_rewards(grailManager, conf, value):
+    # GRAIL held by the manager is sold on the next harvest like claimed rewards
+    harvest = interface.ERC20(conf['harvest_token'])
+    harvestWhale = accounts.at(conf['harvest_token_whale'], True)
+    harvest.transfer(grailManager, round(value / conf['harvest_token_price']), {'from': harvestWhale})
+
+
+def test_pending_harvest_in_want(chain, deployed_vault, strategy, grailManager, conf):
+    value = deployed_vault.totalAssets() * 0.05
+    send_rewards(grailManager, conf, value)
+
+    pending = strategy.balancePendingHarvest()
+    # the swap fee and price impact of selling the GRAIL
+    assert pytest.approx(value, rel=5e-2) == pending
+
+    advance_chain(chain)
+    strategy.harvest()
+    assert strategy.balancePendingHarvest() < pending * 1e-3
+    assert deployed_vault.strategies(strategy)['totalGain'] >= pending * 0.8
+
+
+def test_eth_to_want(strategy):
+    assert strategy.ethToWant(0) == 0
+    # WETH is the short token
+    assert strategy.ethToWant(1e18) == strategy.getOraclePrice()
+
+
+def test_harvest_trigger_weighs_rewards(chain, deployed_vault, strategy, grailManager, gov, conf):
+    advance_chain(chain)
+    send_rewards(grailManager, conf, deployed_vault.totalAssets() * 0.05)
+    pending = strategy.balancePendingHarvest()
+    callCostFor = lambda want: round(want * 1e18 / strategy.ethToWant(1e18) / strategy.profitFactor())
+
+    assert strategy.harvestTrigger(callCostFor(pending / 2))
+    assert not strategy.harvestTrigger(callCostFor(pending * 2))
+
+    # the report delays still apply
+    strategy.setMinReportDelay(3600, {'from': gov})
+    assert not strategy.harvestTrigger(callCostFor(pending / 2))
+    strategy.setMaxReportDelay(1, {'from': gov})
+    strategy.setMinReportDelay(0, {'from': gov})
+    assert strategy.harvestTrigger(callCostFor(pending * 2))
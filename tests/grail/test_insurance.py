@@ -1,7 +1,7 @@
 
 import pytest
+from tests.helper import advance_chain
 from brownie import Contract, accounts
-import time 
 
 
 def farmWithdraw(grailManager, grail_manager_contract, strategy, amount):
@@ -21,11 +21,10 @@ def test_report_profit(
     conf
 ):
     # harvest to load deploy the funnds
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.harvest()
-    chain.sleep(1)
+    advance_chain(chain)
     
     # send some funds to force the profit
     #harvest_token = interface.ERC20(conf['harvest_token'])
@@ -34,8 +33,7 @@ def test_report_profit(
     profit = int(strategy.estimatedTotalAssets() * 0.01)
     token.transfer(strategy, profit, {'from' : whale})
     strategy.harvest()
-    chain.sleep(3600 * 6)  # 6 hrs needed for profits to unlock
-    chain.mine(1)
+    advance_chain(chain, 3600 * 6)  # 6 hrs needed for profits to unlock
 
     # insurance payment should be 10% of profit
     assert pytest.approx(0.1, rel=1e-1) == token.balanceOf(strategy.insurance()) / profit 
@@ -63,12 +61,11 @@ def test_full_payout(
     vault = deployed_vault
     insurance = StrategyInsurance.at(strategy.insurance())
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # harvest to load deploy the funnds
     strategy.harvest()
-    chain.sleep(1)
+    advance_chain(chain)
     initial_debt = vault.strategies(strategy)[6]
 
     # send some funds to insurance for the payment
@@ -98,7 +95,7 @@ def test_full_payout(
     dust = (stolen / 1000)
     assert pytest.approx(target_payout, rel=1e-1) == payout 
     assert tx.events['StrategyReported']['loss'] < dust
-    chain.sleep(1)
+    advance_chain(chain)
 
     # *** 2 *** Now harvest and check no additional payout is made
     token.transfer(strategy, stolen, {'from': whale})
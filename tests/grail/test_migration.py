@@ -1,8 +1,7 @@
 import brownie
 from brownie import interface, Contract, accounts
 import pytest
-import time 
-from tests.helper import encode_function_data
+from tests.helper import advance_chain
 
 
 def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct, router, shortWhale):
@@ -15,7 +14,7 @@ def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct,
     swapAmt = min(swapAmtMax, short.balanceOf(shortWhale))
     print("Force Large Swap - to offset debt ratios")
     short.approve(router, 2**256-1, {"from": shortWhale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [short, token], shortWhale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": shortWhale})
 
@@ -31,7 +30,7 @@ def offSetDebtRatioHigh(strategy_mock_oracle, lp_token, token, Contract, swapPct
     swapAmt = min(swapAmtMax, token.balanceOf(whale))
     print("Force Large Swap - to offset debt ratios")
     token.approve(router, 2**256-1, {"from": whale})
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [token, short], whale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": whale})
     else :
@@ -44,33 +43,24 @@ def test_migration(
     vault,
     strategy,
     amount,
-    strategy_contract,
+    deploy_strategy,
     strategist,
     gov,
     user,
     RELATIVE_APPROX,
-    grail_manager_contract,
-    grail_manager_proxy_contract,
+    deploy_grail_manager,
     conf,
 ):
     # Deposit to the vault and harvest
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
-    new_strategy = strategist.deploy(strategy_contract, vault)
+    new_strategy = deploy_strategy(vault)
 
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    
-    grailManager = strategist.deploy(grail_manager_contract)
-    grailConfig = [new_strategy.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
-
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, new_strategy, grailConfig)
-    
-    grailManagerProxy = strategist.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
+    grailManagerProxy = deploy_grail_manager(new_strategy, strategist)
 
     new_strategy.setGrailManager(grailManagerProxy, {'from' : strategist})
 
@@ -91,22 +81,21 @@ def test_migration_with_low_calcdebtratio(
     amount,
     lp_token,
     Contract,
-    strategy_contract,
+    deploy_strategy,
     strategist,
     gov,
     user,
     RELATIVE_APPROX,
     router,
     shortWhale,
-    grail_manager_contract,
-    grail_manager_proxy_contract,
+    deploy_grail_manager,
     conf,
 ):
 
     # Deposit to the vault and harvest
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -120,17 +109,9 @@ def test_migration_with_low_calcdebtratio(
     preWithdrawDebtRatio = strategy.calcDebtRatio()
     print('Pre Withdraw debt Ratio :  {0}'.format(preWithdrawDebtRatio))
 
-    new_strategy = strategist.deploy(strategy_contract, vault)
-    
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    
-    grailManager = strategist.deploy(grail_manager_contract)
-    grailConfig = [new_strategy.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
+    new_strategy = deploy_strategy(vault)
 
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, new_strategy, grailConfig)
-    
-    grailManagerProxy = strategist.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
+    grailManagerProxy = deploy_grail_manager(new_strategy, strategist)
 
     new_strategy.setGrailManager(grailManagerProxy, {'from' : strategist})
 
@@ -152,22 +133,21 @@ def test_migration_with_high_calcdebtratio(
     amount,
     lp_token,
     Contract,
-    strategy_contract,
+    deploy_strategy,
     strategist,
     gov,
     user,
     RELATIVE_APPROX,
     router,
     whale,
-    grail_manager_contract,
-    grail_manager_proxy_contract,
+    deploy_grail_manager,
     conf,
 ):
 
     # Deposit to the vault and harvest
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
@@ -184,17 +164,9 @@ def test_migration_with_high_calcdebtratio(
 
     # migrate to a new strategy
 
-    new_strategy = strategist.deploy(strategy_contract, vault)
-
-    yieldBooster = '0xD27c373950E7466C53e5Cd6eE3F70b240dC0B1B1'
-    xGrail = '0x3CAaE25Ee616f2C8E13C74dA0813402eae3F496b'
-    
-    grailManager = strategist.deploy(grail_manager_contract)
-    grailConfig = [new_strategy.want(), conf['lp_token'], conf['harvest_token'], xGrail, conf['lp_farm'], conf['router'], yieldBooster]
+    new_strategy = deploy_strategy(vault)
 
-    encoded_initializer_function = encode_function_data(grailManager.initialize, gov, new_strategy, grailConfig)
-    
-    grailManagerProxy = strategist.deploy(grail_manager_proxy_contract, grailManager.address, encoded_initializer_function)
+    grailManagerProxy = deploy_grail_manager(new_strategy, strategist)
 
     new_strategy.setGrailManager(grailManagerProxy, {'from' : strategist})
 
@@ -1,7 +1,7 @@
 import brownie
 from brownie import interface, Contract, accounts, MockAaveOracle
 import pytest
-import time 
+from tests.helper import advance_chain
 
 def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct, router, shortWhale):
     # use other AMM's LP to force some swaps 
@@ -11,7 +11,7 @@ def offSetDebtRatioLow(strategy_mock_oracle, lp_token, token, Contract, swapPct,
     print("Force Large Swap - to offset debt ratios")
     short.approve(router, 2**256-1, {"from": shortWhale})
 
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [short, token], shortWhale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": shortWhale})
 
@@ -29,7 +29,7 @@ def offSetDebtRatioHigh(strategy, lp_token, token, Contract, swapPct, router, wh
     print("Force Large Swap - to offset debt ratios")
     token.approve(router, 2**256-1, {"from": whale})
     
-    if router.address == '0xc873fEcbd354f5A56E00E710B90EF4201db2448d' :
+    if hasattr(router, 'swapExactTokensForTokensSupportingFeeOnTransferTokens') :
         camelotRouter = interface.ICamelotRouter(router.address)
         camelotRouter.swapExactTokensForTokensSupportingFeeOnTransferTokens(swapAmt, 0, [token, short], whale, '0x0000000000000000000000000000000000000000' , 2**256-1, {"from": whale})
     else :
@@ -38,8 +38,7 @@ def offSetDebtRatioHigh(strategy, lp_token, token, Contract, swapPct, router, wh
 def setOracleShortPriceToLpPrice(strategy_mock_oracle):
     short = Contract(strategy_mock_oracle.short())
     # Oracle should reflect the "new" price
-    pool_address_provider = interface.IPoolAddressesProvider(POOL_ADDRESS_PROVIDER)
-    oracle = MockAaveOracle.at(pool_address_provider.getPriceOracle())
+    oracle = MockAaveOracle.at(strategy_mock_oracle.oracle())
     new_price = strategy_mock_oracle.getLpPrice()
     print("Oracle price before", oracle.getAssetPrice(short))
     oracle.setAssetPrice(short, new_price * 100)
@@ -52,8 +51,7 @@ def steal(stealPercent, strategy, token, chain, gov, user):
     steal = round(strategy.estimatedTotalAssets() * stealPercent)
     strategy.liquidatePositionAuth(steal, {'from': gov})
     token.transfer(user, strategy.balanceOfWant(), {"from": accounts.at(strategy, True)})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
 
 def strategySharePrice(strategy, vault):
@@ -71,8 +69,7 @@ def test_operation(
     assert token.balanceOf(vault.address) == amount
     
     # harvest
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
     strat = strategy
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
@@ -88,8 +85,7 @@ def test_operation(
     print('collatRatio: {0}'.format(collatRatio))
     assert pytest.approx(10000, rel=1e-3) == debtRatio
     assert pytest.approx(7000, rel=1e-2) == collatRatio
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     # withdrawal
     vault.withdraw(amount, user, 500, {'from' : user}) 
@@ -104,15 +100,13 @@ def test_emergency_exit(
     # Deposit to the vault
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     # set emergency and exit
     strategy.setEmergencyExit()
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
     assert strategy.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
     assert pytest.approx(token.balanceOf(vault), rel=RELATIVE_APPROX) == amount
@@ -128,8 +122,7 @@ def test_profitable_harvest(
     assert token.balanceOf(vault.address) == amount
 
     # Harvest 1: Send funds through the strategy
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
     before_pps = vault.pricePerShare()
@@ -143,11 +136,9 @@ def test_profitable_harvest(
     harvest.transfer(grailManager, sendAmount, {'from': harvestWhale})
 
     # Harvest 2: Realize profit
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
-    chain.sleep(3600 * 6)  # 6 hrs needed for profits to unlock
-    chain.mine(1)
+    advance_chain(chain, 3600 * 6)  # 6 hrs needed for profits to unlock
     profit = token.balanceOf(vault.address)  # Profits go to vault
 
     assert strategy.estimatedTotalAssets() + profit > amount
@@ -163,33 +154,25 @@ def test_change_debt(
     vault.deposit(amount, {"from": user})
     vault.updateStrategyDebtRatio(strategy.address, 50_00, {"from": gov})
 
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     half = int(amount / 2)
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     vault.updateStrategyDebtRatio(strategy.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy.address, 0, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
     strategy.harvest()
     assert strategy.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
@@ -204,17 +187,13 @@ def test_change_debt_lossy(
     vault.deposit(amount, {"from": user})
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
 
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
 
     # Steal from the strategy
     steal = round(strategy.estimatedTotalAssets() * 0.01)
@@ -222,9 +201,7 @@ def test_change_debt_lossy(
     token.transfer(user, strategy.balanceOfWant(), {"from": accounts.at(strategy, True)})
     vault.updateStrategyDebtRatio(strategy.address, 50_00, {"from": gov})
 
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
 
     strategy.harvest()
@@ -232,9 +209,7 @@ def test_change_debt_lossy(
 
     vault.updateStrategyDebtRatio(strategy.address, 0, {"from": gov})
 
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     
 
     strategy.harvest()
@@ -262,7 +237,7 @@ def test_triggers(
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
     vault.updateStrategyDebtRatio(strategy.address, 5_000, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
 
     strategy.harvestTrigger(0)
@@ -278,19 +253,17 @@ def test_lossy_withdrawal(
     vault.deposit(amount, {"from": user})
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     # Steal from the strategy
     stealPercent = 0.01
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     steal(stealPercent, strategy, token, chain, gov, user)
 
-    chain.mine(1)
+    advance_chain(chain)
     balBefore = token.balanceOf(user)
     vault.withdraw(amount, user, 150, {'from' : user}) 
     balAfter = token.balanceOf(user)
@@ -306,8 +279,7 @@ def test_lossy_withdrawal_partial(
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
@@ -315,16 +287,12 @@ def test_lossy_withdrawal_partial(
 
     # Steal from the strategy
     stealPercent = 0.005
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     steal(stealPercent, strategy, token, chain, gov, user)
 
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy, vault)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
-
     half = int(amount / 2)
     vault.withdraw(half, user, 100, {'from' : user}) 
     balAfter = token.balanceOf(user)
@@ -344,14 +312,12 @@ def test_lossy_withdrawal_tiny(
 
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     # Steal from the strategy
     stealPercent = 0.005
     steal(stealPercent, strategy, token, chain, gov, user)
@@ -359,9 +325,6 @@ def test_lossy_withdrawal_tiny(
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy, vault)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
-
     tiny = int(amount * 0.001)
     vault.withdraw(tiny, user, 100, {'from' : user}) 
     balAfter = token.balanceOf(user)
@@ -372,6 +335,59 @@ def test_lossy_withdrawal_tiny(
     assert pytest.approx(ssp_before, rel = 2e-5) == ssp_after
 
 
+@pytest.mark.parametrize("withdrawPercent", [0.01, 0.3])
+def test_withdrawal_keeps_ratios(
+    chain, gov, token, vault, strategy, user, amount, RELATIVE_APPROX, conf, withdrawPercent
+):
+    # Deposit to the vault and harvest
+    token.approve(vault.address, amount, {"from": user})
+    vault.deposit(amount, {"from": user})
+
+    vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
+    advance_chain(chain)
+    strategy.harvest()
+    assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
+
+    debtRatio = strategy.calcDebtRatio()
+    collatRatio = strategy.calcCollateral()
+    lpBefore = strategy.balanceLp()
+    lendBefore = strategy.balanceLend()
+
+    # Only the withdrawn share of the position is unwound
+    balBefore = token.balanceOf(user)
+    vault.withdraw(int(amount * withdrawPercent), user, 100, {'from' : user})
+    assert pytest.approx(token.balanceOf(user) - balBefore, rel = 2e-3) == int(amount * withdrawPercent)
+
+    assert pytest.approx(strategy.balanceLp(), rel = 2e-3) == lpBefore * (1 - withdrawPercent)
+    assert pytest.approx(strategy.balanceLend(), rel = 2e-3) == lendBefore * (1 - withdrawPercent)
+    assert pytest.approx(strategy.calcDebtRatio(), abs = 20) == debtRatio
+    assert pytest.approx(strategy.calcCollateral(), abs = 20) == collatRatio
+
+
+def test_small_withdrawal_below_full_debt_ratio(
+    chain, gov, token, vault, strategy, user, amount, RELATIVE_APPROX, conf, lp_token, lp_whale, lp_price
+):
+    # Deposit to the vault and harvest
+    token.approve(vault.address, amount, {"from": user})
+    vault.deposit(amount, {"from": user})
+
+    vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
+    advance_chain(chain)
+    strategy.harvest()
+
+    # Bring the debt ratio to ~97%, the LP then holds more short than is owed
+    sendAmount = round(strategy.balanceLp() * (1/.97 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    assert pytest.approx(9700, rel=2e-3) == strategy.calcDebtRatio()
+
+    # Under 5% nothing is swapped, the withdrawal must still be paid in full
+    # with the default maxLoss of 1 bps
+    balBefore = token.balanceOf(user)
+    toWithdraw = int(amount * 0.02)
+    vault.withdraw(toWithdraw, {'from' : user})
+    assert token.balanceOf(user) - balBefore >= toWithdraw * (1 - 1e-4)
+
+
 def test_lossy_withdrawal_99pc(
     chain, gov, accounts, token, vault, strategy, user, strategist, amount, RELATIVE_APPROX, conf
 ):
@@ -380,13 +396,11 @@ def test_lossy_withdrawal_99pc(
     vault.deposit(amount, {"from": user})
 
     vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     # Steal from the strategy
     stealPercent = 0.005
     steal(stealPercent, strategy, token, chain, gov, user)
@@ -394,9 +408,6 @@ def test_lossy_withdrawal_99pc(
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy, vault)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
-
     tiny = int(amount * 0.99)
     vault.withdraw(tiny, user, 100, {'from' : user}) 
     balAfter = token.balanceOf(user)
@@ -411,8 +422,7 @@ def test_lossy_withdrawal_95pc(
     chain, gov, accounts, token, vault, strategy, user, strategist, amount, RELATIVE_APPROX, conf, deployed_vault
 ):
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     # Steal from the strategy
     stealPercent = 0.005
     steal(stealPercent, strategy, token, chain, gov, user)
@@ -420,10 +430,7 @@ def test_lossy_withdrawal_95pc(
     balBefore = token.balanceOf(user)
     ssp_before = strategySharePrice(strategy, vault)
 
-    #give RPC a little break to stop it spzzing out 
-    time.sleep(5)
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
 
     tiny = int(amount * 0.95)
     vault.withdraw(tiny, user, 100, {'from' : user}) 
@@ -452,14 +459,12 @@ def test_reduce_debt_with_low_calcdebtratio(
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=2e-3) == half
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
 
@@ -480,21 +485,18 @@ def test_reduce_debt_with_high_calcdebtratio(
     #assert pytest.approx(10500, rel=2e-3) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     newAmount = strategy_mock_oracle.estimatedTotalAssets() 
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
 
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=2e-3) == int(newAmount / 2)
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     #assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
     assert strategy_mock_oracle.estimatedTotalAssets() / amount < 1e-4  # near zero
@@ -508,8 +510,7 @@ def test_increase_debt_with_low_calcdebtratio(
     half = int(amount / 2)
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
@@ -529,13 +530,12 @@ def test_increase_debt_with_low_calcdebtratio(
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=2e-3) == amount
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
 
@@ -551,8 +551,7 @@ def test_increase_debt_with_high_calcdebtratio(
     strategy_mock_oracle.setSlippageConfig(9900, 400, 500, True)
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount / 2 
 
@@ -566,14 +565,12 @@ def test_increase_debt_with_high_calcdebtratio(
     #assert pytest.approx(10500, rel=2e-3) == debtRatio
     assert pytest.approx(7000, rel=2e-2) == collatRatioBefore
 
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     newAmount = strategy_mock_oracle.estimatedTotalAssets() 
 
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
 
     loss = 0
@@ -581,8 +578,7 @@ def test_increase_debt_with_high_calcdebtratio(
 
     
     vault_mock_oracle.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
 
     #assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
@@ -615,25 +611,23 @@ def test_change_debt_with_price_offset_high(
     strategy_mock_oracle.setSlippageConfig(9900, 400, 500, True)
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
-    time.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     half = int(amount / 2)
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
 
@@ -657,26 +651,23 @@ def test_change_debt_with_price_offset_low(
     strategy_mock_oracle.setSlippageConfig(9900, 400, 500, True)
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     half = int(amount / 2)
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 100_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 50_00, {"from": gov})
-    chain.sleep(1)
-    chain.mine(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert pytest.approx(strategy_mock_oracle.estimatedTotalAssets(), rel=RELATIVE_APPROX) == half
 
     vault.updateStrategyDebtRatio(strategy_mock_oracle.address, 0, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy_mock_oracle.harvest()
     assert strategy_mock_oracle.estimatedTotalAssets() < 10 ** (token.decimals() - 3) # near zero
 
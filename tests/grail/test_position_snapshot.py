@@ -0,0 +1,71 @@
+import pytest
+from tests.helper import advance_chain
+
+
+def assert_snapshot_matches_views(lens, strategy):
+    snapshot = lens.getPositionSnapshot(strategy).dict()
+    wantInLp, shortInLp = strategy.getLpReserves()
+
+    assert snapshot['wantInLp'] == wantInLp
+    assert snapshot['shortInLp'] == shortInLp
+    assert snapshot['lpPrice'] == strategy.getLpPrice()
+    assert snapshot['oraclePrice'] == strategy.getOraclePrice()
+
+    assert snapshot['balanceOfWant'] == strategy.balanceOfWant()
+    assert snapshot['balanceShort'] == strategy.balanceShort()
+    assert snapshot['balanceShortWantEq'] == strategy.balanceShortWantEq()
+    assert snapshot['balanceLend'] == strategy.balanceLend()
+    assert snapshot['balanceLpInShort'] == strategy.balanceLpInShort()
+    assert snapshot['balanceLp'] == strategy.balanceLp()
+    assert snapshot['balanceDebtInShort'] == strategy.balanceDebtInShort()
+    assert snapshot['balanceDebt'] == strategy.balanceDebt()
+    assert snapshot['balanceDebtOracle'] == strategy.balanceDebtOracle()
+    assert snapshot['balancePendingHarvest'] == strategy.balancePendingHarvest()
+    assert snapshot['balanceDeployed'] == strategy.balanceDeployed()
+    assert snapshot['estimatedTotalAssets'] == strategy.estimatedTotalAssets()
+
+    assert snapshot['debtRatio'] == strategy.calcDebtRatio()
+    assert snapshot['collateral'] == strategy.calcCollateral()
+
+    assert snapshot['debtLower'] == strategy.debtLower()
+    assert snapshot['debtUpper'] == strategy.debtUpper()
+    assert snapshot['rebalancePercent'] == strategy.rebalancePercent()
+    assert snapshot['collatLower'] == strategy.collatLower()
+    assert snapshot['collatTarget'] == strategy.collatTarget()
+    assert snapshot['collatUpper'] == strategy.collatUpper()
+    assert snapshot['collatLimit'] == strategy.collatLimit()
+    assert snapshot['priceSourceDiffKeeper'] == strategy.priceSourceDiffKeeper()
+    assert snapshot['priceSourceDiffUser'] == strategy.priceSourceDiffUser()
+    assert snapshot['doPriceCheck'] == strategy.doPriceCheck()
+    assert snapshot['isPaused'] == strategy.isPaused()
+    return snapshot
+
+
+def test_snapshot_matches_views(chain, deployed_vault, strategy, lens, gov, lp_token, lp_whale, lp_price):
+    assert_snapshot_matches_views(lens, strategy)
+
+    # accrue some rewards and move the debt ratio away from the target
+    advance_chain(chain, 3600)
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    strategy.setDebtThresholds(9800, 10200, 5000, {'from': gov})
+    snapshot = assert_snapshot_matches_views(lens, strategy)
+    assert pytest.approx(9500, rel=1e-3) == snapshot['debtRatio']
+
+
+def test_snapshot_before_deploy(vault, strategy, lens):
+    # the ratio views revert on an empty strategy, the snapshot reports 0
+    snapshot = lens.getPositionSnapshot(strategy).dict()
+    assert snapshot['estimatedTotalAssets'] == 0
+    assert snapshot['debtRatio'] == 0
+    assert snapshot['collateral'] == 0
+    assert snapshot['lpPrice'] == strategy.getLpPrice()
+
+
+def test_snapshot_without_grail_manager(vault, deploy_strategy, lens):
+    # keepers and indexers may read a strategy before setGrailManager()
+    new_strategy = deploy_strategy(vault)
+    snapshot = lens.getPositionSnapshot(new_strategy).dict()
+    assert snapshot['balancePendingHarvest'] == 0
+    assert snapshot['estimatedTotalAssets'] == 0
+    assert new_strategy.balancePendingHarvest() == 0
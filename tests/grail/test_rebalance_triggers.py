@@ -0,0 +1,70 @@
+import brownie
+import pytest
+
+READY, PAUSED, NOT_DEPLOYED, IN_RANGE, PRICE_SOURCE_DIFF = range(5)
+
+
+def test_triggers_before_deploy(vault, strategy, lens):
+    assert lens.rebalanceDebtTrigger(strategy) == NOT_DEPLOYED
+    assert lens.rebalanceCollateralTrigger(strategy) == NOT_DEPLOYED
+
+
+def test_triggers_in_range(deployed_vault, strategy, gov, lens):
+    assert lens.rebalanceDebtTrigger(strategy) == IN_RANGE
+    assert lens.rebalanceCollateralTrigger(strategy) == IN_RANGE
+    with brownie.reverts():
+        strategy.rebalanceDebt({'from': gov})
+    with brownie.reverts():
+        strategy.rebalanceCollateral({'from': gov})
+
+
+def test_debt_trigger(deployed_vault, strategy, gov, lp_token, lp_whale, lp_price, lens):
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    assert lens.rebalanceDebtTrigger(strategy) == READY
+
+    # the keeper price check fails however far the prices are apart
+    strategy.setSlippageConfig(9900, 200, 0, True, {'from': gov})
+    assert lens.rebalanceDebtTrigger(strategy) == PRICE_SOURCE_DIFF
+    with brownie.reverts():
+        strategy.rebalanceDebt({'from': gov})
+
+    strategy.setSlippageConfig(9900, 200, 0, False, {'from': gov})
+    assert lens.rebalanceDebtTrigger(strategy) == READY
+    strategy.rebalanceDebt({'from': gov})
+    assert pytest.approx(10000, rel=1e-3) == strategy.calcDebtRatio()
+    assert lens.rebalanceDebtTrigger(strategy) == IN_RANGE
+
+
+def test_collateral_trigger(deployed_vault, strategy, gov, lens):
+    target = 2000
+    strategy.setCollateralThresholds(target-500, target, target+500, 7500, {'from': gov})
+    assert lens.rebalanceCollateralTrigger(strategy) == READY
+
+    strategy.setSlippageConfig(9900, 200, 0, True, {'from': gov})
+    assert lens.rebalanceCollateralTrigger(strategy) == PRICE_SOURCE_DIFF
+    with brownie.reverts():
+        strategy.rebalanceCollateral({'from': gov})
+
+    strategy.setSlippageConfig(9900, 200, 500, True, {'from': gov})
+    strategy.rebalanceCollateral({'from': gov})
+    assert pytest.approx(target, rel=1e-2) == strategy.calcCollateral()
+    assert lens.rebalanceCollateralTrigger(strategy) == IN_RANGE
+
+
+def test_triggers_paused(deployed_vault, strategy, gov, lens):
+    strategy.pauseStrat({'from': gov})
+    assert lens.rebalanceDebtTrigger(strategy) == PAUSED
+    assert lens.rebalanceCollateralTrigger(strategy) == PAUSED
+
+
+def test_strategy_trigger_views(deployed_vault, strategy, lp_token, lp_whale, lp_price):
+    assert strategy.debtInRange() and strategy.collateralInRange()
+    assert strategy.priceSourceOk(strategy.priceSourceDiffKeeper())
+    # the ratio has to be strictly within the difference
+    assert not strategy.priceSourceOk(0)
+
+    sendAmount = round(strategy.balanceLp() * (1/.95 - 1) / lp_price)
+    lp_token.transfer(strategy, sendAmount, {'from': lp_whale})
+    assert not strategy.debtInRange()
+    assert strategy.collateralInRange()
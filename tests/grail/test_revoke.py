@@ -1,4 +1,5 @@
 import pytest
+from tests.helper import advance_chain
 
 
 def test_revoke_strategy_from_vault(
@@ -7,12 +8,12 @@ def test_revoke_strategy_from_vault(
     # Deposit to the vault and harvest
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     vault.revokeStrategy(strategy.address, {"from": gov})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(token.balanceOf(vault.address), rel=RELATIVE_APPROX) == amount
 
@@ -23,11 +24,11 @@ def test_revoke_strategy_from_strategy(
     # Deposit to the vault and harvest
     token.approve(vault.address, amount, {"from": user})
     vault.deposit(amount, {"from": user})
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     strategy.setEmergencyExit()
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     assert pytest.approx(token.balanceOf(vault.address), rel=RELATIVE_APPROX) == amount
@@ -1,8 +1,9 @@
 # TODO: Add tests that show proper operation of this strategy through "emergencyExit"
 #       Make sure to demonstrate the "worst case losses" as well as the time it takes
 
-from brownie import ZERO_ADDRESS
+from brownie import ZERO_ADDRESS, accounts, interface
 import pytest
+from tests.helper import advance_chain
 
 
 def test_vault_shutdown_can_withdraw(
@@ -17,11 +18,10 @@ def test_vault_shutdown_can_withdraw(
         token.transfer(ZERO_ADDRESS, token.balanceOf(user), {"from": user})
 
     # Harvest 1: Send funds through the strategy
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
     debt_before = strategy.balanceDebt()
-    chain.sleep(3600 * 7)
-    chain.mine(1)
+    advance_chain(chain, 3600 * 7)
     delta_debt = strategy.balanceDebt() - debt_before
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount - delta_debt
 
@@ -43,19 +43,17 @@ def test_basic_shutdown(
     assert token.balanceOf(vault.address) == amount
 
     # Harvest 1: Send funds through the strategy
-    chain.sleep(1)
+    advance_chain(chain)
     strategy.harvest()
-    chain.mine(100)
+    advance_chain(chain, 100, 100)
     assert pytest.approx(strategy.estimatedTotalAssets(), rel=RELATIVE_APPROX) == amount
 
     ## Earn interest
-    chain.sleep(3600 * 24 * 1)  ## Sleep 1 day
-    chain.mine(1)
+    advance_chain(chain, 3600 * 24 * 1)  ## Sleep 1 day
 
     # Harvest 2: Realize profit
     strategy.harvest()
-    chain.sleep(3600 * 6)  # 6 hrs needed for profits to unlock
-    chain.mine(1)
+    advance_chain(chain, 3600 * 6)  # 6 hrs needed for profits to unlock
 
     ## Set emergency
     strategy.setEmergencyExit({"from": strategist})
@@ -64,4 +62,25 @@ def test_basic_shutdown(
 
     dust = amount*0.00001
     assert strategy.estimatedTotalAssets() < dust ## the strat shouldn't have more than some dust 
-    assert pytest.approx(token.balanceOf(vault),rel=1e-3) == amount
\ No newline at end of file
+    assert pytest.approx(token.balanceOf(vault),rel=1e-3) == amount
+
+
+def test_shutdown_with_dust_debt(deployed_vault, token, vault, strategy, strategist, keeper, conf, RELATIVE_APPROX):
+    # Everything lent, then leave a few wei of debt with nothing to repay it
+    strategy.pauseStrat({'from': keeper})
+    totalAssets = strategy.estimatedTotalAssets()
+    vaultBalance = token.balanceOf(vault)
+    pool = interface.IPool(interface.IPoolAddressesProvider(conf['pool_address_provider']).getPool())
+    short = interface.IERC20(strategy.short())
+    auth = accounts.at(strategy, True)
+    pool.borrow(short, 10, 2, 0, strategy, {'from': auth})
+    short.transfer(strategist, short.balanceOf(strategy), {'from': auth})
+    assert strategy.balanceDebtInShort() > 0 and strategy.balanceOfWant() == 0
+
+    # A sliver of the lend buys the dust back, it isn't worth a flash loan
+    strategy.setEmergencyExit({"from": strategist})
+    tx = strategy.harvest()
+    assert "FlashLoan" not in tx.events
+    assert strategy.balanceDebtInShort() == 0
+    assert strategy.estimatedTotalAssets() < 10
+    assert pytest.approx(token.balanceOf(vault) - vaultBalance, rel=RELATIVE_APPROX) == totalAssets
@@ -0,0 +1,140 @@
+import brownie
+import pytest
+from tests.helper import advance_chain
+
+READY, PAUSED = range(2)
+
+
+def run_unwind(strategy, keeper, max_steps=20):
+    steps = 0
+    while strategy.unwindLpPerStep() > 0:
+        assert steps < max_steps
+        strategy.unwindStep({'from': keeper})
+        steps += 1
+    return steps
+
+
+def test_chunked_unwind(chain, deployed_vault, strategy, lens, keeper, gov, RELATIVE_APPROX):
+    totalAssets = strategy.estimatedTotalAssets()
+    lp = strategy.balanceLp()
+
+    strategy.startUnwind(2500, {'from': keeper})
+    assert strategy.isPaused()
+    assert lens.rebalanceDebtTrigger(strategy) == PAUSED
+    # nothing is unwound until the first step
+    assert strategy.balanceLp() == lp
+
+    debtRatio = strategy.calcDebtRatio()
+    tx = strategy.unwindStep({'from': keeper})
+    assert pytest.approx(strategy.balanceLp(), rel=1e-2) == lp * 0.75
+    assert pytest.approx(strategy.calcDebtRatio(), abs=50) == debtRatio
+    assert tx.events['UnwindStep']['lpRemaining'] > 0
+
+    # four chunks of a quarter, the last one unwinds the rest
+    assert run_unwind(strategy, keeper) == 3
+    assert strategy.balanceLp() == 0
+    assert strategy.balanceDebt() == 0
+    assert strategy.balanceOfWant() == 0
+    assert pytest.approx(strategy.balanceLend(), rel=RELATIVE_APPROX) == totalAssets
+
+    # back to a regular pause
+    with brownie.reverts():
+        strategy.unwindStep({'from': keeper})
+    strategy.unpauseStrat({'from': keeper})
+    assert pytest.approx(strategy.calcDebtRatio(), rel=1e-3) == 10000
+
+
+def test_unwind_validation(deployed_vault, strategy, keeper, user):
+    with brownie.reverts():
+        strategy.startUnwind(2500, {'from': user})
+    with brownie.reverts():
+        strategy.startUnwind(0, {'from': keeper})
+    with brownie.reverts():
+        strategy.startUnwind(10001, {'from': keeper})
+    with brownie.reverts():
+        strategy.unwindStep({'from': keeper})
+
+    strategy.startUnwind(2500, {'from': keeper})
+    with brownie.reverts():
+        strategy.startUnwind(2500, {'from': keeper})
+    with brownie.reverts():
+        strategy.pauseStrat({'from': keeper})
+    with brownie.reverts():
+        strategy.unpauseStrat({'from': keeper})
+    with brownie.reverts():
+        strategy.unwindStep({'from': user})
+
+
+def test_cancel_unwind(deployed_vault, strategy, lens, keeper, gov, user):
+    strategy.startUnwind(2500, {'from': keeper})
+    strategy.unwindStep({'from': keeper})
+    with brownie.reverts():
+        strategy.cancelUnwind({'from': user})
+    with brownie.reverts():
+        strategy.cancelUnwind({'from': keeper})
+
+    strategy.cancelUnwind({'from': gov})
+    assert strategy.unwindLpPerStep() == 0
+    assert not strategy.isPaused()
+    with brownie.reverts():
+        strategy.cancelUnwind({'from': gov})
+
+    # a quarter of the debt was repaid and its want lent, the keeper borrows it back
+    target = strategy.collatTarget()
+    assert strategy.calcCollateral() < strategy.collatLower()
+    assert lens.rebalanceCollateralTrigger(strategy) == READY
+    strategy.rebalanceCollateral({'from': keeper})
+    assert pytest.approx(strategy.calcCollateral(), rel=1e-2) == target
+
+
+def test_withdraw_during_unwind(chain, token, vault, strategy, user, gov, keeper, amount):
+    token.approve(vault.address, amount, {"from": user})
+    vault.deposit(amount, {"from": user})
+    vault.updateStrategyDebtRatio(strategy.address, 100_00, {"from": gov})
+    advance_chain(chain)
+    strategy.harvest()
+
+    strategy.startUnwind(2500, {'from': keeper})
+    strategy.unwindStep({'from': keeper})
+    lp = strategy.balanceLp()
+
+    # the debt left still needs the lend as collateral, the withdrawal unwinds its share
+    balBefore = token.balanceOf(user)
+    vault.withdraw(int(amount * 0.1), user, 100, {'from': user})
+    assert pytest.approx(token.balanceOf(user) - balBefore, rel=2e-3) == int(amount * 0.1)
+    assert strategy.balanceLp() < lp
+
+    run_unwind(strategy, keeper)
+    assert strategy.balanceDebt() == 0
+
+
+def test_emergency_exit_during_unwind(chain, token, vault, deployed_vault, strategy, strategist, keeper):
+    strategy.startUnwind(2500, {'from': keeper})
+    strategy.unwindStep({'from': keeper})
+
+    strategy.setEmergencyExit({"from": strategist})
+    strategy.harvest()
+    assert strategy.estimatedTotalAssets() < 10
+
+    # liquidating everything ends the unwind, the strategy can be unpaused
+    assert strategy.unwindLpPerStep() == 0
+    with brownie.reverts():
+        strategy.unwindStep({'from': keeper})
+    strategy.unpauseStrat({'from': keeper})
+    assert not strategy.isPaused()
+
+
+def test_migration_during_unwind(chain, token, vault, deployed_vault, strategy, deploy_strategy, deploy_grail_manager, strategist, gov, keeper, RELATIVE_APPROX):
+    totalAssets = strategy.estimatedTotalAssets()
+    strategy.startUnwind(2500, {'from': keeper})
+    strategy.unwindStep({'from': keeper})
+
+    new_strategy = deploy_strategy(vault)
+    new_strategy.setGrailManager(deploy_grail_manager(new_strategy, strategist), {'from': strategist})
+    vault.migrateStrategy(strategy, new_strategy, {"from": gov})
+    assert pytest.approx(new_strategy.estimatedTotalAssets(), rel=2e-3) == totalAssets
+
+    assert strategy.unwindLpPerStep() == 0
+    with brownie.reverts():
+        strategy.unwindStep({'from': keeper})
+    strategy.unpauseStrat({'from': keeper})
@@ -1,3 +1,7 @@
+import ast
+import re
+
+
 def encode_function_data(initializer=None, *args):
     """Encodes the function call so we can work with an initializer.
 
@@ -17,3 +21,74 @@ def encode_function_data(initializer=None, *args):
     if initializer: return initializer.encode_input(*args)
 
     return b''
+
+
+def advance_chain(chain, seconds=1, blocks=1):
+    """Moves the chain forward in time and height in one step.
+
+    Blocks are mined with explicit timestamps counted from the latest block
+    rather than the wall clock, so the result is the same on every run. The
+    last block lands `seconds` after the current head and the others are
+    spread evenly before it.
+
+    Args:
+        chain ([brownie.network.state.Chain]):
+        The chain to advance.
+
+        seconds (int, optional):
+        How far to move the block timestamp. Defaults to 1.
+
+        blocks (int, optional):
+        How many blocks to mine, at most one per second. Defaults to 1.
+
+    Returns:
+        [int]: The timestamp of the last mined block.
+    """
+    if blocks < 1 or seconds < blocks:
+        raise ValueError("mine at least one block and at most one block per second")
+
+    head = chain[-1].timestamp
+    for i in range(1, blocks + 1):
+        chain.mine(timestamp=head + seconds * i // blocks)
+    return head + seconds
+
+
+def pin_fork_block(networks, block, chainid):
+    """Makes every network forking chain `chainid` in `networks` fork from `block`.
+
+    Forks of other chains are left alone, `block` would mean nothing there.
+    Ganache takes the block as a `@block` suffix on the fork url, so network
+    ids such as `arbitrum-main` are resolved to their host here, the same way
+    brownie resolves them when connecting. Anvil and hardhat take the block
+    as a separate setting.
+
+    Args:
+        networks (dict):
+        The network configs by id, as in `brownie._config.CONFIG.networks`.
+
+        block (int):
+        The block to fork from.
+
+        chainid (int):
+        The chain whose forks are pinned.
+    """
+    for network in networks.values():
+        settings = network.get("cmd_settings")
+        if not isinstance(settings, dict) or "fork" not in settings:
+            continue
+        fork = settings["fork"]
+        # forks of a network id take its chain id, forks of a url have to set their own
+        source = networks.get(fork, network)
+        if str(source.get("chainid")) != str(chainid):
+            continue
+        if "anvil" in network["cmd"] or "hardhat" in network["cmd"]:
+            settings["fork_block"] = block
+            continue
+
+        if fork in networks:
+            network.setdefault("chainid", networks[fork]["chainid"])
+            settings.setdefault("chain_id", int(networks[fork]["chainid"]))
+            if "explorer" in networks[fork]:
+                network.setdefault("explorer", networks[fork]["explorer"])
+            fork = networks[fork]["host"]
+        settings["fork"] = f"{re.sub(r'@[0-9]+$', '', fork)}@{block}"
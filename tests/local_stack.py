@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+from brownie import (
+    ZERO_ADDRESS,
+    MockAaveOracle,
+    MockAavePool,
+    MockAaveToken,
+    MockCamelotPair,
+    MockCamelotRouter,
+    MockERC20,
+    MockNFTPool,
+    MockPoolAddressesProvider,
+    MockXGrail,
+    MockYieldBooster,
+)
+
+WETH_PRICE = 1800
+GRAIL_PRICE = 3000
+
+# Pair reserves, denominated in USDC
+LP_WANT_RESERVE = 20_000_000
+GRAIL_WANT_RESERVE = 3_000_000
+
+# Liquidity supplied to the lending pool so strategies can borrow
+AAVE_WANT_LIQUIDITY = 100_000_000
+AAVE_SHORT_LIQUIDITY = 100_000
+
+# Whale balances left after seeding the pools
+WHALE_WANT = 1_000_000_000
+WHALE_SHORT = 1_000_000
+WHALE_GRAIL = 100_000
+
+GRAIL_REWARDS_PER_SECOND = 10 ** 12
+USDC_LTV = (8000, 8500)
+WETH_LTV = (8000, 8250)
+
+
+def deploy_local_stack(deployer):
+    """Deploys mocks of every protocol USDCWETHGRAIL integrates with.
+
+    The stack mirrors the Arbitrum deployment used by the fork tests: USDC and
+    WETH, the Camelot USDC/WETH and GRAIL/USDC pairs behind a router, an Aave
+    v3 pool with its addresses provider and oracle, and the Camelot NFTPool,
+    xGRAIL and yieldBooster. Pools are seeded from `deployer`, which is also
+    used as the whale for every token.
+
+    Args:
+        deployer ([brownie.network.account.Account]):
+        Deploys, owns and funds the stack.
+
+    Returns:
+        [SimpleNamespace]: The deployed contracts, plus `conf` in the format of
+        the `CONFIG` entries in tests/grail/conftest.py and `strategy_config`,
+        the CoreStrategyAaveConfig for MockGrailStrategy.
+    """
+    tx = {"from": deployer}
+
+    usdc = MockERC20.deploy("USD Coin (Arb1)", "USDC", 6, tx)
+    weth = MockERC20.deploy("Wrapped Ether", "WETH", 18, tx)
+    grail = MockERC20.deploy("Camelot token", "GRAIL", 18, tx)
+    usdc.mint(deployer, (WHALE_WANT + LP_WANT_RESERVE + GRAIL_WANT_RESERVE + AAVE_WANT_LIQUIDITY) * 10 ** 6, tx)
+    weth.mint(deployer, (WHALE_SHORT + AAVE_SHORT_LIQUIDITY) * 10 ** 18 + LP_WANT_RESERVE * 10 ** 18 // WETH_PRICE, tx)
+    grail.mint(deployer, WHALE_GRAIL * 10 ** 18 + GRAIL_WANT_RESERVE * 10 ** 18 // GRAIL_PRICE, tx)
+
+    # Camelot
+    router = MockCamelotRouter.deploy(weth, tx)
+    router.createPair(usdc, weth, tx)
+    router.createPair(grail, usdc, tx)
+    lp_token = MockCamelotPair.at(router.getPair(usdc, weth))
+    usdc.approve(router, 2 ** 256 - 1, tx)
+    weth.approve(router, 2 ** 256 - 1, tx)
+    grail.approve(router, 2 ** 256 - 1, tx)
+    router.addLiquidity(
+        usdc, weth, LP_WANT_RESERVE * 10 ** 6, LP_WANT_RESERVE * 10 ** 18 // WETH_PRICE, 0, 0, deployer, 2 ** 256 - 1, tx
+    )
+    router.addLiquidity(
+        grail, usdc, GRAIL_WANT_RESERVE * 10 ** 18 // GRAIL_PRICE, GRAIL_WANT_RESERVE * 10 ** 6, 0, 0, deployer, 2 ** 256 - 1, tx
+    )
+
+    x_grail = MockXGrail.deploy(tx)
+    yield_booster = MockYieldBooster.deploy(x_grail, tx)
+    nft_pool = MockNFTPool.deploy(lp_token, grail, x_grail, tx)
+    nft_pool.setRewardsPerSecond(GRAIL_REWARDS_PER_SECOND, tx)
+
+    # Aave
+    provider = MockPoolAddressesProvider.deploy(deployer, tx)
+    pool = MockAavePool.deploy(provider, tx)
+    provider.setPoolImpl(pool, tx)
+    oracle = MockAaveOracle.deploy(ZERO_ADDRESS, tx)
+    oracle.setAssetPrice(usdc, 10 ** 8, tx)
+    oracle.setAssetPrice(weth, WETH_PRICE * 10 ** 8, tx)
+    provider.setPriceOracle(oracle, tx)
+
+    a_usdc = MockAaveToken.deploy(pool, usdc, 6, True, "Aave Arbitrum USDC", "aArbUSDC", tx)
+    debt_usdc = MockAaveToken.deploy(pool, usdc, 6, False, "Aave Arbitrum Variable Debt USDC", "variableDebtArbUSDC", tx)
+    a_weth = MockAaveToken.deploy(pool, weth, 18, True, "Aave Arbitrum WETH", "aArbWETH", tx)
+    debt_weth = MockAaveToken.deploy(pool, weth, 18, False, "Aave Arbitrum Variable Debt WETH", "variableDebtArbWETH", tx)
+    pool.initReserve(usdc, a_usdc, debt_usdc, *USDC_LTV, tx)
+    pool.initReserve(weth, a_weth, debt_weth, *WETH_LTV, tx)
+    usdc.approve(pool, 2 ** 256 - 1, tx)
+    weth.approve(pool, 2 ** 256 - 1, tx)
+    pool.supply(usdc, AAVE_WANT_LIQUIDITY * 10 ** 6, deployer, 0, tx)
+    pool.supply(weth, AAVE_SHORT_LIQUIDITY * 10 ** 18, deployer, 0, tx)
+
+    conf = {
+        'token': usdc.address,
+        'whale': deployer.address,
+        'shortWhale': deployer.address,
+        'deposit': 1e6,
+        'harvest_token': grail.address,
+        'harvest_token_price': GRAIL_PRICE * 1e-12,
+        'harvest_token_whale': deployer.address,
+        'lp_token': lp_token.address,
+        'lp_whale': deployer.address,
+        'lp_farm': nft_pool.address,
+        'pid': 0,
+        'router': router.address,
+        'xGrail': x_grail.address,
+        'yieldBooster': yield_booster.address,
+        'pool_address_provider': provider.address,
+    }
+    strategy_config = [usdc, weth, lp_token, a_usdc, debt_weth, provider, router, 1e4]
+
+    return SimpleNamespace(
+        usdc=usdc,
+        weth=weth,
+        grail=grail,
+        router=router,
+        lp_token=lp_token,
+        x_grail=x_grail,
+        yield_booster=yield_booster,
+        nft_pool=nft_pool,
+        provider=provider,
+        pool=pool,
+        oracle=oracle,
+        conf=conf,
+        strategy_config=strategy_config,
+    )
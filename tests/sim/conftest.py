@@ -0,0 +1,9 @@
+import pytest
+
+
+# Brownie's xdist workers drop the whole run unless every test uses
+# module_isolation. The sim tests never touch the chain, so they opt in
+# without resetting it, serial or parallel alike.
+@pytest.fixture(scope="module", autouse=True)
+def module_isolation():
+    yield
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from neutra.sim import get_amount_out as float_amount_out
+from neutra.sim.camelot import (
+    LpState,
+    convert_short_to_want_lp,
+    get_amount_in,
+    get_amount_out,
+    swap_exact_short_want,
+    swap_exact_want_short,
+    swap_want_short_exact,
+)
+
+FEE_DENOMINATOR = 100_000
+WANT = 20_000_000 * 10 ** 6
+SHORT = 20_000_000 * 10 ** 18 // 1800
+
+
+def amount_out_reference(amount_in, reserve_in, reserve_out, fee):
+    # MockCamelotPair.getAmountOut, transcribed line by line
+    amount_in_with_fee = amount_in * (FEE_DENOMINATOR - fee)
+    return amount_in_with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+def amount_in_reference(amount_out, reserve_in, reserve_out, fee):
+    # CamelotPairSwap.getAmountIn
+    numerator = reserve_in * amount_out * FEE_DENOMINATOR
+    denominator = (reserve_out - amount_out) * (FEE_DENOMINATOR - fee)
+    return numerator // denominator + 1
+
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    want = [int(x) * 10 ** 6 for x in rng.integers(10_000, 10 ** 9, n)]
+    price = rng.uniform(500, 5000, n)
+    short = [w * 10 ** 12 * 10 ** 6 // int(p * 10 ** 6) for w, p in zip(want, price)]
+    fees = [int(x) for x in rng.integers(0, 2000, n)]
+    return want, short, fees
+
+
+def test_scalar_quotes_are_ints():
+    state = LpState(WANT, SHORT, 300, 200)
+    quote = swap_exact_want_short(10 ** 10, state)
+    assert type(quote.amount_out) is int
+    assert type(quote.slippage_want) is int
+    assert quote.reverted is False
+    assert type(convert_short_to_want_lp(10 ** 18, state)) is int
+
+
+def test_matches_reference_exactly():
+    want, short, fees = random_states(200)
+    amounts = [w // int(d) for w, d in zip(want, np.random.default_rng(1).integers(2, 10 ** 6, 200))]
+    out = get_amount_out(amounts, want, short, fees)
+    assert list(out) == [amount_out_reference(a, w, s, f) for a, w, s, f in zip(amounts, want, short, fees)]
+
+    state = LpState(np.array(want, dtype=object), np.array(short, dtype=object), np.array(fees, dtype=object))
+    targets = [s // 1000 for s in short]
+    amount_in, reverted = get_amount_in(targets, state)
+    assert not reverted.any()
+    assert list(amount_in) == [amount_in_reference(t, w, s, f) for t, w, s, f in zip(targets, want, short, fees)]
+
+
+def test_no_overflow_at_uint112_reserves():
+    reserve = 2 ** 112 - 1
+    amount = 2 ** 100
+    assert get_amount_out(amount, reserve, reserve, 300) == amount_out_reference(amount, reserve, reserve, 300)
+
+
+def test_amount_in_buys_amount_out():
+    state = LpState(WANT, SHORT, 300, 200)
+    for amount_out in [10 ** 12, 10 ** 15, 10 ** 18, 10 ** 21]:
+        amount_in, reverted = get_amount_in(amount_out, state)
+        assert not reverted
+        assert get_amount_out(amount_in, WANT, SHORT, 300) >= amount_out
+        assert get_amount_out(amount_in - 2, WANT, SHORT, 300) < amount_out
+
+
+def test_vector_matches_scalar():
+    state = LpState(WANT, SHORT, 300, 200)
+    sizes = [10 ** 6, 10 ** 9, 10 ** 12, 10 ** 13]
+    batch = swap_exact_want_short(sizes, state)
+    for i, size in enumerate(sizes):
+        single = swap_exact_want_short(size, state)
+        assert single.amount_out == batch.amount_out[i]
+        assert single.slippage_want == batch.slippage_want[i]
+        assert single.reverted == batch.reverted[i]
+        assert single.state.short == batch.state.short[i]
+
+
+def test_grid_of_sizes_and_states():
+    want, short, fees = random_states(50)
+    state = LpState(np.array(want, dtype=object)[:, None], np.array(short, dtype=object)[:, None], 300, 300)
+    sizes = np.array([10 ** 9, 10 ** 18, 10 ** 20], dtype=object)[None, :]
+    quote = swap_exact_short_want(sizes, state)
+    assert quote.amount_out.shape == (50, 3)
+    assert quote.state.want.shape == (50, 3)
+
+
+def test_matches_float_pool():
+    state = LpState(WANT, SHORT, 300, 300)
+    amount = 10 ** 11
+    quote = swap_exact_want_short(amount, state)
+    assert pytest.approx(float_amount_out(amount / 1e6, WANT / 1e6, SHORT / 1e18, 300), rel=1e-9) == quote.amount_out / 1e18
+    # sell back: the round trip loses roughly the fees plus price impact
+    back = swap_exact_short_want(quote.amount_out, quote.state)
+    assert back.amount_out < amount
+    assert pytest.approx(amount * (1 - 0.006), rel=2e-3) == back.amount_out
+
+
+def test_slippage_limit_reverts():
+    state = LpState(WANT, SHORT, 300, 300)
+    small, large = swap_exact_want_short([10 ** 9, WANT // 10], state).reverted
+    assert not small
+    assert large
+    assert not swap_exact_want_short(WANT // 10, state, slippage_adj=5000).reverted
+
+
+def test_want_short_exact():
+    state = LpState(WANT, SHORT, 300, 200)
+    quote = swap_want_short_exact(10 ** 18, state)
+    assert not quote.reverted
+    assert quote.amount_out == 10 ** 18
+    assert quote.slippage_want == quote.amount_in - convert_short_to_want_lp(10 ** 18, state)
+    # the pair's K check holds with exactly amount_in sent
+    want_adjusted = quote.state.want * FEE_DENOMINATOR - quote.amount_in * 300
+    assert want_adjusted * quote.state.short * FEE_DENOMINATOR >= WANT * SHORT * FEE_DENOMINATOR ** 2
+    assert swap_want_short_exact(0, state).amount_in == 0
+    assert not swap_want_short_exact(0, state).reverted
+
+    amount_in, reverted = get_amount_in([0, SHORT, SHORT + 1], state)
+    assert reverted.all()
@@ -0,0 +1,184 @@
+from pathlib import Path
+
+import pytest
+import yaml
+from eth_utils import keccak
+
+from neutra.deploy import (
+    DROPPED,
+    MINED,
+    PENDING,
+    REVERTED,
+    Calldata,
+    DeployError,
+    Deployment,
+    Manifest,
+    Ref,
+    Step,
+    create_address,
+    encode_calldata,
+    grail_steps,
+    waves,
+)
+
+DEPLOYER = "0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0"
+CONFIG = Path(__file__).parents[2] / "deployments" / "usdc-weth-grail.yml"
+
+
+class FakeChain:
+    """Backend mining everything sent at the next `status` poll.
+
+    `drop` and `revert` name steps whose first transaction is dropped or
+    reverts, `fail_after` interrupts the run after that many sends.
+    """
+
+    def __init__(self, drop=(), revert=(), fail_after=None):
+        self.sender = DEPLOYER
+        self.count = 0
+        self.mempool = {}
+        self.mined = {}
+        self.sent = []
+        self.drop = set(drop)
+        self.revert = set(revert)
+        self.fail_after = fail_after
+
+    def nonce(self, pending=True):
+        return self.count + (len(self.mempool) if pending else 0)
+
+    def send(self, step, target, args, nonce):
+        if self.fail_after is not None and len(self.sent) == self.fail_after:
+            raise KeyboardInterrupt
+        assert nonce not in [n for n, _ in self.mined.values()]
+        tx_hash = "0x%064x" % len(self.sent)
+        self.sent.append((step.name, target, args, nonce))
+        if step.name in self.drop:
+            self.drop.discard(step.name)
+        else:
+            self.mempool[tx_hash] = (nonce, step.name)
+        return tx_hash
+
+    def status(self, tx_hash):
+        for pending_hash, (nonce, name) in sorted(self.mempool.items(), key=lambda item: item[1][0]):
+            if nonce != self.count:
+                break
+            del self.mempool[pending_hash]
+            self.mined[pending_hash] = (nonce, REVERTED if name in self.revert else MINED)
+            self.count += 1
+        if tx_hash in self.mined:
+            return self.mined[tx_hash][1]
+        return PENDING if tx_hash in self.mempool else DROPPED
+
+
+def load_config():
+    return yaml.safe_load(CONFIG.read_text())
+
+
+def run(tmp_path, chain, steps=None):
+    steps = grail_steps(load_config(), DEPLOYER) if steps is None else steps
+    manifest = Manifest.load(tmp_path / "manifest.json", "arbitrum-main")
+    return Deployment(steps, manifest, chain, poll_interval=0, timeout=1, log=lambda msg: None).run()
+
+
+def test_create_address():
+    assert create_address(DEPLOYER, 0).lower() == "0xcd234a471b72ba2f1ccf0a70fcaba648a5eecd8d"
+    assert create_address(DEPLOYER, 1).lower() == "0x343c43a37d37dff08ae8c4a11544c718abb4fcf8"
+
+
+def test_encode_calldata():
+    data = encode_calldata("initialize(address,(address,address))", ("0x" + "11" * 20, ("0x" + "22" * 20, "0x" + "33" * 20)))
+    assert data[:4] == keccak(text="initialize(address,(address,address))")[:4]
+    assert data[4:] == bytes(12) + b"\x11" * 20 + bytes(12) + b"\x22" * 20 + bytes(12) + b"\x33" * 20
+
+
+def test_waves():
+    steps = grail_steps(load_config(), DEPLOYER)
+    names = [[step.name for step in wave] for wave in waves(steps)]
+    assert names == [
+        ["vault", "grail_manager_implementation", "health_check"],
+        ["vault_initialize"],
+        ["strategy"],
+        ["grail_manager_implementation_initialize", "grail_manager", "insurance", "set_health_check", "set_min_report_delay"],
+        ["set_grail_manager", "set_insurance"],
+    ]
+    with pytest.raises(ValueError):
+        waves([Step("a", "A", "f", Ref("b")), Step("b", "B")])
+
+
+def test_existing_vault_and_health_check():
+    config = load_config()
+    config["vault"]["address"] = "0x" + "aa" * 20
+    config["health_check"] = "0x" + "bb" * 20
+    config["strategy_params"]["debt_thresholds"] = [9800, 10200, 5000]
+    steps = {step.name: step for step in grail_steps(config, DEPLOYER)}
+    assert "vault" not in steps and "health_check" not in steps
+    assert steps["strategy"].args == ("0x" + "aa" * 20,)
+    assert steps["strategy"].dependencies() == set()
+    assert steps["set_debt_thresholds"].args == (9800, 10200, 5000)
+
+
+def test_grail_swap_threshold():
+    config = load_config()
+    config["grail_manager"]["swap_threshold"] = 10 * 10 ** 6
+    steps = {step.name: step for step in grail_steps(config, DEPLOYER)}
+    assert steps["set_grail_swap_threshold"].target == Ref("grail_manager")
+    assert steps["set_grail_swap_threshold"].args == (10 * 10 ** 6,)
+    assert "set_grail_swap_threshold" not in {step.name for step in grail_steps(load_config(), DEPLOYER)}
+
+
+def test_deploys_in_one_pass(tmp_path):
+    chain = FakeChain()
+    addresses = run(tmp_path, chain)
+    assert [nonce for *_, nonce in chain.sent] == list(range(len(chain.sent)))
+    assert addresses["vault"] == create_address(DEPLOYER, 0)
+
+    sent = {name: (target, args) for name, target, args, _ in chain.sent}
+    assert sent["strategy"] == (None, (addresses["vault"],))
+    assert sent["set_insurance"] == (addresses["strategy"], (addresses["insurance"],))
+    implementation, initializer = sent["grail_manager"][1]
+    assert implementation == addresses["grail_manager_implementation"]
+    assert initializer[4:].endswith(bytes(12) + bytes.fromhex(load_config()["grail_manager"]["yield_booster"][2:]))
+
+    # nothing left to do on a second run
+    assert run(tmp_path, chain) == addresses
+    assert len(chain.sent) == len(addresses)
+
+
+def test_resumes_after_interrupt(tmp_path):
+    chain = FakeChain(fail_after=6)
+    with pytest.raises(KeyboardInterrupt):
+        run(tmp_path, chain)
+    # interrupted in the middle of a wave, its first step sent but never awaited
+    manifest = Manifest.load(tmp_path / "manifest.json")
+    assert [entry["status"] for entry in manifest.steps.values()] == [MINED] * 5 + [PENDING]
+
+    chain.fail_after = None
+    addresses = run(tmp_path, chain)
+    assert len(chain.sent) == len(addresses)
+    assert len({name for name, *_ in chain.sent}) == len(chain.sent)
+
+
+def test_dropped_step_is_resent_with_its_nonce(tmp_path):
+    chain = FakeChain(drop=["health_check"])
+    addresses = run(tmp_path, chain)
+    resent = [nonce for name, *_, nonce in chain.sent if name == "health_check"]
+    assert len(resent) == 2 and resent[0] == resent[1]
+    assert addresses["health_check"] == create_address(DEPLOYER, resent[0])
+
+
+def test_reverted_step_stops_the_deployment(tmp_path):
+    chain = FakeChain(revert=["vault_initialize"])
+    with pytest.raises(DeployError, match="vault_initialize"):
+        run(tmp_path, chain)
+    assert "strategy" not in Manifest.load(tmp_path / "manifest.json").steps
+    with pytest.raises(DeployError, match="reverted"):
+        run(tmp_path, chain)
+
+
+def test_manifest_checks_network_and_sender(tmp_path):
+    run(tmp_path, FakeChain(), [Step("a", "A"), Step("b", "B", "f", Ref("a"), (Calldata("f(uint256)", (1,)),))])
+    with pytest.raises(DeployError):
+        Manifest.load(tmp_path / "manifest.json", "mainnet")
+    other = FakeChain()
+    other.sender = "0x" + "12" * 20
+    with pytest.raises(DeployError):
+        run(tmp_path, other)
@@ -0,0 +1,33 @@
+from tests.helper import pin_fork_block
+
+
+def networks():
+    return {
+        "arbitrum-main": {"chainid": 42161, "host": "https://arb1.example"},
+        "mainnet": {"chainid": 1, "host": "https://eth.example"},
+        "arbitrum-main-fork": {"cmd": "ganache-cli", "cmd_settings": {"fork": "arbitrum-main"}},
+        "mainnet-fork": {"cmd": "ganache-cli", "cmd_settings": {"fork": "mainnet"}},
+        "arbitrum-anvil-fork": {"cmd": "anvil", "chainid": 42161, "cmd_settings": {"fork": "https://arb1.example"}},
+        "url-fork": {"cmd": "ganache-cli", "cmd_settings": {"fork": "https://eth.example@5"}},
+        "development": {"cmd": "ganache-cli", "cmd_settings": {"port": 8545}},
+    }
+
+
+def test_only_arbitrum_forks_are_pinned():
+    config = networks()
+    pin_fork_block(config, 70_000_000, 42161)
+
+    assert config["arbitrum-main-fork"]["cmd_settings"]["fork"] == "https://arb1.example@70000000"
+    assert config["arbitrum-main-fork"]["cmd_settings"]["chain_id"] == 42161
+    assert config["arbitrum-anvil-fork"]["cmd_settings"]["fork_block"] == 70_000_000
+    # other chains keep their settings
+    assert config["mainnet-fork"]["cmd_settings"] == {"fork": "mainnet"}
+    assert config["url-fork"]["cmd_settings"] == {"fork": "https://eth.example@5"}
+    assert config["development"]["cmd_settings"] == {"port": 8545}
+
+
+def test_pinning_again_replaces_the_block():
+    config = networks()
+    pin_fork_block(config, 1, 42161)
+    pin_fork_block(config, 2, 42161)
+    assert config["arbitrum-main-fork"]["cmd_settings"]["fork"] == "https://arb1.example@2"
@@ -0,0 +1,27 @@
+import json
+
+from tests.gas import GasBaseline
+
+
+def test_missing_baseline_fails(tmp_path):
+    path = str(tmp_path / "gas_baseline.json")
+    baseline = GasBaseline(path, "arbitrum-main-fork", 0.02)
+    assert "no baseline" in baseline.check("harvest[10k]", 1_000_000)
+    # checking never writes the file
+    baseline.save()
+    assert not (tmp_path / "gas_baseline.json").exists()
+
+
+def test_update_then_check(tmp_path):
+    path = str(tmp_path / "gas_baseline.json")
+    update = GasBaseline(path, "arbitrum-main-fork", 0.02, update=True)
+    assert update.check("harvest[10k]", 1_000_000) is None
+    update.save()
+    with open(path) as fp:
+        assert json.load(fp) == {"arbitrum-main-fork": {"harvest[10k]": 1_000_000}}
+
+    baseline = GasBaseline(path, "arbitrum-main-fork", 0.02)
+    assert baseline.check("harvest[10k]", 1_020_000) is None
+    assert "over its baseline" in baseline.check("harvest[10k]", 1_030_000)
+    # baselines are per network
+    assert "no baseline" in GasBaseline(path, "development", 0.02).check("harvest[10k]", 1)
@@ -0,0 +1,191 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from neutra.keeper import HARVEST, Keeper, RpcClient, encode_call, predict, predict_harvests
+from neutra.keeper.healthcheck import STRATEGY_VIEWS, HarvestInputs, predict_report
+from neutra.keeper.keeper import VIEWS
+
+DEBT = 1_000_000 * 10 ** 6
+SENDER = "0x" + "ee" * 20
+VAULT = "0x" + "a0" * 20
+HEALTH_CHECK = "0x" + "c0" * 20
+WANT = "0x" + "d0" * 20
+ZERO = "0x" + "00" * 20
+
+INPUTS = HarvestInputs(
+    address="0x" + "01" * 20,
+    block=100,
+    total_assets=DEBT,
+    pending_harvest=0,
+    total_debt=DEBT,
+    debt_outstanding=0,
+    emergency_exit=False,
+    insurance_balance=0,
+    loss_sum=0,
+    target_fund_size=50,
+    profit_take_rate=1000,
+    maximum_compensation_rate=5,
+    do_health_check=True,
+    health_check=HEALTH_CHECK,
+    custom_check=False,
+    profit_limit_ratio=300,
+    loss_limit_ratio=100,
+)
+
+
+@pytest.mark.parametrize("changes,report,passes", [
+    ({}, (0, 0, 0, 0), True),
+    # 1% profit, 10% of it to the insurance fund
+    ({"total_assets": DEBT * 101 // 100}, (DEBT // 100 * 9 // 10, 0, DEBT // 1000, 0), True),
+    ({"total_assets": DEBT + 4_000, "pending_harvest": DEBT * 3 // 100}, (27_000_003_600, 0, 3_000_000_400, 0), True),
+    # the fund is full, all of the profit is reported
+    ({"total_assets": DEBT * 104 // 100, "insurance_balance": DEBT}, (DEBT * 4 // 100, 0, 0, 0), False),
+    ({"total_assets": DEBT * 99 // 100}, (0, DEBT // 100, 0, 0), True),
+    ({"total_assets": DEBT * 98 // 100}, (0, DEBT * 2 // 100, 0, 0), False),
+    # prepareReturn zeroes the harvest rewards before netting them against a larger loss
+    ({"total_assets": DEBT * 98 // 100, "pending_harvest": DEBT * 15 // 1000}, (0, DEBT * 2 // 100, 0, 0), False),
+    ({"total_assets": DEBT * 99 // 100, "pending_harvest": DEBT * 3 // 100}, (DEBT * 18 // 1000, 0, DEBT * 2 // 1000, 0), True),
+    # compensation of 5 bps brings the loss under the limit
+    (
+        {"total_assets": DEBT * 9895 // 10_000, "insurance_balance": DEBT},
+        (0, DEBT * 100 // 10_000, 0, DEBT * 5 // 10_000),
+        True,
+    ),
+    # a pending lossSum keeps being paid on a profit
+    ({"total_assets": DEBT + 100, "loss_sum": 10 ** 9, "insurance_balance": DEBT}, (100 + 5 * 10 ** 8, 0, 0, 5 * 10 ** 8), True),
+    ({"total_assets": DEBT * 98 // 100, "profit_limit_ratio": 0, "loss_limit_ratio": 300}, (0, DEBT * 2 // 100, 0, 0), True),
+    ({"total_assets": DEBT * 98 // 100, "do_health_check": False}, (0, DEBT * 2 // 100, 0, 0), True),
+    ({"total_assets": DEBT * 98 // 100, "health_check": ZERO}, (0, DEBT * 2 // 100, 0, 0), True),
+    ({"total_assets": DEBT * 98 // 100, "custom_check": True}, (0, DEBT * 2 // 100, 0, 0), None),
+    # emergency exit reports against what is liquidated
+    ({"emergency_exit": True, "debt_outstanding": DEBT, "total_assets": DEBT * 98 // 100}, (0, DEBT * 2 // 100, 0, 0), False),
+])
+def test_predict(changes, report, passes):
+    inputs = replace(INPUTS, **changes)
+    assert predict_report(inputs) == report
+    assert predict(inputs).passes is passes
+
+
+def word(value):
+    if isinstance(value, str):
+        value = int(value, 16)
+    return int(value).to_bytes(32, "big").hex()
+
+
+class FakeNode:
+    """Serves the strategy, vault, insurance and health check views of a set of strategies."""
+
+    def __init__(self):
+        self.block = 100
+        self.calls = {}
+        self.requests = []
+        self.sent = []
+
+    def view(self, to, signature, *args, result):
+        self.calls[(to, encode_call(signature, *args))] = "0x" + "".join(map(word, result))
+
+    def add_strategy(self, address, inputs=INPUTS, limits=None, views=None):
+        insurance = "0x" + address[-2:] * 20
+        for name, signature in STRATEGY_VIEWS.items():
+            value = {
+                "vault": VAULT,
+                "insurance": insurance,
+                "health_check": inputs.health_check,
+                "want": WANT,
+                "do_health_check": inputs.do_health_check,
+                "emergency_exit": inputs.emergency_exit,
+            }.get(name, getattr(inputs, name, None))
+            self.view(address, signature, result=[value])
+        self.view(VAULT, "strategies(address)", address, result=[0, 0, 0, 0, 0, 0, inputs.total_debt, 0, 0])
+        self.view(VAULT, "debtOutstanding(address)", address, result=[inputs.debt_outstanding])
+        self.view(WANT, "balanceOf(address)", insurance, result=[inputs.insurance_balance])
+        self.view(insurance, "lossSum()", result=[inputs.loss_sum])
+        self.view(insurance, "targetFundSize()", result=[inputs.target_fund_size])
+        self.view(insurance, "profitTakeRate()", result=[inputs.profit_take_rate])
+        self.view(insurance, "maximumCompenstionRate()", result=[inputs.maximum_compensation_rate])
+        self.view(HEALTH_CHECK, "strategiesLimits(address)", address, result=limits or [0, 0, 0])
+        self.view(HEALTH_CHECK, "checks(address)", address, result=[ZERO])
+        for name, value in (views or {}).items():
+            call_cost = (0,) if name == "harvest_trigger" else ()
+            self.view(address, VIEWS[name], *call_cost, result=[value])
+
+    async def request(self, payload):
+        self.requests.append(payload)
+        return [{"jsonrpc": "2.0", "id": call["id"], **self._handle(call["method"], call["params"])} for call in payload]
+
+    def _handle(self, method, params):
+        if method == "eth_blockNumber":
+            return {"result": hex(self.block)}
+        if method == "eth_call":
+            result = self.calls.get((params[0]["to"], params[0]["data"]))
+            if result is None:
+                return {"error": {"code": -32000, "message": "execution reverted"}}
+            return {"result": result}
+        if method == "eth_sendTransaction":
+            self.sent.append(params[0]["to"])
+            return {"result": "0x%064x" % len(self.sent)}
+        if method == "eth_getTransactionReceipt":
+            return {"result": None}
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+
+def address(i):
+    return "0x%040x" % (i + 1)
+
+
+def test_reads_limits_and_balances():
+    node = FakeNode()
+    node.view(HEALTH_CHECK, "profitLimitRatio()", result=[300])
+    node.view(HEALTH_CHECK, "lossLimitRatio()", result=[100])
+    losing = replace(INPUTS, total_assets=DEBT * 98 // 100)
+    node.add_strategy(address(0), losing)
+    node.add_strategy(address(1), losing, limits=[300, 500, 1])
+    node.add_strategy(address(2), replace(losing, insurance_balance=DEBT, loss_sum=0))
+    node.add_strategy(address(3), replace(INPUTS, total_assets=DEBT * 104 // 100, insurance_balance=DEBT))
+    node.view(HEALTH_CHECK, "checks(address)", address(3), result=["0x" + "99" * 20])
+
+    predictions = asyncio.run(predict_harvests(RpcClient(node), [address(i) for i in range(5)]))
+    # address(4) has no views and is left out
+    assert [prediction.address for prediction in predictions] == [address(i) for i in range(4)]
+    assert [prediction.passes for prediction in predictions] == [False, True, False, None]
+    assert predictions[1].loss_limit == DEBT * 5 // 100
+    assert predictions[2].compensation == DEBT * 5 // 10_000
+    assert predictions[3].profit == DEBT * 4 // 100
+
+
+def test_two_batched_rounds():
+    node = FakeNode()
+    node.view(HEALTH_CHECK, "profitLimitRatio()", result=[300])
+    node.view(HEALTH_CHECK, "lossLimitRatio()", result=[100])
+    for i in range(40):
+        node.add_strategy(address(i))
+    client = RpcClient(node, max_batch_size=1_000)
+    predictions = asyncio.run(predict_harvests(client, [address(i) for i in range(40)], hex(node.block)))
+    assert len(predictions) == 40 and all(prediction.passes for prediction in predictions)
+    assert len(node.requests) == 2
+
+
+def test_keeper_holds_back_failing_harvests():
+    node = FakeNode()
+    node.view(HEALTH_CHECK, "profitLimitRatio()", result=[300])
+    node.view(HEALTH_CHECK, "lossLimitRatio()", result=[100])
+    keeper_views = {
+        "debt_in_range": 1,
+        "collateral_in_range": 1,
+        "harvest_trigger": 1,
+        "pending_harvest": 0,
+        "price_source_diff": 500,
+        "is_paused": 0,
+    }
+    node.add_strategy(address(0), views=keeper_views)
+    node.add_strategy(address(1), replace(INPUTS, total_assets=DEBT * 98 // 100), views=keeper_views)
+    strategies = [address(0), address(1)]
+
+    actions = asyncio.run(Keeper(RpcClient(node), strategies, SENDER, health_check=True).run_once())
+    assert actions == {address(0): HARVEST}
+    assert node.sent == [address(0)]
+
+    actions = asyncio.run(Keeper(RpcClient(node), strategies, SENDER).run_once())
+    assert actions == {address(0): HARVEST, address(1): HARVEST}
@@ -0,0 +1,238 @@
+import asyncio
+
+import pytest
+
+from neutra.indexer import EVENTS, GRAIL_MANAGER, INSURANCE, STRATEGY, VAULT, Indexer, Store
+from neutra.keeper import RpcClient
+
+SPECS = {event.name: event for event in EVENTS}
+STRATEGY_ADDRESS = "0x" + "11" * 20
+INSURANCE_ADDRESS = "0x" + "22" * 20
+MANAGER_ADDRESS = "0x" + "33" * 20
+VAULT_ADDRESS = "0x" + "44" * 20
+OTHER_ADDRESS = "0x" + "55" * 20
+
+
+def word(value):
+    if isinstance(value, str):
+        value = int(value, 16)
+    return value.to_bytes(32, "big")
+
+
+class FakeNode:
+    """In-process chain serving `eth_getLogs` over fake blocks.
+
+    `max_range` makes ranges wider than that many blocks fail like a
+    provider's result limit, `reorg` replaces the chain from a block on.
+    """
+
+    def __init__(self, height, max_range=None):
+        self.blocks = []
+        self.fork = 0
+        self.logs = {}
+        self.requests = []
+        self.max_range = max_range
+        self.extend(height)
+
+    def extend(self, n):
+        for _ in range(n):
+            self.blocks.append("0x%032x%032x" % (self.fork, len(self.blocks)))
+
+    def emit(self, block, address, event, *values):
+        spec = SPECS[event]
+        topics, data = [spec.topic], b""
+        for (_, _, indexed), value in zip(spec.args, values):
+            if indexed:
+                topics.append("0x" + word(value).hex())
+            else:
+                data += word(value)
+        logs = self.logs.setdefault(block, [])
+        logs.append({
+            "address": address,
+            "topics": topics,
+            "data": "0x" + data.hex(),
+            "blockNumber": hex(block),
+            "logIndex": hex(len(logs)),
+            "transactionHash": "0x%064x" % (block * 1000 + len(logs)),
+        })
+
+    def reorg(self, block):
+        self.fork += 1
+        height = len(self.blocks)
+        del self.blocks[block:]
+        self.logs = {number: logs for number, logs in self.logs.items() if number < block}
+        self.extend(height - block)
+
+    async def request(self, payload):
+        self.requests.append(payload)
+        return [{"jsonrpc": "2.0", "id": call["id"], **self._handle(call["method"], call["params"])} for call in payload]
+
+    def _handle(self, method, params):
+        if method == "eth_blockNumber":
+            return {"result": hex(len(self.blocks) - 1)}
+        if method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            return {"result": {"hash": self.blocks[number]} if number < len(self.blocks) else None}
+        if method == "eth_getLogs":
+            log_filter = params[0]
+            first, last = int(log_filter["fromBlock"], 16), int(log_filter["toBlock"], 16)
+            if self.max_range is not None and last - first + 1 > self.max_range:
+                return {"error": {"code": -32005, "message": "query returned more than 10000 results"}}
+            addresses = set(log_filter["address"])
+            topics = set(log_filter["topics"][0])
+            return {"result": [
+                {**log, "blockHash": self.blocks[number]}
+                for number in range(first, last + 1)
+                for log in self.logs.get(number, [])
+                if log["address"] in addresses and log["topics"][0] in topics
+            ]}
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+
+def indexer_for(node, tmp_path, **kwargs):
+    store = Store(str(tmp_path / "events.db"))
+    store.add_contract(STRATEGY_ADDRESS, STRATEGY, 10)
+    store.add_contract(INSURANCE_ADDRESS, INSURANCE, 10)
+    store.add_contract(MANAGER_ADDRESS, GRAIL_MANAGER, 10)
+    store.add_contract(VAULT_ADDRESS, VAULT, 10)
+    kwargs.setdefault("confirmations", 0)
+    return Indexer(RpcClient(node), store, **kwargs)
+
+
+def sync(indexer):
+    return asyncio.run(indexer.sync())
+
+
+def test_decodes_every_event(tmp_path):
+    node = FakeNode(100)
+    node.emit(20, STRATEGY_ADDRESS, "DebtRebalance", 9500, 10 ** 9, 2 ** 200)
+    node.emit(20, STRATEGY_ADDRESS, "CollatRebalance", 7600, 10 ** 6)
+    node.emit(21, STRATEGY_ADDRESS, "SetGrailManager", MANAGER_ADDRESS)
+    node.emit(30, INSURANCE_ADDRESS, "InsurancePayment", 10 ** 12, 10 ** 8, 10 ** 7)
+    node.emit(31, INSURANCE_ADDRESS, "InsurancePayout", 5 * 10 ** 6)
+    node.emit(40, MANAGER_ADDRESS, "SetStrategy", STRATEGY_ADDRESS)
+    node.emit(40, MANAGER_ADDRESS, "SetManager", OTHER_ADDRESS)
+    node.emit(40, MANAGER_ADDRESS, "SetYieldBooster", OTHER_ADDRESS)
+    node.emit(50, VAULT_ADDRESS, "StrategyReported", STRATEGY_ADDRESS, 1, 2, 3, 4, 5, 6, 7, 8)
+    # before the start block, from an unknown contract and from the wrong kind of contract
+    node.emit(5, STRATEGY_ADDRESS, "InsurancePayout", 1)
+    node.emit(60, OTHER_ADDRESS, "InsurancePayout", 1)
+    node.emit(60, STRATEGY_ADDRESS, "InsurancePayout", 1)
+
+    indexer = indexer_for(node, tmp_path)
+    assert sync(indexer) == 9
+    store = indexer.store
+
+    (debt,) = store.rows("DebtRebalance")
+    assert (debt["block_number"], debt["debt_ratio"], debt["swap_amount"], debt["slippage"]) == (20, 9500, 10 ** 9, 2 ** 200)
+    assert debt["block_hash"] == node.blocks[20]
+    assert store.rows("SetGrailManager")[0]["grail_manager"].lower() == MANAGER_ADDRESS
+    assert store.rows("InsurancePayment")[0]["want_payment"] == 10 ** 7
+    assert store.rows("InsurancePayout")[0]["want_payout"] == 5 * 10 ** 6
+    assert store.rows("SetYieldBooster")[0]["yield_booster"].lower() == OTHER_ADDRESS
+    (report,) = store.rows("StrategyReported", address=VAULT_ADDRESS)
+    assert report["strategy"].lower() == STRATEGY_ADDRESS
+    assert [report[name] for name in SPECS["StrategyReported"].columns[1:]] == list(range(1, 9))
+    assert store.rows("CollatRebalance", from_block=21) == []
+
+
+def test_incremental_catch_up(tmp_path):
+    node = FakeNode(1_000)
+    node.emit(500, STRATEGY_ADDRESS, "CollatRebalance", 7600, 1)
+    indexer = indexer_for(node, tmp_path)
+    assert sync(indexer) == 1
+
+    # nothing new, only the head and the reorg check are read
+    node.requests = []
+    assert sync(indexer) == 0
+    assert not any(call["method"] == "eth_getLogs" for payload in node.requests for call in payload)
+
+    node.extend(100)
+    node.emit(1_050, STRATEGY_ADDRESS, "CollatRebalance", 6400, 2)
+    node.requests = []
+    assert sync(indexer) == 1
+    ranges = [
+        (int(call["params"][0]["fromBlock"], 16), int(call["params"][0]["toBlock"], 16))
+        for payload in node.requests for call in payload if call["method"] == "eth_getLogs"
+    ]
+    assert ranges == [(1_000, 1_099)]
+    assert [row["adj_amount"] for row in indexer.store.rows("CollatRebalance")] == [1, 2]
+
+
+def test_resumes_from_a_new_store(tmp_path):
+    node = FakeNode(300)
+    node.emit(100, STRATEGY_ADDRESS, "CollatRebalance", 7600, 1)
+    sync(indexer_for(node, tmp_path))
+    node.extend(10)
+    node.emit(305, STRATEGY_ADDRESS, "CollatRebalance", 7600, 2)
+
+    store = Store(str(tmp_path / "events.db"))
+    assert sync(Indexer(RpcClient(node), store, confirmations=0)) == 1
+    assert len(store.rows("CollatRebalance")) == 2
+
+
+def test_adaptive_chunks(tmp_path):
+    node = FakeNode(20_000, max_range=700)
+    for block in range(100, 20_000, 97):
+        node.emit(block, STRATEGY_ADDRESS, "CollatRebalance", 7000, block)
+    indexer = indexer_for(node, tmp_path, chunk_size=4_000, concurrency=3)
+    assert sync(indexer) == len(range(100, 20_000, 97))
+    assert [row["adj_amount"] for row in indexer.store.rows("CollatRebalance")] == list(range(100, 20_000, 97))
+    assert indexer.chunk_size <= 700
+
+    # sparse ranges grow the chunk again
+    node.max_range = None
+    node.extend(100_000)
+    sync(indexer)
+    assert indexer.chunk_size > 4_000
+
+
+def test_fetches_concurrently(tmp_path):
+    node = FakeNode(10_000)
+    indexer = indexer_for(node, tmp_path, chunk_size=1_000, max_chunk_size=1_000, concurrency=4)
+    seen = []
+
+    async def request(payload):
+        seen.append(payload)
+        await asyncio.sleep(0)
+        in_flight.append(len(seen) - len(done))
+        response = await FakeNode.request(node, payload)
+        done.append(payload)
+        return response
+
+    in_flight, done = [], []
+    node.request = request
+    sync(indexer)
+    assert max(in_flight) == 4
+
+
+def test_new_contract_is_backfilled(tmp_path):
+    node = FakeNode(1_000)
+    other = "0x" + "66" * 20
+    node.emit(200, other, "DebtRebalance", 1, 2, 3)
+    node.emit(900, other, "DebtRebalance", 4, 5, 6)
+    indexer = indexer_for(node, tmp_path)
+    sync(indexer)
+
+    indexer.store.add_contract(other, STRATEGY, 100)
+    node.extend(10)
+    node.emit(1_005, other, "DebtRebalance", 7, 8, 9)
+    assert sync(indexer) == 3
+    assert {indexed_to for _, indexed_to in indexer.store.contracts().values()} == {1_009}
+
+
+@pytest.mark.parametrize("depth", [3, 50])
+def test_reorg(tmp_path, depth):
+    node = FakeNode(1_000)
+    node.emit(990, STRATEGY_ADDRESS, "DebtRebalance", 1, 1, 1)
+    node.emit(999 - depth + 1, STRATEGY_ADDRESS, "DebtRebalance", 2, 2, 2)
+    indexer = indexer_for(node, tmp_path, chunk_size=5, max_chunk_size=5)
+    sync(indexer)
+    assert len(indexer.store.rows("DebtRebalance")) == 2
+
+    node.reorg(1_000 - depth)
+    node.emit(999 - depth + 2, STRATEGY_ADDRESS, "DebtRebalance", 3, 3, 3)
+    sync(indexer)
+    rows = indexer.store.rows("DebtRebalance")
+    assert [row["debt_ratio"] for row in rows] == ([1, 3] if depth < 10 else [3])
+    assert all(row["block_hash"] == node.blocks[row["block_number"]] for row in rows)
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from neutra.sim.insurance import InsuranceParams, harvest_returns, simulate_insurance
+
+DEBT = 1_000_000.0
+
+
+class ReferenceInsurance:
+    """StrategyInsurance and the insurance part of prepareReturn, one scenario, transcribed."""
+
+    def __init__(self, target_fund_size=50, profit_take_rate=1000, maximum_compensation_rate=5):
+        self.target_fund_size = target_fund_size
+        self.profit_take_rate = profit_take_rate
+        self.maximum_compensation_rate = maximum_compensation_rate
+        self.balance = 0.0
+        self.loss_sum = 0.0
+
+    def compensate(self, total_debt):
+        if self.balance == 0:
+            self.loss_sum = 0
+            return 0
+        max_comp = self.maximum_compensation_rate * total_debt / 10_000
+        compensation = min(min(self.balance, self.loss_sum), max_comp)
+        self.balance -= compensation
+        self.loss_sum -= compensation
+        return compensation
+
+    def report_profit(self, total_debt, profit):
+        if self.loss_sum > profit:
+            self.loss_sum -= profit
+            return 0, self.compensate(total_debt)
+        self.loss_sum = 0
+        if self.balance >= total_debt * self.target_fund_size / 10_000:
+            return 0, 0
+        return profit * self.profit_take_rate / 10_000, 0
+
+    def report_loss(self, total_debt, loss):
+        self.loss_sum += loss
+        return self.compensate(total_debt)
+
+    def harvest(self, total_debt, profit, loss):
+        """Returns (profit, loss) reported to the vault."""
+        if loss >= profit:
+            return 0, loss - self.report_loss(total_debt, loss)
+        profit -= loss
+        payment, compensation = self.report_profit(total_debt, profit)
+        profit = profit - payment + compensation
+        if payment > 0 and payment < profit:
+            self.balance += payment
+        return profit, 0
+
+
+def reference(returns, params, compound=False):
+    rows = []
+    for scenario in returns:
+        fund = ReferenceInsurance(**params)
+        debt, stranded, row = DEBT, 0.0, []
+        for r in scenario:
+            pnl = r * debt
+            profit, loss = fund.harvest(debt, max(pnl, 0) + stranded, max(-pnl, 0))
+            stranded = 0.0
+            row.append((fund.balance, profit, loss))
+            if compound:
+                debt += profit - loss
+        rows.append(row)
+    return np.array(rows)
+
+
+@pytest.mark.parametrize("compound", [False, True])
+def test_matches_reference(compound):
+    returns = harvest_returns(20, 300, loss_probability=0.05, seed=3)
+    settings = dict(target_fund_size=100, profit_take_rate=2000, maximum_compensation_rate=10)
+    result = simulate_insurance(returns, DEBT, InsuranceParams(**settings), compound=compound)
+    expected = reference(returns, settings, compound)
+    np.testing.assert_allclose(result.balance, expected[:, :, 0], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(result.profit, expected[:, :, 1], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(result.loss, expected[:, :, 2], rtol=1e-9, atol=1e-6)
+
+
+def test_fund_stops_at_target():
+    result = simulate_insurance(np.full((1, 500), 0.001), DEBT)
+    # 10% of every profit until the fund holds 0.5% of the debt
+    assert result.payments[0, 0] == pytest.approx(100)
+    assert result.balance[0, -1] == pytest.approx(DEBT * 0.005, abs=100)
+    assert result.payments[0, -1] == 0
+    assert result.profit_drag[0] < 0.1
+
+
+def test_compensation_is_capped_per_harvest():
+    returns = np.zeros((1, 20))
+    returns[0, 0] = -0.002
+    result = simulate_insurance(returns, DEBT, initial_balance=10_000.0)
+    # 5 bps of the debt per harvest until the 2000 loss is repaid
+    assert list(result.compensation[0, :5]) == pytest.approx([500, 500, 500, 500, 0])
+    assert result.coverage[0] == pytest.approx(1.0)
+    assert result.loss_sum[0, -1] == 0
+
+
+def test_pending_losses_continue_on_profitable_harvests():
+    returns = np.array([[-0.003, 0.0001, 0.0001, 0.0001]])
+    result = simulate_insurance(returns, DEBT, initial_balance=10_000.0)
+    # the profit is netted off lossSum, then the fund keeps compensating
+    assert list(result.compensation[0]) == pytest.approx([500, 500, 500, 500])
+    assert list(result.loss_sum[0]) == pytest.approx([2500, 1900, 1300, 700])
+    assert result.payments[0].sum() == 0
+
+
+def test_empty_fund_forgets_losses():
+    returns = np.array([[-0.003, 0.0, 0.0002]])
+    result = simulate_insurance(returns, DEBT)
+    assert result.compensation.sum() == 0
+    assert result.loss_sum[0, 0] == 0
+    assert result.coverage[0] == 0
+    assert result.uncovered_loss[0] == pytest.approx(3000)
+
+
+def test_parameters_per_scenario():
+    returns = np.repeat(harvest_returns(1, 2_000, seed=7), 3, axis=0)
+    params = InsuranceParams(
+        target_fund_size=np.array([10, 50, 200]), profit_take_rate=np.array([1000, 1000, 3000]), maximum_compensation_rate=5
+    )
+    assert params.valid().all()
+    result = simulate_insurance(returns, DEBT, params)
+    assert result.coverage[0] <= result.coverage[1] <= result.coverage[2]
+    drag = result.apr_drag(harvests_per_year=365)
+    assert drag[0] < drag[2]
+
+
+def test_many_scenarios_at_once():
+    returns = harvest_returns(10_000, 365, seed=1)
+    result = simulate_insurance(returns, DEBT)
+    assert result.balance.shape == (10_000, 365)
+    assert ((result.coverage >= 0) | np.isnan(result.coverage)).all()
+    assert (result.balance >= -1e-6).all()
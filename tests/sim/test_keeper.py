@@ -0,0 +1,247 @@
+import asyncio
+import math
+
+import pytest
+
+from neutra.keeper import (
+    HARVEST,
+    IN_RANGE,
+    NOT_DEPLOYED,
+    PAUSED,
+    PRICE_SOURCE_DIFF,
+    READY,
+    REBALANCE_COLLATERAL,
+    REBALANCE_DEBT,
+    HarvestScheduler,
+    Keeper,
+    RpcClient,
+    collateral_trigger,
+    debt_trigger,
+    decide,
+    harvest_target,
+    selector,
+)
+from neutra.keeper.keeper import PRICE_SOURCE_OK, VIEWS
+
+SENDER = "0x" + "ee" * 20
+
+DEFAULT_VIEWS = {
+    "debt_in_range": 1,
+    "collateral_in_range": 1,
+    "harvest_trigger": 0,
+    "pending_harvest": 0,
+    "price_source_diff": 500,
+    "is_paused": 0,
+    # priceSourceOk(uint256), by the difference passed
+    "price_source_ok": {500: 1},
+}
+
+
+class FakeNode:
+    """In-process stand-in for a JSON-RPC node serving strategy views.
+
+    Keeper calls put the strategy back on target and are mined on the next
+    `eth_blockNumber`.
+    """
+
+    def __init__(self, strategies):
+        self.strategies = strategies
+        self.block = 100
+        self.requests = []
+        self.sent = []
+        self.mempool = []
+        self.receipts = {}
+        self._views = {"0x" + selector(signature).hex(): name for name, signature in VIEWS.items()}
+        self._views["0x" + selector(PRICE_SOURCE_OK).hex()] = "price_source_ok"
+        self._actions = {"0x" + selector(f"{action}()").hex(): action for action in (REBALANCE_DEBT, REBALANCE_COLLATERAL, HARVEST)}
+
+    async def request(self, payload):
+        self.requests.append(payload)
+        return [{"jsonrpc": "2.0", "id": call["id"], **self._handle(call["method"], call["params"])} for call in payload]
+
+    def _handle(self, method, params):
+        if method == "eth_blockNumber":
+            for tx_hash, address, action in self.mempool:
+                self.strategies[address].update(debt_in_range=1, collateral_in_range=1, harvest_trigger=0)
+                self.receipts[tx_hash] = {"status": "0x1", "blockNumber": hex(self.block)}
+            self.mempool = []
+            self.block += 1
+            return {"result": hex(self.block)}
+        if method == "eth_call":
+            views = self.strategies.get(params[0]["to"])
+            if views is None or views.get("reverts"):
+                return {"error": {"code": -32000, "message": "execution reverted"}}
+            data = params[0]["data"]
+            value = views[self._views[data[:10]]]
+            if isinstance(value, dict):
+                value = value.get(int(data[10:], 16), 0)
+            if value is None:
+                return {"error": {"code": -32000, "message": "execution reverted"}}
+            return {"result": "0x" + value.to_bytes(32, "big").hex()}
+        if method == "eth_sendTransaction":
+            tx = params[0]
+            tx_hash = "0x%064x" % len(self.sent)
+            action = self._actions[tx["data"]]
+            self.sent.append((tx["to"], action))
+            self.mempool.append((tx_hash, tx["to"], action))
+            return {"result": tx_hash}
+        if method == "eth_getTransactionReceipt":
+            return {"result": self.receipts.get(params[0])}
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+
+def address(i):
+    return "0x%040x" % (i + 1)
+
+
+def node_with(n, **overrides):
+    strategies = {address(i): dict(DEFAULT_VIEWS) for i in range(n)}
+    for i, views in overrides.items():
+        strategies[address(int(i[1:]))].update(views)
+    return FakeNode(strategies)
+
+
+@pytest.mark.parametrize("views,action", [
+    ({}, None),
+    ({"debt_in_range": 0}, REBALANCE_DEBT),
+    ({"collateral_in_range": 0}, REBALANCE_COLLATERAL),
+    ({"harvest_trigger": 1}, HARVEST),
+    ({"debt_in_range": 0, "collateral_in_range": 0, "harvest_trigger": 1}, REBALANCE_DEBT),
+    ({"debt_in_range": 0, "price_source_ok": {}}, None),
+    ({"debt_in_range": 0, "price_source_ok": {}, "harvest_trigger": 1}, HARVEST),
+    # checked with the strategy's priceSourceDiffKeeper()
+    ({"debt_in_range": 0, "price_source_diff": 300, "price_source_ok": {300: 1}}, REBALANCE_DEBT),
+    ({"debt_in_range": 0, "is_paused": 1}, None),
+])
+def test_decide(views, action):
+    node = node_with(1, s0=views)
+    client = RpcClient(node)
+    (state,) = asyncio.run(Keeper(client, [address(0)], SENDER).poll())
+    assert decide(state) == action
+
+
+@pytest.mark.parametrize("views,triggers", [
+    ({}, (IN_RANGE, IN_RANGE)),
+    ({"debt_in_range": 0, "collateral_in_range": 0}, (READY, READY)),
+    ({"debt_in_range": 0, "price_source_ok": {}}, (PRICE_SOURCE_DIFF, IN_RANGE)),
+    ({"collateral_in_range": 0, "price_source_ok": {500: 0}}, (IN_RANGE, PRICE_SOURCE_DIFF)),
+    ({"debt_in_range": 0, "is_paused": 1}, (PAUSED, PAUSED)),
+])
+def test_triggers(views, triggers):
+    node = node_with(1, s0=views)
+    (state,) = asyncio.run(Keeper(RpcClient(node), [address(0)], SENDER).poll())
+    assert (debt_trigger(state), collateral_trigger(state)) == triggers
+
+
+def test_price_source_read_when_out_of_range():
+    node = node_with(3, s1={"debt_in_range": 0}, s2={"collateral_in_range": None, "is_paused": 1})
+    states = asyncio.run(Keeper(RpcClient(node), [address(i) for i in range(3)], SENDER).poll())
+    assert [state.price_source_ok for state in states] == [None, True, None]
+    calls = [call for payload in node.requests for call in payload if call["method"] == "eth_call"]
+    checks = [call for call in calls if call["params"][0]["data"].startswith("0x" + selector(PRICE_SOURCE_OK).hex())]
+    assert [call["params"][0]["to"] for call in checks] == [address(1)]
+    # at the block of the other views
+    assert checks[0]["params"][1] == hex(node.block)
+
+
+def test_reads_are_batched():
+    node = node_with(50)
+    client = RpcClient(node, max_batch_size=100, max_concurrency=2)
+    states = asyncio.run(Keeper(client, [address(i) for i in range(50)], SENDER).poll())
+    assert len(states) == 50
+    calls = [call for payload in node.requests for call in payload if call["method"] == "eth_call"]
+    assert len(calls) == 50 * len(VIEWS)
+    # block number, then the receipts and views in batches of 100
+    assert max(len(payload) for payload in node.requests) == 100
+    assert len(node.requests) == 1 + math.ceil(len(calls) / 100)
+    # every view is read at the same block
+    assert len({call["params"][1] for call in calls}) == 1
+
+
+def test_run_once_sends_actions():
+    node = node_with(4, s1={"debt_in_range": 0}, s2={"collateral_in_range": 0}, s3={"harvest_trigger": 1})
+    keeper = Keeper(RpcClient(node), [address(i) for i in range(4)], SENDER)
+
+    actions = asyncio.run(keeper.run_once())
+    assert actions == {address(1): REBALANCE_DEBT, address(2): REBALANCE_COLLATERAL, address(3): HARVEST}
+    assert sorted(node.sent) == sorted(actions.items())
+    assert set(keeper.pending) == set(actions)
+
+    # once mined the strategies are back on target and nothing is resent
+    assert asyncio.run(keeper.run_once()) == {}
+    assert keeper.pending == {}
+    assert len(node.sent) == 3
+
+
+def test_pending_strategies_are_skipped():
+    node = node_with(2, s0={"debt_in_range": 0})
+    keeper = Keeper(RpcClient(node), [address(0), address(1)], SENDER)
+    keeper.pending[address(0)] = "0x" + "ab" * 32
+
+    states = asyncio.run(keeper.poll())
+    assert [state.address for state in states] == [address(1)]
+    assert keeper.pending == {address(0): "0x" + "ab" * 32}
+
+
+def test_reverting_strategy_is_skipped():
+    node = node_with(3, s1={"reverts": True}, s2={"harvest_trigger": 1})
+    keeper = Keeper(RpcClient(node), [address(i) for i in range(3)], SENDER)
+    assert asyncio.run(keeper.run_once()) == {address(2): HARVEST}
+
+
+def test_undeployed_strategy_is_harvested():
+    # debtInRange() and collateralInRange() revert with only idle want
+    node = node_with(2, s0={"debt_in_range": None, "collateral_in_range": None, "harvest_trigger": 1}, s1={"debt_in_range": None})
+    keeper = Keeper(RpcClient(node), [address(0), address(1)], SENDER)
+
+    states = asyncio.run(keeper.poll())
+    assert [(debt_trigger(state), collateral_trigger(state)) for state in states] == [
+        (NOT_DEPLOYED, NOT_DEPLOYED),
+        (NOT_DEPLOYED, IN_RANGE),
+    ]
+    assert asyncio.run(keeper.run_once()) == {address(0): HARVEST}
+
+
+def test_run_stops():
+    node = node_with(1, s0={"harvest_trigger": 1})
+    keeper = Keeper(RpcClient(node), [address(0)], SENDER, poll_interval=0.01)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(keeper.run(stop))
+        await asyncio.sleep(0.1)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+    assert node.sent == [(address(0), HARVEST)]
+    assert len([p for p in node.requests if p[0]["method"] == "eth_blockNumber"]) > 2
+
+
+def test_keeper_harvests_when_scheduled():
+    node = node_with(2)
+    now = [0]
+    scheduler = HarvestScheduler(2 * 10 ** 6, 0.2)
+    keeper = Keeper(RpcClient(node), [address(0), address(1)], SENDER, scheduler=scheduler, clock=lambda: now[0])
+    due_at = harvest_target(2 * 10 ** 6, 100, 0.2) / 100
+
+    assert asyncio.run(keeper.run_once()) == {}
+    now[0] = due_at
+    node.strategies[address(0)]["pending_harvest"] = math.ceil(100 * due_at)
+    node.strategies[address(1)]["pending_harvest"] = int(100 * due_at / 2)
+    assert asyncio.run(keeper.run_once()) == {address(0): HARVEST}
+
+
+def test_keeper_restarts_schedule_on_harvest():
+    # the pending rewards don't drop after the harvest
+    node = node_with(1)
+    now = [0]
+    scheduler = HarvestScheduler(10, 0.2, max_delay=100)
+    keeper = Keeper(RpcClient(node), [address(0)], SENDER, scheduler=scheduler, clock=lambda: now[0])
+
+    harvests = []
+    for t in range(0, 301, 50):
+        now[0] = t
+        if asyncio.run(keeper.run_once()) == {address(0): HARVEST}:
+            harvests.append(t)
+    assert harvests == [100, 250]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from neutra.sim import StrategyParams
+from neutra.sim.optimize import Paths, SearchSpace, gbm_prices, search, valid
+from neutra.sim.replay import Tick, replay_arrays
+
+PRICE = 1800.0
+DEPOSIT = 100_000.0
+WANT_RESERVE = 5_000_000.0
+
+
+def paths(n_paths=4, n_steps=2_000):
+    return Paths.from_prices(gbm_prices(n_paths, n_steps, PRICE, 0.003), WANT_RESERVE)
+
+
+def test_grid_respects_setter_checks():
+    space = SearchSpace(
+        debt_lower=(9500, 9800, 10100),
+        debt_upper=(9900, 10200, 10500),
+        collat_upper=(7500, 8200),
+        collat_limit=(8100, 8500),
+    )
+    grid = space.grid()
+    # debt_lower 10100 and debt_upper 9900 are rejected, as is collatUpper >= collatLimit
+    assert len(grid) == 2 * 2 * 3
+    assert all(valid(params) for params in grid)
+    assert not valid(StrategyParams(collat_lower=7100))
+
+    sample = space.sample(5, seed=1)
+    assert len(sample) == 5
+    assert len({(p.debt_lower, p.debt_upper, p.collat_upper, p.collat_limit) for p in sample}) == 5
+    assert all(valid(params) for params in sample)
+
+
+def test_matches_replay():
+    space = SearchSpace(debt_lower=(9610, 9800), debt_upper=(10200, 10390))
+    candidates = space.grid()
+    data = paths(2, 1_000)
+    evaluations = search(data, candidates, DEPOSIT, workers=2, batch_size=3, gas_per_call=1.5)
+    assert len(evaluations) == 4
+    assert [e.score for e in evaluations] == sorted(e.score for e in evaluations)
+
+    for evaluation in evaluations:
+        results = [
+            replay_arrays(data.want[p], data.short[p], DEPOSIT, evaluation.params, oracle_price=data.oracle_price[p], gas_per_call=1.5)
+            for p in range(2)
+        ]
+        assert evaluation.net_pnl == pytest.approx(np.mean([r.net_pnl[0] for r in results]), rel=1e-12)
+        assert evaluation.gas_cost == pytest.approx(np.mean([r.gas_cost[0] for r in results]))
+        assert evaluation.rebalances == np.mean([r.debt_rebalances[0] + r.collat_rebalances[0] for r in results])
+        assert evaluation.score == -evaluation.net_pnl
+
+
+def test_gas_favours_wider_bands():
+    space = SearchSpace(debt_lower=(9900, 9610, 9000), debt_upper=(10100, 10390, 11000))
+    data = paths()
+    cheap = search(data, space.grid(), DEPOSIT, workers=2, gas_per_call=0.0)
+    expensive = search(data, space.grid(), DEPOSIT, workers=2, gas_per_call=50.0)
+    band = lambda e: e.params.debt_upper - e.params.debt_lower
+    assert band(expensive[0]) > band(cheap[0])
+    assert min(e.rebalances for e in expensive) < max(e.rebalances for e in expensive)
+
+
+def test_collateral_limit_rules_out():
+    space = SearchSpace(collat_upper=(7500, 7900), collat_limit=(8000,))
+    evaluations = search(paths(2, 3_000), space.grid(), DEPOSIT, workers=1)
+    assert all(e.feasible == (e.max_collat_ratio < 8000) for e in evaluations)
+
+
+def test_paths_from_ticks():
+    ticks = [Tick(i, WANT_RESERVE, WANT_RESERVE / PRICE, PRICE if i % 2 == 0 else None) for i in range(10)]
+    data = Paths.from_ticks(ticks)
+    assert data.want.shape == (1, 10)
+    assert np.isnan(data.oracle_price[0, 1])
+    (evaluation,) = search(data, [StrategyParams()], DEPOSIT, workers=1)
+    assert evaluation.rebalances == 0
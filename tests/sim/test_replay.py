@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from neutra.sim import Pool, Position, StrategyParams, deploy, estimated_total_assets, keeper_step
+from neutra.sim.replay import Tick, read_csv, replay, replay_arrays
+
+PRICE = 1800.0
+DEPOSIT = 100_000.0
+WANT_RESERVE = 5_000_000.0
+
+PARAMS = [
+    StrategyParams(),
+    StrategyParams(debt_lower=9800, debt_upper=10200),
+    StrategyParams(debt_lower=9000, debt_upper=11000, collat_lower=6000, collat_upper=8000),
+]
+
+
+def history(n, vol=0.003, seed=0, oracle_every=1):
+    """Reserves of a pair random walking along x*y=k, with liquidity added now and then."""
+    rng = np.random.default_rng(seed)
+    price = PRICE * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    liquidity = WANT_RESERVE * np.cumprod(np.where(rng.random(n) < 0.01, 1.05, 1.0))
+    oracle = price * (1 + rng.normal(0, 0.001, n))
+    for i in range(n):
+        yield Tick(1_000 + i * 3, liquidity[i], liquidity[i] / price[i], oracle[i] if i % oracle_every == 0 else None)
+
+
+def reference(ticks, deposit, params):
+    """Per tick loop: reset the pair to the tick and run the keeper on it."""
+    ticks = list(ticks)
+    params = StrategyParams.stack(params)
+    n = len(params.collat_target)
+    oracle = ticks[0].oracle_price
+    pool = Pool.from_price(np.full(n, ticks[0].want / ticks[0].short), ticks[0].want)
+    pos = Position.empty(n)
+    pos.want += deposit
+    deploy(pos, pool, pos.want.copy(), oracle, params)
+    pos.reverted[:] = False
+    debt = np.zeros(n, dtype=int)
+    collat = np.zeros(n, dtype=int)
+    slippage = np.zeros(n)
+    for tick in ticks:
+        oracle = oracle if tick.oracle_price is None else tick.oracle_price
+        pool.want[:], pool.short[:], pool.supply[:] = tick.want, tick.short, np.sqrt(tick.want * tick.short)
+        d, c, _, slip = keeper_step(pos, pool, oracle, params)
+        debt += d
+        collat += c
+        slippage += slip
+    pool.want[:], pool.short[:], pool.supply[:] = tick.want, tick.short, np.sqrt(tick.want * tick.short)
+    return debt, collat, slippage, estimated_total_assets(pos, pool)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1_000])
+def test_matches_per_tick_loop(chunk_size):
+    result = replay(history(3_000, oracle_every=3), DEPOSIT, PARAMS, chunk_size=chunk_size)
+    debt, collat, slippage, total_assets = reference(history(3_000, oracle_every=3), DEPOSIT, PARAMS)
+    assert result.ticks == 3_000
+    assert (result.first_block, result.last_block) == (1_000, 1_000 + 2_999 * 3)
+    assert list(result.debt_rebalances) == list(debt)
+    assert list(result.collat_rebalances) == list(collat)
+    assert debt.sum() > 0 and collat.sum() > 0
+    np.testing.assert_allclose(result.slippage, slippage, rtol=1e-9)
+    np.testing.assert_allclose(result.total_assets, total_assets, rtol=1e-9)
+    np.testing.assert_allclose(result.pnl, total_assets - DEPOSIT, rtol=1e-9)
+
+
+def test_wider_bands_rebalance_less():
+    result = replay(history(5_000), DEPOSIT, PARAMS, gas_per_call=2.0)
+    calls = result.debt_rebalances + result.collat_rebalances
+    assert calls[2] < calls[0] < calls[1]
+    assert list(result.gas_cost) == list((calls + result.reverted) * 2.0)
+    np.testing.assert_allclose(result.net_pnl, result.pnl - result.gas_cost)
+    # the ratios drift past the band before the keeper brings them back
+    assert (result.debt_ratio_range[:, 0] < [9610, 9800, 9000]).all()
+    assert (result.debt_ratio_range[:, 1] > [10390, 10200, 11000]).all()
+
+
+def test_equity_curve():
+    result = replay(history(1_000), DEPOSIT, PARAMS, chunk_size=64, record_every=100)
+    assert list(result.equity_blocks) == [1_000 + i * 3 for i in range(0, 1_000, 100)]
+    assert result.equity.shape == (10, 3)
+    np.testing.assert_allclose(result.equity[0], DEPOSIT, rtol=1e-6)
+
+
+def test_streams_a_long_history():
+    consumed = []
+
+    def ticks():
+        for tick in history(100_000, vol=0.0005):
+            consumed.append(tick.block)
+            yield tick
+
+    result = replay(ticks(), DEPOSIT, StrategyParams(), chunk_size=5_000)
+    assert result.ticks == len(consumed) == 100_000
+    assert result.debt_rebalances[0] > 0
+
+
+def test_read_csv(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(
+        "block,want,short,oracle_price,supply\n"
+        "1,2000000000000,1000000000000000000000,2000.5,\n"
+        "2,2000100000000,999950000000000000000,,\n"
+    )
+    assert list(read_csv(path)) == [
+        Tick(1, 2_000_000.0, 1_000.0, 2000.5, None),
+        Tick(2, 2_000_100.0, 999.95, None, None),
+    ]
+    result = replay(read_csv(path), 1_000.0)
+    assert result.ticks == 2
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        replay([], DEPOSIT)
+    ticks = [Tick(1, WANT_RESERVE, WANT_RESERVE / PRICE, PRICE, 10.0), Tick(2, WANT_RESERVE, WANT_RESERVE / PRICE)]
+    with pytest.raises(ValueError):
+        replay(ticks, DEPOSIT)
+    with pytest.raises(ValueError):
+        StrategyParams.stack([StrategyParams(), StrategyParams(do_price_check=False)])
+
+
+def test_replay_arrays():
+    ticks = list(history(2_000, oracle_every=2))
+    oracle = [np.nan if tick.oracle_price is None else tick.oracle_price for tick in ticks]
+    result = replay_arrays(
+        [tick.want for tick in ticks], [tick.short for tick in ticks], DEPOSIT, PARAMS,
+        oracle_price=oracle, block=[tick.block for tick in ticks], chunk_size=300,
+    )
+    expected = replay(ticks, DEPOSIT, PARAMS)
+    assert list(result.debt_rebalances) == list(expected.debt_rebalances)
+    assert list(result.collat_rebalances) == list(expected.collat_rebalances)
+    np.testing.assert_allclose(result.total_assets, expected.total_assets, rtol=1e-12)
+    assert result.last_block == expected.last_block
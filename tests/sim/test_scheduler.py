@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+from neutra.keeper import HarvestScheduler, harvest_target, optimal_interval
+from neutra.keeper.scheduler import SECONDS_PER_YEAR
+
+COST = 2 * 10 ** 6  # 2 USDC
+RATE = 100  # want per second
+APR = 0.2
+STRATEGY = "0x" + "01" * 20
+
+
+def test_optimal_interval_minimises_losses():
+    interval = optimal_interval(COST, RATE, APR)
+
+    def lost_per_second(t):
+        return COST / t + APR / SECONDS_PER_YEAR * RATE * t / 2
+
+    assert lost_per_second(interval) < lost_per_second(interval * 0.9)
+    assert lost_per_second(interval) < lost_per_second(interval * 1.1)
+    assert harvest_target(COST, RATE, APR) == pytest.approx(RATE * interval)
+
+
+def test_nothing_accrues():
+    assert optimal_interval(COST, 0, APR) == math.inf
+    assert harvest_target(COST, RATE, 0) == math.inf
+
+
+def test_scheduler_waits_for_target():
+    scheduler = HarvestScheduler(COST, APR)
+    target = harvest_target(COST, RATE, APR)
+    due_at = target / RATE
+
+    # one reading is not enough to estimate the rate
+    assert not scheduler.observe(STRATEGY, 0, 0)
+    assert not scheduler.observe(STRATEGY, due_at / 2, RATE * due_at / 2)
+    assert scheduler.reward_rate(STRATEGY) == pytest.approx(RATE)
+    assert scheduler.next_harvest(STRATEGY) == pytest.approx(due_at)
+    assert scheduler.observe(STRATEGY, due_at, RATE * due_at)
+
+    # harvested, the accrual starts over
+    assert not scheduler.observe(STRATEGY, due_at + 10, RATE * 10)
+    assert scheduler.next_harvest(STRATEGY) is None
+
+
+def test_scheduler_max_delay():
+    scheduler = HarvestScheduler(COST, APR, max_delay=3600)
+    assert not scheduler.observe(STRATEGY, 0, 0)
+    assert not scheduler.observe(STRATEGY, 1800, 1)
+    assert scheduler.next_harvest(STRATEGY) == 3600
+    assert scheduler.observe(STRATEGY, 3600, 2)
+
+
+def test_harvest_restarts_accrual():
+    # rewards that stay at 0, e.g. the harvests revert
+    scheduler = HarvestScheduler(10, 0.2, max_delay=100)
+    assert not scheduler.observe(STRATEGY, 0, 0)
+    assert scheduler.observe(STRATEGY, 100, 0)
+    scheduler.harvested(STRATEGY)
+    assert not scheduler.observe(STRATEGY, 150, 0)
+    assert not scheduler.observe(STRATEGY, 200, 0)
+    assert scheduler.observe(STRATEGY, 250, 0)
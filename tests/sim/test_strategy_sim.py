@@ -0,0 +1,173 @@
+import time
+
+import numpy as np
+import pytest
+
+from neutra.sim import (
+    Pool,
+    Position,
+    StrategyParams,
+    calc_collateral,
+    calc_debt_ratio,
+    deploy,
+    estimated_total_assets,
+    keeper_step,
+    price_source_ok,
+    rebalance_collateral,
+    rebalance_debt,
+    rebalance_debt_incremental,
+    simulate,
+)
+
+PRICE = 1800.0
+DEPOSIT = 10_000.0
+WANT_RESERVE = 20_000_000.0
+
+
+def deployed(n_paths=1, params=None):
+    params = params or StrategyParams()
+    pool = Pool.from_price(np.full(n_paths, PRICE), WANT_RESERVE)
+    pos = Position.empty(n_paths)
+    pos.want += DEPOSIT
+    deploy(pos, pool, pos.want.copy(), np.full(n_paths, PRICE), params)
+    return pos, pool, params
+
+
+def gbm_paths(n_paths, n_steps, vol=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(-0.5 * vol ** 2, vol, size=(n_paths, n_steps))
+    steps[:, 0] = 0
+    return PRICE * np.exp(np.cumsum(steps, axis=1))
+
+
+def test_deploy_hits_targets():
+    pos, pool, params = deployed()
+    assert not pos.reverted.any()
+    assert pytest.approx(10000, rel=1e-6) == calc_debt_ratio(pos, pool)[0]
+    assert pytest.approx(params.collat_target, rel=1e-6) == calc_collateral(pos, PRICE)[0]
+    assert pytest.approx(DEPOSIT, rel=1e-6) == estimated_total_assets(pos, pool)[0]
+
+
+@pytest.mark.parametrize("debt_ratio,rel", [(0.4, 1e-2), (0.95, 1e-3), (1.05, 2e-3), (1.5, 1e-2)])
+def test_debt_rebalance(debt_ratio, rel):
+    pos, pool, params = deployed()
+    # scale the LP holding to offset the debt ratio, as test_debt_rebalance does on-chain
+    pos.lp /= debt_ratio
+    assert pytest.approx(debt_ratio * 10000, rel=1e-6) == calc_debt_ratio(pos, pool)[0]
+
+    rebalance_debt(pos, pool, PRICE, params)
+    assert not pos.reverted.any()
+    assert pytest.approx(10000, rel=rel) == calc_debt_ratio(pos, pool)[0]
+    assert pytest.approx(params.collat_target, rel=1e-2) == calc_collateral(pos, pool.price)[0]
+
+
+@pytest.mark.parametrize("debt_ratio", [0.95, 1.05])
+def test_debt_rebalance_incremental(debt_ratio):
+    full, pool_full, params = deployed()
+    full.lp /= debt_ratio
+    pos, pool = full.copy(), pool_full.copy()
+    lp_before = pos.lp.copy()
+
+    swap_full, _ = rebalance_debt(full, pool_full, PRICE, params)
+    swap, _ = rebalance_debt(pos, pool, PRICE, StrategyParams(incremental_debt_rebalance=True))
+    assert not pos.reverted.any()
+    assert pytest.approx(10000, rel=1e-3) == calc_debt_ratio(pos, pool)[0]
+    # the same swap as the full rebalance, without touching the LP
+    assert pytest.approx(swap_full[0], rel=2e-2) == swap[0]
+    assert pos.lp[0] == lp_before[0]
+    assert pytest.approx(params.collat_target, rel=2e-2) == calc_collateral(pos, pool.price)[0]
+
+
+def test_debt_rebalance_incremental_per_path():
+    params = StrategyParams.stack([StrategyParams(), StrategyParams(incremental_debt_rebalance=True)])
+    pos, pool, _ = deployed(2, params)
+    pos.lp /= 0.95
+    single, single_pool, _ = deployed()
+    single.lp /= 0.95
+    rebalance_debt(pos, pool, PRICE, params)
+    rebalance_debt_incremental(single, single_pool, PRICE, StrategyParams())
+    assert pytest.approx(params.collat_target[0], rel=1e-2) == calc_collateral(pos, pool.price)[0]
+    np.testing.assert_allclose(pos.lend[1], single.lend[0])
+    np.testing.assert_allclose(pos.debt[1], single.debt[0])
+
+
+def test_debt_rebalance_partial():
+    pos, pool, _ = deployed()
+    params = StrategyParams(debt_lower=9800, debt_upper=10200, rebalance_percent=5000)
+    pos.lp /= 0.95
+    rebalance_debt(pos, pool, PRICE, params)
+    assert pytest.approx(9750, rel=1e-3) == calc_debt_ratio(pos, pool)[0]
+
+
+@pytest.mark.parametrize("target", [2000, 6000])
+def test_collat_rebalance(target):
+    pos, pool, _ = deployed()
+    params = StrategyParams(collat_lower=target - 500, collat_target=target, collat_upper=target + 500)
+    rebalance_collateral(pos, pool, PRICE, params)
+    assert not pos.reverted.any()
+    assert pytest.approx(10000, rel=1e-3) == calc_debt_ratio(pos, pool)[0]
+    assert pytest.approx(target, rel=1e-2) == calc_collateral(pos, PRICE)[0]
+
+
+def test_masked_paths_untouched():
+    pos, pool, params = deployed(n_paths=2)
+    pos.lp /= 0.95
+    before = pos.copy()
+    rebalance_debt(pos, pool, PRICE, params, mask=np.array([True, False]))
+    assert pytest.approx(10000, rel=1e-3) == calc_debt_ratio(pos, pool)[0]
+    for name in ("want", "short", "lend", "debt", "lp"):
+        assert getattr(pos, name)[1] == getattr(before, name)[1]
+
+
+def test_simulate_matches_single_paths():
+    prices = gbm_paths(4, 200, vol=0.01)
+    batch = simulate(prices, DEPOSIT, WANT_RESERVE)
+    assert batch.debt_rebalances.sum() > 0
+    for i in range(prices.shape[0]):
+        single = simulate(prices[i], DEPOSIT, WANT_RESERVE)
+        assert np.allclose(single.total_assets[0], batch.total_assets[i])
+        assert single.debt_rebalances[0] == batch.debt_rebalances[i]
+
+
+def test_simulate_keeps_ratios_in_band():
+    params = StrategyParams()
+    result = simulate(gbm_paths(50, 500, vol=0.003), DEPOSIT, WANT_RESERVE, params=params)
+    ok = result.reverted == 0
+    assert ok.any()
+    assert (result.debt_ratio[ok, -1] >= params.debt_lower).all()
+    assert (result.debt_ratio[ok, -1] <= params.debt_upper).all()
+    assert (result.slippage >= 0).all()
+
+
+def test_keeper_rechecks_prices_after_debt_rebalance():
+    params = StrategyParams(incremental_debt_rebalance=True, slippage_adj=9500)
+    pool = Pool.from_price(np.full(1, PRICE), 100_000.0)
+    pos = Position.empty(1)
+    pos.want += DEPOSIT
+    deploy(pos, pool, pos.want.copy(), np.full(1, PRICE), params)
+    pos.lp /= 1.5
+    oracle = pool.price * 0.955
+    assert price_source_ok(pool, oracle, params.price_source_diff_keeper, params).all()
+
+    debt, collat, reverted, _ = keeper_step(pos, pool, oracle, params)
+    assert debt.all() and not reverted.any()
+    # buying back the debt moved the pair past the price check, which the
+    # collateral rebalance runs again on-chain
+    assert not price_source_ok(pool, oracle, params.price_source_diff_keeper, params).any()
+    assert calc_collateral(pos, oracle)[0] < params.collat_lower
+    assert not collat.any()
+
+
+def test_simulate_oracle_divergence_blocks_keeper():
+    prices = gbm_paths(8, 100, vol=0.01)
+    result = simulate(prices, DEPOSIT, WANT_RESERVE, oracle_prices=prices * 1.1)
+    assert (result.debt_rebalances == 0).all()
+    assert (result.collat_rebalances == 0).all()
+
+
+def test_simulate_scale():
+    start = time.perf_counter()
+    result = simulate(gbm_paths(1000, 1000, vol=0.005), DEPOSIT, WANT_RESERVE)
+    assert result.debt_ratio.shape == (1000, 1000)
+    assert result.debt_rebalances.sum() > 0
+    assert time.perf_counter() - start < 30
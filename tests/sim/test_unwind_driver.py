@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from neutra.keeper import RpcClient, UnwindError, run_unwind, selector
+
+STRATEGY = "0x" + "01" * 20
+SENDER = "0x" + "ee" * 20
+
+
+class UnwindNode:
+    """JSON-RPC node running the unwind state machine of one strategy.
+
+    Transactions are mined after `delay` receipt polls, `reverts` steps in a
+    row revert first.
+    """
+
+    def __init__(self, lp=10 ** 18, paused=False, lp_per_step=0, reverts=0, delay=1, cancel_after=None):
+        self.lp = lp
+        self.paused = paused
+        self.lp_per_step = lp_per_step
+        self.reverts = reverts
+        self.delay = delay
+        self.cancel_after = cancel_after
+        self.sent = []
+        self.receipts = {}
+        self._views = {
+            "0x" + selector(signature).hex(): signature
+            for signature in ("unwindLpPerStep()", "isPaused()", "balanceLpInShort()")
+        }
+
+    async def request(self, payload):
+        return [{"jsonrpc": "2.0", "id": call["id"], **self._handle(call["method"], call["params"])} for call in payload]
+
+    def _view(self, signature):
+        return {"unwindLpPerStep()": self.lp_per_step, "isPaused()": int(self.paused), "balanceLpInShort()": self.lp}[signature]
+
+    def _execute(self, data):
+        if data.startswith("0x" + selector("startUnwind(uint256)").hex()):
+            if self.paused:
+                return False
+            self.paused = True
+            self.lp_per_step = max(-(-self.lp * int(data[10:], 16) // 10_000), 1)
+            return True
+        if self.lp_per_step == 0:
+            return False
+        if self.reverts:
+            self.reverts -= 1
+            return False
+        self.lp -= min(self.lp_per_step, self.lp)
+        if self.lp == 0:
+            self.lp_per_step = 0
+        if self.cancel_after is not None:
+            self.cancel_after -= 1
+            if self.cancel_after == 0:
+                # cancelUnwind() mined next
+                self.lp_per_step, self.paused = 0, False
+        return True
+
+    def _handle(self, method, params):
+        if method == "eth_call":
+            return {"result": "0x" + self._view(self._views[params[0]["data"]]).to_bytes(32, "big").hex()}
+        if method == "eth_sendTransaction":
+            tx_hash = "0x%064x" % len(self.sent)
+            self.sent.append(params[0])
+            ok = self._execute(params[0]["data"])
+            self.receipts[tx_hash] = [self.delay, {"status": "0x1" if ok else "0x0"}]
+            return {"result": tx_hash}
+        if method == "eth_getTransactionReceipt":
+            pending = self.receipts[params[0]]
+            if pending[0] > 0:
+                pending[0] -= 1
+                return {"result": None}
+            return {"result": pending[1]}
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+
+async def no_sleep(seconds):
+    pass
+
+
+def unwind(node, **kwargs):
+    return asyncio.run(run_unwind(RpcClient(node), STRATEGY, SENDER, sleep=no_sleep, **kwargs))
+
+
+def test_unwind_to_completion():
+    node = UnwindNode()
+    sent = unwind(node, chunk=2500, gas=2_000_000)
+    # startUnwind and four steps of a quarter
+    assert len(sent) == 5
+    assert node.lp == 0 and node.lp_per_step == 0 and node.paused
+    assert all(tx["gas"] == hex(2_000_000) and tx["from"] == SENDER for tx in node.sent)
+
+
+def test_resumes_unwind_in_progress():
+    node = UnwindNode(lp=10 ** 18 // 4, paused=True, lp_per_step=10 ** 17)
+    sent = unwind(node, chunk=2500)
+    # the chunk of the unwind in progress is kept
+    assert len(sent) == 3
+    assert node.lp == 0
+
+
+def test_paused_strategy_is_left_alone():
+    node = UnwindNode(paused=True)
+    assert unwind(node) == []
+    assert node.sent == [] and node.lp == 10 ** 18
+
+
+def test_reverted_steps_are_retried():
+    node = UnwindNode(reverts=2)
+    sent = unwind(node, chunk=5000, max_reverts=3)
+    assert len(sent) == 5
+    assert node.lp == 0
+
+
+def test_gives_up_after_max_reverts():
+    node = UnwindNode(reverts=3)
+    with pytest.raises(UnwindError):
+        unwind(node, chunk=5000, max_reverts=3)
+    # still in progress, a later run picks it up
+    assert node.lp_per_step > 0
+    assert len(unwind(node)) == 2
+
+
+def test_cancelled_unwind():
+    node = UnwindNode(cancel_after=2)
+    with pytest.raises(UnwindError):
+        unwind(node, chunk=2500)
+    assert node.lp == 10 ** 18 // 2 and not node.paused
+
+
+def test_invalid_chunk():
+    with pytest.raises(ValueError):
+        unwind(UnwindNode(), chunk=0)
+    with pytest.raises(ValueError):
+        unwind(UnwindNode(), chunk=10_001)
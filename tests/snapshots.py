@@ -0,0 +1,90 @@
+def layer_path(parents, name):
+    """Layer names from the root of the `parents` tree down to `name`."""
+    path = []
+    while name is not None:
+        path.append(name)
+        name = parents[name]
+    return path[::-1]
+
+
+def deepest_layer(parents, names):
+    """Returns the deepest of `names`, which must all lie on one branch of `parents`."""
+    paths = sorted((layer_path(parents, name) for name in set(names)), key=len)
+    for path in paths[:-1]:
+        if paths[-1][:len(path)] != path:
+            raise ValueError(
+                f"snapshots '{path[-1]}' and '{paths[-1][-1]}' are on different branches"
+            )
+    return paths[-1][-1]
+
+
+class ChainSnapshots:
+    """Named chain snapshots that tests restore instead of redeploying.
+
+    Layers form a tree through `parents`: each layer is built on top of its
+    parent's state by the function registered with `builder` and the result is
+    snapshotted. Nodes discard every snapshot taken after the one they revert
+    to, so the snapshots that are alive always form a single path from the
+    root. Restoring a layer keeps the shared part of that path and rebuilds the
+    rest, which is why tests using the same layer should run back to back.
+
+    Args:
+        chain ([brownie.network.state.Chain]):
+        The chain to snapshot.
+
+        parents (dict):
+        Maps every layer name to the name of its parent, None for the root.
+    """
+
+    def __init__(self, chain, parents):
+        self._chain = chain
+        self._parents = parents
+        self._builders = {}
+        # [name, snapshot id, value], each entry built on top of the previous one
+        self._stack = []
+        self._active = None
+
+    def builder(self, name):
+        """Registers `build(parent_value)` as the builder of layer `name`.
+
+        The builder runs against the parent's chain state and returns the value
+        handed to `value(name)` and to the builders of child layers.
+        """
+        def register(build):
+            self._builders[name] = build
+            return build
+        return register
+
+    def clear(self):
+        """Forgets every snapshot, after the chain was reset under them."""
+        self._stack = []
+        self._active = None
+
+    def restore(self, name):
+        """Reverts the chain to layer `name`, building any missing layers on the way."""
+        path = layer_path(self._parents, name)
+        keep = 0
+        while keep < min(len(path), len(self._stack)) and self._stack[keep][0] == path[keep]:
+            keep += 1
+        del self._stack[keep:]
+
+        if self._stack:
+            # reverting consumes the snapshot, brownie takes a new one in its place
+            self._chain._snapshot_id = self._stack[-1][1]
+            self._chain.revert()
+            self._stack[-1][1] = self._chain._snapshot_id
+        else:
+            self._chain.reset()
+
+        for layer in path[keep:]:
+            value = self._builders[layer](self._stack[-1][2] if self._stack else None)
+            self._chain.snapshot()
+            self._stack.append([layer, self._chain._snapshot_id, value])
+        self._active = name
+
+    def value(self, name):
+        """Value built for layer `name`, which must be restored or an ancestor of it."""
+        for layer, _, value in self._stack:
+            if layer == name and name in layer_path(self._parents, self._active):
+                return value
+        raise ValueError(f"snapshot '{name}' is not restored")